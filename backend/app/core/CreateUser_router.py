@@ -1,9 +1,15 @@
 from fastapi import APIRouter, FastAPI, HTTPException
 from pydantic import BaseModel
+import asyncio
+import logging
 from app.services import supabase_service
+from app.services.resilience import CircuitOpenError
+from app.core.logging_config import log_payload
 
 router = APIRouter()
 
+logger = logging.getLogger(__name__)
+
 # Pydantic model for incoming user data
 class UserCreateRequest(BaseModel):
     phone_number: str
@@ -20,14 +26,14 @@ async def create_user(user: UserCreateRequest):
             "fist_name": user.full_name.split()[0] if user.full_name.split() else user.full_name,
             "last_name": " ".join(user.full_name.split()[1:]) if len(user.full_name.split()) > 1 else ""
         }
-        print(f"Attempting to insert: {user_data}")  # Debug print
+        log_payload(logger, "Inserting user", user_data)
         
         # Execute the insert query
-        response = supabase_service.supabase.table("userst").insert(user_data).execute()
+        response = await supabase_service.execute_async(
+            supabase_service.supabase.table("userst").insert(user_data), "userst_insert"
+        )
 
-        # Debug print the full response
-        print(f"Response structure: {type(response)}")
-        print(f"Response data: {response}")
+        log_payload(logger, "Supabase insert response", getattr(response, "data", None))
         
         # Check if response contains data or error
         if hasattr(response, 'data'):
@@ -36,8 +42,12 @@ async def create_user(user: UserCreateRequest):
             # Handle case where response format is different
             return {"message": "User created successfully", "response": str(response)}
     
+    except CircuitOpenError as e:
+        logger.warning(f"Supabase unavailable: {str(e)}")
+        raise HTTPException(status_code=503, detail="User service temporarily unavailable, please try again shortly")
+    except asyncio.TimeoutError:
+        logger.warning("Supabase query timed out")
+        raise HTTPException(status_code=503, detail="User service temporarily unavailable, please try again shortly")
     except Exception as e:
-        print(f"Exception caught: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.error(f"Creating user failed: {type(e).__name__}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
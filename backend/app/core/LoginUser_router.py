@@ -1,9 +1,15 @@
 from fastapi import APIRouter, FastAPI, HTTPException
 from pydantic import BaseModel
+import asyncio
+import logging
 from app.services import supabase_service
+from app.services.resilience import CircuitOpenError
+from app.core.logging_config import log_payload
 
 router = APIRouter()
 
+logger = logging.getLogger(__name__)
+
 class UserLoginRequest(BaseModel):
     phone_number: str
     password: str
@@ -11,11 +17,11 @@ class UserLoginRequest(BaseModel):
 @router.post("/login")
 async def login_user(user: UserLoginRequest):
     try:
-        response = supabase_service.supabase.table("userst").select("*").eq("phone_number", user.phone_number).execute()
-        print(f"Response data: {response.data}")
-    # Debug print the full response
-        print(f"Response structure: {type(response)}")
-        print(f"Response data: {response}")
+        response = await supabase_service.execute_async(
+            supabase_service.supabase.table("userst").select("*").eq("phone_number", user.phone_number),
+            "userst_select",
+        )
+        log_payload(logger, "Supabase login lookup", response.data)
 
         # Check if user exists
         if not response.data or len(response.data) == 0:
@@ -41,8 +47,12 @@ async def login_user(user: UserLoginRequest):
     except HTTPException as he:
         # Re-raise HTTP exceptions
         raise he
+    except CircuitOpenError as e:
+        logger.warning(f"Supabase unavailable: {str(e)}")
+        raise HTTPException(status_code=503, detail="Login temporarily unavailable, please try again shortly")
+    except asyncio.TimeoutError:
+        logger.warning("Supabase query timed out")
+        raise HTTPException(status_code=503, detail="Login temporarily unavailable, please try again shortly")
     except Exception as e:
-        print(f"Exception caught: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.error(f"Login failed: {type(e).__name__}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Server error: {str(e)}")
\ No newline at end of file
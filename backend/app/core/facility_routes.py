@@ -0,0 +1,50 @@
+# backend/app/core/facility_routes.py
+from fastapi import APIRouter, Header, Query
+from fastapi.responses import JSONResponse
+from typing import Optional
+import hmac
+import os
+import logging
+
+from app.services.facility_index import get_facility_registry
+
+router = APIRouter()
+
+logger = logging.getLogger(__name__)
+
+# Reloading is disabled unless a token is configured
+FACILITY_ADMIN_TOKEN = os.getenv("FACILITY_ADMIN_TOKEN")
+
+
+@router.get("/api/facilities/nearest")
+async def get_nearest_facilities(
+    latitude: float = Query(..., ge=-90, le=90),
+    longitude: float = Query(..., ge=-180, le=180),
+    k: int = Query(5, ge=1, le=100),
+    place_type: Optional[str] = Query(None),
+    max_radius: Optional[float] = Query(None, gt=0),
+):
+    """The `k` closest facilities in the local index, optionally of one type and within `max_radius` metres."""
+    index = get_facility_registry().index
+    places = index.nearest(latitude, longitude, k, place_type, max_radius)
+    return JSONResponse(content={"places": places, "indexed": len(index)})
+
+
+@router.post("/api/facilities/reload")
+async def reload_facilities(x_admin_token: Optional[str] = Header(None)):
+    """
+    Re-read changed facility export files and swap in the new index without
+    a restart. Requires the `X-Admin-Token` header to match
+    FACILITY_ADMIN_TOKEN.
+    """
+    if not FACILITY_ADMIN_TOKEN:
+        return JSONResponse(status_code=403, content={"error": "Facility reloads are disabled"})
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, FACILITY_ADMIN_TOKEN):
+        return JSONResponse(status_code=401, content={"error": "Invalid admin token"})
+
+    try:
+        result = await get_facility_registry().reload_async()
+    except Exception as e:
+        logger.error(f"Facility index reload failed: {str(e)}", exc_info=True)
+        return JSONResponse(status_code=500, content={"error": "Facility index reload failed"})
+    return JSONResponse(content=result)
@@ -1,14 +1,27 @@
-from fastapi import APIRouter, Query
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Query, Request
+from fastapi.responses import JSONResponse, StreamingResponse, Response
 import httpx
 import os
+import json
+import asyncio
+import hashlib
 import logging
+from typing import Optional
+from email.utils import formatdate, parsedate_to_datetime
 from dotenv import load_dotenv
+from app.services.http_client import upstream, upstream_url, UpstreamError
+from app.services.country_resolver import get_country_resolver
+from app.services.places_cache import nearby_cache, haversine_m
+from app.services.place_store import get_place_store
+from app.services.directions_cache import directions_cache
+from app.services.quota import priority, request_priority, LOW
+from app.services.facility_index import get_facility_registry, LOCAL_PREFIX
+from app.services.route_geometry import haversine_distances_m
+from app.services.timing import TimedRoute, stage
+from app.core.logging_config import coarse_location
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Load API Key
@@ -19,6 +32,15 @@ if not GOOGLEMAPS_API_KEY:
     logger.error("GOOGLEMAPS_API_KEY not found in environment variables")
     raise ValueError("Google Maps API key is required")
 
+NEARBY_MAX_RESULTS = 20
+
+# Where nearby searches come from: "auto" (local facility index, Google when
+# the index has nothing there), "local", "google" or "merge" (both, deduplicated)
+NEARBY_SOURCES = ("auto", "local", "google", "merge")
+NEARBY_SOURCE = os.getenv("NEARBY_SOURCE", "auto")
+# Local and Google results closer than this are treated as the same facility
+MERGE_DISTANCE_M = 75
+
 # Helper function to get country code from coordinates using reverse geocoding
 async def get_country_code_from_coordinates(latitude: float, longitude: float) -> str:
     """
@@ -26,33 +48,187 @@ async def get_country_code_from_coordinates(latitude: float, longitude: float) -
     Returns 2-letter country code (e.g., 'US', 'CA', 'MX')
     """
     try:
-        url = "https://maps.googleapis.com/maps/api/geocode/json"
+        url = upstream_url("maps", "/maps/api/geocode/json")
         params = {
             "latlng": f"{latitude},{longitude}",
             "key": GOOGLEMAPS_API_KEY,
             "result_type": "country"
         }
         
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.get(url, params=params)
-            
-            if response.status_code == 200:
-                data = response.json()
-                if data.get('status') == 'OK' and data.get('results'):
-                    # Extract country code from the first result
-                    for component in data['results'][0].get('address_components', []):
-                        if 'country' in component.get('types', []):
-                            country_code = component.get('short_name', 'US')
-                            logger.info(f"Found country code: {country_code} for coordinates ({latitude}, {longitude})")
-                            return country_code
-                            
-        logger.warning(f"Could not determine country code for coordinates ({latitude}, {longitude}), defaulting to US")
+        response = await upstream.request("maps", "GET", url, endpoint="geocode", params=params)
+        
+        if response.status_code == 200:
+            data = response.json()
+            if data.get('status') == 'OK' and data.get('results'):
+                # Extract country code from the first result
+                for component in data['results'][0].get('address_components', []):
+                    if 'country' in component.get('types', []):
+                        country_code = component.get('short_name', 'US')
+                        logger.info(f"Found country code: {country_code} for cell {coarse_location(latitude, longitude)}")
+                        return country_code
+                        
+        logger.warning(f"Could not determine country code for cell {coarse_location(latitude, longitude)}, defaulting to US")
         return 'US'  # Default fallback
         
     except Exception as e:
         logger.error(f"Error getting country code: {str(e)}, defaulting to US")
         return 'US'  # Default fallback
 
+async def resolve_region_code(latitude: float, longitude: float) -> str:
+    """
+    Country code for the Places `regionCode`, answered offline from the
+    bundled boundaries and only falling back to Geocoding near a border
+    or for points outside every known country.
+    """
+    match = get_country_resolver().lookup(latitude, longitude)
+    if match.confident:
+        return match.code
+
+    logger.info(
+        f"Offline country lookup not confident for cell {coarse_location(latitude, longitude)}: "
+        f"code={match.code}, border_distance_km={match.border_distance_km}; using Geocoding"
+    )
+    return await get_country_code_from_coordinates(latitude, longitude)
+
+async def search_nearby_places(latitude: float, longitude: float, radius: int, place_type: str):
+    """
+    Call Places API (New) `searchNearby` and project the results.
+    Returns (places, complete) where `complete` is False when Google may
+    have truncated the list at `maxResultCount`. Raises UpstreamError.
+    """
+    # New Places API (New) format
+    url = upstream_url("places", "/v1/places:searchNearby")
+    
+    # Request body for new API with country restriction
+    request_body = {
+        "includedTypes": [place_type.lower()],
+        "maxResultCount": NEARBY_MAX_RESULTS,
+        "locationRestriction": {
+            "circle": {
+                "center": {
+                    "latitude": latitude,
+                    "longitude": longitude
+                },
+                "radius": radius
+            }
+        },
+        "regionCode": await resolve_region_code(latitude, longitude)
+    }
+    
+    headers = {
+        "Content-Type": "application/json",
+        "X-Goog-Api-Key": GOOGLEMAPS_API_KEY,
+        "X-Goog-FieldMask": "places.displayName,places.formattedAddress,places.location,places.rating,places.id"
+    }
+    
+    logger.info(f"Making request to Google Places API (New): {url}")
+    
+    response = await upstream.request("places", "POST", url, endpoint="places_nearby", json=request_body, headers=headers)
+    
+    logger.info(f"Google Places API response status: {response.status_code}")
+    
+    if response.status_code != 200:
+        logger.error(f"Google Places API returned status {response.status_code}: {response.text}")
+        raise UpstreamError(502, f"Google Places API error: {response.status_code}")
+    
+    data = response.json()
+    
+    # New API returns different error structure
+    if 'error' in data:
+        error = data['error']
+        error_message = error.get('message', 'Unknown error')
+        error_code = error.get('code', 'UNKNOWN')
+        logger.error(f"Google Places API (New) error - Code: {error_code}, Message: {error_message}")
+        
+        if error_code == 403 or 'API key' in error_message:
+            raise UpstreamError(403, "API key invalid or Places API (New) not enabled")
+        elif error_code == 429 or 'quota' in error_message.lower():
+            raise UpstreamError(429, "API quota exceeded")
+        else:
+            raise UpstreamError(502, f"Google Places API error: {error_message}")
+
+    results = data.get('places', [])
+    logger.info(f"Found {len(results)} places")
+    places = [project_place(place) for place in results]
+
+    return places, len(results) < NEARBY_MAX_RESULTS
+
+def project_place(place: dict) -> dict:
+    """One Places (New) search result as the flat dict the app and caches use."""
+    return {
+        "place_id": place.get("id"),
+        "name": place.get("displayName", {}).get("text", "Unknown"),
+        "address": place.get("formattedAddress", "Unknown"),
+        "latitude": place.get("location", {}).get("latitude"),
+        "longitude": place.get("location", {}).get("longitude"),
+        "rating": place.get("rating", "N/A")
+    }
+
+async def google_nearby_places(latitude: float, longitude: float, radius: int, place_type: str):
+    """
+    Google nearby search through the geocell cache. Returns (places, cache_state);
+    stale hits are refreshed in the background. Raises UpstreamError.
+    """
+    with stage("cache"):
+        places, state = nearby_cache.get(latitude, longitude, radius, place_type)
+    if state == "stale":
+        # The stale result is served either way, so the refresh only spends spare quota
+        with priority(LOW):
+            nearby_cache.refresh_in_background(
+                latitude, longitude, radius, place_type,
+                lambda: search_nearby_places(latitude, longitude, radius, place_type)
+            )
+    if places is None:
+        # Searched at the requested radius: a wider search truncated at
+        # maxResultCount (ranked by popularity) could leave out the nearest places
+        places, complete = await search_nearby_places(latitude, longitude, radius, place_type)
+        nearby_cache.put(latitude, longitude, radius, place_type, places, complete)
+    return places, state
+
+def merge_places(local: list, remote: list) -> list:
+    """
+    Google results plus the local facilities Google did not return, closest
+    first. A local facility matches a Google result with the same place id
+    or one within MERGE_DISTANCE_M.
+    """
+    remote_ids = {place["place_id"] for place in remote}
+    extra = [
+        place for place in local
+        if place["place_id"] not in remote_ids and not any(
+            other.get("latitude") is not None and haversine_m(
+                place["latitude"], place["longitude"], other["latitude"], other["longitude"]
+            ) <= MERGE_DISTANCE_M
+            for other in remote
+        )
+    ]
+    return sorted(remote + extra, key=lambda place: place.get("distance_m", float("inf")))
+
+async def find_nearby_places(latitude: float, longitude: float, radius: int, place_type: str,
+                             source: str = NEARBY_SOURCE):
+    """
+    Nearby search from the local facility index and/or Google according to
+    `source` (see NEARBY_SOURCES). Returns (places, cache_state), where
+    cache_state is "local" for answers from the index. Raises UpstreamError.
+    """
+    local = []
+    if source != "google":
+        index = get_facility_registry().index
+        if index.covers(place_type):
+            with stage("facility_index"):
+                local = index.nearby(latitude, longitude, radius, place_type, limit=NEARBY_MAX_RESULTS)
+        if source == "local" or (source == "auto" and local):
+            return local, "local"
+
+    places, state = await google_nearby_places(latitude, longitude, radius, place_type)
+    if source == "merge" and local:
+        # Copies, so the distances do not leak into the cached results
+        places = merge_places(local, [
+            {**place, "distance_m": round(haversine_m(latitude, longitude, place["latitude"], place["longitude"]), 1)}
+            if place.get("latitude") is not None else place
+            for place in places
+        ])
+    return places, state
+
 # ---------------------------------
 # 1. Places Nearby Search
 # ---------------------------------
@@ -62,8 +238,15 @@ async def get_nearby_places(
     longitude: float = Query(...),
     radius: int = Query(10000),
     place_type: str = Query("hospital"),
+    source: str = Query(NEARBY_SOURCE),
+    rank: str = Query("relevance"),
 ):
-    logger.info(f"Nearby places request: lat={latitude}, lng={longitude}, radius={radius}, type={place_type}")
+    """
+    Places of `place_type` within `radius` metres. With `rank=eta` the
+    closest candidates are re-ordered by traffic-aware drive time and carry
+    `duration_s`; `rank=distance` orders by straight-line distance.
+    """
+    logger.info(f"Nearby places request: cell={coarse_location(latitude, longitude)}, radius={radius}, type={place_type}, source={source}, rank={rank}")
     
     try:
         if not (-90 <= latitude <= 90):
@@ -78,91 +261,20 @@ async def get_nearby_places(
             logger.error(f"Invalid radius: {radius}")
             return JSONResponse(status_code=400, content={"error": "Radius must be between 1 and 50000 meters"})
 
-        # New Places API (New) format
-        url = "https://places.googleapis.com/v1/places:searchNearby"
-        
-        # Request body for new API with country restriction
-        request_body = {
-            "includedTypes": [place_type.lower()],
-            "maxResultCount": 20,
-            "locationRestriction": {
-                "circle": {
-                    "center": {
-                        "latitude": latitude,
-                        "longitude": longitude
-                    },
-                    "radius": radius
-                }
-            },
-            "regionCode": await get_country_code_from_coordinates(latitude, longitude)
-        }
-        
-        headers = {
-            "Content-Type": "application/json",
-            "X-Goog-Api-Key": GOOGLEMAPS_API_KEY,
-            "X-Goog-FieldMask": "places.displayName,places.formattedAddress,places.location,places.rating,places.id"
-        }
-        
-        logger.info(f"Making request to Google Places API (New): {url}")
-        
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(url, json=request_body, headers=headers)
-            
-            logger.info(f"Google Places API response status: {response.status_code}")
-            
-            if response.status_code != 200:
-                logger.error(f"Google Places API returned status {response.status_code}: {response.text}")
-                return JSONResponse(
-                    status_code=502, 
-                    content={"error": f"Google Places API error: {response.status_code}"}
-                )
-            
-            data = response.json()
-            
-            # New API returns different error structure
-            if 'error' in data:
-                error = data['error']
-                error_message = error.get('message', 'Unknown error')
-                error_code = error.get('code', 'UNKNOWN')
-                logger.error(f"Google Places API (New) error - Code: {error_code}, Message: {error_message}")
-                
-                if error_code == 403 or 'API key' in error_message:
-                    return JSONResponse(
-                        status_code=403, 
-                        content={"error": "API key invalid or Places API (New) not enabled"}
-                    )
-                elif error_code == 429 or 'quota' in error_message.lower():
-                    return JSONResponse(
-                        status_code=429, 
-                        content={"error": "API quota exceeded"}
-                    )
-                else:
-                    return JSONResponse(
-                        status_code=502, 
-                        content={"error": f"Google Places API error: {error_message}"}
-                    )
-
-        places = []
-        results = data.get('places', [])
-        logger.info(f"Found {len(results)} places")
-        
-        # Handle empty results
-        if not results:
-            logger.info("No places found for the given criteria")
-            return JSONResponse(content={"places": []})
-        
-        for place in results:
-            places.append({
-                "place_id": place.get("id"),
-                "name": place.get("displayName", {}).get("text", "Unknown"),
-                "address": place.get("formattedAddress", "Unknown"),
-                "latitude": place.get("location", {}).get("latitude"),
-                "longitude": place.get("location", {}).get("longitude"),
-                "rating": place.get("rating", "N/A")
-            })
-
-        return JSONResponse(content={"places": places})
+        if source not in NEARBY_SOURCES:
+            return JSONResponse(status_code=400, content={"error": f"source must be one of {', '.join(NEARBY_SOURCES)}"})
+
+        if rank not in NEARBY_RANKS:
+            return JSONResponse(status_code=400, content={"error": f"rank must be one of {', '.join(NEARBY_RANKS)}"})
+
+        places, state = await find_nearby_places(latitude, longitude, radius, place_type, source)
+        places, ranked = await rank_places(places, latitude, longitude, rank)
+
+        logger.info(f"Returning {len(places)} places (cache: {state}, rank: {ranked})")
+        return JSONResponse(content={"places": places}, headers={"X-Cache": state.upper(), "X-Rank": ranked})
 
+    except UpstreamError as e:
+        return JSONResponse(status_code=e.status_code, content={"error": e.error})
     except httpx.TimeoutException:
         logger.error("Request to Google Places API timed out")
         return JSONResponse(status_code=504, content={"error": "Request timed out"})
@@ -173,11 +285,134 @@ async def get_nearby_places(
         logger.error(f"Unexpected error in nearby places endpoint: {str(e)}", exc_info=True)
         return JSONResponse(status_code=500, content={"error": "Internal server error"})
 
+async def request_place_fields(place_id: str, fields: list) -> dict:
+    """
+    Call Places API (New) place details for just `fields` and return the
+    raw response. Raises UpstreamError.
+    """
+    # New Places API (New) format for place details
+    url = upstream_url("places", f"/v1/places/{place_id}")
+    
+    headers = {
+        "Content-Type": "application/json",
+        "X-Goog-Api-Key": GOOGLEMAPS_API_KEY,
+        "X-Goog-FieldMask": ",".join(fields)
+    }
+    
+    logger.info(f"Making request to Google Places Details API (New): {url}")
+    
+    response = await upstream.request("places", "GET", url, endpoint="places_details", headers=headers)
+    
+    logger.info(f"Google Places Details API response status: {response.status_code}")
+    
+    if response.status_code != 200:
+        logger.error(f"Google Places Details API returned status {response.status_code}: {response.text}")
+        raise UpstreamError(502, f"Google Places Details API error: {response.status_code}")
+    
+    data = response.json()
+    
+    # Handle errors for new API
+    if 'error' in data:
+        error = data['error']
+        error_message = error.get('message', 'Unknown error')
+        error_code = error.get('code', 'UNKNOWN')
+        logger.error(f"Google Places Details API (New) error - Code: {error_code}, Message: {error_message}")
+        
+        if error_code == 403 or 'API key' in error_message:
+            raise UpstreamError(403, "API key invalid or Places API (New) not enabled")
+        elif error_code == 429 or 'quota' in error_message.lower():
+            raise UpstreamError(429, "API quota exceeded")
+        elif error_code == 404 or 'not found' in error_message.lower():
+            logger.warning(f"Place not found for place_id: {place_id}")
+            raise UpstreamError(404, "Place not found")
+        else:
+            raise UpstreamError(502, f"Google Places Details API error: {error_message}")
+    
+    return data
+
+async def get_place_record(place_id: str):
+    """
+    Place details from the local store, re-fetching only the fields that
+    have gone stale. Returns (fields, last_modified, cache_state) where
+    cache_state is "HIT", "REFRESH" or "MISS", "STALE" when the refresh failed
+    and the stored fields are served as they are, or "LOCAL" for facilities
+    that only exist in the local index. Raises UpstreamError.
+    """
+    if place_id.startswith(LOCAL_PREFIX):
+        index = get_facility_registry().index
+        data = index.details(place_id)
+        if data is None:
+            raise UpstreamError(404, "Place not found")
+        return data, index.loaded_at, "LOCAL"
+
+    store = get_place_store()
+    with stage("cache"):
+        stored = await store.aload(place_id)
+    stale = store.stale_fields(stored)
+
+    if not stale:
+        store.record("hits")
+        state = "HIT"
+    else:
+        logger.info(f"Refreshing stale fields for place_id {place_id}: {stale}")
+        try:
+            data = await request_place_fields(place_id, stale)
+        except (UpstreamError, httpx.HTTPError) as e:
+            # Old details beat no details, unless Google says the place is gone
+            if not stored or (isinstance(e, UpstreamError) and e.status_code == 404):
+                raise
+            logger.warning(f"Place details refresh failed ({type(e).__name__}: {e}), serving stored fields")
+            store.record("stale_served")
+            state = "STALE"
+        else:
+            stored.update(await store.asave(place_id, data, stale, stored))
+            partial = len(stale) < len(store.field_ttls)
+            store.record("partial_refreshes" if partial else "misses")
+            state = "REFRESH" if partial else "MISS"
+
+    fields = {field: entry.value for field, entry in stored.items()}
+    last_modified = max(entry.changed_at for entry in stored.values())
+    return fields, last_modified, state
+
+def format_place_details(data: dict) -> dict:
+    """Places (New) fields in the legacy `result` shape the app expects."""
+    return {
+        "name": (data.get("displayName") or {}).get("text", "Unknown"),
+        "formatted_address": data.get("formattedAddress") or "Unknown",
+        "formatted_phone_number": data.get("nationalPhoneNumber") or "Not available",
+        "international_phone_number": data.get("internationalPhoneNumber") or "Not available",
+        "geometry": {
+            "location": {
+                "lat": (data.get("location") or {}).get("latitude"),
+                "lng": (data.get("location") or {}).get("longitude")
+            }
+        }
+    }
+
+async def fetch_place_details(place_id: str) -> dict:
+    """Place details in the legacy `result` shape, served from the local store when fresh."""
+    data, _, _ = await get_place_record(place_id)
+    return format_place_details(data)
+
+def _not_modified(request: Request, etag: str, last_modified: float) -> bool:
+    """Conditional request check; If-None-Match wins over If-Modified-Since."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*"
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return int(last_modified) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
 # ---------------------------------
 # 2. Place Details Lookup
 # ---------------------------------
 @router.get("/api/places/details")
 async def get_place_details(
+    request: Request,
     place_id: str = Query(...)
 ):
     logger.info(f"Place details request for place_id: {place_id}")
@@ -187,80 +422,26 @@ async def get_place_details(
             logger.error("Empty or invalid place_id provided")
             return JSONResponse(status_code=400, content={"error": "place_id is required"})
         
-        # New Places API (New) format for place details
-        url = f"https://places.googleapis.com/v1/places/{place_id}"
-        
-        headers = {
-            "Content-Type": "application/json",
-            "X-Goog-Api-Key": GOOGLEMAPS_API_KEY,
-            "X-Goog-FieldMask": "displayName,formattedAddress,location,nationalPhoneNumber,internationalPhoneNumber"
-        }
-        
-        logger.info(f"Making request to Google Places Details API (New): {url}")
-        
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(url, headers=headers)
-            
-            logger.info(f"Google Places Details API response status: {response.status_code}")
-            
-            if response.status_code != 200:
-                logger.error(f"Google Places Details API returned status {response.status_code}: {response.text}")
-                return JSONResponse(
-                    status_code=502, 
-                    content={"error": f"Google Places Details API error: {response.status_code}"}
-                )
-            
-            data = response.json()
-            
-            # Handle errors for new API
-            if 'error' in data:
-                error = data['error']
-                error_message = error.get('message', 'Unknown error')
-                error_code = error.get('code', 'UNKNOWN')
-                logger.error(f"Google Places Details API (New) error - Code: {error_code}, Message: {error_message}")
-                
-                if error_code == 403 or 'API key' in error_message:
-                    return JSONResponse(
-                        status_code=403, 
-                        content={"error": "API key invalid or Places API (New) not enabled"}
-                    )
-                elif error_code == 429 or 'quota' in error_message.lower():
-                    return JSONResponse(
-                        status_code=429, 
-                        content={"error": "API quota exceeded"}
-                    )
-                elif error_code == 404 or 'not found' in error_message.lower():
-                    logger.warning(f"Place not found for place_id: {place_id}")
-                    return JSONResponse(
-                        status_code=404, 
-                        content={"error": "Place not found"}
-                    )
-                else:
-                    return JSONResponse(
-                        status_code=502, 
-                        content={"error": f"Google Places Details API error: {error_message}"}
-                    )
-        
-        # Transform response to match expected format
+        data, last_modified, state = await get_place_record(place_id)
         result = {
-            "result": {
-                "name": data.get("displayName", {}).get("text", "Unknown"),
-                "formatted_address": data.get("formattedAddress", "Unknown"),
-                "formatted_phone_number": data.get("nationalPhoneNumber", "Not available"),
-                "international_phone_number": data.get("internationalPhoneNumber", "Not available"),
-                "geometry": {
-                    "location": {
-                        "lat": data.get("location", {}).get("latitude"),
-                        "lng": data.get("location", {}).get("longitude")
-                    }
-                }
-            },
+            "result": format_place_details(data),
             "status": "OK"
         }
         
-        logger.info(f"Successfully retrieved details for place_id: {place_id}")
-        return JSONResponse(content=result)
+        etag = '"' + hashlib.sha1(json.dumps(result, sort_keys=True).encode()).hexdigest() + '"'
+        headers = {
+            "ETag": etag,
+            "Last-Modified": formatdate(last_modified, usegmt=True),
+            "X-Cache": state
+        }
+        if _not_modified(request, etag, last_modified):
+            return Response(status_code=304, headers=headers)
+        
+        logger.info(f"Successfully retrieved details for place_id: {place_id} (store: {state})")
+        return JSONResponse(content=result, headers=headers)
 
+    except UpstreamError as e:
+        return JSONResponse(status_code=e.status_code, content={"error": e.error})
     except httpx.TimeoutException:
         logger.error("Request to Google Places Details API timed out")
         return JSONResponse(status_code=504, content={"error": "Request timed out"})
@@ -282,7 +463,8 @@ async def get_route_estimate(
     destination_latitude: float = Query(...),
     destination_longitude: float = Query(...)
 ):
-    logger.info(f"Route estimate request: origin=({origin_latitude},{origin_longitude}), destination=({destination_latitude},{destination_longitude})")
+    logger.info(f"Route estimate request: origin cell={coarse_location(origin_latitude, origin_longitude)}, "
+                f"destination cell={coarse_location(destination_latitude, destination_longitude)}")
     
     try:
         # Validate coordinates
@@ -302,7 +484,7 @@ async def get_route_estimate(
                 return JSONResponse(status_code=400, content={"error": f"{name} must be between -180 and 180"})
         
         # New Routes API format
-        url = "https://routes.googleapis.com/directions/v2:computeRoutes"
+        url = upstream_url("routes", "/directions/v2:computeRoutes")
         
         request_body = {
             "origin": {
@@ -333,47 +515,46 @@ async def get_route_estimate(
         
         logger.info(f"Making request to Google Routes API: {url}")
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(url, json=request_body, headers=headers)
-            
-            logger.info(f"Google Routes API response status: {response.status_code}")
+        response = await upstream.request("routes", "POST", url, endpoint="routes", json=request_body, headers=headers)
+        
+        logger.info(f"Google Routes API response status: {response.status_code}")
+        
+        if response.status_code != 200:
+            logger.error(f"Google Routes API returned status {response.status_code}: {response.text}")
+            return JSONResponse(
+                status_code=502, 
+                content={"error": f"Google Routes API error: {response.status_code}"}
+            )
+        
+        data = response.json()
+        
+        # Handle errors for new Routes API
+        if 'error' in data:
+            error = data['error']
+            error_message = error.get('message', 'Unknown error')
+            error_code = error.get('code', 'UNKNOWN')
+            logger.error(f"Google Routes API error - Code: {error_code}, Message: {error_message}")
             
-            if response.status_code != 200:
-                logger.error(f"Google Routes API returned status {response.status_code}: {response.text}")
+            if error_code == 403 or 'API key' in error_message:
+                return JSONResponse(
+                    status_code=403, 
+                    content={"error": "API key invalid or Routes API not enabled"}
+                )
+            elif error_code == 429 or 'quota' in error_message.lower():
+                return JSONResponse(
+                    status_code=429, 
+                    content={"error": "API quota exceeded"}
+                )
+            elif 'not found' in error_message.lower():
+                return JSONResponse(
+                    status_code=404, 
+                    content={"error": "One or more locations could not be geocoded"}
+                )
+            else:
                 return JSONResponse(
                     status_code=502, 
-                    content={"error": f"Google Routes API error: {response.status_code}"}
+                    content={"error": f"Google Routes API error: {error_message}"}
                 )
-            
-            data = response.json()
-            
-            # Handle errors for new Routes API
-            if 'error' in data:
-                error = data['error']
-                error_message = error.get('message', 'Unknown error')
-                error_code = error.get('code', 'UNKNOWN')
-                logger.error(f"Google Routes API error - Code: {error_code}, Message: {error_message}")
-                
-                if error_code == 403 or 'API key' in error_message:
-                    return JSONResponse(
-                        status_code=403, 
-                        content={"error": "API key invalid or Routes API not enabled"}
-                    )
-                elif error_code == 429 or 'quota' in error_message.lower():
-                    return JSONResponse(
-                        status_code=429, 
-                        content={"error": "API quota exceeded"}
-                    )
-                elif 'not found' in error_message.lower():
-                    return JSONResponse(
-                        status_code=404, 
-                        content={"error": "One or more locations could not be geocoded"}
-                    )
-                else:
-                    return JSONResponse(
-                        status_code=502, 
-                        content={"error": f"Google Routes API error: {error_message}"}
-                    )
 
         # Parse new Routes API response
         if data.get('routes'):
@@ -381,14 +562,7 @@ async def get_route_estimate(
                 route = data['routes'][0]
                 
                 # Convert duration from seconds format (e.g., "1234s") to readable format
-                duration_seconds = int(route.get('duration', '0s').rstrip('s'))
-                duration_minutes = duration_seconds // 60
-                duration_hours = duration_minutes // 60
-                
-                if duration_hours > 0:
-                    duration_text = f"{duration_hours} hr {duration_minutes % 60} min"
-                else:
-                    duration_text = f"{duration_minutes} min"
+                duration_text = format_duration_text(parse_duration_seconds(route.get('duration', '0s')))
                 
                 # Convert distance from meters to miles/feet only
                 distance_meters = route.get('distanceMeters', 0)
@@ -424,6 +598,302 @@ async def get_route_estimate(
         logger.error(f"Unexpected error in route estimate endpoint: {str(e)}", exc_info=True)
         return JSONResponse(status_code=500, content={"error": "Internal server error"})
 
+def raise_for_routes_error(data: dict):
+    """Raise UpstreamError for an error payload from the Routes API."""
+    if 'error' in data:
+        error = data['error']
+        error_message = error.get('message', 'Unknown error')
+        error_code = error.get('code', 'UNKNOWN')
+        logger.error(f"Google Routes API error - Code: {error_code}, Message: {error_message}")
+        
+        if error_code == 403 or 'API key' in error_message:
+            raise UpstreamError(403, "API key invalid or Routes API not enabled")
+        elif error_code == 429 or 'quota' in error_message.lower():
+            raise UpstreamError(429, "API quota exceeded")
+        elif 'not found' in error_message.lower():
+            raise UpstreamError(404, "One or more locations could not be geocoded")
+        else:
+            raise UpstreamError(502, f"Google Routes API error: {error_message}")
+
+def parse_duration_seconds(value: str) -> int:
+    """Routes API durations look like "123s"."""
+    return int(float((value or '0s').rstrip('s')))
+
+def format_duration_text(duration_seconds: int) -> str:
+    """Trip duration as "1 hr 5 min" or "12 min"."""
+    duration_minutes = duration_seconds // 60
+    duration_hours = duration_minutes // 60
+    
+    if duration_hours > 0:
+        return f"{duration_hours} hr {duration_minutes % 60} min"
+    return f"{duration_minutes} min"
+
+def format_route_step(step: dict) -> dict:
+    """One Routes API step as the instruction/distance/duration text the app shows."""
+    # Convert duration from seconds format
+    duration_seconds = parse_duration_seconds(step.get('staticDuration', '0s'))
+    duration_minutes = duration_seconds // 60
+    
+    if duration_minutes > 0:
+        duration_text = f"{duration_minutes} min"
+    else:
+        duration_text = "< 1 min"
+    
+    # Convert distance from meters to miles/feet only
+    distance_meters = step.get('distanceMeters', 0)
+    distance_miles = distance_meters * 0.000621371  # Convert meters to miles
+    if distance_miles >= 1:
+        distance_text = f"{distance_miles:.1f} mi"
+    else:  # For all distances under 1 mile, show feet
+        distance_feet = distance_meters * 3.28084
+        distance_text = f"{distance_feet:.0f} ft"
+    
+    # Get navigation instruction
+    nav_instruction = step.get('navigationInstruction', {})
+    instruction = nav_instruction.get('instructions', 'Continue straight')
+    
+    return {
+        "instruction": instruction,
+        "distance": distance_text,
+        "duration": duration_text
+    }
+
+def strip_instructions_html(html: str) -> str:
+    """Directions API `html_instructions` as plain text for the app."""
+    return html.replace("<b>", "").replace("</b>", "").replace("<div>", " ").replace("</div>", "")
+
+async def compute_direction_steps(origin_latitude: float, origin_longitude: float,
+                                  destination_latitude: float, destination_longitude: float) -> list:
+    """
+    Call the Routes API and format the first leg as step-by-step
+    instructions. Raises UpstreamError.
+    """
+    # New Routes API format for detailed directions
+    url = upstream_url("routes", "/directions/v2:computeRoutes")
+    
+    request_body = {
+        "origin": {
+            "location": {
+                "latLng": {
+                    "latitude": origin_latitude,
+                    "longitude": origin_longitude
+                }
+            }
+        },
+        "destination": {
+            "location": {
+                "latLng": {
+                    "latitude": destination_latitude,
+                    "longitude": destination_longitude
+                }
+            }
+        },
+        "travelMode": "DRIVE",
+        "routingPreference": "TRAFFIC_AWARE"
+    }
+    
+    headers = {
+        "Content-Type": "application/json",
+        "X-Goog-Api-Key": GOOGLEMAPS_API_KEY,
+        "X-Goog-FieldMask": "routes.legs.steps.navigationInstruction,routes.legs.steps.distanceMeters,routes.legs.steps.staticDuration"
+    }
+    
+    logger.info(f"Making request to Google Routes API: {url}")
+    
+    response = await upstream.request("routes", "POST", url, endpoint="routes", json=request_body, headers=headers)
+    
+    logger.info(f"Google Routes API response status: {response.status_code}")
+    
+    if response.status_code != 200:
+        logger.error(f"Google Routes API returned status {response.status_code}: {response.text}")
+        raise UpstreamError(502, f"Google Routes API error: {response.status_code}")
+    
+    data = response.json()
+    raise_for_routes_error(data)
+
+    # Extract steps from new Routes API format
+    steps = []
+    if data.get('routes'):
+        try:
+            # New Routes API structure: routes[0].legs[0].steps
+            legs = data['routes'][0].get('legs', [])
+            if legs:
+                route_steps = legs[0].get('steps', [])
+                logger.info(f"Processing {len(route_steps)} direction steps")
+                
+                with stage("format_steps"):
+                    for step in route_steps:
+                        steps.append(format_route_step(step))
+                    
+                logger.info(f"Successfully processed {len(steps)} direction steps")
+            else:
+                logger.warning("No legs found in route")
+        except (KeyError, IndexError, ValueError) as e:
+            logger.error(f"Error parsing directions data: {str(e)}")
+            raise UpstreamError(502, "Invalid directions data from Google API")
+    else:
+        logger.info("No routes found in API response")
+
+    return steps
+
+async def get_direction_steps(origin_latitude: float, origin_longitude: float,
+                              destination_latitude: float, destination_longitude: float,
+                              destination_place_id: Optional[str] = None):
+    """
+    compute_direction_steps through the directions cache. Returns
+    (steps, cache_state). Steps only carry static durations, so entries live
+    for the full geometry TTL. Raises UpstreamError.
+    """
+    key = directions_cache.key("steps", origin_latitude, origin_longitude,
+                               destination_latitude, destination_longitude, destination_place_id)
+    with stage("cache"):
+        entry, state = directions_cache.get(key)
+    if entry is not None:
+        return entry.route, state
+
+    steps = await compute_direction_steps(
+        origin_latitude, origin_longitude, destination_latitude, destination_longitude
+    )
+    if steps:
+        directions_cache.put(key, steps, (origin_latitude, origin_longitude),
+                             (destination_latitude, destination_longitude))
+    return steps, state
+
+async def fetch_traffic_duration(origin_latitude: float, origin_longitude: float,
+                                 destination_latitude: float, destination_longitude: float) -> int:
+    """
+    Traffic-aware driving time in seconds, without geometry or steps. Used
+    to refresh the ETA of a cached route. Raises UpstreamError.
+    """
+    url = upstream_url("routes", "/directions/v2:computeRoutes")
+    request_body = {
+        "origin": {"location": {"latLng": {"latitude": origin_latitude, "longitude": origin_longitude}}},
+        "destination": {"location": {"latLng": {"latitude": destination_latitude, "longitude": destination_longitude}}},
+        "travelMode": "DRIVE",
+        "routingPreference": "TRAFFIC_AWARE"
+    }
+    headers = {
+        "Content-Type": "application/json",
+        "X-Goog-Api-Key": GOOGLEMAPS_API_KEY,
+        "X-Goog-FieldMask": "routes.duration"
+    }
+
+    response = await upstream.request("routes", "POST", url, endpoint="routes", json=request_body, headers=headers)
+    if response.status_code != 200:
+        logger.error(f"Google Routes API returned status {response.status_code}: {response.text}")
+        raise UpstreamError(502, f"Google Routes API error: {response.status_code}")
+
+    data = response.json()
+    raise_for_routes_error(data)
+    if not data.get('routes'):
+        raise UpstreamError(404, "No route found")
+    return parse_duration_seconds(data['routes'][0].get('duration', '0s'))
+
+# Nearby results can be ordered as Google returned them, by straight-line
+# distance, or by traffic-aware drive time for the closest candidates
+NEARBY_RANKS = ("relevance", "distance", "eta")
+# Destinations per route matrix call; Google allows 25 with a single origin
+ETA_RANK_CANDIDATES = min(25, int(os.getenv("ETA_RANK_CANDIDATES", "10")))
+# Ranking falls back to distance rather than holding up the response
+ETA_RANK_DEADLINE = float(os.getenv("ETA_RANK_DEADLINE", "3"))
+
+ROUTE_MATRIX_FIELD_MASK = "originIndex,destinationIndex,duration,distanceMeters,condition"
+
+def sort_by_distance(places: list, latitude: float, longitude: float) -> list:
+    """
+    Copies of `places` closest first, each with its straight-line `distance_m`.
+    Places without a location go last.
+    """
+    located = [p for p in places if p.get("latitude") is not None and p.get("longitude") is not None]
+    unlocated = [p for p in places if p.get("latitude") is None or p.get("longitude") is None]
+    if not located:
+        return list(unlocated)
+    distances = haversine_distances_m(
+        latitude, longitude, [p["latitude"] for p in located], [p["longitude"] for p in located]
+    )
+    return [
+        {**located[i], "distance_m": round(float(distances[i]), 1)}
+        for i in distances.argsort(kind="stable")
+    ] + unlocated
+
+async def compute_route_matrix(latitude: float, longitude: float, destinations: list) -> list:
+    """
+    Traffic-aware drive from one origin to every destination in a single
+    computeRouteMatrix call. Returns (duration_seconds, distance_meters) per
+    destination, or None where Google found no route. Raises UpstreamError.
+    """
+    url = upstream_url("routes", "/distanceMatrix/v2:computeRouteMatrix")
+    request_body = {
+        "origins": [{"waypoint": {"location": {"latLng": {"latitude": latitude, "longitude": longitude}}}}],
+        "destinations": [
+            {"waypoint": {"location": {"latLng": {"latitude": d["latitude"], "longitude": d["longitude"]}}}}
+            for d in destinations
+        ],
+        "travelMode": "DRIVE",
+        "routingPreference": "TRAFFIC_AWARE"
+    }
+    headers = {
+        "Content-Type": "application/json",
+        "X-Goog-Api-Key": GOOGLEMAPS_API_KEY,
+        "X-Goog-FieldMask": ROUTE_MATRIX_FIELD_MASK
+    }
+
+    response = await upstream.request(
+        "routes", "POST", url, endpoint="route_matrix", json=request_body, headers=headers,
+        deadline=ETA_RANK_DEADLINE
+    )
+    if response.status_code != 200:
+        logger.error(f"Google Route Matrix API returned status {response.status_code}: {response.text}")
+        raise UpstreamError(502, f"Google Routes API error: {response.status_code}")
+
+    data = response.json()
+    if isinstance(data, dict):
+        # Errors come back as an object, results as an array of elements
+        raise_for_routes_error(data)
+        raise UpstreamError(502, "Invalid route matrix from Google API")
+
+    results = [None] * len(destinations)
+    for element in data:
+        index = element.get("destinationIndex", 0)
+        if element.get("condition") == "ROUTE_EXISTS" and 0 <= index < len(results):
+            results[index] = (parse_duration_seconds(element.get("duration")), element.get("distanceMeters"))
+    return results
+
+async def rank_by_eta(places: list, latitude: float, longitude: float, candidates: int = ETA_RANK_CANDIDATES):
+    """
+    Pre-filter to the `candidates` places closest in a straight line, order
+    them by drive time from one route matrix call and append the rest by
+    distance. Ranked places get `duration_s`, `duration` and
+    `route_distance_m`; those without a route follow the ones with one.
+    Returns (places, rank), with rank "distance" if the matrix call failed.
+    """
+    by_distance = sort_by_distance(places, latitude, longitude)
+    top = [p for p in by_distance[:candidates] if "distance_m" in p]
+    rest = by_distance[len(top):]
+    if not top:
+        return by_distance, "distance"
+
+    try:
+        matrix = await compute_route_matrix(latitude, longitude, top)
+    except (UpstreamError, httpx.HTTPError) as e:
+        logger.warning(f"Route matrix failed ({type(e).__name__}: {e}), ranking by distance instead")
+        return by_distance, "distance"
+
+    for place, result in zip(top, matrix):
+        if result is not None:
+            place["duration_s"], place["route_distance_m"] = result
+            place["duration"] = format_duration_text(result[0])
+    top.sort(key=lambda place: place.get("duration_s", float("inf")))
+    return top + rest, "eta"
+
+async def rank_places(places: list, latitude: float, longitude: float, rank: str):
+    """Order nearby results by `rank` (see NEARBY_RANKS). Returns (places, rank applied)."""
+    if rank == "eta":
+        return await rank_by_eta(places, latitude, longitude)
+    if rank == "distance":
+        return sort_by_distance(places, latitude, longitude), "distance"
+    return places, "relevance"
+
 # ---------------------------------
 # 4. Full Directions (Step-by-step)
 # ---------------------------------
@@ -432,9 +902,11 @@ async def get_full_directions(
     origin_latitude: float = Query(...),
     origin_longitude: float = Query(...),
     destination_latitude: float = Query(...),
-    destination_longitude: float = Query(...)
+    destination_longitude: float = Query(...),
+    destination_place_id: Optional[str] = Query(None, description="Place id of the destination; improves cache sharing")
 ):
-    logger.info(f"Full directions request: origin=({origin_latitude},{origin_longitude}), destination=({destination_latitude},{destination_longitude})")
+    logger.info(f"Full directions request: origin cell={coarse_location(origin_latitude, origin_longitude)}, "
+                f"destination cell={coarse_location(destination_latitude, destination_longitude)}")
     
     try:
         # Validate coordinates
@@ -453,130 +925,14 @@ async def get_full_directions(
                 logger.error(f"Invalid {name}: {value}")
                 return JSONResponse(status_code=400, content={"error": f"{name} must be between -180 and 180"})
         
-        # New Routes API format for detailed directions
-        url = "https://routes.googleapis.com/directions/v2:computeRoutes"
-        
-        request_body = {
-            "origin": {
-                "location": {
-                    "latLng": {
-                        "latitude": origin_latitude,
-                        "longitude": origin_longitude
-                    }
-                }
-            },
-            "destination": {
-                "location": {
-                    "latLng": {
-                        "latitude": destination_latitude,
-                        "longitude": destination_longitude
-                    }
-                }
-            },
-            "travelMode": "DRIVE",
-            "routingPreference": "TRAFFIC_AWARE"
-        }
-        
-        headers = {
-            "Content-Type": "application/json",
-            "X-Goog-Api-Key": GOOGLEMAPS_API_KEY,
-            "X-Goog-FieldMask": "routes.legs.steps.navigationInstruction,routes.legs.steps.distanceMeters,routes.legs.steps.staticDuration"
-        }
-        
-        logger.info(f"Making request to Google Routes API: {url}")
-        
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(url, json=request_body, headers=headers)
-            
-            logger.info(f"Google Routes API response status: {response.status_code}")
-            
-            if response.status_code != 200:
-                logger.error(f"Google Routes API returned status {response.status_code}: {response.text}")
-                return JSONResponse(
-                    status_code=502, 
-                    content={"error": f"Google Routes API error: {response.status_code}"}
-                )
-            
-            data = response.json()
-            
-            # Handle errors for new Routes API
-            if 'error' in data:
-                error = data['error']
-                error_message = error.get('message', 'Unknown error')
-                error_code = error.get('code', 'UNKNOWN')
-                logger.error(f"Google Routes API error - Code: {error_code}, Message: {error_message}")
-                
-                if error_code == 403 or 'API key' in error_message:
-                    return JSONResponse(
-                        status_code=403, 
-                        content={"error": "API key invalid or Routes API not enabled"}
-                    )
-                elif error_code == 429 or 'quota' in error_message.lower():
-                    return JSONResponse(
-                        status_code=429, 
-                        content={"error": "API quota exceeded"}
-                    )
-                elif 'not found' in error_message.lower():
-                    return JSONResponse(
-                        status_code=404, 
-                        content={"error": "One or more locations could not be geocoded"}
-                    )
-                else:
-                    return JSONResponse(
-                        status_code=502, 
-                        content={"error": f"Google Routes API error: {error_message}"}
-                    )
-
-        # Extract steps from new Routes API format
-        steps = []
-        if data.get('routes'):
-            try:
-                # New Routes API structure: routes[0].legs[0].steps
-                legs = data['routes'][0].get('legs', [])
-                if legs:
-                    route_steps = legs[0].get('steps', [])
-                    logger.info(f"Processing {len(route_steps)} direction steps")
-                    
-                    for step in route_steps:
-                        # Convert duration from seconds format
-                        duration_seconds = int(step.get('staticDuration', '0s').rstrip('s'))
-                        duration_minutes = duration_seconds // 60
-                        
-                        if duration_minutes > 0:
-                            duration_text = f"{duration_minutes} min"
-                        else:
-                            duration_text = "< 1 min"
-                        
-                        # Convert distance from meters to miles/feet only
-                        distance_meters = step.get('distanceMeters', 0)
-                        distance_miles = distance_meters * 0.000621371  # Convert meters to miles
-                        if distance_miles >= 1:
-                            distance_text = f"{distance_miles:.1f} mi"
-                        else:  # For all distances under 1 mile, show feet
-                            distance_feet = distance_meters * 3.28084
-                            distance_text = f"{distance_feet:.0f} ft"
-                        
-                        # Get navigation instruction
-                        nav_instruction = step.get('navigationInstruction', {})
-                        instruction = nav_instruction.get('instructions', 'Continue straight')
-                        
-                        steps.append({
-                            "instruction": instruction,
-                            "distance": distance_text,
-                            "duration": duration_text
-                        })
-                        
-                    logger.info(f"Successfully processed {len(steps)} direction steps")
-                else:
-                    logger.warning("No legs found in route")
-            except (KeyError, IndexError, ValueError) as e:
-                logger.error(f"Error parsing directions data: {str(e)}")
-                return JSONResponse(status_code=502, content={"error": "Invalid directions data from Google API"})
-        else:
-            logger.info("No routes found in API response")
+        steps, state = await get_direction_steps(
+            origin_latitude, origin_longitude, destination_latitude, destination_longitude, destination_place_id
+        )
 
-        return JSONResponse(content={"steps": steps})
+        return JSONResponse(content={"steps": steps}, headers={"X-Cache": state.upper()})
 
+    except UpstreamError as e:
+        return JSONResponse(status_code=e.status_code, content={"error": e.error})
     except httpx.TimeoutException:
         logger.error("Request to Google Routes API timed out")
         return JSONResponse(status_code=504, content={"error": "Request timed out"})
@@ -585,4 +941,161 @@ async def get_full_directions(
         return JSONResponse(status_code=502, content={"error": "Network connection error"})
     except Exception as e:
         logger.error(f"Unexpected error in full directions endpoint: {str(e)}", exc_info=True)
-        return JSONResponse(status_code=500, content={"error": "Internal server error"})
\ No newline at end of file
+        return JSONResponse(status_code=500, content={"error": "Internal server error"})
+# ---------------------------------
+# 5. Nearest Care (nearby + details + directions in one call)
+# ---------------------------------
+NEAREST_CARE_CANDIDATES = int(os.getenv("NEAREST_CARE_CANDIDATES", "3"))
+
+def _error_response(e: BaseException):
+    """Map a pipeline failure to the (status_code, error) the single-stage endpoints would return."""
+    if isinstance(e, UpstreamError):
+        return e.status_code, e.error
+    if isinstance(e, httpx.TimeoutException):
+        return 504, "Request timed out"
+    if isinstance(e, httpx.NetworkError):
+        return 502, "Network connection error"
+    logger.error(f"Unexpected error in nearest care pipeline: {str(e)}", exc_info=e)
+    return 500, "Internal server error"
+
+def _details_from_place(place: dict) -> dict:
+    """Details-shaped fallback built from the nearby result when the details call fails."""
+    return {
+        "name": place.get("name", "Unknown"),
+        "formatted_address": place.get("address", "Unknown"),
+        "formatted_phone_number": "Not available",
+        "international_phone_number": "Not available",
+        "geometry": {
+            "location": {
+                "lat": place.get("latitude"),
+                "lng": place.get("longitude")
+            }
+        }
+    }
+
+async def _nearest_care_stages(latitude: float, longitude: float, top: list):
+    """
+    Run place details for every candidate and directions to the first one
+    concurrently, yielding (stage, payload) as each call finishes. The
+    destination comes from the nearby result, so directions do not wait
+    on details.
+    """
+    first = top[0]
+    tasks = {}
+    for place in top:
+        # Details for the other candidates are extras and are dropped first when quota runs low
+        with priority(request_priority.get() if place is first else LOW):
+            tasks[asyncio.ensure_future(fetch_place_details(place["place_id"]))] = ("details", place)
+
+    async def _directions():
+        dest_lat, dest_lng = first.get("latitude"), first.get("longitude")
+        if dest_lat is None or dest_lng is None:
+            location = (await fetch_place_details(first["place_id"]))["geometry"]["location"]
+            dest_lat, dest_lng = location["lat"], location["lng"]
+        steps, _ = await get_direction_steps(latitude, longitude, dest_lat, dest_lng, first["place_id"])
+        return steps
+
+    tasks[asyncio.ensure_future(_directions())] = ("directions", first)
+
+    try:
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                stage, place = tasks[task]
+                yield stage, place, task.exception() or task.result()
+    finally:
+        for task in tasks:
+            task.cancel()
+
+@router.get("/api/places/nearest-care")
+async def get_nearest_care(
+    latitude: float = Query(...),
+    longitude: float = Query(...),
+    radius: int = Query(10000),
+    place_type: str = Query("hospital"),
+    candidates: int = Query(NEAREST_CARE_CANDIDATES, ge=1, le=10),
+    stream: bool = Query(False),
+    rank: str = Query("relevance"),
+):
+    """
+    Server-side version of the results screen flow: nearby search, details
+    for the top candidates and directions to the first one, in one round
+    trip. `rank` orders the candidates as on /api/places/nearby, so with
+    `rank=eta` the first one is the fastest to reach. With `stream=true`
+    each stage is sent as an NDJSON line as soon as it completes.
+    """
+    logger.info(f"Nearest care request: cell={coarse_location(latitude, longitude)}, radius={radius}, type={place_type}, stream={stream}, rank={rank}")
+
+    if not (-90 <= latitude <= 90):
+        return JSONResponse(status_code=400, content={"error": "Latitude must be between -90 and 90"})
+    if not (-180 <= longitude <= 180):
+        return JSONResponse(status_code=400, content={"error": "Longitude must be between -180 and 180"})
+    if radius <= 0 or radius > 50000:
+        return JSONResponse(status_code=400, content={"error": "Radius must be between 1 and 50000 meters"})
+    if rank not in NEARBY_RANKS:
+        return JSONResponse(status_code=400, content={"error": f"rank must be one of {', '.join(NEARBY_RANKS)}"})
+
+    if stream:
+        return StreamingResponse(
+            _stream_nearest_care(latitude, longitude, radius, place_type, candidates, rank),
+            media_type="application/x-ndjson"
+        )
+
+    try:
+        places, _ = await find_nearby_places(latitude, longitude, radius, place_type)
+        places, ranked = await rank_places(places, latitude, longitude, rank)
+    except Exception as e:
+        status_code, error = _error_response(e)
+        return JSONResponse(status_code=status_code, content={"error": error})
+
+    if not places:
+        logger.info("No places found for nearest care request")
+        return JSONResponse(content={"hospital": None, "details": None, "candidates": [], "steps": []})
+
+    top = places[:candidates]
+    details = {}
+    result = {"hospital": top[0], "steps": [], "rank": ranked}
+    async for stage, place, outcome in _nearest_care_stages(latitude, longitude, top):
+        if stage == "details":
+            details[place["place_id"]] = None if isinstance(outcome, BaseException) else outcome
+        elif isinstance(outcome, BaseException):
+            result["directions_error"] = _error_response(outcome)[1]
+        else:
+            result["steps"] = outcome
+
+    result["details"] = details.get(top[0]["place_id"]) or _details_from_place(top[0])
+    result["candidates"] = [{**place, "details": details.get(place["place_id"])} for place in top]
+    return JSONResponse(content=result)
+
+async def _stream_nearest_care(latitude: float, longitude: float, radius: int, place_type: str,
+                               candidates: int, rank: str = "relevance"):
+    def line(payload: dict) -> str:
+        return json.dumps(payload) + "\n"
+
+    try:
+        places, _ = await find_nearby_places(latitude, longitude, radius, place_type)
+        places, ranked = await rank_places(places, latitude, longitude, rank)
+    except Exception as e:
+        yield line({"stage": "error", "error": _error_response(e)[1]})
+        return
+
+    top = places[:candidates]
+    yield line({"stage": "nearby", "places": top, "rank": ranked})
+    if not top:
+        yield line({"stage": "done"})
+        return
+
+    async for stage, place, outcome in _nearest_care_stages(latitude, longitude, top):
+        event = {"stage": stage, "place_id": place["place_id"]}
+        if isinstance(outcome, BaseException):
+            event["error"] = _error_response(outcome)[1]
+            if stage == "details" and place is top[0]:
+                event["result"] = _details_from_place(place)
+        elif stage == "details":
+            event["result"] = outcome
+        else:
+            event["steps"] = outcome
+        yield line(event)
+
+    yield line({"stage": "done"})
@@ -0,0 +1,268 @@
+# backend/app/core/logging_config.py
+"""
+Structured, non-blocking logging for the backend.
+
+configure_logging() puts a single queue handler on the root logger. Request
+handlers only pay for the level check, formatting their own message and a
+put_nowait on an in-memory queue; a QueueListener thread renders the records
+(JSON lines by default, LOG_FORMAT=text for development) and writes them to
+stdout. When the queue is full records are dropped and counted rather than
+blocking the event loop.
+
+Every record carries the request's correlation id, taken from the
+`X-Request-ID` header or generated by CorrelationIdMiddleware and echoed on
+the response. Messages are scrubbed of e-mail addresses, phone numbers and
+API keys in URLs before they are queued, and request payloads (forms,
+Supabase responses) are only logged through log_payload(): at DEBUG level,
+for a sampled fraction LOG_PAYLOAD_SAMPLE_RATE of requests, with patient
+and account fields replaced by their length. Device coordinates in log
+messages go through coarse_location(), which keeps only a ~5 km geohash cell,
+and uvicorn access lines have the coordinates in their query string coarsened
+the same way.
+"""
+import os
+import re
+import sys
+import json
+import uuid
+import queue
+import atexit
+import random
+import logging
+import logging.handlers
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Optional
+from urllib.parse import parse_qsl, urlencode
+from app.services.geohash import geohash_encode
+
+request_id: ContextVar[str] = ContextVar("request_id", default="-")
+
+# Fields that hold PHI or credentials in forms and Supabase rows
+SENSITIVE_KEYS = frozenset({
+    "password", "phone_number", "phonen", "phone", "email",
+    "medical_issue", "health_problems", "location", "address",
+    "full_name", "fist_name", "last_name", "name", "latitude", "longitude",
+})
+
+_EMAIL = re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+")
+_API_KEY = re.compile(r"(key=)[\w-]+")
+_PHONE = re.compile(r"(?<![\w.])\+?(?:\d[\s().-]{0,2}){9,14}\d(?![\w.])")
+
+_REQUEST_ID = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+# "lat,lng" query values such as /directions?origin=31.77,-106.49
+_LAT_LNG = re.compile(r"^\s*-?\d+(?:\.\d+)?\s*,\s*-?\d+(?:\.\d+)?\s*$")
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def scrub(text: str) -> str:
+    """Mask e-mail addresses, phone numbers and API keys in URLs in free text."""
+    if "@" in text:
+        text = _EMAIL.sub("[email]", text)
+    if "key=" in text:
+        text = _API_KEY.sub(r"\1[redacted]", text)
+    return _PHONE.sub("[phone]", text)
+
+
+def coarse_location(latitude: float, longitude: float) -> str:
+    """Geohash-5 cell (about 5 x 5 km) of a position, for log messages."""
+    try:
+        return geohash_encode(float(latitude), float(longitude), 5)
+    except (TypeError, ValueError):
+        return "?"
+
+
+def coarsen_query(path: str) -> str:
+    """
+    Request path with the coordinates in its query string replaced by
+    geohash-5 cells: `latitude`/`longitude` (and `origin_latitude`/... pairs)
+    become one `cell` (`origin_cell`) parameter, and "lat,lng" values are
+    replaced in place.
+    """
+    base, sep, query = path.partition("?")
+    if not sep:
+        return path
+    params = parse_qsl(query, keep_blank_values=True)
+    values = dict(params)
+    coarsened = []
+    for key, value in params:
+        if key.endswith("latitude"):
+            prefix = key[:-len("latitude")]
+            coarsened.append((prefix + "cell", coarse_location(value, values.get(prefix + "longitude"))))
+        elif key.endswith("longitude"):
+            continue
+        elif _LAT_LNG.match(value):
+            coarsened.append((key, coarse_location(*value.split(","))))
+        else:
+            coarsened.append((key, value))
+    return base + "?" + urlencode(coarsened, safe=",")
+
+
+class AccessLogFilter(logging.Filter):
+    """Coarsens coordinates in the request path of uvicorn access records."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        # uvicorn.access args: (client_addr, method, full_path, http_version, status_code)
+        args = record.args
+        if isinstance(args, tuple) and len(args) >= 3 and isinstance(args[2], str) and "?" in args[2]:
+            record.args = args[:2] + (coarsen_query(args[2]),) + args[3:]
+        return True
+
+
+def redact(value: Any) -> Any:
+    """Copy of a payload with sensitive fields replaced by their length."""
+    if isinstance(value, dict):
+        return {
+            key: f"[redacted {len(str(item))} chars]" if str(key).lower() in SENSITIVE_KEYS and item is not None
+            else redact(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, (list, tuple)):
+        return [redact(item) for item in value]
+    if isinstance(value, str):
+        return scrub(value)
+    return value
+
+
+def log_payload(logger: logging.Logger, message: str, payload: Any,
+                sample_rate: Optional[float] = None):
+    """
+    Log a redacted request or response payload at DEBUG level for a sampled
+    fraction of calls. Costs one level check when debug output is off.
+    """
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
+    rate = sample_rate if sample_rate is not None else float(os.getenv("LOG_PAYLOAD_SAMPLE_RATE", "0"))
+    if rate <= 0 or random.random() >= rate:
+        return
+    if hasattr(payload, "model_dump"):
+        payload = payload.model_dump()
+    logger.debug(message, extra={"payload": redact(payload)})
+
+
+class RequestQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue handler that stamps the correlation id, scrubs the message and
+    drops records instead of blocking when the queue is full.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Done on the calling thread, where the request's context is visible
+        record = logging.makeLogRecord(record.__dict__)
+        record.request_id = request_id.get()
+        record.msg = scrub(record.getMessage())
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": getattr(record, "request_id", "-"),
+            "message": record.getMessage(),
+        }
+        payload = getattr(record, "payload", None)
+        if payload is not None:
+            entry["payload"] = payload
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+TEXT_FORMAT = "%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s"
+
+
+def configure_logging(level: Optional[str] = None, fmt: Optional[str] = None,
+                      queue_size: Optional[int] = None) -> RequestQueueHandler:
+    """
+    Route all logging (including uvicorn's) through one queue handler and
+    start the writer thread. Safe to call again; the previous listener is
+    stopped first.
+    """
+    global _listener
+    level = (level or os.getenv("LOG_LEVEL", "INFO")).upper()
+    fmt = fmt or os.getenv("LOG_FORMAT", "json")
+    queue_size = queue_size or int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+
+    shutdown_logging()
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(JsonFormatter() if fmt == "json" else logging.Formatter(TEXT_FORMAT))
+    handler = RequestQueueHandler(queue.Queue(queue_size))
+
+    root = logging.getLogger()
+    root.handlers = [handler]
+    root.setLevel(level)
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers = []
+        uvicorn_logger.propagate = True
+    # Access lines carry the raw query string, which holds the patient's position
+    access_logger = logging.getLogger("uvicorn.access")
+    if not any(isinstance(f, AccessLogFilter) for f in access_logger.filters):
+        access_logger.addFilter(AccessLogFilter())
+    # One line per upstream call is what /metrics is for
+    logging.getLogger("httpx").setLevel(os.getenv("LOG_LEVEL_HTTPX", "WARNING").upper())
+
+    _listener = logging.handlers.QueueListener(handler.queue, output)
+    _listener.start()
+    return handler
+
+
+def shutdown_logging():
+    """Flush queued records and stop the writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
+
+
+class CorrelationIdMiddleware:
+    """Pure ASGI middleware that sets the request id for logging and returns it as `X-Request-ID`."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        rid = None
+        for name, value in scope.get("headers", ()):
+            if name == b"x-request-id":
+                candidate = value.decode("latin-1")
+                rid = candidate if _REQUEST_ID.match(candidate) else None
+                break
+        rid = rid or uuid.uuid4().hex[:16]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", ())) + [(b"x-request-id", rid.encode())]
+            await send(message)
+
+        token = request_id.set(rid)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_id.reset(token)
@@ -0,0 +1,177 @@
+# backend/app/core/navigation_routes.py
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, Field
+from typing import Optional
+import httpx
+import logging
+
+from app.core.google_routes import (
+    GOOGLEMAPS_API_KEY, raise_for_routes_error, format_route_step, parse_duration_seconds,
+)
+from app.services.http_client import upstream, upstream_url, UpstreamError
+from app.services.navigation import NavigationRoute, NavigationSession, navigation_sessions, step_payload, MAX_ACCURACY_METERS
+from app.services.route_geometry import decode_polylines, encode_polyline
+
+router = APIRouter()
+
+logger = logging.getLogger(__name__)
+
+ROUTES_URL = upstream_url("routes", "/directions/v2:computeRoutes")
+
+NAVIGATION_FIELD_MASK = ",".join([
+    "routes.duration",
+    "routes.distanceMeters",
+    "routes.legs.steps.navigationInstruction",
+    "routes.legs.steps.distanceMeters",
+    "routes.legs.steps.staticDuration",
+    "routes.legs.steps.polyline.encodedPolyline",
+])
+
+
+class NavigationStartRequest(BaseModel):
+    origin_latitude: float
+    origin_longitude: float
+    destination_latitude: float
+    destination_longitude: float
+
+
+class GpsFix(BaseModel):
+    latitude: float
+    longitude: float
+    # Reported horizontal accuracy in metres, if the device provides it
+    accuracy: Optional[float] = Field(None, ge=0, le=MAX_ACCURACY_METERS)
+
+
+async def fetch_navigation_route(origin_latitude: float, origin_longitude: float,
+                                 destination_latitude: float, destination_longitude: float) -> NavigationRoute:
+    """Routes API request with step geometry, turned into a matchable route. Raises UpstreamError."""
+    request_body = {
+        "origin": {"location": {"latLng": {"latitude": origin_latitude, "longitude": origin_longitude}}},
+        "destination": {"location": {"latLng": {"latitude": destination_latitude, "longitude": destination_longitude}}},
+        "travelMode": "DRIVE",
+        "routingPreference": "TRAFFIC_AWARE"
+    }
+    headers = {
+        "Content-Type": "application/json",
+        "X-Goog-Api-Key": GOOGLEMAPS_API_KEY,
+        "X-Goog-FieldMask": NAVIGATION_FIELD_MASK
+    }
+
+    # Reroutes start from a fresh GPS fix, so identical requests are rare; skip coalescing
+    response = await upstream.request("routes", "POST", ROUTES_URL, endpoint="routes", coalesce=False,
+                                      json=request_body, headers=headers)
+    if response.status_code != 200:
+        logger.error(f"Google Routes API returned status {response.status_code}: {response.text}")
+        raise UpstreamError(502, f"Google Routes API error: {response.status_code}")
+
+    data = response.json()
+    raise_for_routes_error(data)
+    if not data.get("routes"):
+        raise UpstreamError(404, "No route found")
+
+    try:
+        route = data["routes"][0]
+        route_steps = route["legs"][0].get("steps", [])
+        step_coords = decode_polylines([s.get("polyline", {}).get("encodedPolyline", "") for s in route_steps])
+        steps = []
+        for step in route_steps:
+            formatted = format_route_step(step)
+            formatted["duration_s"] = parse_duration_seconds(step.get("staticDuration", "0s"))
+            steps.append(formatted)
+        return NavigationRoute(step_coords, steps, parse_duration_seconds(route.get("duration", "0s")))
+    except (KeyError, IndexError, ValueError) as e:
+        logger.error(f"Error parsing navigation route: {str(e)}")
+        raise UpstreamError(502, "Invalid directions data from Google API")
+
+
+def _route_payload(session: NavigationSession) -> dict:
+    route = session.route
+    return {
+        "route": encode_polyline(route.coords),
+        "route_format": "polyline",
+        "steps": [step_payload(step) for step in route.steps],
+        "distance_m": round(route.length_m, 1),
+        "duration_s": round(route.duration_s),
+    }
+
+
+def _upstream_error_response(e: Exception) -> JSONResponse:
+    if isinstance(e, UpstreamError):
+        return JSONResponse(status_code=e.status_code, content={"error": e.error})
+    if isinstance(e, httpx.TimeoutException):
+        logger.error("Request to Google Routes API timed out")
+        return JSONResponse(status_code=504, content={"error": "Request timed out"})
+    logger.error(f"Network error connecting to Google Routes API: {str(e)}")
+    return JSONResponse(status_code=502, content={"error": "Network connection error"})
+
+
+# ---------------------------------
+# Navigation sessions
+# ---------------------------------
+@router.post("/api/navigation/sessions")
+async def start_navigation(body: NavigationStartRequest):
+    """Fetch a route once and open a session that GPS fixes are matched against."""
+    try:
+        route = await fetch_navigation_route(
+            body.origin_latitude, body.origin_longitude, body.destination_latitude, body.destination_longitude
+        )
+    except (UpstreamError, httpx.TimeoutException, httpx.NetworkError) as e:
+        return _upstream_error_response(e)
+    except Exception as e:
+        logger.error(f"Unexpected error starting navigation: {str(e)}", exc_info=True)
+        return JSONResponse(status_code=500, content={"error": "Internal server error"})
+
+    session = navigation_sessions.add(
+        NavigationSession(body.destination_latitude, body.destination_longitude, route)
+    )
+    logger.info(f"Navigation session {session.id} started ({len(route.coords)} points, {len(route.steps)} steps)")
+    return JSONResponse(status_code=201, content={
+        **_route_payload(session),
+        "state": session.update(body.origin_latitude, body.origin_longitude),
+    })
+
+
+@router.post("/api/navigation/sessions/{session_id}/fixes")
+async def post_gps_fix(session_id: str, fix: GpsFix):
+    """
+    Match a GPS fix against the stored route. Google is only called again
+    when the fix confirms the driver is off-route.
+    """
+    session = navigation_sessions.get(session_id)
+    if session is None:
+        return JSONResponse(status_code=404, content={"error": "Unknown or expired navigation session"})
+
+    navigation_sessions.record("fixes")
+    state = session.update(fix.latitude, fix.longitude, fix.accuracy)
+    if not state["off_route"] or not session.can_reroute():
+        return JSONResponse(content=state)
+
+    logger.info(f"Navigation session {session_id} is off-route, requesting a new route")
+    try:
+        route = await fetch_navigation_route(fix.latitude, fix.longitude, *session.destination)
+    except (UpstreamError, httpx.TimeoutException, httpx.NetworkError) as e:
+        # Keep guiding along the old route; the next off-route fix retries
+        session.reroute_failed()
+        error = _upstream_error_response(e)
+        return JSONResponse(content={**state, "reroute_error": error.status_code})
+
+    session.replace_route(route)
+    navigation_sessions.record("reroutes")
+    state = session.update(fix.latitude, fix.longitude, fix.accuracy)
+    return JSONResponse(content={**state, "rerouted": True, **_route_payload(session)})
+
+
+@router.get("/api/navigation/sessions/{session_id}")
+async def get_navigation_session(session_id: str):
+    session = navigation_sessions.get(session_id)
+    if session is None:
+        return JSONResponse(status_code=404, content={"error": "Unknown or expired navigation session"})
+    return JSONResponse(content={**_route_payload(session), "state": session.state()})
+
+
+@router.delete("/api/navigation/sessions/{session_id}")
+async def end_navigation(session_id: str):
+    if not navigation_sessions.remove(session_id):
+        return JSONResponse(status_code=404, content={"error": "Unknown or expired navigation session"})
+    return JSONResponse(content={"ended": session_id})
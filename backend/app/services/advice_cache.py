@@ -0,0 +1,199 @@
+# backend/app/services/advice_cache.py
+"""
+Cache of generated medical advice keyed on normalized symptoms.
+
+Submissions such as "headache and fever" and "Fever, headache" in the same
+language and region map to the same key: the text is lowercased, accents
+are stripped, stop-words (English and Spanish) are dropped and the
+remaining tokens are sorted. Negations and polarity words are never
+stop-words; a negation is folded into the symptom it applies to, so
+"fever without headache" and "headache without fever" stay distinct.
+
+Entries expire after ADVICE_CACHE_TTL seconds and the cache is bounded by
+ADVICE_CACHE_MAX_ENTRIES in LRU order. Advice that contains the emergency
+header is only kept for ADVICE_CACHE_EMERGENCY_TTL seconds.
+
+Setting ADVICE_CACHE_SIMILARITY to a value in (0, 1] enables a second tier
+that matches paraphrases by cosine similarity of hashed character-trigram
+vectors within the same language and region. It is off by default.
+"""
+import os
+import re
+import math
+import time
+import zlib
+import logging
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from app.services.advice_stream import EMERGENCY_MARKER
+
+logger = logging.getLogger(__name__)
+
+TTL = float(os.getenv("ADVICE_CACHE_TTL", "3600"))
+EMERGENCY_TTL = float(os.getenv("ADVICE_CACHE_EMERGENCY_TTL", "60"))
+MAX_ENTRIES = int(os.getenv("ADVICE_CACHE_MAX_ENTRIES", "1000"))
+SIMILARITY_THRESHOLD = float(os.getenv("ADVICE_CACHE_SIMILARITY", "0"))
+
+# Dimension of the hashed trigram vectors used by the similarity tier
+VECTOR_DIMENSIONS = 1024
+
+# Words that carry no symptom meaning. Polarity words (with/without, no/not,
+# con/sin) must never be listed here: they change what the patient reports.
+STOPWORDS = frozenset("""
+a an and are as at be been but by for from have having i im is it its me my
+of on or so the to too very was also since about really some feel feeling
+y o e u de del la las el los un una unos unas en por para que me mi mis
+es esta estoy tengo muy mucho poco al se le lo
+""".split())
+
+# Negations; the next symptom token is stored as "no_<token>"
+NEGATIONS = frozenset("no not without never dont doesnt didnt isnt sin nunca ni tampoco".split())
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+AdviceKey = Tuple[str, str, Tuple[str, ...]]
+
+
+def _fold(text: str) -> str:
+    """Lowercase and strip accents so "Fiebre" and "fiébre" compare equal."""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def normalize_symptoms(text: str) -> Tuple[str, ...]:
+    """Sorted, de-duplicated symptom tokens without stop-words, negations folded in."""
+    tokens = set()
+    negated = False
+    for token in _TOKEN_RE.findall(_fold(text)):
+        if token in NEGATIONS:
+            negated = True
+        elif token not in STOPWORDS:
+            tokens.add(f"no_{token}" if negated else token)
+            negated = False
+    if negated:
+        # A trailing negation ("fever, no") still makes the text different
+        tokens.add("no")
+    return tuple(sorted(tokens))
+
+
+def coarse_region(location: str) -> str:
+    """
+    Region part of a free-text address: its last two comma-separated
+    components without digits, e.g. "Austin, TX 78701" -> "austin,tx".
+    """
+    parts = [re.sub(r"[\d]+", "", p).strip() for p in _fold(location).split(",")]
+    parts = [" ".join(p.split()) for p in parts if p.strip()]
+    return ",".join(parts[-2:])
+
+
+def _trigram_vector(tokens: Tuple[str, ...]) -> Dict[int, float]:
+    """L2-normalized sparse vector of hashed character trigrams."""
+    counts: Dict[int, float] = {}
+    for token in tokens:
+        padded = f" {token} "
+        for i in range(len(padded) - 2):
+            slot = zlib.crc32(padded[i:i + 3].encode()) % VECTOR_DIMENSIONS
+            counts[slot] = counts.get(slot, 0.0) + 1.0
+    norm = math.sqrt(sum(v * v for v in counts.values()))
+    return {k: v / norm for k, v in counts.items()} if norm else {}
+
+
+def _cosine(a: Dict[int, float], b: Dict[int, float]) -> float:
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(v * b.get(k, 0.0) for k, v in a.items())
+
+
+@dataclass
+class AdviceEntry:
+    text: str
+    expires_at: float
+    emergency: bool
+    vector: Optional[Dict[int, float]] = None
+
+
+class AdviceCache:
+    """TTL + LRU cache of advice text with an optional paraphrase tier."""
+
+    def __init__(self, max_entries: int = MAX_ENTRIES, ttl: float = TTL,
+                 emergency_ttl: float = EMERGENCY_TTL, similarity_threshold: float = SIMILARITY_THRESHOLD):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.emergency_ttl = emergency_ttl
+        self.similarity_threshold = similarity_threshold
+        self._entries: "OrderedDict[AdviceKey, AdviceEntry]" = OrderedDict()
+        self._stats = {"hits": 0, "similar_hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+    def key(self, location: str, medical_issue: str, language: str) -> AdviceKey:
+        return (coarse_region(location), _fold(language).strip(), normalize_symptoms(medical_issue))
+
+    def get(self, location: str, medical_issue: str, language: str) -> Tuple[Optional[str], str]:
+        """Returns (advice, state) with state "hit", "similar" or "miss"."""
+        now = time.monotonic()
+        key = self.key(location, medical_issue, language)
+        if not key[2]:
+            self._stats["misses"] += 1
+            return None, "miss"
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            if now < entry.expires_at:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return entry.text, "hit"
+            del self._entries[key]
+
+        if self.similarity_threshold > 0:
+            match = self._find_similar(key, now)
+            if match is not None:
+                self._stats["similar_hits"] += 1
+                return match.text, "similar"
+
+        self._stats["misses"] += 1
+        return None, "miss"
+
+    def _find_similar(self, key: AdviceKey, now: float) -> Optional[AdviceEntry]:
+        vector = _trigram_vector(key[2])
+        best, best_score = None, self.similarity_threshold
+        for other_key, entry in self._entries.items():
+            # Emergency advice is never reused for a merely similar complaint
+            if other_key[:2] != key[:2] or entry.emergency or now >= entry.expires_at:
+                continue
+            score = _cosine(vector, entry.vector)
+            if score >= best_score:
+                best, best_score = entry, score
+        return best
+
+    def put(self, location: str, medical_issue: str, language: str, text: str):
+        key = self.key(location, medical_issue, language)
+        if not key[2] or not text:
+            return
+        emergency = EMERGENCY_MARKER in text
+        self._entries[key] = AdviceEntry(
+            text=text,
+            expires_at=time.monotonic() + (self.emergency_ttl if emergency else self.ttl),
+            emergency=emergency,
+            vector=_trigram_vector(key[2]) if self.similarity_threshold > 0 else None,
+        )
+        self._entries.move_to_end(key)
+        self._stats["stores"] += 1
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def stats(self) -> dict:
+        lookups = self._stats["hits"] + self._stats["similar_hits"] + self._stats["misses"]
+        served = lookups - self._stats["misses"]
+        return {
+            **self._stats,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hit_ratio": round(served / lookups, 4) if lookups else None,
+        }
+
+
+# Shared instance used by the /medicalpost routes
+advice_cache = AdviceCache()
@@ -0,0 +1,81 @@
+# backend/app/services/advice_jobs.py
+"""
+Background generation of detailed medical advice.
+
+When triage answers /medicalpost immediately, the full Gemini advice is
+generated in a background task and kept here under a random id for
+ADVICE_JOB_TTL seconds, so the client can fetch it with
+GET /medicalpost/advice/{advice_id} once it is ready.
+"""
+import os
+import time
+import uuid
+import asyncio
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+JOB_TTL = float(os.getenv("ADVICE_JOB_TTL", "600"))
+MAX_JOBS = int(os.getenv("ADVICE_MAX_JOBS", "500"))
+
+
+@dataclass
+class AdviceJob:
+    status: str  # "pending", "done" or "failed"
+    created_at: float
+    message: Optional[str] = None
+
+
+class AdviceJobs:
+    """Size- and age-bounded registry of background advice generations."""
+
+    def __init__(self, ttl: float = JOB_TTL, max_jobs: int = MAX_JOBS):
+        self.ttl = ttl
+        self.max_jobs = max_jobs
+        self._jobs: "OrderedDict[str, AdviceJob]" = OrderedDict()
+        self._tasks: Set[asyncio.Task] = set()
+
+    def submit(self, generate: Callable[[], Awaitable[str]]) -> str:
+        """Start `generate()` in the background and return the id to poll."""
+        self._expire()
+        advice_id = uuid.uuid4().hex
+        job = AdviceJob(status="pending", created_at=time.monotonic())
+        self._jobs[advice_id] = job
+
+        async def _run():
+            try:
+                job.message = await generate()
+                job.status = "done"
+            except Exception as e:
+                logger.warning(f"Background advice {advice_id} failed: {str(e)}")
+                job.status = "failed"
+
+        task = asyncio.create_task(_run())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return advice_id
+
+    def get(self, advice_id: str) -> Optional[AdviceJob]:
+        job = self._jobs.get(advice_id)
+        if job is None or time.monotonic() - job.created_at >= self.ttl:
+            return None
+        return job
+
+    def _expire(self):
+        now = time.monotonic()
+        while self._jobs:
+            advice_id, job = next(iter(self._jobs.items()))
+            if len(self._jobs) < self.max_jobs and now - job.created_at < self.ttl:
+                break
+            del self._jobs[advice_id]
+
+    def stats(self) -> dict:
+        pending = sum(1 for job in self._jobs.values() if job.status == "pending")
+        return {"jobs": len(self._jobs), "pending": pending}
+
+
+# Shared registry used by the /medicalpost routes
+advice_jobs = AdviceJobs()
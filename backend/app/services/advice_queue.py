@@ -0,0 +1,114 @@
+# backend/app/services/advice_queue.py
+"""
+Bounded concurrency for Gemini medical advice calls.
+
+At most GEMINI_MAX_CONCURRENCY generations run at once; up to
+GEMINI_MAX_QUEUE more requests wait for a slot for at most
+GEMINI_QUEUE_TIMEOUT seconds. Anything beyond that is rejected straight
+away so a spike of symptom submissions cannot pile up behind Gemini.
+"""
+import os
+import time
+import asyncio
+import logging
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, TypeVar
+
+logger = logging.getLogger(__name__)
+
+MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", "4"))
+MAX_QUEUE = int(os.getenv("GEMINI_MAX_QUEUE", "32"))
+QUEUE_TIMEOUT = float(os.getenv("GEMINI_QUEUE_TIMEOUT", "20"))
+
+# Number of recent queue waits kept for the percentile stats
+WAIT_SAMPLES = 500
+
+T = TypeVar("T")
+
+
+class AdviceQueueFull(Exception):
+    """Raised when the advice queue is full or a request waited too long for a slot."""
+
+
+class AdviceLimiter:
+    """Semaphore-based limiter with a bounded wait queue and wait-time stats."""
+
+    def __init__(self, max_concurrency: int = MAX_CONCURRENCY, max_queue: int = MAX_QUEUE,
+                 queue_timeout: float = QUEUE_TIMEOUT):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._waiting = 0
+        self._active = 0
+        self._waits = deque(maxlen=WAIT_SAMPLES)
+        self._counters = {"completed": 0, "failed": 0, "rejected": 0, "timed_out": 0}
+
+    async def run(self, call: Callable[[], Awaitable[T]]) -> T:
+        """Wait for a free slot, then await `call()`. Raises AdviceQueueFull."""
+        async with self.slot():
+            return await call()
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """
+        Hold one generation slot for the body of the `async with` block, e.g.
+        while a streamed response is being forwarded. Raises AdviceQueueFull.
+        """
+        start = time.perf_counter()
+        if not self._semaphore.locked():
+            # Free slot: take it without queueing
+            await self._semaphore.acquire()
+        else:
+            if self._waiting >= self.max_queue:
+                self._counters["rejected"] += 1
+                logger.warning(f"Advice queue full ({self._waiting} waiting), rejecting request")
+                raise AdviceQueueFull("Medical advice queue is full")
+
+            self._waiting += 1
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+            except asyncio.TimeoutError:
+                self._counters["timed_out"] += 1
+                logger.warning(f"Advice request waited {self.queue_timeout}s without a free slot")
+                raise AdviceQueueFull("Timed out waiting for a medical advice slot")
+            finally:
+                self._waiting -= 1
+        self._waits.append(time.perf_counter() - start)
+
+        self._active += 1
+        try:
+            yield
+            self._counters["completed"] += 1
+        except BaseException:
+            self._counters["failed"] += 1
+            raise
+        finally:
+            self._active -= 1
+            self._semaphore.release()
+
+    def stats(self) -> dict:
+        waits = sorted(self._waits)
+
+        def percentile(p: float):
+            if not waits:
+                return None
+            return round(waits[min(len(waits) - 1, int(p * len(waits)))] * 1000, 2)
+
+        return {
+            "queue_depth": self._waiting,
+            "active": self._active,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            **self._counters,
+            "wait_ms": {
+                "p50": percentile(0.50),
+                "p95": percentile(0.95),
+                "max": round(waits[-1] * 1000, 2) if waits else None,
+            },
+        }
+
+
+# Shared limiter for every Gemini call made by the API
+advice_limiter = AdviceLimiter()
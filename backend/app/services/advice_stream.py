@@ -0,0 +1,69 @@
+# backend/app/services/advice_stream.py
+"""
+Framing for streamed medical advice.
+
+Gemini text chunks are wrapped into events and encoded either as
+Server-Sent Events or as newline-delimited JSON. When the advice contains
+the emergency header, a dedicated `emergency` event is sent before the text
+that carries it, so the client can raise the alarm before the rest of the
+answer has rendered.
+"""
+import json
+from typing import AsyncIterator, Tuple
+
+EMERGENCY_MARKER = "EMERGENCY MEDICAL ATTENTION REQUIRED"
+
+# Text held back at the start of a stream to look for the emergency header;
+# the prompt asks for it as the very first line
+PROBE_CHARS = 120
+
+MEDIA_TYPES = {
+    "sse": "text/event-stream",
+    "ndjson": "application/x-ndjson",
+}
+
+# Stop proxies (nginx) from buffering the stream
+STREAM_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",
+}
+
+Event = Tuple[str, dict]
+
+
+async def advice_events(chunks: AsyncIterator[str], emergency_sent: bool = False) -> AsyncIterator[Event]:
+    """
+    Turn raw text chunks into ("emergency" | "chunk", data) events. The
+    emergency event is emitted at most once, ahead of the chunk in which the
+    header completes; pass `emergency_sent` when the caller already sent it.
+    """
+    buffer = ""
+    probing = not emergency_sent
+    # Tail of the text already sent, so a header split across chunks is still found
+    tail = ""
+
+    async for text in chunks:
+        if probing:
+            buffer += text
+            if len(buffer) < PROBE_CHARS and EMERGENCY_MARKER not in buffer:
+                continue
+            probing = False
+            text, buffer = buffer, ""
+
+        if not emergency_sent and EMERGENCY_MARKER in tail + text:
+            emergency_sent = True
+            yield "emergency", {"message": EMERGENCY_MARKER}
+        tail = (tail + text)[-len(EMERGENCY_MARKER):]
+        yield "chunk", {"text": text}
+
+    if buffer:
+        if not emergency_sent and EMERGENCY_MARKER in buffer:
+            yield "emergency", {"message": EMERGENCY_MARKER}
+        yield "chunk", {"text": buffer}
+
+
+def encode_event(event: str, data: dict, fmt: str = "sse") -> str:
+    """One event as an SSE frame or an NDJSON line."""
+    if fmt == "ndjson":
+        return json.dumps({"type": event, **data}, ensure_ascii=False) + "\n"
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
@@ -0,0 +1,212 @@
+# backend/app/services/country_resolver.py
+"""
+Offline reverse-country lookup.
+
+Resolves a coordinate to an ISO 3166-1 alpha-2 country code from a bundled,
+simplified copy of the Natural Earth 1:110m country boundaries. Ring
+bounding boxes are packed into a static R-tree and candidates are checked
+with an even-odd point-in-polygon test, so a lookup takes microseconds and
+never touches the network.
+
+The 1:110m outlines can be off by several kilometres, so every match carries
+the distance to the nearest foreign boundary. Callers should only trust a
+match that is `confident` (far enough from any border) and otherwise fall
+back to the Geocoding API.
+"""
+import os
+import json
+import math
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DATA_PATH = Path(__file__).resolve().parent.parent / "data" / "country_boundaries_110m.json"
+
+# Matches closer than this to a foreign boundary are reported as not confident
+BORDER_THRESHOLD_KM = float(os.getenv("COUNTRY_BORDER_THRESHOLD_KM", "30"))
+
+KM_PER_DEG_LAT = 110.574
+KM_PER_DEG_LNG = 111.320
+
+RTREE_NODE_CAPACITY = 8
+
+# Height of the latitude bands ring edges are bucketed into
+BAND_DEGREES = 1.0
+
+BBox = Tuple[float, float, float, float]  # (min_lng, min_lat, max_lng, max_lat)
+
+
+@dataclass(frozen=True)
+class CountryMatch:
+    """
+    Result of a lookup. `border_distance_km` is None when no foreign
+    boundary lies within the border threshold; `code` is None when the
+    point is not inside any bundled outline.
+    """
+
+    code: Optional[str]
+    border_distance_km: Optional[float]
+    confident: bool
+
+
+class _Ring:
+    """One boundary ring with its edges bucketed into horizontal latitude bands."""
+
+    __slots__ = ("code", "bbox", "bands")
+
+    def __init__(self, code: str, flat: List[float]):
+        self.code = code
+        xs, ys = flat[0::2], flat[1::2]
+        self.bbox = (min(xs), min(ys), max(xs), max(ys))
+        self.bands = {}
+        j = len(xs) - 1
+        for i in range(len(xs)):
+            edge = (xs[j], ys[j], xs[i], ys[i])
+            for band in range(_band(min(ys[i], ys[j])), _band(max(ys[i], ys[j])) + 1):
+                self.bands.setdefault(band, []).append(edge)
+            j = i
+
+    def crossings(self, x: float, y: float) -> int:
+        """Number of edges crossed by a ray cast from (x, y) towards +x."""
+        count = 0
+        for x1, y1, x2, y2 in self.bands.get(_band(y), ()):
+            if (y1 > y) != (y2 > y) and x < (x2 - x1) * (y - y1) / (y2 - y1) + x1:
+                count += 1
+        return count
+
+    def distance_km(self, x: float, y: float, window: BBox) -> Optional[float]:
+        """
+        Approximate distance in km from (x, y) to the closest edge of the
+        ring, or None when no edge comes within `window`.
+        """
+        kx = KM_PER_DEG_LNG * math.cos(math.radians(y))
+        ky = KM_PER_DEG_LAT
+        best = None
+        seen = set()
+        for band in range(_band(window[1]), _band(window[3]) + 1):
+            for edge in self.bands.get(band, ()):
+                x1, y1, x2, y2 = edge
+                if edge in seen or not _intersects((min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2)), window):
+                    continue
+                seen.add(edge)
+                ax, ay = (x1 - x) * kx, (y1 - y) * ky
+                dx, dy = (x2 - x1) * kx, (y2 - y1) * ky
+                seg_len = dx * dx + dy * dy
+                t = 0.0 if seg_len == 0 else max(0.0, min(1.0, -(ax * dx + ay * dy) / seg_len))
+                px, py = ax + t * dx, ay + t * dy
+                dist = px * px + py * py
+                if best is None or dist < best:
+                    best = dist
+        return math.sqrt(best) if best is not None else None
+
+
+def _band(lat: float) -> int:
+    return math.floor(lat / BAND_DEGREES)
+
+
+def _intersects(a: BBox, b: BBox) -> bool:
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+
+class RTree:
+    """Static Sort-Tile-Recursive packed R-tree over (bbox, item) pairs."""
+
+    def __init__(self, entries: List[Tuple[BBox, object]], capacity: int = RTREE_NODE_CAPACITY):
+        self.capacity = capacity
+        level = [(bbox, item, True) for bbox, item in entries]
+        while len(level) > capacity:
+            level = self._pack(level)
+        self.root = level
+
+    def _pack(self, level):
+        capacity = self.capacity
+        level = sorted(level, key=lambda e: (e[0][0] + e[0][2]))
+        node_count = math.ceil(len(level) / capacity)
+        slice_count = math.ceil(math.sqrt(node_count))
+        slice_size = slice_count * capacity
+        parents = []
+        for s in range(0, len(level), slice_size):
+            vertical = sorted(level[s:s + slice_size], key=lambda e: (e[0][1] + e[0][3]))
+            for n in range(0, len(vertical), capacity):
+                children = vertical[n:n + capacity]
+                bbox = (
+                    min(c[0][0] for c in children),
+                    min(c[0][1] for c in children),
+                    max(c[0][2] for c in children),
+                    max(c[0][3] for c in children),
+                )
+                parents.append((bbox, children, False))
+        return parents
+
+    def query(self, bbox: BBox) -> list:
+        """Items whose bounding box intersects `bbox`."""
+        found = []
+        stack = [self.root]
+        while stack:
+            for entry_bbox, child, is_leaf in stack.pop():
+                if _intersects(entry_bbox, bbox):
+                    if is_leaf:
+                        found.append(child)
+                    else:
+                        stack.append(child)
+        return found
+
+
+class CountryResolver:
+    """In-process reverse-country lookup over the bundled boundary dataset."""
+
+    def __init__(self, data_path: Path = DATA_PATH, border_threshold_km: float = BORDER_THRESHOLD_KM):
+        self.border_threshold_km = border_threshold_km
+        with open(data_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        rings = [
+            _Ring(country["code"], flat)
+            for country in data["countries"]
+            for flat in country["rings"]
+        ]
+        self.index = RTree([(ring.bbox, ring) for ring in rings])
+        logger.info(f"Loaded {len(data['countries'])} country boundaries ({len(rings)} rings) from {data_path.name}")
+
+    def lookup(self, latitude: float, longitude: float) -> CountryMatch:
+        """Country containing the point plus its distance to the nearest foreign boundary."""
+        x, y = longitude, latitude
+        crossings = {}
+        for ring in self.index.query((x, y, x, y)):
+            crossings[ring.code] = crossings.get(ring.code, 0) + ring.crossings(x, y)
+        inside = [code for code, count in crossings.items() if count % 2 == 1]
+        if len(inside) != 1:
+            # Ocean, a country too small for 1:110m, or overlapping outlines
+            return CountryMatch(code=None, border_distance_km=None, confident=False)
+        code = inside[0]
+
+        # Only foreign outlines within the threshold window can lower confidence
+        dlat = self.border_threshold_km / KM_PER_DEG_LAT
+        dlng = self.border_threshold_km / max(KM_PER_DEG_LNG * math.cos(math.radians(y)), 1e-6)
+        window = (x - dlng, y - dlat, x + dlng, y + dlat)
+        border_distance = None
+        for ring in self.index.query(window):
+            if ring.code != code:
+                dist = ring.distance_km(x, y, window)
+                if dist is not None and (border_distance is None or dist < border_distance):
+                    border_distance = dist
+
+        confident = border_distance is None or border_distance >= self.border_threshold_km
+        return CountryMatch(
+            code=code,
+            border_distance_km=round(border_distance, 2) if border_distance is not None else None,
+            confident=confident,
+        )
+
+
+_resolver: Optional[CountryResolver] = None
+
+
+def get_country_resolver() -> CountryResolver:
+    """Shared resolver, loaded on first use."""
+    global _resolver
+    if _resolver is None:
+        _resolver = CountryResolver()
+    return _resolver
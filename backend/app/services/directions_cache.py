@@ -0,0 +1,142 @@
+# backend/app/services/directions_cache.py
+"""
+Directions cache keyed by snapped endpoints.
+
+The origin is snapped to a geohash cell of DIRECTIONS_CACHE_ORIGIN_PRECISION
+(~150 m at the default 7) and the destination is keyed by its place id, or
+by a ~40 m cell when the caller only has coordinates, so patients leaving
+the same neighbourhood for the same hospital share one route. An entry holds
+two parts with separate lifetimes: the route geometry and steps, which
+rarely change and live for DIRECTIONS_CACHE_GEOMETRY_TTL, and the
+traffic-dependent duration, which is only trusted for DIRECTIONS_CACHE_ETA_TTL.
+When only the duration has expired the lookup reports "eta_stale" and the
+caller refreshes it with a duration-only request instead of fetching the
+whole route again.
+"""
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Optional, Tuple
+
+from app.services.geohash import geohash_encode
+
+ORIGIN_PRECISION = int(os.getenv("DIRECTIONS_CACHE_ORIGIN_PRECISION", "7"))
+DESTINATION_PRECISION = 8
+GEOMETRY_TTL = float(os.getenv("DIRECTIONS_CACHE_GEOMETRY_TTL", "86400"))
+ETA_TTL = float(os.getenv("DIRECTIONS_CACHE_ETA_TTL", "120"))
+MAX_ENTRIES = int(os.getenv("DIRECTIONS_CACHE_MAX_ENTRIES", "2000"))
+
+CacheKey = Tuple[str, str, str]
+
+
+@dataclass
+class DirectionsEntry:
+    # Route payload as the caller stored it (geometry, steps, distance)
+    route: Any
+    # Coordinates the route was actually computed between, used for ETA refreshes
+    origin: Tuple[float, float]
+    destination: Tuple[float, float]
+    geometry_until: float
+    duration_s: Optional[float]
+    duration_text: Optional[str]
+    eta_until: float
+
+
+class DirectionsCache:
+    """Size-bounded LRU of routes with independently expiring traffic durations."""
+
+    def __init__(self, max_entries: int = MAX_ENTRIES, geometry_ttl: float = GEOMETRY_TTL,
+                 eta_ttl: float = ETA_TTL, origin_precision: int = ORIGIN_PRECISION):
+        self.max_entries = max_entries
+        self.geometry_ttl = geometry_ttl
+        self.eta_ttl = eta_ttl
+        self.origin_precision = origin_precision
+        self._entries: "OrderedDict[CacheKey, DirectionsEntry]" = OrderedDict()
+        self._stats = {"hits": 0, "eta_refreshes": 0, "eta_refresh_failures": 0, "misses": 0, "evictions": 0}
+
+    def key(self, kind: str, origin_latitude: float, origin_longitude: float,
+            destination_latitude: float, destination_longitude: float,
+            destination_place_id: Optional[str] = None) -> CacheKey:
+        """
+        `kind` separates payloads of different endpoints for the same trip,
+        e.g. full directions versus steps only.
+        """
+        origin = geohash_encode(origin_latitude, origin_longitude, self.origin_precision)
+        if destination_place_id:
+            destination = f"place:{destination_place_id}"
+        else:
+            destination = geohash_encode(destination_latitude, destination_longitude, DESTINATION_PRECISION)
+        return (kind, origin, destination)
+
+    def get(self, key: CacheKey) -> Tuple[Optional[DirectionsEntry], str]:
+        """
+        Look up a route. Returns (entry, state) where state is "hit",
+        "eta_stale" (geometry still valid, duration needs a refresh) or "miss".
+        """
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry is None or now >= entry.geometry_until:
+            if entry is not None:
+                del self._entries[key]
+            self._stats["misses"] += 1
+            return None, "miss"
+
+        self._entries.move_to_end(key)
+        if now >= entry.eta_until:
+            return entry, "eta_stale"
+        self._stats["hits"] += 1
+        return entry, "hit"
+
+    def put(self, key: CacheKey, route: Any, origin: Tuple[float, float], destination: Tuple[float, float],
+            duration_s: Optional[float] = None, duration_text: Optional[str] = None) -> DirectionsEntry:
+        """
+        Store a freshly fetched route. Without a duration the entry has
+        nothing traffic-dependent and stays valid for the geometry TTL.
+        """
+        now = time.monotonic()
+        geometry_until = now + self.geometry_ttl
+        entry = DirectionsEntry(
+            route=route,
+            origin=origin,
+            destination=destination,
+            geometry_until=geometry_until,
+            duration_s=duration_s,
+            duration_text=duration_text,
+            eta_until=now + self.eta_ttl if duration_s is not None else geometry_until,
+        )
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+        return entry
+
+    def update_eta(self, key: CacheKey, duration_s: float, duration_text: str):
+        """Record a refreshed traffic duration for an entry that returned "eta_stale"."""
+        self._stats["eta_refreshes"] += 1
+        entry = self._entries.get(key)
+        if entry is not None:
+            entry.duration_s = duration_s
+            entry.duration_text = duration_text
+            entry.eta_until = time.monotonic() + self.eta_ttl
+
+    def eta_refresh_failed(self):
+        """Count a refresh that failed; the stale duration is served instead."""
+        self._stats["eta_refresh_failures"] += 1
+
+    def stats(self) -> dict:
+        lookups = self._stats["hits"] + self._stats["eta_refreshes"] + self._stats["eta_refresh_failures"] \
+            + self._stats["misses"]
+        reused = lookups - self._stats["misses"]
+        return {
+            **self._stats,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            # Share of requests that reused cached geometry, with or without an ETA refresh
+            "geometry_hit_ratio": round(reused / lookups, 4) if lookups else None,
+        }
+
+
+# Shared instance used by /directions and the Routes API step endpoints
+directions_cache = DirectionsCache()
@@ -0,0 +1,441 @@
+# backend/app/services/facility_index.py
+"""
+Local index of care facilities for offline nearby search.
+
+Hospitals, clinics, IHS/tribal facilities and urgent care centres are bulk
+loaded from CSV or GeoJSON exports found under FACILITY_INDEX_PATH (a file
+or a directory). Coordinates are stored as unit vectors on the sphere and
+indexed in a static KD-tree, so radius and k-nearest queries use straight
+chord distances (no special cases at the poles or the antimeridian) and
+take microseconds even for national datasets of hundreds of thousands of
+facilities.
+
+Each loaded snapshot is immutable. A reload re-parses only the files whose
+size or modification time changed, builds a new snapshot off the event loop
+and swaps it in with a single assignment, so queries keep running against
+the old index until the new one is ready.
+"""
+import os
+import csv
+import json
+import math
+import time
+import heapq
+import asyncio
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent  # backend folder
+INDEX_PATH = os.getenv("FACILITY_INDEX_PATH", str(BASE_DIR / "data" / "facilities"))
+
+EARTH_RADIUS_M = 6371008.8
+LEAF_SIZE = 32
+
+# place_id prefix for facilities that have no Google place id
+LOCAL_PREFIX = "local:"
+
+FACILITY_TYPES = ("hospital", "clinic", "urgent_care", "tribal_health", "other")
+
+# Google place types the index can answer, and the facility types each one covers
+PLACE_TYPE_FACILITIES = {
+    "hospital": ("hospital", "tribal_health"),
+    "doctor": ("clinic", "urgent_care", "tribal_health"),
+    "clinic": ("clinic", "tribal_health"),
+    "urgent_care": ("urgent_care",),
+    "tribal_health": ("tribal_health",),
+}
+
+# Accepted column / property names for each field, first match wins
+FIELD_ALIASES = {
+    "id": ("id", "facility_id", "objectid", "npi"),
+    "place_id": ("place_id", "google_place_id"),
+    "name": ("name", "facility_name", "title"),
+    "address": ("address", "formatted_address", "full_address", "street_address"),
+    "phone": ("phone", "telephone", "phone_number"),
+    "type": ("type", "facility_type", "category", "naics_desc"),
+    "latitude": ("latitude", "lat", "y"),
+    "longitude": ("longitude", "lng", "lon", "long", "x"),
+}
+
+
+def normalize_type(raw: Optional[str]) -> str:
+    """Map a dataset's free-text facility type onto FACILITY_TYPES."""
+    text = (raw or "").strip().lower()
+    if any(word in text for word in ("ihs", "tribal", "indian health", "native")):
+        return "tribal_health"
+    if "urgent" in text or "walk-in" in text:
+        return "urgent_care"
+    if "hospital" in text or "medical center" in text:
+        return "hospital"
+    if any(word in text for word in ("clinic", "health center", "fqhc", "community health")):
+        return "clinic"
+    return "other"
+
+
+def unit_vectors(latitude, longitude) -> np.ndarray:
+    lat = np.radians(np.asarray(latitude, dtype=np.float64))
+    lng = np.radians(np.asarray(longitude, dtype=np.float64))
+    cos_lat = np.cos(lat)
+    return np.column_stack((cos_lat * np.cos(lng), cos_lat * np.sin(lng), np.sin(lat)))
+
+
+def chord_for_meters(meters: float) -> float:
+    return 2 * math.sin(min(math.pi, meters / EARTH_RADIUS_M) / 2)
+
+
+def meters_for_chord(chord):
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.clip(np.asarray(chord) / 2, 0.0, 1.0))
+
+
+class KDTree:
+    """Static KD-tree over 3-D points with leaf buckets, queried by Euclidean distance."""
+
+    def __init__(self, points: np.ndarray, leaf_size: int = LEAF_SIZE):
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        order = np.arange(len(points))
+        starts, ends, lefts, rights, lows, highs = [], [], [], [], [], []
+        stack = [(0, len(points), -1, False)] if len(points) else []
+        while stack:
+            start, end, parent, is_right = stack.pop()
+            node = len(starts)
+            segment = points[order[start:end]]
+            low, high = segment.min(axis=0), segment.max(axis=0)
+            starts.append(start)
+            ends.append(end)
+            lefts.append(-1)
+            rights.append(-1)
+            lows.append(low.tolist())
+            highs.append(high.tolist())
+            if parent >= 0:
+                (rights if is_right else lefts)[parent] = node
+            if end - start > leaf_size:
+                axis = int(np.argmax(high - low))
+                mid = (end - start) // 2
+                order[start:end] = order[start:end][np.argpartition(segment[:, axis], mid)]
+                stack.append((start + mid, end, node, True))
+                stack.append((start, start + mid, node, False))
+
+        self.order = order
+        self.points = points[order]
+        self._start, self._end = starts, ends
+        self._left, self._right = lefts, rights
+        self._low, self._high = lows, highs
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def _box_distance2(self, node: int, p: Sequence[float]) -> float:
+        low, high = self._low[node], self._high[node]
+        d2 = 0.0
+        for k in range(3):
+            v = p[k]
+            if v < low[k]:
+                d2 += (low[k] - v) ** 2
+            elif v > high[k]:
+                d2 += (v - high[k]) ** 2
+        return d2
+
+    def query_radius(self, point: Sequence[float], radius: float,
+                     mask: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Original indices and distances of points within `radius`. `mask`
+        is a boolean array over the original points restricting matches.
+        """
+        if not len(self.points):
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        p = [float(v) for v in point]
+        target = np.asarray(p)
+        r2 = radius * radius
+        tree_mask = mask[self.order] if mask is not None else None
+        found_index, found_d2 = [], []
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            if self._box_distance2(node, p) > r2:
+                continue
+            if self._left[node] < 0:
+                start, end = self._start[node], self._end[node]
+                diff = self.points[start:end] - target
+                d2 = np.einsum("ij,ij->i", diff, diff)
+                hit = d2 <= r2
+                if tree_mask is not None:
+                    hit &= tree_mask[start:end]
+                if hit.any():
+                    found_index.append(np.flatnonzero(hit) + start)
+                    found_d2.append(d2[hit])
+            else:
+                stack.append(self._left[node])
+                stack.append(self._right[node])
+        if not found_index:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        index = np.concatenate(found_index)
+        return self.order[index], np.sqrt(np.concatenate(found_d2))
+
+    def query_nearest(self, point: Sequence[float], k: int, max_distance: float = math.inf,
+                      mask: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Original indices and distances of up to `k` nearest points, closest first."""
+        if not len(self.points) or k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        p = [float(v) for v in point]
+        target = np.asarray(p)
+        tree_mask = mask[self.order] if mask is not None else None
+        bound = max_distance * max_distance
+        best: List[Tuple[float, int]] = []  # max-heap of (-d2, tree index)
+        frontier = [(self._box_distance2(0, p), 0)]
+        while frontier:
+            d2, node = heapq.heappop(frontier)
+            if d2 > bound:
+                break
+            left = self._left[node]
+            if left >= 0:
+                for child in (left, self._right[node]):
+                    child_d2 = self._box_distance2(child, p)
+                    if child_d2 <= bound:
+                        heapq.heappush(frontier, (child_d2, child))
+                continue
+            start, end = self._start[node], self._end[node]
+            diff = self.points[start:end] - target
+            leaf_d2 = np.einsum("ij,ij->i", diff, diff)
+            for i in np.flatnonzero(leaf_d2 <= bound):
+                if tree_mask is not None and not tree_mask[start + i]:
+                    continue
+                entry = (-float(leaf_d2[i]), int(start + i))
+                if len(best) < k:
+                    heapq.heappush(best, entry)
+                elif entry > best[0]:
+                    heapq.heapreplace(best, entry)
+                if len(best) == k:
+                    bound = -best[0][0]
+        best.sort(reverse=True)
+        index = np.array([i for _, i in best], dtype=np.int64)
+        return self.order[index], np.sqrt(np.array([-d for d, _ in best]))
+
+
+class FacilityIndex:
+    """Immutable snapshot: facility columns plus the KD-tree over their locations."""
+
+    def __init__(self, columns: Dict[str, list], loaded_at: float = 0.0):
+        self.ids: List[str] = columns["id"]
+        self.place_ids: List[str] = columns["place_id"]
+        self.names: List[str] = columns["name"]
+        self.addresses: List[str] = columns["address"]
+        self.phones: List[str] = columns["phone"]
+        self.latitudes = np.asarray(columns["latitude"], dtype=np.float64)
+        self.longitudes = np.asarray(columns["longitude"], dtype=np.float64)
+        self.types = np.array([FACILITY_TYPES.index(t) for t in columns["type"]], dtype=np.int8)
+        self.loaded_at = loaded_at
+        self.tree = KDTree(unit_vectors(self.latitudes, self.longitudes))
+        self._by_place_id = {place_id: row for row, place_id in enumerate(self.place_ids)}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def covers(self, place_type: str) -> bool:
+        """Whether the index holds facilities for a Google place type."""
+        wanted = PLACE_TYPE_FACILITIES.get(place_type.lower())
+        return bool(wanted) and bool(np.isin(self.types, self._type_codes(wanted)).any())
+
+    def _type_codes(self, types: Iterable[str]) -> List[int]:
+        return [FACILITY_TYPES.index(t) for t in types if t in FACILITY_TYPES]
+
+    def _mask(self, place_type: Optional[str]) -> Optional[np.ndarray]:
+        if place_type is None:
+            return None
+        wanted = PLACE_TYPE_FACILITIES.get(place_type.lower(), (place_type.lower(),))
+        return np.isin(self.types, self._type_codes(wanted))
+
+    def nearby(self, latitude: float, longitude: float, radius_m: float,
+               place_type: Optional[str] = None, limit: Optional[int] = None) -> List[dict]:
+        """Facilities within `radius_m`, closest first, as nearby-search places."""
+        rows, chords = self.tree.query_radius(
+            unit_vectors(latitude, longitude)[0], chord_for_meters(radius_m), self._mask(place_type)
+        )
+        order = np.argsort(chords, kind="stable")[:limit]
+        return [self.place(int(rows[i]), float(d)) for i, d in zip(order, meters_for_chord(chords[order]))]
+
+    def nearest(self, latitude: float, longitude: float, k: int, place_type: Optional[str] = None,
+                max_radius_m: Optional[float] = None) -> List[dict]:
+        """The `k` closest facilities, optionally within `max_radius_m`."""
+        max_chord = chord_for_meters(max_radius_m) if max_radius_m is not None else math.inf
+        rows, chords = self.tree.query_nearest(
+            unit_vectors(latitude, longitude)[0], k, max_chord, self._mask(place_type)
+        )
+        return [self.place(int(row), float(d)) for row, d in zip(rows, meters_for_chord(chords))]
+
+    def place(self, row: int, distance_m: Optional[float] = None) -> dict:
+        """One facility in the same shape as a Places nearby result."""
+        place = {
+            "place_id": self.place_ids[row],
+            "name": self.names[row],
+            "address": self.addresses[row] or "Unknown",
+            "latitude": float(self.latitudes[row]),
+            "longitude": float(self.longitudes[row]),
+            "rating": "N/A",
+            "facility_type": FACILITY_TYPES[self.types[row]],
+            "source": "local",
+        }
+        if distance_m is not None:
+            place["distance_m"] = round(distance_m, 1)
+        return place
+
+    def details(self, place_id: str) -> Optional[dict]:
+        """Places (New)-style fields for a facility, or None if it is not indexed."""
+        row = self._by_place_id.get(place_id)
+        if row is None:
+            return None
+        phone = self.phones[row] or None
+        return {
+            "displayName": {"text": self.names[row]},
+            "formattedAddress": self.addresses[row] or None,
+            "nationalPhoneNumber": phone,
+            "internationalPhoneNumber": phone,
+            "location": {"latitude": float(self.latitudes[row]), "longitude": float(self.longitudes[row])},
+        }
+
+
+def _pick(record: dict, field: str):
+    for alias in FIELD_ALIASES[field]:
+        value = record.get(alias)
+        if value not in (None, ""):
+            return value
+    return None
+
+
+def _rows_from_records(records: Iterable[dict], source: str) -> Dict[str, list]:
+    columns = {field: [] for field in ("id", "place_id", "name", "address", "phone", "type", "latitude", "longitude")}
+    skipped = 0
+    for number, record in enumerate(records):
+        record = {str(key).strip().lower(): value for key, value in record.items()}
+        try:
+            latitude = float(_pick(record, "latitude"))
+            longitude = float(_pick(record, "longitude"))
+        except (TypeError, ValueError):
+            skipped += 1
+            continue
+        if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+            skipped += 1
+            continue
+        facility_id = str(_pick(record, "id") or f"{source}:{number}")
+        columns["id"].append(facility_id)
+        columns["place_id"].append(str(_pick(record, "place_id") or LOCAL_PREFIX + facility_id))
+        columns["name"].append(str(_pick(record, "name") or "Unknown"))
+        columns["address"].append(str(_pick(record, "address") or ""))
+        columns["phone"].append(str(_pick(record, "phone") or ""))
+        columns["type"].append(normalize_type(_pick(record, "type")))
+        columns["latitude"].append(latitude)
+        columns["longitude"].append(longitude)
+    if skipped:
+        logger.warning(f"Skipped {skipped} facilities without valid coordinates in {source}")
+    return columns
+
+
+def read_csv(path: Path) -> Dict[str, list]:
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        return _rows_from_records(csv.DictReader(f), path.name)
+
+
+def read_geojson(path: Path) -> Dict[str, list]:
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+
+    def records():
+        for feature in data.get("features", []):
+            geometry = feature.get("geometry") or {}
+            if geometry.get("type") != "Point":
+                continue
+            longitude, latitude = geometry["coordinates"][:2]
+            yield {**(feature.get("properties") or {}), "latitude": latitude, "longitude": longitude,
+                   **({"id": feature["id"]} if "id" in feature else {})}
+
+    return _rows_from_records(records(), path.name)
+
+
+READERS = {".csv": read_csv, ".geojson": read_geojson, ".json": read_geojson}
+
+
+class FacilityRegistry:
+    """Holds the current FacilityIndex and rebuilds it from the export files on reload."""
+
+    def __init__(self, path: str = INDEX_PATH):
+        self.path = Path(path)
+        self.index = FacilityIndex(_rows_from_records([], "empty"))
+        self._files: Dict[Path, Tuple[float, int, Dict[str, list]]] = {}
+        self._lock = threading.Lock()
+        self._stats = {"reloads": 0, "files": 0, "build_ms": None, "duplicates": 0}
+
+    def _export_files(self) -> List[Path]:
+        if self.path.is_file():
+            return [self.path]
+        if not self.path.is_dir():
+            return []
+        return sorted(p for p in self.path.iterdir() if p.suffix.lower() in READERS)
+
+    def reload(self) -> dict:
+        """Re-read changed export files and swap in a new index. Blocking; see reload_async."""
+        with self._lock:
+            start = time.perf_counter()
+            files = self._export_files()
+            parsed = 0
+            for path in files:
+                stat = path.stat()
+                cached = self._files.get(path)
+                if cached is None or cached[:2] != (stat.st_mtime, stat.st_size):
+                    self._files[path] = (stat.st_mtime, stat.st_size, READERS[path.suffix.lower()](path))
+                    parsed += 1
+            for path in set(self._files) - set(files):
+                del self._files[path]
+
+            merged = {field: [] for field in ("id", "place_id", "name", "address", "phone", "type", "latitude", "longitude")}
+            for path in files:
+                for field, values in self._files[path][2].items():
+                    merged[field].extend(values)
+            merged, duplicates = _dedupe(merged)
+
+            self.index = FacilityIndex(merged, loaded_at=time.time())
+            build_ms = round((time.perf_counter() - start) * 1000, 1)
+            self._stats.update(reloads=self._stats["reloads"] + 1, files=len(files),
+                               build_ms=build_ms, duplicates=duplicates)
+            logger.info(f"Facility index loaded {len(self.index)} facilities from {len(files)} files "
+                        f"({parsed} re-read) in {build_ms} ms")
+            return {"facilities": len(self.index), "files": len(files), "reparsed": parsed, "build_ms": build_ms}
+
+    async def reload_async(self) -> dict:
+        """Reload in a worker thread; requests keep using the previous index meanwhile."""
+        return await asyncio.to_thread(self.reload)
+
+    def stats(self) -> dict:
+        index = self.index
+        counts = np.bincount(index.types, minlength=len(FACILITY_TYPES)) if len(index) else [0] * len(FACILITY_TYPES)
+        return {
+            **self._stats,
+            "path": str(self.path),
+            "facilities": len(index),
+            "by_type": {name: int(count) for name, count in zip(FACILITY_TYPES, counts)},
+            "loaded_at": index.loaded_at or None,
+        }
+
+
+def _dedupe(columns: Dict[str, list]) -> Tuple[Dict[str, list], int]:
+    """Keep the last row for each place id, so later files update earlier ones."""
+    last = {place_id: row for row, place_id in enumerate(columns["place_id"])}
+    if len(last) == len(columns["place_id"]):
+        return columns, 0
+    rows = sorted(last.values())
+    return {field: [values[row] for row in rows] for field, values in columns.items()}, len(columns["place_id"]) - len(rows)
+
+
+_registry: Optional[FacilityRegistry] = None
+
+
+def get_facility_registry() -> FacilityRegistry:
+    """Shared registry, created on first use (empty until reloaded)."""
+    global _registry
+    if _registry is None:
+        _registry = FacilityRegistry()
+    return _registry
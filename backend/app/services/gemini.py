@@ -1,12 +1,169 @@
+# backend/app/services/gemini.py
+"""
+Medical advice from Google Gemini.
+
+The static triage instructions are sent once, as the model's system
+instruction, and each request only carries the patient fields. When
+GEMINI_CONTEXT_CACHE is enabled the instructions are also stored with
+Gemini context caching so they are not billed as input tokens on every
+call; Gemini only caches contexts above a minimum token count, so when the
+cache cannot be created the engine falls back to the plain system
+instruction. Creating the cache is a blocking call: async requests start it
+in a worker thread and keep using the current model until it is ready.
+"""
 import os
+import time
+import asyncio
+import logging
+import threading
+import datetime
+from typing import AsyncIterator
 import google.generativeai as genai
 from app.core.config import GEMINI_API_KEY
+from app.services.resilience import resilience
+from app.services.advice_prompt import SYSTEM_INSTRUCTION, build_patient_content
+
+logger = logging.getLogger(__name__)
+
+MODEL_NAME = os.getenv("GEMINI_MODEL", "gemini-1.5-flash")
+# Context caching needs an explicit model version
+CACHE_MODEL_NAME = os.getenv("GEMINI_CACHE_MODEL", "models/gemini-1.5-flash-001")
+CONTEXT_CACHE_ENABLED = os.getenv("GEMINI_CONTEXT_CACHE", "0").lower() in ("1", "true", "yes")
+CONTEXT_CACHE_TTL = int(os.getenv("GEMINI_CONTEXT_CACHE_TTL", "3600"))
+# Upper bound for one generation (first chunk when streaming); the breaker adapts below it
+GEMINI_TIMEOUT = float(os.getenv("GEMINI_TIMEOUT", "30"))
+# Another host for the Gemini API, e.g. the load-test stand-in; it is reached over REST
+API_ENDPOINT = os.getenv("GEMINI_API_ENDPOINT")
+
+# Breaker shared by every Gemini call; when open, callers return the fallback advice at once
+gemini_breaker = resilience.breaker("gemini")
+
+
+def fallback_advice(health_problems: str) -> str:
+    """Advice returned when Gemini cannot be reached."""
+    return f"""
+    **System Alert**
+    
+    I apologize, but I'm unable to process your request at the moment.
+    
+    **Your Reported Symptoms:** {health_problems}
+    
+    **WARNING:** If experiencing severe symptoms:
+    * Call emergency services (911) immediately
+    * Don't wait for online assistance
+    * Seek immediate medical attention
+    
+    For non-emergency symptoms, please contact a healthcare professional or visit an urgent care center.
+    """
+
+
+def is_fallback_advice(text: str) -> bool:
+    """True when the text contains the canned advice sent when Gemini failed; it must not be cached."""
+    return "**System Alert**" in text
+
+
+class AdviceEngine:
+    """Configured Gemini client and model, built once and shared by every request."""
+
+    def __init__(self, api_key: str = GEMINI_API_KEY, model_name: str = MODEL_NAME,
+                 use_context_cache: bool = CONTEXT_CACHE_ENABLED):
+        if API_ENDPOINT:
+            genai.configure(api_key=api_key, transport="rest", client_options={"api_endpoint": API_ENDPOINT})
+        else:
+            genai.configure(api_key=api_key)
+        self.model_name = model_name
+        self.use_context_cache = use_context_cache
+        # Creating the context cache is a blocking API call, so it is not done here:
+        # requests use the plain model until the first refresh has built the cached one
+        self._cache_expires_at = 0.0 if use_context_cache else None
+        self._refresh_lock = threading.Lock()
+        self._refresh_task = None
+        self.model = genai.GenerativeModel(self.model_name, system_instruction=SYSTEM_INSTRUCTION)
+
+    def _build_cached_model(self):
+        """Model over a new Gemini context cache, or None when it cannot be created."""
+        try:
+            from google.generativeai import caching
+            cached = caching.CachedContent.create(
+                model=CACHE_MODEL_NAME,
+                display_name="health-routes-triage",
+                system_instruction=SYSTEM_INSTRUCTION,
+                ttl=datetime.timedelta(seconds=CONTEXT_CACHE_TTL),
+            )
+            logger.info(f"Using Gemini context cache {cached.name}")
+            return genai.GenerativeModel.from_cached_content(cached_content=cached)
+        except Exception as e:
+            # Most likely the instructions are below the minimum cacheable size
+            logger.warning(f"Gemini context cache unavailable, using system instruction: {str(e)}")
+            return None
+
+    def _cache_due(self) -> bool:
+        return self._cache_expires_at is not None and time.monotonic() >= self._cache_expires_at
+
+    def _refresh_cache(self):
+        """Replace the model with one over a fresh context cache; blocking, one caller at a time."""
+        with self._refresh_lock:
+            if not self._cache_due():
+                return
+            cached_model = self._build_cached_model()
+            if cached_model is None:
+                self.use_context_cache = False
+                self._cache_expires_at = None
+                self.model = genai.GenerativeModel(self.model_name, system_instruction=SYSTEM_INSTRUCTION)
+                return
+            # Rebuild a little before Gemini drops the cached content
+            self._cache_expires_at = time.monotonic() + CONTEXT_CACHE_TTL * 0.9
+            self.model = cached_model
+
+    def _current_model(self):
+        if self._cache_due():
+            self._refresh_cache()
+        return self.model
+
+    def _current_model_async(self):
+        """Model for a request on the event loop; a due cache refresh runs in a worker thread."""
+        if self._cache_due() and (self._refresh_task is None or self._refresh_task.done()):
+            # The current model keeps serving until the new cache is ready
+            self._refresh_task = asyncio.ensure_future(asyncio.to_thread(self._refresh_cache))
+        return self.model
+
+    def generate(self, address: str, health_problems: str, language: str) -> str:
+        with gemini_breaker.guard("generate_content"):
+            response = self._current_model().generate_content(
+                build_patient_content(address, health_problems, language),
+                request_options={"timeout": GEMINI_TIMEOUT},
+            )
+            return response.text
+
+    async def generate_async(self, address: str, health_problems: str, language: str) -> str:
+        with gemini_breaker.guard("generate_content"):
+            response = await asyncio.wait_for(
+                self._current_model_async().generate_content_async(build_patient_content(address, health_problems, language)),
+                gemini_breaker.timeout(GEMINI_TIMEOUT),
+            )
+            return response.text
+
+    async def stream(self, address: str, health_problems: str, language: str) -> AsyncIterator[str]:
+        # Only the wait for the first chunk is timed and bounded; the rest arrives at generation speed
+        with gemini_breaker.guard("stream_first_chunk"):
+            response = await asyncio.wait_for(
+                self._current_model_async().generate_content_async(
+                    build_patient_content(address, health_problems, language), stream=True
+                ),
+                gemini_breaker.timeout(GEMINI_TIMEOUT),
+            )
+        async for chunk in response:
+            text = getattr(chunk, "text", "")
+            if text:
+                yield text
 
-# Configure the Gemini API
-genai.configure(api_key=GEMINI_API_KEY)
 
-# Initialize the Gemini model
-model = genai.GenerativeModel('gemini-1.5-flash') 
+advice_engine = AdviceEngine()
+
+# The model built at startup, kept as a module attribute for callers and tests that
+# use it directly; requests always go through advice_engine.model
+model = advice_engine.model
+
 
 def get_medical_advice(address: str, health_problems: str, language: str) -> str:
     """
@@ -21,174 +178,14 @@ def get_medical_advice(address: str, health_problems: str, language: str) -> str
         str: Medical advice response from Gemini
     """
     
-    print("=== GEMINI SERVICE CALLED ===")
-    print(f"Address: '{address}'")
-    print(f"Health problems: '{health_problems}'")
-    print(f"Language: '{language}'")
-    
-    # Check if API key is configured
-    if not GEMINI_API_KEY:
-        print("ERROR: GEMINI_API_KEY is not set!")
-        raise Exception("Gemini API key not configured")
-
-    print("API Key configured")
-    prompt = f"""
-    You are an emergency-aware healthcare assistant providing critical medical guidance based on symptoms severity.
-    
-    CRITICAL TASK: Analyze these symptoms and provide life-saving advice if needed.
-    
-    Patient Information:
-    - Current Location: {address}
-    - Reported Symptoms: {health_problems}
-    - Language Preference: {language}
-    
-    IMPORTANT: First determine if this is potentially life-threatening. If ANY of these conditions are possible based on the symptoms (chest pain, difficulty breathing, severe bleeding, stroke symptoms, loss of consciousness, severe allergic reaction, severe burns, poisoning, severe head injury), START your response with the emergency section.
-    
-    FOR LIFE-THREATENING CONDITIONS, use this format:
-
-    **⚠️ EMERGENCY MEDICAL ATTENTION REQUIRED ⚠️**
-    **WARNING:** Call emergency services (911 or local emergency number) IMMEDIATELY
-    
-    **Critical Condition Suspected:**
-    [Explain what life-threatening condition this might be]
-    
-    **IMMEDIATE ACTIONS While Waiting for Emergency Services:**
-    * [Specific action 1 - e.g., "If conscious, help them sit upright"]
-    * [Specific action 2 - e.g., "Loosen tight clothing around chest/neck"]
-    * [Specific action 3 - e.g., "Monitor breathing and consciousness"]
-    * [Include CPR instructions if relevant]
-    
-    **DO NOT:**
-    * [Thing to avoid that could worsen condition]
-    * [Another dangerous action to avoid]
-    
-    **Expected Emergency Response Time:**
-    [Typical ambulance arrival time for their area if known]
-    
-    FOR NON-EMERGENCY CONDITIONS, use this format:
-
-    **1. Medical Assessment:**
-    [Provide detailed analysis of what condition this likely is, with confidence level]
-    [Explain why you believe it's this condition based on symptoms]
-    
-    **2. Severity Level:**
-    [Rate as: Mild | Moderate | Serious but not emergency]
-    [Explain typical progression if untreated]
-    
-    **3. Recommended Healthcare Provider:**
-    [Be specific: "Visit urgent care within 24 hours" or "Schedule appointment with primary care doctor within 3-5 days"]
-    [Suggest specific type of specialist if needed]
-    
-    **4. Immediate Relief Measures:**
-    * [Specific remedy with dosage/frequency - e.g., "Take 400-600mg ibuprofen every 6 hours"]
-    * [Physical relief method - e.g., "Apply ice pack for 15 minutes every hour"]
-    * [Comfort measure - e.g., "Rest in dark, quiet room"]
-    * [Dietary advice - e.g., "Drink 8-10 glasses of water throughout the day"]
-    
-    **5. Home Care Instructions:**
-    * [Day 1 care routine]
-    * [Day 2-3 progression]
-    * [When to expect improvement]
-    
-    **6. Red Flags - Seek Immediate Care If:**
-    **WARNING:** Go to emergency room if you experience:
-    * [Specific dangerous symptom to watch for]
-    * [Another warning sign]
-    * [Progressive worsening indicator]
-    
-    **7. Recovery Timeline:**
-    [Expected duration and stages of recovery]
-    
-    **8. Prevention Tips:**
-    * [How to prevent recurrence]
-    * [Lifestyle modifications]
-    
-    FORMATTING RULES FOR PROPER DISPLAY:
-    - Use **text** for bold headers and important labels
-    - Start each section header with ** and end with **
-    - Use * at the beginning of bullet points (single asterisk, space, then text)
-    - For warnings/emergencies, always include "WARNING:" or "EMERGENCY" in the text
-    - Keep line breaks between sections for proper spacing
-    - Write clear, direct sentences that a worried patient can easily understand
-    - Respond in {language} language
-    - Be compassionate but urgent when necessary
-    - Use medical terms but always explain them in simple language
-    
-    Remember: You might save a life with clear, urgent instructions for emergencies, or provide comfort and healing guidance for common ailments. Analyze carefully and respond appropriately to the severity level.
-    """
-    
-    print(f"Prompt length: {len(prompt)} characters")
-    print(f"First 100 chars of prompt: {prompt[:100]}...")
-    
     try:
-        print("INFO: Configuring Gemini...")
-        genai.configure(api_key=GEMINI_API_KEY)
-        print("SUCCESS: Gemini configured successfully")
-        
-        print("INFO: Initializing Gemini model...")
-        model = genai.GenerativeModel('gemini-1.5-flash')
-        print("SUCCESS: Gemini model initialized")
-        
-        print("INFO: Generating content...")
-        response = model.generate_content(prompt)
-        print("SUCCESS: Content generation completed")
-        
-        print(f"Response type: {type(response)}")
-        print(f"Response attributes: {dir(response)}")
-        
-        if hasattr(response, 'text'):
-            response_text = response.text
-            print(f"Response text length: {len(response_text)} characters")
-            print(f"First 200 chars: {response_text[:200]}...")
-            return response_text
-        else:
-            print("ERROR: Response has no 'text' attribute")
-            print(f"Response content: {response}")
-            raise Exception("Invalid response format from Gemini API")
+        response_text = advice_engine.generate(address, health_problems, language)
+        logger.debug("Gemini advice: %d characters", len(response_text))
+        return response_text
         
     except Exception as e:
-        print(f"GEMINI ERROR: {str(e)}")
-        print(f"Error type: {type(e)}")
-        
-        # Try to get more details about the error
-        if hasattr(e, 'args'):
-            print(f"Error args: {e.args}")
-        if hasattr(e, 'code'):
-            print(f"Error code: {e.code}")
-        if hasattr(e, 'details'):
-            print(f"Error details: {e.details}")
-            
-        import traceback
-        print("Full traceback:")
-        traceback.print_exc()
-        
-        # Fallback response
-        fallback_response = f"""
-        **System Alert**
-        
-        I apologize, but I'm unable to process your medical request at the moment due to a technical issue.
-        
-        **Your Reported Symptoms:** {health_problems}
-        
-        **IMPORTANT:** 
-        * If you're experiencing severe symptoms, please don't wait
-        * Call emergency services (911) immediately for:
-        * Chest pain or pressure
-        * Difficulty breathing
-        * Severe bleeding
-        * Loss of consciousness
-        * Severe allergic reactions
-        
-        **For Non-Emergency Symptoms:**
-        * Contact your healthcare provider
-        * Visit an urgent care center
-        * Call a medical helpline for guidance
-        
-        Technical error details: {str(e)}
-        """
-        
-        print("INFO: Returning fallback response")
-        return fallback_response
+        logger.error(f"Gemini error, returning the fallback: {type(e).__name__}: {e}")
+        return fallback_advice(health_problems)
 
 # Alternative async version if you prefer async/await pattern
 async def get_medical_advice_async(address: str, health_problems: str, language: str) -> str:
@@ -196,110 +193,25 @@ async def get_medical_advice_async(address: str, health_problems: str, language:
     Async version of get_medical_advice using Google Gemini API
     """
     
-    prompt = f"""
-    You are an emergency-aware healthcare assistant providing critical medical guidance based on symptoms severity.
-    
-    CRITICAL TASK: Analyze these symptoms and provide life-saving advice if needed.
-    
-    Patient Information:
-    - Current Location: {address}
-    - Reported Symptoms: {health_problems}
-    - Language Preference: {language}
-    
-    IMPORTANT: First determine if this is potentially life-threatening. If ANY of these conditions are possible based on the symptoms (chest pain, difficulty breathing, severe bleeding, stroke symptoms, loss of consciousness, severe allergic reaction, severe burns, poisoning, severe head injury), START your response with the emergency section.
-    
-    FOR LIFE-THREATENING CONDITIONS, use this format:
-
-    **⚠️ EMERGENCY MEDICAL ATTENTION REQUIRED ⚠️**
-    **WARNING:** Call emergency services (911 or local emergency number) IMMEDIATELY
-    
-    **Critical Condition Suspected:**
-    [Explain what life-threatening condition this might be]
-    
-    **IMMEDIATE ACTIONS While Waiting for Emergency Services:**
-    * [Specific action 1 - e.g., "If conscious, help them sit upright"]
-    * [Specific action 2 - e.g., "Loosen tight clothing around chest/neck"]
-    * [Specific action 3 - e.g., "Monitor breathing and consciousness"]
-    * [Include CPR instructions if relevant]
-    
-    **DO NOT:**
-    * [Thing to avoid that could worsen condition]
-    * [Another dangerous action to avoid]
-    
-    **Expected Emergency Response Time:**
-    [Typical ambulance arrival time for their area if known]
-    
-    FOR NON-EMERGENCY CONDITIONS, use this format:
-
-    **1. Medical Assessment:**
-    [Provide detailed analysis of what condition this likely is, with confidence level]
-    [Explain why you believe it's this condition based on symptoms]
-    
-    **2. Severity Level:**
-    [Rate as: Mild | Moderate | Serious but not emergency]
-    [Explain typical progression if untreated]
-    
-    **3. Recommended Healthcare Provider:**
-    [Be specific: "Visit urgent care within 24 hours" or "Schedule appointment with primary care doctor within 3-5 days"]
-    [Suggest specific type of specialist if needed]
-    
-    **4. Immediate Relief Measures:**
-    * [Specific remedy with dosage/frequency - e.g., "Take 400-600mg ibuprofen every 6 hours"]
-    * [Physical relief method - e.g., "Apply ice pack for 15 minutes every hour"]
-    * [Comfort measure - e.g., "Rest in dark, quiet room"]
-    * [Dietary advice - e.g., "Drink 8-10 glasses of water throughout the day"]
-    
-    **5. Home Care Instructions:**
-    * [Day 1 care routine]
-    * [Day 2-3 progression]
-    * [When to expect improvement]
-    
-    **6. Red Flags - Seek Immediate Care If:**
-    **WARNING:** Go to emergency room if you experience:
-    * [Specific dangerous symptom to watch for]
-    * [Another warning sign]
-    * [Progressive worsening indicator]
-    
-    **7. Recovery Timeline:**
-    [Expected duration and stages of recovery]
-    
-    **8. Prevention Tips:**
-    * [How to prevent recurrence]
-    * [Lifestyle modifications]
-    
-    FORMATTING RULES FOR PROPER DISPLAY:
-    - Use **text** for bold headers and important labels
-    - Start each section header with ** and end with **
-    - Use * at the beginning of bullet points (single asterisk, space, then text)
-    - For warnings/emergencies, always include "WARNING:" or "EMERGENCY" in the text
-    - Keep line breaks between sections for proper spacing
-    - Write clear, direct sentences that a worried patient can easily understand
-    - Respond in {language} language
-    - Be compassionate but urgent when necessary
-    - Use medical terms but always explain them in simple language
-    
-    Remember: You might save a life with clear, urgent instructions for emergencies, or provide comfort and healing guidance for common ailments. Analyze carefully and respond appropriately to the severity level.
-    """
-    
     try:
         # Generate content using Gemini (async)
-        response = await model.generate_content_async(prompt)
-        return response.text
+        return await advice_engine.generate_async(address, health_problems, language)
         
     except Exception as e:
-        print(f"Error calling Gemini API: {e}")
+        logger.error(f"Error calling Gemini API: {type(e).__name__}: {e}")
         # Fallback response
-        return f"""
-        **System Alert**
-        
-        I apologize, but I'm unable to process your medical request at the moment.
-        
-        **Your Reported Symptoms:** {health_problems}
-        
-        **WARNING:** If experiencing severe symptoms:
-        * Call emergency services (911) immediately
-        * Don't wait for online assistance
-        * Seek immediate medical attention
-        
-        For non-emergency symptoms, please contact your healthcare provider or visit an urgent care center.
-        """
\ No newline at end of file
+        return fallback_advice(health_problems)
+
+async def stream_medical_advice(address: str, health_problems: str, language: str) -> AsyncIterator[str]:
+    """
+    Stream medical advice text from Gemini chunk by chunk as it is generated.
+    If the stream fails, the static advice is sent after whatever text
+    already went out so the patient knows the answer was cut short.
+    """
+    try:
+        async for text in advice_engine.stream(address, health_problems, language):
+            yield text
+                
+    except Exception as e:
+        logger.error(f"Error streaming from Gemini API: {type(e).__name__}: {e}")
+        yield fallback_advice(health_problems)
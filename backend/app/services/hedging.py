@@ -0,0 +1,125 @@
+# backend/app/services/hedging.py
+"""
+Deadlines and hedged requests for latency-sensitive upstream calls.
+
+A LatencyTracker keeps a sliding window of successful response times per
+endpoint. When hedging is enabled and the first attempt has not answered by
+the observed HEDGE_PERCENTILE latency, a second identical attempt is sent
+and whichever succeeds first wins; the other is cancelled. Both attempts
+share one overall deadline, after which the call fails with a timeout.
+Hedging stays off for an endpoint until HEDGE_MIN_SAMPLES latencies have
+been seen, so a cold process does not double its traffic.
+"""
+import os
+import asyncio
+import logging
+from collections import deque
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+LATENCY_WINDOW = int(os.getenv("LATENCY_WINDOW", "256"))
+HEDGE_MIN_SAMPLES = int(os.getenv("HEDGE_MIN_SAMPLES", "20"))
+HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", "95"))
+# Never hedge sooner than this, however fast the endpoint usually is
+HEDGE_MIN_DELAY = float(os.getenv("HEDGE_MIN_DELAY", "0.05"))
+
+T = TypeVar("T")
+
+
+class LatencyTracker:
+    """Sliding window of recent latencies in seconds."""
+
+    def __init__(self, window: int = LATENCY_WINDOW, min_samples: int = HEDGE_MIN_SAMPLES):
+        self.min_samples = min_samples
+        self._samples = deque(maxlen=window)
+
+    def record(self, seconds: float):
+        self._samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """The q-th percentile (0-100), or None until enough samples were recorded."""
+        if len(self._samples) < self.min_samples:
+            return None
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, max(0, round(q / 100 * len(ordered)) - 1))
+        return ordered[index]
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+
+class Hedger:
+    """Runs attempts under a deadline, hedging slow ones, and counts who won."""
+
+    def __init__(self):
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    async def run(self, label: str, attempt: Callable[[float], Awaitable[T]], deadline: float,
+                  hedge_after: Optional[float] = None) -> T:
+        """
+        Call `attempt(timeout)` and return its result. If `hedge_after` is
+        set and the first attempt is still running after that many seconds,
+        a second attempt is started. Raises httpx.TimeoutException when no
+        attempt succeeds within `deadline` seconds, or the error of the last
+        failed attempt.
+        """
+        stats = self._stats.setdefault(
+            label, {"requests": 0, "hedged": 0, "hedge_wins": 0, "deadline_exceeded": 0}
+        )
+        stats["requests"] += 1
+        loop = asyncio.get_running_loop()
+        expires = loop.time() + deadline
+
+        primary = asyncio.ensure_future(attempt(deadline))
+        primary.add_done_callback(_retrieve)
+        hedge = None
+        pending = {primary}
+        try:
+            if hedge_after is not None and hedge_after < deadline:
+                done, _ = await asyncio.wait(pending, timeout=hedge_after)
+                if not done:
+                    stats["hedged"] += 1
+                    hedge = asyncio.ensure_future(attempt(expires - loop.time()))
+                    hedge.add_done_callback(_retrieve)
+                    pending.add(hedge)
+
+            error = None
+            while pending:
+                remaining = expires - loop.time()
+                if remaining <= 0:
+                    break
+                done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            stats["hedge_wins"] += 1
+                        return task.result()
+                    error = task.exception()
+            if error is not None and not pending:
+                raise error
+            stats["deadline_exceeded"] += 1
+            logger.warning(f"Upstream call '{label}' missed its {deadline}s deadline")
+            raise httpx.TimeoutException(f"Deadline of {deadline}s exceeded for {label}")
+        finally:
+            primary.cancel()
+            if hedge is not None:
+                hedge.cancel()
+
+    def stats(self) -> Dict[str, dict]:
+        result = {}
+        for label, counters in self._stats.items():
+            hedged = counters["hedged"]
+            result[label] = {
+                **counters,
+                "hedge_win_ratio": round(counters["hedge_wins"] / hedged, 4) if hedged else None,
+            }
+        return result
+
+
+def _retrieve(task: asyncio.Future):
+    """Mark a losing attempt's exception as retrieved."""
+    if not task.cancelled():
+        task.exception()
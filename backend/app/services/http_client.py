@@ -0,0 +1,287 @@
+# backend/app/services/http_client.py
+"""
+Application-scoped pooled HTTP clients for the upstream Google APIs.
+
+One httpx.AsyncClient is kept per upstream host so keep-alive connections
+(and HTTP/2 streams when enabled) are reused across requests instead of
+paying a new TCP + TLS handshake on every call. The clients are opened in
+the FastAPI lifespan (see main.py) and shared by every route.
+"""
+import os
+import time
+import logging
+import importlib.util
+from functools import partial
+from typing import Dict, Optional
+
+import httpx
+
+from app.services.singleflight import SingleFlight, request_key
+from app.services.hedging import Hedger, LatencyTracker, HEDGE_PERCENTILE, HEDGE_MIN_DELAY
+from app.services.resilience import resilience, CircuitOpenError
+from app.services.quota import quota, QuotaExceeded, priority, request_priority, EMERGENCY, LOW
+from app.services import metrics
+
+logger = logging.getLogger(__name__)
+
+# Upstream hosts we talk to, keyed by a short name used by the routes.
+# UPSTREAM_URL_<NAME> points one elsewhere, e.g. at the load-test stand-ins
+# in benchmarks/loadtest.
+UPSTREAM_HOSTS = {
+    name: os.getenv(f"UPSTREAM_URL_{name.upper()}", default).rstrip("/")
+    for name, default in {
+        "places": "https://places.googleapis.com",
+        "routes": "https://routes.googleapis.com",
+        "maps": "https://maps.googleapis.com",
+    }.items()
+}
+
+# Per-endpoint timeouts in seconds (override with HTTP_TIMEOUT_<ENDPOINT>)
+DEFAULT_TIMEOUTS = {
+    "geocode": 10.0,
+    "places_nearby": 30.0,
+    "places_details": 30.0,
+    "routes": 30.0,
+    "route_matrix": 10.0,
+    "directions": 10.0,
+}
+
+# Circuit breaker each endpoint reports to; Places searches and details fail together
+ENDPOINT_DEPENDENCIES = {
+    "geocode": "geocoding",
+    "places_nearby": "places",
+    "places_details": "places",
+    "routes": "routes",
+    "route_matrix": "routes",
+    "directions": "directions",
+}
+
+
+def upstream_url(name: str, path: str) -> str:
+    """Absolute URL of `path` on the upstream host `name`."""
+    return UPSTREAM_HOSTS[name] + path
+
+
+class UpstreamError(Exception):
+    """An upstream API answered with an error that should be passed on to the client."""
+
+    def __init__(self, status_code: int, error: str):
+        super().__init__(error)
+        self.status_code = status_code
+        self.error = error
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        logger.warning(f"Invalid integer for {name}, using default {default}")
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        logger.warning(f"Invalid number for {name}, using default {default}")
+        return default
+
+
+def _http2_enabled() -> bool:
+    """HTTP/2 is opt-in and needs the optional `h2` package."""
+    if os.getenv("HTTP2_ENABLED", "false").lower() not in ("1", "true", "yes"):
+        return False
+    if importlib.util.find_spec("h2") is None:
+        logger.warning("HTTP2_ENABLED is set but the 'h2' package is not installed, using HTTP/1.1")
+        return False
+    return True
+
+
+class UpstreamClients:
+    """Holds one pooled AsyncClient per upstream host plus usage counters."""
+
+    def __init__(self):
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._stats: Dict[str, Dict[str, float]] = {}
+        self.singleflight = SingleFlight()
+        self.hedger = Hedger()
+        self.latency: Dict[str, LatencyTracker] = {}
+        self.limits = httpx.Limits(
+            max_connections=_env_int("HTTP_MAX_CONNECTIONS", 100),
+            max_keepalive_connections=_env_int("HTTP_MAX_KEEPALIVE_CONNECTIONS", 20),
+            keepalive_expiry=_env_float("HTTP_KEEPALIVE_EXPIRY", 30.0),
+        )
+        self.http2 = _http2_enabled()
+        self.timeouts = {
+            endpoint: _env_float(f"HTTP_TIMEOUT_{endpoint.upper()}", default)
+            for endpoint, default in DEFAULT_TIMEOUTS.items()
+        }
+
+    def _create(self, name: str) -> httpx.AsyncClient:
+        logger.info(f"Opening pooled HTTP client for '{name}' ({UPSTREAM_HOSTS[name]}), http2={self.http2}")
+        self._stats[name] = {"requests": 0, "errors": 0, "in_flight": 0, "total_time": 0.0}
+        return httpx.AsyncClient(
+            limits=self.limits,
+            http2=self.http2,
+            timeout=httpx.Timeout(30.0, connect=5.0),
+        )
+
+    async def startup(self):
+        """Open a client per upstream host. Called from the app lifespan."""
+        for name in UPSTREAM_HOSTS:
+            if name not in self._clients:
+                self._clients[name] = self._create(name)
+
+    async def shutdown(self):
+        """Close every pooled client. Called from the app lifespan."""
+        for name, client in list(self._clients.items()):
+            await client.aclose()
+            logger.info(f"Closed pooled HTTP client for '{name}'")
+        self._clients.clear()
+
+    def client(self, name: str) -> httpx.AsyncClient:
+        """Return the shared client for a host, creating it lazily if the lifespan has not run."""
+        client = self._clients.get(name)
+        if client is None or client.is_closed:
+            client = self._clients[name] = self._create(name)
+        return client
+
+    def timeout(self, endpoint: str) -> float:
+        return self.timeouts.get(endpoint, 30.0)
+
+    def hedge_delay(self, endpoint: str) -> Optional[float]:
+        """How long to wait before hedging `endpoint`, or None while its latency is unknown."""
+        tracker = self.latency.get(endpoint)
+        delay = tracker.percentile(HEDGE_PERCENTILE) if tracker is not None else None
+        return max(delay, HEDGE_MIN_DELAY) if delay is not None else None
+
+    async def request(self, name: str, method: str, url: str, endpoint: str,
+                      coalesce: bool = True, hedge: bool = False, deadline: Optional[float] = None,
+                      **kwargs) -> httpx.Response:
+        """
+        Send a request through the pooled client for `name` using the
+        timeout configured for `endpoint`, recording usage stats.
+
+        Identical concurrent requests (same method, URL, params, body and
+        field mask) share one upstream call unless `coalesce` is False.
+        With `hedge`, a second attempt is sent once the first is slower than
+        the endpoint's observed p95; `deadline` bounds all attempts together
+        and defaults to the endpoint timeout.
+        """
+        if hedge or deadline is not None:
+            send = partial(self._hedged, name, method, url, endpoint, hedge, deadline, **kwargs)
+        else:
+            send = partial(self._send, name, method, url, endpoint, **kwargs)
+        if not coalesce:
+            return await send()
+        key = request_key(method, url, kwargs.get("params"), kwargs.get("json"), kwargs.get("headers"))
+        if request_priority.get() == EMERGENCY:
+            # Never wait behind a normal-lane call that may be queued on the quota
+            key = f"{EMERGENCY}:{key}"
+        return await self.singleflight.do(key, send, label=endpoint)
+
+    async def _hedged(self, name: str, method: str, url: str, endpoint: str,
+                      hedge: bool, deadline: Optional[float], **kwargs) -> httpx.Response:
+        deadline = deadline if deadline is not None else self.timeout(endpoint)
+        attempts = 0
+
+        async def attempt(timeout: float) -> httpx.Response:
+            nonlocal attempts
+            attempts += 1
+            if attempts > 1 and request_priority.get() != EMERGENCY:
+                # The hedge is optional; it must not eat into the reserved budget
+                with priority(LOW):
+                    return await self._send(name, method, url, endpoint, **{**kwargs, "timeout": timeout})
+            return await self._send(name, method, url, endpoint, **{**kwargs, "timeout": timeout})
+
+        return await self.hedger.run(endpoint, attempt, deadline, self.hedge_delay(endpoint) if hedge else None)
+
+    async def _send(self, name: str, method: str, url: str, endpoint: str, **kwargs) -> httpx.Response:
+        try:
+            await quota.acquire(endpoint)
+        except QuotaExceeded as e:
+            # Same answer Google would give, but before the key is actually exhausted
+            metrics.record_upstream_error(ENDPOINT_DEPENDENCIES.get(endpoint, name), endpoint, "quota")
+            raise UpstreamError(429, "API quota exceeded") from e
+        client = self.client(name)
+        breaker = resilience.breaker(ENDPOINT_DEPENDENCIES.get(endpoint, name))
+        # The configured (or deadline) timeout caps the adaptive one
+        kwargs["timeout"] = breaker.timeout(kwargs.get("timeout") or self.timeout(endpoint))
+        stats = self._stats[name]
+        try:
+            with breaker.guard(endpoint) as call:
+                stats["requests"] += 1
+                stats["in_flight"] += 1
+                start = time.perf_counter()
+                try:
+                    response = await client.request(method, url, **kwargs)
+                    self.latency.setdefault(endpoint, LatencyTracker()).record(time.perf_counter() - start)
+                    if response.status_code == 429:
+                        call.fail("rate_limited")
+                    elif response.status_code >= 500:
+                        call.fail("http_5xx")
+                    return response
+                except httpx.HTTPError:
+                    stats["errors"] += 1
+                    raise
+                finally:
+                    stats["in_flight"] -= 1
+                    stats["total_time"] += time.perf_counter() - start
+        except CircuitOpenError as e:
+            # Fail fast so the route falls back instead of waiting on an unhealthy dependency
+            raise UpstreamError(503, f"{e.dependency} temporarily unavailable")
+
+    def stats(self) -> Dict[str, dict]:
+        """Pool usage per upstream host."""
+        result = {}
+        for name, client in self._clients.items():
+            counters = self._stats.get(name, {})
+            requests = counters.get("requests", 0)
+            result[name] = {
+                "host": UPSTREAM_HOSTS[name],
+                "http2": self.http2,
+                "requests": requests,
+                "errors": counters.get("errors", 0),
+                "in_flight": counters.get("in_flight", 0),
+                "avg_latency_ms": round(counters.get("total_time", 0.0) / requests * 1000, 2) if requests else None,
+                **_pool_usage(client),
+            }
+        return {
+            "limits": {
+                "max_connections": self.limits.max_connections,
+                "max_keepalive_connections": self.limits.max_keepalive_connections,
+                "keepalive_expiry": self.limits.keepalive_expiry,
+            },
+            "timeouts": self.timeouts,
+            "hosts": result,
+            "coalescing": self.singleflight.stats(),
+            "latency": {
+                endpoint: {
+                    "samples": len(tracker),
+                    "p50_ms": _ms(tracker.percentile(50)),
+                    "p95_ms": _ms(tracker.percentile(95)),
+                }
+                for endpoint, tracker in self.latency.items()
+            },
+            "hedging": self.hedger.stats(),
+        }
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return round(seconds * 1000, 2) if seconds is not None else None
+
+
+def _pool_usage(client: httpx.AsyncClient) -> dict:
+    """Connection counts from the underlying httpcore pool (best effort)."""
+    pool = getattr(getattr(client, "_transport", None), "_pool", None)
+    connections = getattr(pool, "connections", None)
+    if connections is None:
+        return {"connections": None, "idle_connections": None}
+    return {
+        "connections": len(connections),
+        "idle_connections": sum(1 for conn in connections if conn.is_idle()),
+    }
+
+
+# Shared instance used by the routes
+upstream = UpstreamClients()
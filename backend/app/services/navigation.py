@@ -0,0 +1,312 @@
+# backend/app/services/navigation.py
+"""
+Server-side navigation sessions.
+
+A route is fetched once and kept in memory with a uniform grid over its
+segments. Each GPS fix is map-matched against that geometry (nearest
+segment within the search radius, preferring segments that do not move the
+driver backwards), which gives the current step, the remaining distance and
+an ETA without calling Google. A session is only flagged off-route after
+NAV_OFF_ROUTE_FIXES consecutive fixes farther than NAV_OFF_ROUTE_METERS (or
+the fix's own accuracy, if worse) from the route; only then should the
+caller fetch a new route.
+"""
+import os
+import math
+import time
+import uuid
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from app.services.route_geometry import join_polylines
+
+logger = logging.getLogger(__name__)
+
+OFF_ROUTE_METERS = float(os.getenv("NAV_OFF_ROUTE_METERS", "50"))
+OFF_ROUTE_FIXES = int(os.getenv("NAV_OFF_ROUTE_FIXES", "2"))
+ARRIVAL_METERS = float(os.getenv("NAV_ARRIVAL_METERS", "30"))
+REROUTE_MIN_INTERVAL = float(os.getenv("NAV_REROUTE_MIN_INTERVAL", "10"))
+SESSION_TTL = float(os.getenv("NAV_SESSION_TTL", "7200"))
+MAX_SESSIONS = int(os.getenv("NAV_MAX_SESSIONS", "1000"))
+
+# Side of the square grid cells segments are indexed in, metres
+GRID_CELL_METERS = 100.0
+# Largest fix accuracy accepted and largest radius a match searches
+MAX_ACCURACY_METERS = 500.0
+
+# Extra cost for matching a segment this far behind the last position
+BACKTRACK_TOLERANCE_M = 30.0
+BACKTRACK_PENALTY_M = 40.0
+
+EARTH_RADIUS_M = 6371008.8
+
+
+@dataclass
+class RouteStep:
+    instruction: str
+    distance: str
+    duration: str
+    duration_s: float
+    start_offset_m: float
+    length_m: float
+    latitude: float
+    longitude: float
+
+
+@dataclass
+class RouteMatch:
+    distance_m: float
+    segment: int
+    offset_m: float
+
+
+class NavigationRoute:
+    """Route geometry in local metres with a segment grid index and per-step offsets."""
+
+    def __init__(self, step_coords: Sequence[np.ndarray], steps: Sequence[dict], duration_s: float):
+        """
+        `step_coords` holds each step's (lat, lng) geometry and `steps` the
+        matching formatted steps plus their static "duration_s".
+        """
+        self.coords = join_polylines(step_coords)
+        if len(self.coords) < 2:
+            raise ValueError("Route geometry needs at least two points")
+        self.lat0, self.lng0 = float(self.coords[0, 0]), float(self.coords[0, 1])
+        self._kx = math.radians(1) * EARTH_RADIUS_M * math.cos(math.radians(self.lat0))
+        self._ky = math.radians(1) * EARTH_RADIUS_M
+        points = self.project(self.coords[:, 0], self.coords[:, 1])
+        self._start = points[:-1]
+        self._delta = points[1:] - points[:-1]
+        self._length2 = np.einsum("ij,ij->i", self._delta, self._delta)
+        self._cumulative = np.concatenate(([0.0], np.cumsum(np.sqrt(self._length2))))
+        self.length_m = float(self._cumulative[-1])
+        self.duration_s = duration_s
+
+        offset = 0.0
+        self.steps: List[RouteStep] = []
+        for coords, step in zip(step_coords, steps):
+            coords = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+            if len(coords) >= 2:
+                xy = self.project(coords[:, 0], coords[:, 1])
+                length = float(np.hypot(*np.diff(xy, axis=0).T).sum())
+                lat, lng = float(coords[0, 0]), float(coords[0, 1])
+            else:
+                length = 0.0
+                lat, lng = (float(coords[0, 0]), float(coords[0, 1])) if len(coords) else (self.lat0, self.lng0)
+            self.steps.append(RouteStep(
+                instruction=step.get("instruction", ""),
+                distance=step.get("distance", ""),
+                duration=step.get("duration", ""),
+                duration_s=float(step.get("duration_s", 0)),
+                start_offset_m=offset,
+                length_m=length,
+                latitude=lat,
+                longitude=lng,
+            ))
+            offset += length
+        static_total = sum(step.duration_s for step in self.steps)
+        # Steps only carry static durations; scale them to the traffic-aware total
+        self._traffic_ratio = duration_s / static_total if static_total > 0 and duration_s > 0 else 1.0
+
+        self._grid: Dict[tuple, List[int]] = {}
+        for i, ((x1, y1), (dx, dy)) in enumerate(zip(self._start.tolist(), self._delta.tolist())):
+            x2, y2 = x1 + dx, y1 + dy
+            for cx in range(_cell(min(x1, x2)), _cell(max(x1, x2)) + 1):
+                for cy in range(_cell(min(y1, y2)), _cell(max(y1, y2)) + 1):
+                    self._grid.setdefault((cx, cy), []).append(i)
+        # Cell range of the whole route; searches never scan outside it
+        cells = np.array(list(self._grid)) if self._grid else np.zeros((1, 2), dtype=np.int64)
+        self._cell_min = cells.min(axis=0).tolist()
+        self._cell_max = cells.max(axis=0).tolist()
+
+    def project(self, latitude, longitude) -> np.ndarray:
+        """Local equirectangular metres around the route start."""
+        x = (np.asarray(longitude, dtype=np.float64) - self.lng0) * self._kx
+        y = (np.asarray(latitude, dtype=np.float64) - self.lat0) * self._ky
+        return np.column_stack((np.atleast_1d(x), np.atleast_1d(y)))
+
+    def match(self, latitude: float, longitude: float, radius_m: float,
+              last_offset_m: float = 0.0) -> Optional[RouteMatch]:
+        """Nearest route position within `radius_m` (at most MAX_ACCURACY_METERS), or None."""
+        radius_m = min(radius_m, MAX_ACCURACY_METERS)
+        x, y = self.project(latitude, longitude)[0]
+        candidates = set()
+        for cx in range(max(_cell(x - radius_m), self._cell_min[0]), min(_cell(x + radius_m), self._cell_max[0]) + 1):
+            for cy in range(max(_cell(y - radius_m), self._cell_min[1]), min(_cell(y + radius_m), self._cell_max[1]) + 1):
+                candidates.update(self._grid.get((cx, cy), ()))
+        if not candidates:
+            return None
+        segments = np.fromiter(candidates, dtype=np.int64)
+        start, delta, length2 = self._start[segments], self._delta[segments], self._length2[segments]
+        rel = np.array([x, y]) - start
+        t = np.clip(np.einsum("ij,ij->i", rel, delta) / np.where(length2 == 0, 1, length2), 0.0, 1.0)
+        offset = rel - t[:, None] * delta
+        dist = np.hypot(offset[:, 0], offset[:, 1])
+        along = self._cumulative[segments] + t * np.sqrt(length2)
+
+        cost = dist + np.where(along < last_offset_m - BACKTRACK_TOLERANCE_M, BACKTRACK_PENALTY_M, 0.0)
+        best = int(np.argmin(cost))
+        if dist[best] > radius_m:
+            return None
+        return RouteMatch(distance_m=float(dist[best]), segment=int(segments[best]), offset_m=float(along[best]))
+
+    def step_at(self, offset_m: float) -> int:
+        index = 0
+        for i, step in enumerate(self.steps):
+            if step.start_offset_m <= offset_m:
+                index = i
+        return index
+
+    def remaining_duration_s(self, offset_m: float) -> float:
+        remaining = 0.0
+        for step in self.steps:
+            end = step.start_offset_m + step.length_m
+            if end <= offset_m:
+                continue
+            if step.start_offset_m >= offset_m or step.length_m == 0:
+                remaining += step.duration_s
+            else:
+                remaining += step.duration_s * (end - offset_m) / step.length_m
+        return remaining * self._traffic_ratio
+
+
+def _cell(value: float) -> int:
+    return math.floor(value / GRID_CELL_METERS)
+
+
+class NavigationSession:
+    """One trip: destination, current route and the matching state."""
+
+    def __init__(self, destination_latitude: float, destination_longitude: float, route: NavigationRoute):
+        self.id = uuid.uuid4().hex
+        self.destination = (destination_latitude, destination_longitude)
+        self.route = route
+        self.offset_m = 0.0
+        self.off_route_fixes = 0
+        self.reroutes = 0
+        self.fixes = 0
+        self.last_reroute_at = 0.0
+        self.updated_at = time.monotonic()
+
+    def replace_route(self, route: NavigationRoute):
+        self.route = route
+        self.offset_m = 0.0
+        self.off_route_fixes = 0
+        self.reroutes += 1
+        self.last_reroute_at = time.monotonic()
+
+    def reroute_failed(self):
+        """Back off before retrying after a failed reroute request."""
+        self.last_reroute_at = time.monotonic()
+
+    def can_reroute(self) -> bool:
+        return time.monotonic() - self.last_reroute_at >= REROUTE_MIN_INTERVAL
+
+    def update(self, latitude: float, longitude: float, accuracy_m: Optional[float] = None) -> dict:
+        """Match a GPS fix and return the navigation state for it."""
+        self.fixes += 1
+        self.updated_at = time.monotonic()
+        threshold = max(OFF_ROUTE_METERS, min(accuracy_m or 0.0, MAX_ACCURACY_METERS))
+        match = self.route.match(latitude, longitude, threshold, self.offset_m)
+        if match is None:
+            self.off_route_fixes += 1
+        else:
+            self.off_route_fixes = 0
+            self.offset_m = match.offset_m
+        return self.state(match)
+
+    def state(self, match: Optional[RouteMatch] = None) -> dict:
+        route = self.route
+        index = route.step_at(self.offset_m)
+        remaining_m = max(0.0, route.length_m - self.offset_m)
+        remaining_s = route.remaining_duration_s(self.offset_m)
+        step = route.steps[index] if route.steps else None
+        next_step = route.steps[index + 1] if index + 1 < len(route.steps) else None
+        return {
+            "session_id": self.id,
+            "on_route": self.off_route_fixes == 0,
+            "off_route": self.off_route_fixes >= OFF_ROUTE_FIXES,
+            "distance_from_route_m": round(match.distance_m, 1) if match is not None else None,
+            "current_step_index": index,
+            "current_step": step_payload(step) if step else None,
+            "next_step": step_payload(next_step) if next_step else None,
+            "distance_to_next_step_m": round(next_step.start_offset_m - self.offset_m, 1) if next_step else None,
+            "remaining_distance_m": round(remaining_m, 1),
+            "remaining_duration_s": round(remaining_s),
+            "eta": _iso_utc(time.time() + remaining_s),
+            "arrived": remaining_m <= ARRIVAL_METERS,
+            "reroutes": self.reroutes,
+        }
+
+
+def step_payload(step: RouteStep) -> dict:
+    return {
+        "instruction": step.instruction,
+        "distance": step.distance,
+        "duration": step.duration,
+        "location": {"latitude": step.latitude, "longitude": step.longitude},
+    }
+
+
+def _iso_utc(timestamp: float) -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(timestamp))
+
+
+class NavigationSessions:
+    """In-memory session registry bounded by idle time and count."""
+
+    def __init__(self, ttl: float = SESSION_TTL, max_sessions: int = MAX_SESSIONS):
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, NavigationSession]" = OrderedDict()
+        self._stats = {"created": 0, "fixes": 0, "reroutes": 0, "expired": 0}
+
+    def add(self, session: NavigationSession) -> NavigationSession:
+        self._expire()
+        self._sessions[session.id] = session
+        self._stats["created"] += 1
+        return session
+
+    def get(self, session_id: str) -> Optional[NavigationSession]:
+        session = self._sessions.get(session_id)
+        if session is None:
+            return None
+        if time.monotonic() - session.updated_at >= self.ttl:
+            del self._sessions[session_id]
+            self._stats["expired"] += 1
+            return None
+        self._sessions.move_to_end(session_id)
+        return session
+
+    def remove(self, session_id: str) -> bool:
+        return self._sessions.pop(session_id, None) is not None
+
+    def record(self, counter: str):
+        """Count a "fixes" or "reroutes" event."""
+        self._stats[counter] += 1
+
+    def _expire(self):
+        now = time.monotonic()
+        while self._sessions:
+            session_id, session = next(iter(self._sessions.items()))
+            if len(self._sessions) < self.max_sessions and now - session.updated_at < self.ttl:
+                break
+            del self._sessions[session_id]
+            self._stats["expired"] += 1
+
+    def stats(self) -> dict:
+        fixes = self._stats["fixes"]
+        return {
+            **self._stats,
+            "active": len(self._sessions),
+            # Share of fixes answered from the stored route instead of a new Google request
+            "local_ratio": round(1 - self._stats["reroutes"] / fixes, 4) if fixes else None,
+        }
+
+
+# Shared registry used by the navigation routes
+navigation_sessions = NavigationSessions()
@@ -0,0 +1,180 @@
+# backend/app/services/place_store.py
+"""
+Persistent local store for Places API place details.
+
+Each Google field of a place is stored as its own row with the time it was
+fetched and the time its value last changed, so freshness is tracked per
+field. Only stale fields are re-requested from Google (with a narrowed
+X-Goog-FieldMask), and the store survives restarts because it lives in an
+embedded SQLite file. It holds at most PLACE_STORE_MAX_PLACES places; past
+that, the places fetched longest ago are evicted.
+"""
+import os
+import json
+import time
+import sqlite3
+import asyncio
+import logging
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent  # backend folder
+STORE_PATH = os.getenv("PLACE_STORE_PATH", str(BASE_DIR / "data" / "place_details.sqlite3"))
+
+DAY = 86400
+
+# Place count above which the least recently fetched places are evicted
+MAX_PLACES = int(os.getenv("PLACE_STORE_MAX_PLACES", "20000"))
+# Share of MAX_PLACES evicted at once, so eviction does not run on every new place
+EVICT_FRACTION = 0.1
+
+# How long each Places (New) field stays fresh, in seconds
+FIELD_TTLS = {
+    "displayName": 30 * DAY,
+    "formattedAddress": 30 * DAY,
+    "location": 90 * DAY,
+    "nationalPhoneNumber": 7 * DAY,
+    "internationalPhoneNumber": 7 * DAY,
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS place_fields (
+    place_id TEXT NOT NULL,
+    field TEXT NOT NULL,
+    value TEXT,
+    fetched_at REAL NOT NULL,
+    changed_at REAL NOT NULL,
+    PRIMARY KEY (place_id, field)
+)
+"""
+
+
+@dataclass
+class StoredField:
+    value: object
+    fetched_at: float
+    changed_at: float
+
+
+class PlaceStore:
+    """SQLite-backed per-field place details store."""
+
+    def __init__(self, path: str = STORE_PATH, field_ttls: Dict[str, float] = None,
+                 max_places: int = MAX_PLACES):
+        self.path = path
+        self.field_ttls = field_ttls or FIELD_TTLS
+        self.max_places = max_places
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(_SCHEMA)
+        self._conn.commit()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "partial_refreshes": 0, "misses": 0, "stale_served": 0}
+        self._evictions = 0
+        # Counted once here and kept up to date by save(), so stats() never queries SQLite
+        self._places = self._conn.execute("SELECT COUNT(DISTINCT place_id) FROM place_fields").fetchone()[0]
+
+    def load(self, place_id: str) -> Dict[str, StoredField]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT field, value, fetched_at, changed_at FROM place_fields WHERE place_id = ?",
+                (place_id,),
+            ).fetchall()
+        return {
+            field: StoredField(json.loads(value) if value is not None else None, fetched_at, changed_at)
+            for field, value, fetched_at, changed_at in rows
+        }
+
+    def stale_fields(self, stored: Dict[str, StoredField], now: Optional[float] = None) -> List[str]:
+        """Fields that are missing or older than their TTL, in FIELD_TTLS order."""
+        now = time.time() if now is None else now
+        return [
+            field for field, ttl in self.field_ttls.items()
+            if field not in stored or now - stored[field].fetched_at >= ttl
+        ]
+
+    def save(self, place_id: str, data: dict, fields: Iterable[str],
+             stored: Dict[str, StoredField]) -> Dict[str, StoredField]:
+        """
+        Store the requested `fields` from an upstream response and return
+        them. Fields Google left out are stored as null so they are not
+        re-fetched until they go stale; `changed_at` only moves when a
+        value changes.
+        """
+        now = time.time()
+        written = {}
+        rows = []
+        for field in fields:
+            value = data.get(field)
+            previous = stored.get(field)
+            changed_at = previous.changed_at if previous is not None and previous.value == value else now
+            written[field] = StoredField(value, now, changed_at)
+            rows.append((place_id, field, json.dumps(value) if value is not None else None, now, changed_at))
+        with self._lock:
+            known = self._conn.execute(
+                "SELECT 1 FROM place_fields WHERE place_id = ? LIMIT 1", (place_id,)
+            ).fetchone() is not None
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO place_fields (place_id, field, value, fetched_at, changed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+            if not known and rows:
+                self._places += 1
+                if self._places > self.max_places:
+                    self._evict(self._places - self.max_places + int(self.max_places * EVICT_FRACTION))
+        return written
+
+    def _evict(self, count: int):
+        """Delete the `count` places fetched longest ago; the caller holds the lock."""
+        place_ids = [row[0] for row in self._conn.execute(
+            "SELECT place_id FROM place_fields GROUP BY place_id ORDER BY MAX(fetched_at) LIMIT ?", (count,)
+        )]
+        self._conn.executemany("DELETE FROM place_fields WHERE place_id = ?", [(p,) for p in place_ids])
+        self._conn.commit()
+        self._places -= len(place_ids)
+        self._evictions += len(place_ids)
+        logger.info(f"Evicted {len(place_ids)} places from the place details store")
+
+    async def aload(self, place_id: str) -> Dict[str, StoredField]:
+        return await asyncio.to_thread(self.load, place_id)
+
+    async def asave(self, place_id: str, data: dict, fields: Iterable[str],
+                    stored: Dict[str, StoredField]) -> Dict[str, StoredField]:
+        return await asyncio.to_thread(self.save, place_id, data, list(fields), stored)
+
+    def record(self, outcome: str):
+        """Count a lookup as "hits", "partial_refreshes", "misses" or "stale_served"."""
+        self._stats[outcome] += 1
+
+    def stats(self) -> dict:
+        lookups = sum(self._stats.values())
+        return {
+            **self._stats,
+            "places": self._places,
+            "evictions": self._evictions,
+            "hit_ratio": round(self._stats["hits"] / lookups, 4) if lookups else None,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_store: Optional[PlaceStore] = None
+
+
+def get_place_store() -> PlaceStore:
+    """Shared store, opened on first use."""
+    global _store
+    if _store is None:
+        _store = PlaceStore()
+        logger.info(f"Opened place details store at {_store.path}")
+    return _store
@@ -0,0 +1,208 @@
+# backend/app/services/places_cache.py
+"""
+Geocell-keyed cache for Places nearby searches.
+
+Requests are keyed by (geohash cell, radius bucket, place type), so patients
+a few hundred metres apart share one upstream `searchNearby` result. Entries
+are fresh for NEARBY_CACHE_TTL seconds and can then be served stale for
+NEARBY_CACHE_STALE_TTL more seconds while a background task refreshes them.
+A cached search from the same or a neighbouring cell is reused when its
+circle fully covers the requested one and it was not truncated by
+`maxResultCount`; a truncated one only answers the search that made it.
+Google is always queried at the requested radius, since a wider search cut
+at `maxResultCount` could miss the closest places.
+"""
+import os
+import math
+import time
+import asyncio
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+from app.services.geohash import geohash_encode, geohash_neighbors
+
+logger = logging.getLogger(__name__)
+
+GEOHASH_PRECISION = int(os.getenv("NEARBY_CACHE_GEOHASH_PRECISION", "6"))  # ~1.2 km x 0.6 km cells
+FRESH_TTL = float(os.getenv("NEARBY_CACHE_TTL", "600"))
+STALE_TTL = float(os.getenv("NEARBY_CACHE_STALE_TTL", "3600"))
+MAX_ENTRIES = int(os.getenv("NEARBY_CACHE_MAX_ENTRIES", "2000"))
+
+# Requested radii are rounded up to one of these in cache keys
+RADIUS_BUCKETS = (1000, 2000, 5000, 10000, 20000, 50000)
+
+EARTH_RADIUS_M = 6371008.8
+
+CacheKey = Tuple[str, int, str]
+
+
+def haversine_m(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lng2 - lng1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+
+def radius_bucket(radius: int) -> int:
+    for bucket in RADIUS_BUCKETS:
+        if radius <= bucket:
+            return bucket
+    return RADIUS_BUCKETS[-1]
+
+
+@dataclass
+class CacheEntry:
+    places: List[dict]
+    latitude: float
+    longitude: float
+    radius: int
+    complete: bool
+    fresh_until: float
+    stale_until: float
+
+
+class NearbyPlacesCache:
+    """Size-bounded LRU of nearby-search results with stale-while-revalidate."""
+
+    def __init__(self, max_entries: int = MAX_ENTRIES, fresh_ttl: float = FRESH_TTL,
+                 stale_ttl: float = STALE_TTL, precision: int = GEOHASH_PRECISION):
+        self.max_entries = max_entries
+        self.fresh_ttl = fresh_ttl
+        self.stale_ttl = stale_ttl
+        self.precision = precision
+        self._entries: "OrderedDict[CacheKey, CacheEntry]" = OrderedDict()
+        self._by_cell: Dict[str, Set[CacheKey]] = {}
+        self._refreshing: Set[CacheKey] = set()
+        self._tasks: Set[asyncio.Task] = set()
+        self._stats = {"hits": 0, "stale_hits": 0, "covered_hits": 0, "misses": 0, "refreshes": 0, "evictions": 0}
+
+    def key(self, latitude: float, longitude: float, radius: int, place_type: str) -> CacheKey:
+        return (geohash_encode(latitude, longitude, self.precision), radius_bucket(radius), place_type.lower())
+
+    def get(self, latitude: float, longitude: float, radius: int, place_type: str) -> Tuple[Optional[List[dict]], str]:
+        """
+        Look up a search. Returns (places, state) where state is one of
+        "fresh", "stale", "covered" or "miss"; places are filtered to the
+        requested circle.
+        """
+        now = time.monotonic()
+        key = self.key(latitude, longitude, radius, place_type)
+        entry = self._entries.get(key)
+        # Same cell and bucket is not enough: the entry is centred on whoever
+        # searched first, up to a cell diagonal away, and must contain this circle.
+        # A truncated result only answers the very search that produced it.
+        if (entry is not None and now < entry.stale_until
+                and (entry.complete or radius == entry.radius)
+                and self._covers(entry, latitude, longitude, radius)):
+            self._entries.move_to_end(key)
+            state = "fresh" if now < entry.fresh_until else "stale"
+            self._stats["hits" if state == "fresh" else "stale_hits"] += 1
+            return filter_to_circle(entry.places, latitude, longitude, radius), state
+
+        covering = self._find_covering(latitude, longitude, radius, key, now)
+        if covering is not None:
+            self._stats["covered_hits"] += 1
+            return filter_to_circle(covering.places, latitude, longitude, radius), "covered"
+
+        self._stats["misses"] += 1
+        return None, "miss"
+
+    def _find_covering(self, latitude: float, longitude: float, radius: int,
+                       key: CacheKey, now: float) -> Optional[CacheEntry]:
+        """A fresh, complete entry in this or a neighbouring cell whose circle contains the request."""
+        for cell in geohash_neighbors(key[0]):
+            for candidate_key in self._by_cell.get(cell, ()):
+                if candidate_key[2] != key[2]:
+                    continue
+                entry = self._entries[candidate_key]
+                if not entry.complete or now >= entry.fresh_until:
+                    continue
+                if self._covers(entry, latitude, longitude, radius):
+                    self._entries.move_to_end(candidate_key)
+                    return entry
+        return None
+
+    @staticmethod
+    def _covers(entry: CacheEntry, latitude: float, longitude: float, radius: int) -> bool:
+        """True when the entry's search circle contains the requested one."""
+        return haversine_m(latitude, longitude, entry.latitude, entry.longitude) + radius <= entry.radius
+
+    def put(self, latitude: float, longitude: float, radius: int, place_type: str,
+            places: List[dict], complete: bool):
+        """
+        Store the result of a search made with `radius` around (latitude,
+        longitude). It is keyed by the radius bucket but only answers
+        requests inside that exact circle.
+        """
+        now = time.monotonic()
+        key = self.key(latitude, longitude, radius, place_type)
+        self._entries[key] = CacheEntry(
+            places=places,
+            latitude=latitude,
+            longitude=longitude,
+            radius=radius,
+            complete=complete,
+            fresh_until=now + self.fresh_ttl,
+            stale_until=now + self.fresh_ttl + self.stale_ttl,
+        )
+        self._entries.move_to_end(key)
+        self._by_cell.setdefault(key[0], set()).add(key)
+        while len(self._entries) > self.max_entries:
+            old_key, _ = self._entries.popitem(last=False)
+            self._forget(old_key)
+            self._stats["evictions"] += 1
+
+    def _forget(self, key: CacheKey):
+        cell_keys = self._by_cell.get(key[0])
+        if cell_keys is not None:
+            cell_keys.discard(key)
+            if not cell_keys:
+                del self._by_cell[key[0]]
+
+    def refresh_in_background(self, latitude: float, longitude: float, radius: int, place_type: str,
+                              fetch: Callable[[], Awaitable[Tuple[List[dict], bool]]]):
+        """Re-run `fetch` for a stale entry unless a refresh for it is already running."""
+        key = self.key(latitude, longitude, radius, place_type)
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+        self._stats["refreshes"] += 1
+
+        async def _refresh():
+            try:
+                places, complete = await fetch()
+                self.put(latitude, longitude, radius, place_type, places, complete)
+            except Exception as e:
+                logger.warning(f"Background refresh of nearby cache entry {key} failed: {str(e)}")
+            finally:
+                self._refreshing.discard(key)
+
+        task = asyncio.create_task(_refresh())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def stats(self) -> dict:
+        lookups = self._stats["hits"] + self._stats["stale_hits"] + self._stats["covered_hits"] + self._stats["misses"]
+        served = lookups - self._stats["misses"]
+        return {
+            **self._stats,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hit_ratio": round(served / lookups, 4) if lookups else None,
+        }
+
+
+def filter_to_circle(places: List[dict], latitude: float, longitude: float, radius: int) -> List[dict]:
+    """Places inside the requested circle; places without coordinates are kept."""
+    result = []
+    for place in places:
+        lat, lng = place.get("latitude"), place.get("longitude")
+        if lat is None or lng is None or haversine_m(latitude, longitude, lat, lng) <= radius:
+            result.append(place)
+    return result
+
+
+# Shared instance used by the nearby search route
+nearby_cache = NearbyPlacesCache()
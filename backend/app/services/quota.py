@@ -0,0 +1,237 @@
+# backend/app/services/quota.py
+"""
+Client-side quota governor for the Google APIs.
+
+Each API has a token bucket refilled at QUOTA_<API>_PER_MINUTE with room for
+QUOTA_<API>_BURST tokens, sized to stay under the key's real quota so
+Google never has to reject us. Requests draw from it by priority lane:
+
+- emergency: always sent; may overdraw the bucket by up to one burst, which
+  later normal traffic pays back.
+- normal: keeps QUOTA_EMERGENCY_RESERVE of the bucket untouched; when that
+  is all that is left, waits up to QUOTA_MAX_WAIT for a refill and is then
+  rejected with QuotaExceeded.
+- low: optional work (background cache refreshes, hedged attempts, extra
+  candidates) only runs while the bucket is more than QUOTA_LOW_FLOOR full
+  and is dropped immediately otherwise.
+
+The lane comes from a ContextVar set per request by PriorityMiddleware and
+can be lowered for a block of work with `priority(LOW)`. Clients may ask
+for the normal or low lane with the `X-Priority` header or `priority` query
+parameter, but the emergency lane is decided by the server: it needs an
+`X-Priority-Token` issued by `issue_emergency_token()` after local triage
+found an emergency. The token is an HMAC over its expiry time, signed with
+PRIORITY_TOKEN_SECRET (a random per-process key when unset; set it when
+running several workers).
+"""
+import os
+import hmac
+import time
+import asyncio
+import hashlib
+import logging
+import secrets
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+from urllib.parse import parse_qs
+
+logger = logging.getLogger(__name__)
+
+EMERGENCY, NORMAL, LOW = "emergency", "normal", "low"
+LANES = (EMERGENCY, NORMAL, LOW)
+
+# Requests per minute per API; keep these below the Google Cloud quota for the key
+DEFAULT_BUDGETS = {
+    "places_nearby": 300,
+    "places_details": 600,
+    "routes": 600,
+    # One call covers up to ETA_RANK_CANDIDATES destinations
+    "route_matrix": 120,
+    "geocode": 300,
+    "directions": 300,
+}
+
+EMERGENCY_RESERVE = float(os.getenv("QUOTA_EMERGENCY_RESERVE", "0.2"))
+LOW_FLOOR = float(os.getenv("QUOTA_LOW_FLOOR", "0.5"))
+MAX_WAIT = float(os.getenv("QUOTA_MAX_WAIT", "1.0"))
+# How long an emergency triage keeps its requests in the emergency lane
+EMERGENCY_TOKEN_TTL = float(os.getenv("PRIORITY_TOKEN_TTL", "3600"))
+_TOKEN_SECRET = os.getenv("PRIORITY_TOKEN_SECRET", "").encode() or secrets.token_bytes(32)
+
+request_priority: ContextVar[str] = ContextVar("request_priority", default=NORMAL)
+
+
+class QuotaExceeded(Exception):
+    """The local budget for an API cannot cover a request in its lane."""
+
+    def __init__(self, api: str, lane: str, retry_after: float):
+        super().__init__(f"Local quota for {api} exhausted for {lane} requests (retry in {retry_after:.1f}s)")
+        self.api = api
+        self.lane = lane
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Token bucket that may go negative when emergency requests overdraw it."""
+
+    def __init__(self, per_minute: float, burst: float):
+        self.rate = per_minute / 60.0
+        self.capacity = burst
+        self.tokens = burst
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_take(self, floor: float) -> bool:
+        """Take a token if at least `floor` tokens remain afterwards."""
+        self._refill()
+        if self.tokens - 1 >= floor:
+            self.tokens -= 1
+            return True
+        return False
+
+    def wait_time(self, floor: float) -> float:
+        """Seconds until a token can be taken above `floor`."""
+        self._refill()
+        missing = floor + 1 - self.tokens
+        return max(0.0, missing / self.rate) if self.rate > 0 else float("inf")
+
+    def remaining(self) -> float:
+        self._refill()
+        return self.tokens
+
+
+class QuotaGovernor:
+    """One token bucket per Google API plus per-lane counters."""
+
+    def __init__(self, budgets: Optional[Dict[str, float]] = None, max_wait: float = MAX_WAIT):
+        self.max_wait = max_wait
+        self._buckets: Dict[str, TokenBucket] = {}
+        for api, default in (budgets or DEFAULT_BUDGETS).items():
+            per_minute = float(os.getenv(f"QUOTA_{api.upper()}_PER_MINUTE", default))
+            burst = float(os.getenv(f"QUOTA_{api.upper()}_BURST", max(1.0, per_minute / 6)))
+            self._buckets[api] = TokenBucket(per_minute, burst)
+        self._stats = {
+            api: {"granted": {lane: 0 for lane in LANES}, "queued": 0, "degraded": 0, "overdrawn": 0}
+            for api in self._buckets
+        }
+
+    def _floor(self, bucket: TokenBucket, lane: str) -> float:
+        if lane == EMERGENCY:
+            return -bucket.capacity
+        if lane == LOW:
+            return bucket.capacity * LOW_FLOOR
+        return bucket.capacity * EMERGENCY_RESERVE
+
+    async def acquire(self, api: str, lane: Optional[str] = None):
+        """
+        Take one request's worth of budget for `api` in `lane` (default: the
+        current request's lane). APIs without a budget are not governed.
+        Raises QuotaExceeded.
+        """
+        bucket = self._buckets.get(api)
+        if bucket is None:
+            return
+        lane = lane or request_priority.get()
+        stats = self._stats[api]
+        floor = self._floor(bucket, lane)
+        deadline = time.monotonic() + self.max_wait
+        queued = False
+        while True:
+            if bucket.try_take(floor):
+                stats["granted"][lane] += 1
+                if bucket.tokens < 0:
+                    stats["overdrawn"] += 1
+                return
+            wait = bucket.wait_time(floor)
+            if lane == LOW or time.monotonic() + wait > deadline:
+                stats["degraded"] += 1
+                logger.warning(f"Local quota for {api} is low, rejecting {lane} request")
+                raise QuotaExceeded(api, lane, wait)
+            if not queued:
+                queued = True
+                stats["queued"] += 1
+            await asyncio.sleep(wait)
+
+    def stats(self) -> Dict[str, dict]:
+        result = {}
+        for api, bucket in self._buckets.items():
+            remaining = bucket.remaining()
+            result[api] = {
+                **self._stats[api],
+                "per_minute": round(bucket.rate * 60, 2),
+                "capacity": bucket.capacity,
+                "remaining": round(remaining, 2),
+                "remaining_ratio": round(remaining / bucket.capacity, 4),
+                "emergency_reserve": round(bucket.capacity * EMERGENCY_RESERVE, 2),
+            }
+        return result
+
+
+@contextmanager
+def priority(lane: str):
+    """Run a block (and tasks created in it) in another priority lane."""
+    token = request_priority.set(lane)
+    try:
+        yield
+    finally:
+        request_priority.reset(token)
+
+
+def _sign(expires: str) -> str:
+    return hmac.new(_TOKEN_SECRET, expires.encode(), hashlib.sha256).hexdigest()
+
+
+def issue_emergency_token(ttl: float = EMERGENCY_TOKEN_TTL) -> str:
+    """Token that puts the bearer's requests in the emergency lane for `ttl` seconds."""
+    expires = str(int(time.time() + ttl))
+    return f"{expires}.{_sign(expires)}"
+
+
+def verify_emergency_token(token: Optional[str]) -> bool:
+    expires, _, signature = (token or "").strip().partition(".")
+    if not expires.isdigit() or not hmac.compare_digest(signature, _sign(expires)):
+        return False
+    return time.time() < int(expires)
+
+
+def _lane(value: Optional[str]) -> Optional[str]:
+    value = (value or "").strip().lower()
+    # Only a valid priority token grants the emergency lane
+    return value if value in (NORMAL, LOW) else None
+
+
+class PriorityMiddleware:
+    """
+    ASGI middleware that sets the request's lane: emergency with a valid
+    `X-Priority-Token`, otherwise normal or low from `X-Priority` or `?priority=`.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        lane = None
+        for name, value in scope.get("headers", ()):
+            if name == b"x-priority-token":
+                if verify_emergency_token(value.decode("latin-1")):
+                    lane = EMERGENCY
+                    break
+            elif name == b"x-priority":
+                lane = _lane(value.decode("latin-1")) or lane
+        if lane is None and scope.get("query_string"):
+            values = parse_qs(scope["query_string"].decode("latin-1")).get("priority")
+            lane = _lane(values[0]) if values else None
+        with priority(lane or NORMAL):
+            await self.app(scope, receive, send)
+
+
+# Shared governor used by the upstream clients
+quota = QuotaGovernor()
@@ -0,0 +1,241 @@
+# backend/app/services/resilience.py
+"""
+Per-dependency circuit breakers and adaptive timeouts.
+
+Every external dependency (Google Places, Routes, Geocoding, Directions,
+Gemini, Supabase, Twilio) gets a CircuitBreaker holding the outcomes of its
+calls over the last BREAKER_WINDOW seconds and a sliding window of
+successful latencies:
+
+- closed: calls go through. The breaker opens when at least
+  BREAKER_MIN_CALLS calls in the window failed at BREAKER_FAILURE_RATIO or
+  more, or after BREAKER_CONSECUTIVE_FAILURES failures in a row.
+- open: calls fail immediately with CircuitOpenError for BREAKER_OPEN_SECONDS,
+  so handlers go straight to their fallback (straight-line route, static
+  advice, ...) instead of waiting out a timeout.
+- half_open: up to BREAKER_HALF_OPEN_CALLS trial calls are let through; one
+  success closes the breaker, one failure opens it again.
+
+The adaptive timeout is TIMEOUT_MULTIPLIER times the observed
+TIMEOUT_PERCENTILE latency, never below TIMEOUT_FLOOR and never above the
+fixed timeout configured for the call, which is also used until enough
+latencies have been seen.
+"""
+import os
+import math
+import time
+import logging
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from app.services.hedging import LatencyTracker
+from app.services import metrics
+from app.services import timing
+
+logger = logging.getLogger(__name__)
+
+BREAKER_WINDOW = float(os.getenv("BREAKER_WINDOW", "60"))
+BREAKER_MIN_CALLS = int(os.getenv("BREAKER_MIN_CALLS", "10"))
+BREAKER_FAILURE_RATIO = float(os.getenv("BREAKER_FAILURE_RATIO", "0.5"))
+BREAKER_CONSECUTIVE_FAILURES = int(os.getenv("BREAKER_CONSECUTIVE_FAILURES", "5"))
+BREAKER_OPEN_SECONDS = float(os.getenv("BREAKER_OPEN_SECONDS", "30"))
+BREAKER_HALF_OPEN_CALLS = int(os.getenv("BREAKER_HALF_OPEN_CALLS", "1"))
+
+TIMEOUT_PERCENTILE = float(os.getenv("TIMEOUT_PERCENTILE", "99"))
+TIMEOUT_MULTIPLIER = float(os.getenv("TIMEOUT_MULTIPLIER", "3"))
+TIMEOUT_FLOOR = float(os.getenv("TIMEOUT_FLOOR", "1.0"))
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitOpenError(Exception):
+    """A dependency's breaker is open; the caller should use its fallback."""
+
+    def __init__(self, dependency: str, retry_after: float):
+        super().__init__(f"{dependency} is temporarily unavailable (retry in {retry_after:.0f}s)")
+        self.dependency = dependency
+        self.retry_after = retry_after
+
+
+class _Call:
+    """Handle yielded by CircuitBreaker.guard to flag a failure that did not raise."""
+
+    def __init__(self):
+        self.failed = False
+        self.category = None
+
+    def fail(self, category: str = "error"):
+        self.failed = True
+        self.category = category
+
+
+class CircuitBreaker:
+    """Rolling error statistics, breaker state and adaptive timeout for one dependency."""
+
+    def __init__(self, name: str, window: float = BREAKER_WINDOW, min_calls: int = BREAKER_MIN_CALLS,
+                 failure_ratio: float = BREAKER_FAILURE_RATIO,
+                 consecutive_failures: int = BREAKER_CONSECUTIVE_FAILURES,
+                 open_seconds: float = BREAKER_OPEN_SECONDS, half_open_calls: int = BREAKER_HALF_OPEN_CALLS):
+        self.name = name
+        self.window = window
+        self.min_calls = min_calls
+        self.failure_ratio = failure_ratio
+        self.consecutive_failures = consecutive_failures
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+        self.latency = LatencyTracker()
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._trials = 0
+        self._outcomes = deque()  # (monotonic time, ok)
+        self._failures_in_a_row = 0
+        self._stats = {"calls": 0, "failures": 0, "rejected": 0, "opened": 0}
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+            self._state = HALF_OPEN
+            self._trials = 0
+            logger.info(f"Circuit breaker for {self.name} is half-open, letting trial calls through")
+        return self._state
+
+    def is_open(self) -> bool:
+        """True while calls are rejected without a trial."""
+        return self.state == OPEN
+
+    def before_call(self):
+        """Admit a call or raise CircuitOpenError."""
+        state = self.state
+        if state == OPEN or (state == HALF_OPEN and self._trials >= self.half_open_calls):
+            self._stats["rejected"] += 1
+            retry_after = max(0.0, self.open_seconds - (time.monotonic() - self._opened_at))
+            raise CircuitOpenError(self.name, retry_after)
+        if state == HALF_OPEN:
+            self._trials += 1
+
+    def record(self, ok: bool, seconds: Optional[float] = None):
+        """Record the outcome of an admitted call."""
+        now = time.monotonic()
+        self._stats["calls"] += 1
+        self._outcomes.append((now, ok))
+        while self._outcomes and now - self._outcomes[0][0] > self.window:
+            self._outcomes.popleft()
+
+        if self._state == HALF_OPEN:
+            self._trials = max(0, self._trials - 1)
+        if ok:
+            self._failures_in_a_row = 0
+            if seconds is not None:
+                self.latency.record(seconds)
+            if self._state == HALF_OPEN:
+                self._close()
+            return
+
+        self._stats["failures"] += 1
+        self._failures_in_a_row += 1
+        if self._state == HALF_OPEN or self._should_open():
+            self._open()
+
+    def release(self):
+        """An admitted call ended without an outcome (e.g. it was cancelled)."""
+        if self._state == HALF_OPEN:
+            self._trials = max(0, self._trials - 1)
+
+    def _should_open(self) -> bool:
+        if self._state != CLOSED:
+            return False
+        if self._failures_in_a_row >= self.consecutive_failures:
+            return True
+        failures = sum(1 for _, ok in self._outcomes if not ok)
+        return len(self._outcomes) >= self.min_calls and failures / len(self._outcomes) >= self.failure_ratio
+
+    def _open(self):
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+        self._stats["opened"] += 1
+        logger.warning(f"Circuit breaker for {self.name} opened for {self.open_seconds:.0f}s")
+
+    def _close(self):
+        self._state = CLOSED
+        self._outcomes.clear()
+        self._failures_in_a_row = 0
+        logger.info(f"Circuit breaker for {self.name} closed")
+
+    def timeout(self, ceiling: float) -> float:
+        """Adaptive timeout for the next call, at most `ceiling` seconds."""
+        observed = self.latency.percentile(TIMEOUT_PERCENTILE)
+        if observed is None:
+            return ceiling
+        return min(ceiling, max(TIMEOUT_FLOOR, observed * TIMEOUT_MULTIPLIER))
+
+    @contextmanager
+    def guard(self, endpoint: Optional[str] = None):
+        """
+        Admit, time and record one call, and report it to /metrics and the
+        request's Server-Timing under `endpoint` (default: the dependency
+        name). Exceptions count as
+        failures; call `.fail(category)` on the yielded handle for failures
+        that do not raise, such as a 503 response.
+        """
+        endpoint = endpoint or self.name
+        try:
+            self.before_call()
+        except CircuitOpenError:
+            metrics.record_upstream_error(self.name, endpoint, "circuit_open")
+            raise
+        call = _Call()
+        metrics.upstream_in_flight.inc(self.name)
+        start = time.perf_counter()
+        try:
+            yield call
+        except Exception as e:
+            self.record(False)
+            metrics.record_upstream_error(self.name, endpoint, metrics.error_category(e))
+            raise
+        except BaseException:
+            self.release()
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            metrics.upstream_in_flight.dec(self.name)
+            metrics.upstream_duration.observe(elapsed, self.name, endpoint)
+            timing.record(endpoint, elapsed)
+        self.record(not call.failed, elapsed)
+        if call.failed:
+            metrics.record_upstream_error(self.name, endpoint, call.category)
+
+    def stats(self) -> dict:
+        failures = sum(1 for _, ok in self._outcomes if not ok)
+        return {
+            **self._stats,
+            "state": self.state,
+            "window_calls": len(self._outcomes),
+            "window_failure_ratio": round(failures / len(self._outcomes), 4) if self._outcomes else None,
+            "p99_ms": _ms(self.latency.percentile(99)),
+            "adaptive_timeout_ms": _ms(self.timeout(math.inf)) if len(self.latency) >= self.latency.min_samples else None,
+        }
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return round(seconds * 1000, 2) if seconds is not None else None
+
+
+class Resilience:
+    """Registry of breakers, one per dependency name."""
+
+    def __init__(self):
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def breaker(self, name: str) -> CircuitBreaker:
+        breaker = self._breakers.get(name)
+        if breaker is None:
+            breaker = self._breakers[name] = CircuitBreaker(name)
+        return breaker
+
+    def stats(self) -> Dict[str, dict]:
+        return {name: breaker.stats() for name, breaker in sorted(self._breakers.items())}
+
+
+# Shared registry used by the upstream clients and services
+resilience = Resilience()
@@ -0,0 +1,304 @@
+# backend/app/services/route_geometry.py
+"""
+Route geometry helpers backed by NumPy.
+
+Google encoded polylines are decoded and encoded with array operations
+instead of a per-character Python loop, and several step polylines can be
+decoded in one batch. Coordinates are (n, 2) float arrays of
+(latitude, longitude).
+
+Simplification drops vertices that would not be visible on screen: the
+tolerance in metres is derived from the map zoom level (ROUTE_SIMPLIFY_PIXELS
+pixels at that zoom), and either Douglas-Peucker or Visvalingam-Whyatt is
+applied. The first and last vertices are always kept.
+"""
+import os
+import json
+import math
+import heapq
+import struct
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Simplification tolerance in screen pixels
+SIMPLIFY_PIXELS = float(os.getenv("ROUTE_SIMPLIFY_PIXELS", "1"))
+
+# Web Mercator ground resolution at zoom 0 on the equator, metres per pixel
+METERS_PER_PIXEL_Z0 = 156543.03392
+
+EARTH_RADIUS_M = 6371008.8
+
+SIMPLIFY_METHODS = ("dp", "vw")
+
+# Wire formats for a route: verbose objects (default), encoded polyline,
+# parallel coordinate arrays, or the binary frame below
+ROUTE_FORMATS = ("objects", "polyline", "arrays", "binary")
+
+# Binary frame: magic, version, point count, metadata length (little-endian),
+# then the UTF-8 JSON metadata and `count` float32 (lat, lng) pairs
+ROUTE_BINARY_MEDIA_TYPE = "application/vnd.health-routes.route"
+ROUTE_BINARY_MAGIC = b"HRRT"
+ROUTE_BINARY_VERSION = 1
+_BINARY_HEADER = struct.Struct("<4sBxxxII")
+
+
+def _decode_values(data: np.ndarray) -> np.ndarray:
+    """Signed integers from polyline bytes already shifted down by 63."""
+    if data.size == 0:
+        return np.zeros(0, dtype=np.int64)
+    ends = data < 0x20
+    # Position of every byte inside its value, counted from the value's first byte
+    index = np.arange(data.size)
+    starts = np.empty(data.size, dtype=bool)
+    starts[0] = True
+    starts[1:] = ends[:-1]
+    first = np.maximum.accumulate(np.where(starts, index, 0))
+    chunks = (data & 0x1F).astype(np.int64) << (5 * (index - first))
+    values = np.add.reduceat(chunks, np.flatnonzero(starts))
+    return (values >> 1) ^ -(values & 1)
+
+
+def decode_polyline(encoded: str) -> np.ndarray:
+    """Decode one encoded polyline into an (n, 2) array of (lat, lng)."""
+    data = np.frombuffer(encoded.encode("ascii"), dtype=np.uint8).astype(np.int16) - 63
+    values = _decode_values(data)
+    deltas = values[: values.size - values.size % 2].reshape(-1, 2)
+    return np.cumsum(deltas, axis=0) / 1e5
+
+
+def decode_polylines(encoded: Sequence[str]) -> List[np.ndarray]:
+    """
+    Decode several polylines with one pass over their concatenated bytes.
+    Returns one (n, 2) array per input string.
+    """
+    if not encoded:
+        return []
+    data = np.frombuffer("".join(encoded).encode("ascii"), dtype=np.uint8).astype(np.int16) - 63
+    values = _decode_values(data)
+    deltas = values[: values.size - values.size % 2].reshape(-1, 2)
+    totals = np.cumsum(deltas, axis=0)
+
+    # Each polyline holds as many coordinate pairs as it has terminator bytes / 2
+    byte_ends = np.cumsum([len(s) for s in encoded])
+    terminators = np.concatenate(([0], np.cumsum(data < 0x20)))
+    pair_ends = terminators[byte_ends] // 2
+    result = []
+    start = 0
+    for end in pair_ends:
+        part = totals[start:end]
+        if start:
+            # Undo the running sum carried over from the previous polylines
+            part = part - totals[start - 1]
+        result.append(part / 1e5)
+        start = end
+    return result
+
+
+def encode_polyline(coords: np.ndarray) -> str:
+    """Encode an (n, 2) array of (lat, lng) as a Google polyline string."""
+    coords = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+    if coords.size == 0:
+        return ""
+    scaled = np.round(coords * 1e5).astype(np.int64)
+    deltas = np.diff(scaled, axis=0, prepend=np.zeros((1, 2), dtype=np.int64)).ravel()
+    values = np.where(deltas < 0, ~(deltas << 1), deltas << 1)
+
+    # Number of 5-bit chunks needed for each value (at least one)
+    counts = np.ones(values.size, dtype=np.int64)
+    remaining = values >> 5
+    while remaining.any():
+        counts += remaining > 0
+        remaining >>= 5
+    width = int(counts.max())
+
+    k = np.arange(width)
+    chunks = (values[:, None] >> (5 * k)) & 0x1F
+    chunks = chunks | np.where(k < counts[:, None] - 1, 0x20, 0)
+    chars = (chunks + 63).astype(np.uint8)
+    return chars[k < counts[:, None]].tobytes().decode("ascii")
+
+
+def remove_duplicates(coords: np.ndarray) -> np.ndarray:
+    """Drop vertices identical to the one before them."""
+    coords = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+    if len(coords) < 2:
+        return coords
+    keep = np.ones(len(coords), dtype=bool)
+    keep[1:] = np.any(coords[1:] != coords[:-1], axis=1)
+    return coords[keep]
+
+
+def join_polylines(parts: Sequence[np.ndarray]) -> np.ndarray:
+    """Concatenate step geometries, removing the repeated vertex at each step boundary."""
+    parts = [np.asarray(p, dtype=np.float64).reshape(-1, 2) for p in parts]
+    if not parts:
+        return np.zeros((0, 2))
+    return remove_duplicates(np.concatenate(parts))
+
+
+def haversine_distances_m(latitude: float, longitude: float, latitudes, longitudes) -> np.ndarray:
+    """Great-circle distances in metres from one point to many, in one vectorized pass."""
+    lat1 = math.radians(latitude)
+    lat2 = np.radians(np.asarray(latitudes, dtype=np.float64))
+    dlat = lat2 - lat1
+    dlng = np.radians(np.asarray(longitudes, dtype=np.float64) - longitude)
+    a = np.sin(dlat / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin(dlng / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def zoom_tolerance_m(zoom: float, latitude: float, pixels: float = SIMPLIFY_PIXELS) -> float:
+    """Ground distance covered by `pixels` screen pixels at `zoom` and `latitude`."""
+    return pixels * METERS_PER_PIXEL_Z0 * math.cos(math.radians(latitude)) / (2 ** zoom)
+
+
+def _project(coords: np.ndarray) -> np.ndarray:
+    """Local equirectangular projection to metres, good enough for one route."""
+    lat0 = math.radians(float(coords[:, 0].mean()))
+    lat = np.radians(coords[:, 0]) * EARTH_RADIUS_M
+    lng = np.radians(coords[:, 1]) * EARTH_RADIUS_M * math.cos(lat0)
+    return np.column_stack((lng, lat))
+
+
+def simplify_douglas_peucker(coords: np.ndarray, tolerance_m: float) -> np.ndarray:
+    """
+    Douglas-Peucker, evaluated one recursion level at a time: every pass
+    measures the still-undecided vertices against the segment between their
+    kept neighbours and keeps the farthest vertex of each segment beyond the
+    tolerance. Segments with nothing beyond it are settled and dropped from
+    later passes.
+    """
+    coords = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+    n = len(coords)
+    if n < 3 or tolerance_m <= 0:
+        return coords
+    points = _project(coords)
+    xs, ys = points[:, 0].copy(), points[:, 1].copy()
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    pending = np.arange(1, n - 1)
+    while pending.size:
+        kept = np.flatnonzero(keep)
+        segment = np.searchsorted(kept, pending) - 1
+        start, end = kept[segment], kept[segment + 1]
+        ax, ay = xs[start], ys[start]
+        abx, aby = xs[end] - ax, ys[end] - ay
+        apx, apy = xs[pending] - ax, ys[pending] - ay
+        length2 = abx * abx + aby * aby
+        t = np.clip((apx * abx + apy * aby) / np.where(length2 == 0, 1, length2), 0.0, 1.0)
+        dist = np.hypot(apx - t * abx, apy - t * aby)
+
+        # Pending vertices are sorted, so each segment is one contiguous run
+        runs = np.flatnonzero(np.diff(segment, prepend=-1))
+        farthest = np.maximum.reduceat(dist, runs)
+        run_of = np.repeat(np.arange(runs.size), np.diff(runs, append=pending.size))
+        split = (dist > tolerance_m) & (dist == farthest[run_of])
+        # One vertex per segment, the first on ties
+        split[split] = np.diff(run_of[split], prepend=-1) != 0
+        keep[pending[split]] = True
+        # Vertices of segments without a split are settled
+        open_runs = np.zeros(runs.size, dtype=bool)
+        open_runs[run_of[split]] = True
+        pending = pending[open_runs[run_of] & ~split]
+    return coords[keep]
+
+
+def simplify_visvalingam(coords: np.ndarray, tolerance_m: float) -> np.ndarray:
+    """
+    Visvalingam-Whyatt: repeatedly drop the vertex forming the smallest
+    triangle with its neighbours while that area is below tolerance_m^2 / 2.
+    """
+    coords = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+    n = len(coords)
+    if n < 3 or tolerance_m <= 0:
+        return coords
+    points = _project(coords)
+    min_area = tolerance_m * tolerance_m / 2
+    # Plain lists: the removal loop touches single vertices, where NumPy scalars are slow
+    xs, ys = points[:, 0].tolist(), points[:, 1].tolist()
+
+    def area(i, j, k):
+        return abs((xs[j] - xs[i]) * (ys[k] - ys[i]) - (xs[k] - xs[i]) * (ys[j] - ys[i])) / 2
+
+    prev = list(range(-1, n - 1))
+    nxt = list(range(1, n + 1))
+    # Initial areas computed in one vectorized pass
+    a, b, c = points[:-2], points[1:-1], points[2:]
+    areas = np.abs((b[:, 0] - a[:, 0]) * (c[:, 1] - a[:, 1]) - (c[:, 0] - a[:, 0]) * (b[:, 1] - a[:, 1])) / 2
+    current = [math.inf] + areas.tolist() + [math.inf]
+    heap = [(current[i], i) for i in range(1, n - 1)]
+    heapq.heapify(heap)
+    removed = [False] * n
+    while heap:
+        value, i = heapq.heappop(heap)
+        if removed[i] or value != current[i]:
+            continue
+        if value >= min_area:
+            break
+        removed[i] = True
+        p, q = prev[i], nxt[i]
+        nxt[p], prev[q] = q, p
+        for j in (p, q):
+            if 0 < j < n - 1:
+                # A neighbour's area never drops below the one just removed
+                current[j] = max(area(prev[j], j, nxt[j]), value)
+                heapq.heappush(heap, (current[j], j))
+    return coords[~np.array(removed)]
+
+
+def simplify(coords: np.ndarray, zoom: Optional[float] = None, tolerance_m: Optional[float] = None,
+             method: str = "dp") -> np.ndarray:
+    """
+    Simplify for display at `zoom` (or with an explicit `tolerance_m`).
+    Returns the input unchanged when neither is given.
+    """
+    coords = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+    if tolerance_m is None:
+        if zoom is None or len(coords) < 3:
+            return coords
+        tolerance_m = zoom_tolerance_m(zoom, float(coords[:, 0].mean()))
+    if method == "vw":
+        return simplify_visvalingam(coords, tolerance_m)
+    return simplify_douglas_peucker(coords, tolerance_m)
+
+
+def to_points(coords: np.ndarray) -> List[dict]:
+    """[{"latitude": ..., "longitude": ...}] as returned by the routes API."""
+    return [{"latitude": lat, "longitude": lng} for lat, lng in np.asarray(coords).tolist()]
+
+
+def format_route(coords: np.ndarray, fmt: str = "objects"):
+    """Route geometry in one of the JSON wire formats ("objects", "polyline" or "arrays")."""
+    coords = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+    if fmt == "polyline":
+        return encode_polyline(coords)
+    if fmt == "arrays":
+        return {"latitudes": coords[:, 0].tolist(), "longitudes": coords[:, 1].tolist()}
+    return to_points(coords)
+
+
+def pack_route(coords: np.ndarray, metadata: dict) -> bytes:
+    """
+    Binary route frame: header, JSON metadata (everything but the
+    geometry), then float32 (lat, lng) pairs, about 1 m resolution.
+    """
+    coords = np.asarray(coords, dtype="<f4").reshape(-1, 2)
+    meta = json.dumps(metadata, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    header = _BINARY_HEADER.pack(ROUTE_BINARY_MAGIC, ROUTE_BINARY_VERSION, len(coords), len(meta))
+    # Pad the metadata so the float block is 4-byte aligned for typed-array views
+    padding = b" " * (-(len(header) + len(meta)) % 4)
+    return header + meta + padding + coords.tobytes()
+
+
+def unpack_route(frame: bytes) -> Tuple[np.ndarray, dict]:
+    """Inverse of pack_route. Raises ValueError for anything that is not a route frame."""
+    if len(frame) < _BINARY_HEADER.size:
+        raise ValueError("Route frame too short")
+    magic, version, count, meta_len = _BINARY_HEADER.unpack_from(frame)
+    if magic != ROUTE_BINARY_MAGIC or version != ROUTE_BINARY_VERSION:
+        raise ValueError("Not a route frame")
+    meta_end = _BINARY_HEADER.size + meta_len
+    metadata = json.loads(frame[_BINARY_HEADER.size:meta_end].decode("utf-8"))
+    offset = meta_end + (-meta_end % 4)
+    coords = np.frombuffer(frame, dtype="<f4", count=count * 2, offset=offset).reshape(-1, 2)
+    return coords.astype(np.float64), metadata
@@ -0,0 +1,76 @@
+# backend/app/services/singleflight.py
+"""
+Single-flight request coalescing.
+
+Concurrent callers asking for the same key share one in-flight call instead
+of each sending their own. The call runs in its own task, so a caller that
+disconnects does not cancel the work the others are waiting on.
+"""
+import json
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """Deduplicates concurrent calls by key and counts how many were saved."""
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]], label: str = "default") -> Any:
+        """Run `fn` for `key`, or wait for the identical call already in flight."""
+        stats = self._stats.setdefault(label, {"executions": 0, "coalesced": 0})
+        task = self._inflight.get(key)
+        if task is not None:
+            stats["coalesced"] += 1
+            return await asyncio.shield(task)
+
+        task = asyncio.ensure_future(fn())
+        self._inflight[key] = task
+        stats["executions"] += 1
+
+        def _done(finished: asyncio.Future):
+            if self._inflight.get(key) is finished:
+                del self._inflight[key]
+            # Mark the exception as retrieved in case every waiter went away
+            if not finished.cancelled():
+                finished.exception()
+
+        task.add_done_callback(_done)
+        return await asyncio.shield(task)
+
+    def in_flight(self) -> int:
+        return len(self._inflight)
+
+    def stats(self) -> Dict[str, dict]:
+        result = {}
+        for label, counters in self._stats.items():
+            calls = counters["executions"] + counters["coalesced"]
+            result[label] = {
+                **counters,
+                "coalesced_ratio": round(counters["coalesced"] / calls, 4) if calls else None,
+            }
+        return result
+
+
+def request_key(method: str, url: str, params: Any = None, json_body: Any = None, headers: Any = None) -> str:
+    """
+    Normalized key for an upstream request: method, URL, sorted query
+    params, canonical JSON body and the field mask (which changes the
+    response). Credentials and timeouts do not take part.
+    """
+    field_mask = None
+    if headers:
+        field_mask = next((v for k, v in headers.items() if k.lower() == "x-goog-fieldmask"), None)
+    if params:
+        params = {k: v for k, v in dict(params).items() if k != "key"}
+    return json.dumps(
+        [method.upper(), url, params or None, json_body, field_mask],
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
@@ -1,16 +1,22 @@
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
 import os
+import asyncio
 from twilio.rest import Client
+from twilio.http.http_client import TwilioHttpClient
 from dotenv import load_dotenv
+from app.services.resilience import resilience
 
 load_dotenv()
 app = FastAPI()
 
-# Twilio connection
+# Twilio connection, with a bounded timeout instead of waiting indefinitely.
+# TWILIO_TIMEOUT is the ceiling; async callers get the breaker's adaptive timeout below it
 account_id = os.getenv('TWILIO_ID')
 auth_token = os.getenv('TWILIO_KEY')
-client = Client(account_id, auth_token)
+TWILIO_TIMEOUT = float(os.getenv('TWILIO_TIMEOUT', '10'))
+client = Client(account_id, auth_token, http_client=TwilioHttpClient(timeout=TWILIO_TIMEOUT))
+twilio_breaker = resilience.breaker("twilio")
 
 
 # class SMSRequest(BaseModel):
@@ -30,11 +36,25 @@ client = Client(account_id, auth_token)
 #         raise Exception(f"Failed to send SMS: {str(e)}")
     
 def sendCustomMessage(recipient, body):
-    message = client.messages.create(
-        body = body,
-        from_ = '+118557585706',
-        to = recipient
-    )
+    # Raises CircuitOpenError right away while Twilio keeps failing
+    with twilio_breaker.guard("messages_create"):
+        message = client.messages.create(
+            body = body,
+            from_ = '+118557585706',
+            to = recipient
+        )
+    return message.sid
+
+async def send_custom_message_async(recipient, body):
+    """
+    sendCustomMessage for async handlers: the blocking Twilio call runs in a
+    worker thread, bounded by the breaker's adaptive timeout.
+    """
+    with twilio_breaker.guard("messages_create"):
+        message = await asyncio.wait_for(
+            asyncio.to_thread(client.messages.create, body=body, from_='+118557585706', to=recipient),
+            twilio_breaker.timeout(TWILIO_TIMEOUT),
+        )
     return message.sid
 
 # API Endpoint to send SMS
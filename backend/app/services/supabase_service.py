@@ -1,13 +1,35 @@
 # backend/app/services/supabase_service.py
+import os
+import asyncio
 from supabase import create_client
 from app.core import config
+from app.services.resilience import resilience
 
 supabase = create_client(config.SUPABASE_URL, config.SUPABASE_KEY)
 
+# Upper bound for one query; the breaker adapts below it
+SUPABASE_TIMEOUT = float(os.getenv("SUPABASE_TIMEOUT", "10"))
+
+# Wrap query execution in `with supabase_breaker.guard("<table>_<op>"):` so an outage fails fast
+# and the call shows up in /metrics; async handlers use execute_async instead
+supabase_breaker = resilience.breaker("supabase")
+
+
+async def execute_async(query, endpoint: str):
+    """
+    Run a query builder's blocking execute() in a worker thread, guarded by
+    the breaker and bounded by its adaptive timeout. Raises CircuitOpenError
+    while Supabase keeps failing and asyncio.TimeoutError when it is slow.
+    """
+    with supabase_breaker.guard(endpoint):
+        return await asyncio.wait_for(asyncio.to_thread(query.execute), supabase_breaker.timeout(SUPABASE_TIMEOUT))
+
 def insert_into_test_table(id: int, name: str):
-    response = supabase.table("test_table").insert({"id": id, "name": name}).execute()
+    with supabase_breaker.guard("test_table_insert"):
+        response = supabase.table("test_table").insert({"id": id, "name": name}).execute()
     return response
 
 def fetch_from_test_table():
-    response = supabase.table("test_table").select("*").execute()
+    with supabase_breaker.guard("test_table_select"):
+        response = supabase.table("test_table").select("*").execute()
     return response
\ No newline at end of file
@@ -0,0 +1,170 @@
+# backend/app/services/timing.py
+"""
+Per-request stage timings, returned as a `Server-Timing` header.
+
+ServerTimingMiddleware gives each HTTP request a RequestTiming in a
+ContextVar. Code on the request path records stages into it with
+`stage(name)` or `record(name, seconds)`; repeated stages are summed and
+counted, and outside a request both are no-ops. Stages recorded
+automatically:
+
+- validate: from the request reaching the app to the endpoint function
+  starting (routing, body parsing, Pydantic validation);
+- handler: the endpoint function itself;
+- serialize: rendering the response, plus anything after the endpoint
+  returns and before the response starts;
+- one stage per upstream endpoint (places_nearby, routes, directions,
+  generate_content, ...), from CircuitBreaker.guard;
+- total.
+
+Endpoints add their own (cache, decode_polyline, format_steps, geometry,
+encode for bodies rendered inside the handler). The same numbers
+feed the `http_stage_duration_seconds` histogram on /metrics. The header is
+sent with the response start, so streamed bodies only report what happened
+before their first byte.
+"""
+import time
+import asyncio
+import functools
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+from fastapi.routing import APIRoute
+
+from app.services import metrics
+
+stage_duration = metrics.registry.histogram(
+    "http_stage_duration_seconds", "Time spent in each stage of a request", ("route", "stage"))
+
+
+class RequestTiming:
+    """Stage durations of one request, in the order they were first recorded."""
+
+    __slots__ = ("start", "stages", "handler_start", "handler_end")
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.stages: Dict[str, List[float]] = {}  # name -> [seconds, count]
+        self.handler_start: Optional[float] = None
+        self.handler_end: Optional[float] = None
+
+    def add(self, name: str, seconds: float):
+        entry = self.stages.get(name)
+        if entry is None:
+            self.stages[name] = [seconds, 1]
+        else:
+            entry[0] += seconds
+            entry[1] += 1
+
+    def header(self, now: float) -> str:
+        parts = []
+        for name, (seconds, count) in self.stages.items():
+            part = f"{name};dur={seconds * 1000:.1f}"
+            if count > 1:
+                part += f';desc="{count} calls"'
+            parts.append(part)
+        parts.append(f"total;dur={(now - self.start) * 1000:.1f}")
+        return ", ".join(parts)
+
+
+_current: ContextVar[Optional[RequestTiming]] = ContextVar("request_timing", default=None)
+
+
+def record(name: str, seconds: float):
+    """Add `seconds` to stage `name` of the current request, if any."""
+    timing = _current.get()
+    if timing is not None:
+        timing.add(name, seconds)
+
+
+@contextmanager
+def stage(name: str):
+    """Time a block as stage `name` of the current request."""
+    timing = _current.get()
+    if timing is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timing.add(name, time.perf_counter() - start)
+
+
+def _timed_endpoint(endpoint):
+    """Wrap an endpoint so the time around it splits into validate / handler / serialize."""
+    if getattr(endpoint, "_server_timing", False):
+        return endpoint
+
+    def begin():
+        timing = _current.get()
+        if timing is not None:
+            timing.handler_start = time.perf_counter()
+            timing.add("validate", timing.handler_start - timing.start)
+        return timing
+
+    def end(timing):
+        if timing is not None:
+            timing.handler_end = time.perf_counter()
+            timing.add("handler", timing.handler_end - timing.handler_start)
+
+    if asyncio.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            timing = begin()
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                end(timing)
+    else:
+        @functools.wraps(endpoint)
+        def wrapper(*args, **kwargs):
+            timing = begin()
+            try:
+                return endpoint(*args, **kwargs)
+            finally:
+                end(timing)
+
+    wrapper._server_timing = True
+    return wrapper
+
+
+class TimedRoute(APIRoute):
+    """APIRoute whose endpoint reports the validate / handler / serialize split."""
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        super().__init__(path, _timed_endpoint(endpoint), **kwargs)
+
+
+class ServerTimingMiddleware:
+    """Pure ASGI middleware that collects stage timings and sends them as `Server-Timing`."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timing = RequestTiming()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                now = time.perf_counter()
+                if timing.handler_end is not None:
+                    timing.add("serialize", now - timing.handler_end)
+                message["headers"] = list(message.get("headers", ())) + [
+                    (b"server-timing", timing.header(now).encode("latin-1"))
+                ]
+            await send(message)
+
+        token = _current.set(timing)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            route = metrics.route_label(scope)
+            for name, (seconds, _) in list(timing.stages.items()):
+                stage_duration.observe(seconds, route, name)
@@ -0,0 +1,381 @@
+# backend/app/services/triage.py
+"""
+Local emergency triage ahead of the Gemini call.
+
+Symptom text is matched against English and Spanish phrases for
+life-threatening conditions (the same list the Gemini prompt uses) with a
+single Aho-Corasick automaton, so one pass over the text finds every phrase
+in a few microseconds. Text and phrases are folded the same way: lowercase,
+accents stripped, clause punctuation (, . ; : ! ?) kept as its own token and
+other punctuation collapsed to single spaces. Phrases only match on whole
+words, except those ending in "*", which match any word starting with them.
+A match is ignored when one of the few words before it, within the same
+clause, is a negation ("no chest pain", "I do not have chest pain", "sin
+dificultad para respirar"); "no fever, chest pain" is still an emergency.
+Words that are also everyday
+English ("stroke") only count inside a phrase that gives them a medical
+sense ("having a stroke"), and matches inside EXCLUSIONS ("stroke of luck")
+are dropped.
+
+When a condition is found the caller can return the emergency instructions
+and the local emergency number straight away and let the detailed advice
+follow.
+"""
+import os
+import re
+import logging
+import unicodedata
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EMERGENCY_NUMBER = os.getenv("DEFAULT_EMERGENCY_NUMBER", "911")
+
+# Words that cancel a phrase starting up to NEGATION_WINDOW words after them.
+# "don", "doesn", ... are what "don't", "doesn't", ... fold to.
+NEGATIONS = frozenset({
+    "no", "not", "without", "denies", "denied", "never", "nor", "don", "doesn", "didn", "isn", "wasn",
+    "haven", "hasn", "dont", "doesnt", "didnt", "sin", "nunca", "tampoco", "ni", "niega",
+})
+NEGATION_WINDOW = 4
+# Words and punctuation that start a new clause; a negation before them does not reach past them
+CLAUSE_BREAKS = frozenset({
+    "and", "but", "although", "though", "however", "now", "then", "y", "e", "pero", "aunque", "sino",
+    ",", ".", ";", ":", "!", "?", "¡", "¿",
+})
+
+# Phrases that contain an emergency phrase without the medical sense
+EXCLUSIONS: Tuple[str, ...] = (
+    "stroke of luck", "stroke of genius", "stroke of midnight", "stroke of the pen", "stroke of good luck",
+)
+
+CONDITION_PHRASES: Dict[str, Tuple[str, ...]] = {
+    "cardiac": (
+        "chest pain", "chest pressure", "chest tightness", "tight chest", "pain in my chest",
+        "heart attack", "crushing pain", "pain radiating to arm", "pain spreading to my arm",
+        "dolor de pecho", "dolor en el pecho", "presion en el pecho", "opresion en el pecho",
+        "infarto", "ataque al corazon", "ataque cardiaco",
+    ),
+    "breathing": (
+        "difficulty breathing", "trouble breathing", "hard to breathe", "can t breathe", "cant breathe",
+        "cannot breathe", "unable to breathe", "not breathing", "stopped breathing", "shortness of breath",
+        "short of breath", "choking", "gasping for air", "lips turning blue", "turning blue",
+        "dificultad para respirar", "no puedo respirar", "no puede respirar", "falta de aire",
+        "me falta el aire", "me ahogo", "se ahoga", "ahogando*", "asfixia*", "labios morados",
+    ),
+    "stroke": (
+        "having a stroke", "had a stroke", "have a stroke", "has a stroke", "mini stroke",
+        "stroke symptoms", "signs of a stroke", "signs of stroke", "face drooping", "facial droop*", "drooping face", "slurred speech", "slurring words",
+        "numbness on one side", "one side numb", "weakness on one side", "one side of my body",
+        "sudden confusion", "can t speak", "cannot speak", "sudden vision loss", "worst headache",
+        "derrame cerebral", "le dio un derrame", "tuvo un derrame", "teniendo un derrame", "ictus", "embolia", "cara caida", "habla arrastrada",
+        "no puede hablar", "adormecimiento de un lado", "debilidad de un lado",
+        "peor dolor de cabeza",
+    ),
+    "bleeding": (
+        "severe bleeding", "heavy bleeding", "bleeding heavily", "bleeding a lot", "lots of blood",
+        "won t stop bleeding", "bleeding won t stop", "bleeding that won t stop", "hemorrhag*",
+        "vomiting blood", "coughing up blood", "spurting blood",
+        "sangrado abundante", "sangrado fuerte", "sangrado intenso", "hemorragia*", "mucha sangre",
+        "sangra mucho", "no para de sangrar", "vomito con sangre", "vomitando sangre",
+    ),
+    "unconscious": (
+        "unconscious", "passed out", "fainted", "unresponsive", "not responding", "won t wake up",
+        "collapsed", "seizure*", "convulsion*", "having a fit", "having fits",
+        "inconsciente", "desmayo", "desmay*", "perdio el conocimiento", "perdida de conocimiento",
+        "no responde", "no despierta", "convulsiones", "ataque epileptico",
+    ),
+    "anaphylaxis": (
+        "anaphyla*", "throat swelling", "swollen throat", "throat closing", "throat is closing",
+        "tongue swelling", "swollen tongue", "severe allergic reaction",
+        "anafilaxia", "anafilactic*", "reaccion alergica grave", "reaccion alergica severa",
+        "garganta cerrada", "se me cierra la garganta", "hinchazon de garganta", "lengua hinchada",
+    ),
+    "burns": (
+        "severe burn*", "bad burn*", "third degree burn*", "burned badly", "burnt badly",
+        "quemadura grave", "quemaduras graves", "quemadura severa", "quemaduras severas",
+        "quemadura de tercer grado", "quemaduras de tercer grado",
+    ),
+    "poisoning": (
+        "poisoning", "poisoned", "overdose*", "swallowed bleach", "drank bleach", "swallowed poison",
+        "intoxicacion", "envenenamiento", "envenenad*", "sobredosis", "trago cloro", "tomo veneno",
+    ),
+    "head_injury": (
+        "head injury", "head trauma", "hit my head", "hit his head", "hit her head", "hit their head",
+        "skull fracture", "fell on my head", "golpe en la cabeza", "golpe fuerte en la cabeza",
+        "traumatismo craneal", "lesion en la cabeza", "se golpeo la cabeza",
+    ),
+    "self_harm": (
+        "suicidal", "suicide", "kill myself", "end my life", "want to die", "hurt myself",
+        "suicida", "suicidio", "matarme", "quitarme la vida", "quiero morir", "hacerme dano",
+    ),
+}
+
+CONDITION_LABELS = {
+    "en": {
+        "cardiac": "Possible heart attack", "breathing": "Severe breathing difficulty",
+        "stroke": "Possible stroke", "bleeding": "Severe bleeding",
+        "unconscious": "Loss of consciousness or seizure", "anaphylaxis": "Severe allergic reaction",
+        "burns": "Severe burns", "poisoning": "Poisoning or overdose",
+        "head_injury": "Serious head injury", "self_harm": "Risk of self-harm",
+    },
+    "es": {
+        "cardiac": "Posible ataque al corazón", "breathing": "Dificultad grave para respirar",
+        "stroke": "Posible derrame cerebral", "bleeding": "Sangrado grave",
+        "unconscious": "Pérdida de conocimiento o convulsión", "anaphylaxis": "Reacción alérgica grave",
+        "burns": "Quemaduras graves", "poisoning": "Intoxicación o sobredosis",
+        "head_injury": "Lesión grave en la cabeza", "self_harm": "Riesgo de autolesión",
+    },
+}
+
+CONDITION_ACTIONS = {
+    "en": {
+        "cardiac": ["Sit down and rest in a comfortable position", "Loosen tight clothing",
+                    "Chew one adult aspirin (325 mg) if you are not allergic to it"],
+        "breathing": ["Sit upright and lean slightly forward", "Loosen tight clothing around the neck and chest",
+                      "Use a prescribed inhaler if you have one"],
+        "stroke": ["Note the time symptoms started", "Lie down with the head slightly raised",
+                   "Do not give food, drink or medication"],
+        "bleeding": ["Press firmly on the wound with a clean cloth", "Keep pressure on without lifting to check",
+                     "Raise the injured limb above the heart if possible"],
+        "unconscious": ["Check breathing; start CPR if the person is not breathing",
+                        "If breathing, place them on their side (recovery position)",
+                        "During a seizure, move hard objects away and do not restrain them"],
+        "anaphylaxis": ["Use an epinephrine auto-injector (EpiPen) if available",
+                        "Lie down with legs raised, or sit up if breathing is hard"],
+        "burns": ["Cool the burn under running water for 20 minutes",
+                  "Remove jewellery near the burn; do not remove stuck clothing",
+                  "Cover loosely with clean plastic wrap or a clean cloth"],
+        "poisoning": ["Call Poison Control as well (1-800-222-1222 in the US)",
+                      "Keep the container or substance to show responders",
+                      "Do not induce vomiting unless told to"],
+        "head_injury": ["Keep the head and neck still", "Press gently on any bleeding with a clean cloth",
+                        "Watch for vomiting, drowsiness or confusion"],
+        "self_harm": ["Stay with the person and remove anything they could use to hurt themselves",
+                      "In the US you can also call or text 988 (Suicide & Crisis Lifeline)"],
+    },
+    "es": {
+        "cardiac": ["Siéntese y descanse en una posición cómoda", "Afloje la ropa ajustada",
+                    "Mastique una aspirina de adulto (325 mg) si no es alérgico"],
+        "breathing": ["Siéntese derecho e inclínese ligeramente hacia adelante",
+                      "Afloje la ropa alrededor del cuello y el pecho",
+                      "Use su inhalador recetado si tiene uno"],
+        "stroke": ["Anote la hora en que empezaron los síntomas", "Recuéstese con la cabeza un poco elevada",
+                   "No dé comida, bebida ni medicamentos"],
+        "bleeding": ["Presione firmemente la herida con un paño limpio",
+                     "Mantenga la presión sin levantar el paño para revisar",
+                     "Eleve la extremidad herida por encima del corazón si es posible"],
+        "unconscious": ["Revise la respiración; inicie RCP si no respira",
+                        "Si respira, colóquelo de lado (posición de recuperación)",
+                        "Durante una convulsión, aleje objetos duros y no lo sujete"],
+        "anaphylaxis": ["Use un autoinyector de epinefrina (EpiPen) si hay uno disponible",
+                        "Acuéstese con las piernas elevadas, o siéntese si le cuesta respirar"],
+        "burns": ["Enfríe la quemadura con agua corriente durante 20 minutos",
+                  "Quite joyas cerca de la quemadura; no quite ropa pegada",
+                  "Cubra sin apretar con plástico limpio o un paño limpio"],
+        "poisoning": ["Llame también al centro de toxicología",
+                      "Guarde el envase o la sustancia para mostrarla a los paramédicos",
+                      "No provoque el vómito a menos que se lo indiquen"],
+        "head_injury": ["Mantenga la cabeza y el cuello quietos",
+                        "Presione suavemente cualquier sangrado con un paño limpio",
+                        "Vigile si hay vómitos, somnolencia o confusión"],
+        "self_harm": ["Quédese con la persona y retire objetos con los que pueda hacerse daño"],
+    },
+}
+
+DO_NOT = {
+    "en": ["Do not drive yourself to the hospital", "Do not wait to see if symptoms go away"],
+    "es": ["No conduzca usted mismo al hospital", "No espere a ver si los síntomas desaparecen"],
+}
+
+# Emergency numbers by ISO 3166-1 alpha-2 code; other known countries use 112
+EMERGENCY_NUMBERS = {
+    "US": "911", "CA": "911", "MX": "911", "PR": "911", "PA": "911", "CR": "911", "SV": "911",
+    "GT": "110", "HN": "911", "NI": "118", "DO": "911", "AR": "107", "UY": "911", "PY": "911",
+    "BO": "118", "CL": "131", "CO": "123", "PE": "106", "EC": "911", "VE": "911", "BR": "192",
+    "CU": "104", "GB": "999", "IE": "112", "AU": "000", "NZ": "111", "IN": "112", "JP": "119",
+    "KR": "119", "CN": "120", "TW": "119", "HK": "999", "ZA": "10177", "PH": "911",
+}
+INTERNATIONAL_NUMBER = "112"
+
+# Words, and the punctuation that ends a clause so negations stop there
+_TOKEN_RE = re.compile(r"[a-z0-9]+|[,.;:!?¡¿]")
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def normalize_text(text: str) -> str:
+    """
+    Folded text as single-space separated tokens with a space on each side.
+    Clause punctuation is kept as tokens of its own, so phrases never match
+    across it and negations do not reach past it.
+    """
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    folded = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " " + " ".join(_TOKEN_RE.findall(folded)) + " "
+
+
+def _negated(text: str, start: int) -> bool:
+    """Whether a negation precedes position `start` of normalized `text` in the same clause."""
+    for word in reversed(text[:start].split()[-NEGATION_WINDOW:]):
+        if word in CLAUSE_BREAKS:
+            return False
+        if word in NEGATIONS:
+            return True
+    return False
+
+
+class PhraseAutomaton:
+    """Aho-Corasick automaton over folded phrases, matched on word boundaries."""
+
+    def __init__(self, phrases: Dict[str, Tuple[str, ...]], exclusions: Tuple[str, ...] = EXCLUSIONS):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[Optional[str], str, int]]] = [[]]
+        for condition, items in phrases.items():
+            for phrase in items:
+                prefix = phrase.endswith("*")
+                pattern = normalize_text(phrase.rstrip("*"))
+                if prefix:
+                    # Leave the word open so any continuation matches
+                    pattern = pattern[:-1]
+                self._add(pattern, condition, phrase)
+        for phrase in exclusions:
+            self._add(normalize_text(phrase), None, phrase)
+        self._build_failure_links()
+
+    def _add(self, pattern: str, condition: Optional[str], phrase: str):
+        node = 0
+        for char in pattern:
+            nxt = self._goto[node].get(char)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][char] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        self._out[node].append((condition, phrase, len(pattern)))
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def search(self, text: str) -> List[Tuple[str, str]]:
+        """(condition, phrase) for every non-negated, non-excluded phrase found in normalized `text`."""
+        goto, fail, out = self._goto, self._fail, self._out
+        found, excluded = [], []
+        node = 0
+        for end, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for condition, phrase, length in out[node]:
+                start = end - length + 1
+                if condition is None:
+                    excluded.append((start, end))
+                elif not _negated(text, start):
+                    found.append((condition, phrase, start, end))
+        return [
+            (condition, phrase) for condition, phrase, start, end in found
+            # Spans include the spaces around the words, so neighbours share one character
+            if not any(start < x_end and x_start < end for x_start, x_end in excluded)
+        ]
+
+
+@dataclass
+class TriageResult:
+    emergency: bool
+    conditions: List[str] = field(default_factory=list)
+    matched: List[str] = field(default_factory=list)
+    emergency_number: Optional[str] = None
+
+
+class TriageEngine:
+    """Keyword triage over the built-in multilingual phrase lists."""
+
+    def __init__(self, phrases: Dict[str, Tuple[str, ...]] = CONDITION_PHRASES):
+        self.automaton = PhraseAutomaton(phrases)
+        self._stats = {"checked": 0, "emergencies": 0}
+
+    def assess(self, text: str, country_code: Optional[str] = None) -> TriageResult:
+        self._stats["checked"] += 1
+        conditions, matched = [], []
+        for condition, phrase in self.automaton.search(normalize_text(text)):
+            if condition not in conditions:
+                conditions.append(condition)
+            if phrase not in matched:
+                matched.append(phrase)
+        if not conditions:
+            return TriageResult(emergency=False)
+        self._stats["emergencies"] += 1
+        return TriageResult(
+            emergency=True,
+            conditions=conditions,
+            matched=matched,
+            emergency_number=emergency_number(country_code),
+        )
+
+    def stats(self) -> dict:
+        return dict(self._stats)
+
+
+def emergency_number(country_code: Optional[str]) -> str:
+    if not country_code:
+        return DEFAULT_EMERGENCY_NUMBER
+    return EMERGENCY_NUMBERS.get(country_code.upper(), INTERNATIONAL_NUMBER)
+
+
+def instruction_language(language: str) -> str:
+    """"es" for Spanish requests, "en" otherwise."""
+    folded = " ".join(_WORD_RE.findall(normalize_text(language)))
+    return "es" if folded in ("spanish", "espanol", "es", "castellano") else "en"
+
+
+def emergency_instructions(result: TriageResult, language: str) -> str:
+    """Emergency section in the same markdown layout the Gemini prompt asks for."""
+    lang = instruction_language(language)
+    labels = CONDITION_LABELS[lang]
+    actions = [action for condition in result.conditions for action in CONDITION_ACTIONS[lang][condition]]
+    if lang == "es":
+        lines = [
+            # The header stays in English: it is the marker clients and the advice cache look for
+            "**⚠️ EMERGENCY MEDICAL ATTENTION REQUIRED ⚠️**",
+            f"**ADVERTENCIA:** Llame a emergencias ({result.emergency_number}) INMEDIATAMENTE",
+            "",
+            "**Condición crítica sospechada:**",
+            ", ".join(labels[c] for c in result.conditions),
+            "",
+            "**ACCIONES INMEDIATAS mientras llega la ayuda:**",
+        ]
+        footer = "Estamos preparando una orientación más detallada."
+        do_not_header = "**NO:**"
+    else:
+        lines = [
+            "**⚠️ EMERGENCY MEDICAL ATTENTION REQUIRED ⚠️**",
+            f"**WARNING:** Call emergency services ({result.emergency_number}) IMMEDIATELY",
+            "",
+            "**Critical Condition Suspected:**",
+            ", ".join(labels[c] for c in result.conditions),
+            "",
+            "**IMMEDIATE ACTIONS While Waiting for Emergency Services:**",
+        ]
+        footer = "More detailed guidance is being prepared."
+        do_not_header = "**DO NOT:**"
+    lines += [f"* {action}" for action in actions]
+    lines += ["", do_not_header] + [f"* {item}" for item in DO_NOT[lang]]
+    lines += ["", footer]
+    return "\n".join(lines)
+
+
+# Shared engine used by the /medicalpost routes
+triage_engine = TriageEngine()
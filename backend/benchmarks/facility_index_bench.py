@@ -0,0 +1,87 @@
+# backend/benchmarks/facility_index_bench.py
+"""
+Facility index build and query microbenchmark.
+
+Builds app.services.facility_index.FacilityIndex over synthetic facilities
+scattered across the continental US and times radius and k-nearest queries
+against a brute-force NumPy scan over the same points.
+
+Usage (from the backend folder):
+    python benchmarks/facility_index_bench.py [--facilities 10000 100000 500000] [--queries 2000]
+"""
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.facility_index import FacilityIndex, FACILITY_TYPES, unit_vectors, chord_for_meters
+
+
+def synthetic_columns(count: int, seed: int = 0) -> dict:
+    """Facilities clustered around random 'towns', like real ones are."""
+    rng = np.random.default_rng(seed)
+    towns = np.column_stack((rng.uniform(25, 49, count // 50 + 1), rng.uniform(-124, -67, count // 50 + 1)))
+    picked = towns[rng.integers(0, len(towns), count)]
+    latitude = picked[:, 0] + rng.normal(0, 0.1, count)
+    longitude = picked[:, 1] + rng.normal(0, 0.1, count)
+    ids = [str(i) for i in range(count)]
+    return {
+        "id": ids,
+        "place_id": ["local:" + i for i in ids],
+        "name": ["Facility " + i for i in ids],
+        "address": [""] * count,
+        "phone": [""] * count,
+        "type": [FACILITY_TYPES[t] for t in rng.integers(0, 4, count)],
+        "latitude": latitude.tolist(),
+        "longitude": longitude.tolist(),
+    }
+
+
+def per_query_us(fn, queries) -> float:
+    start = time.perf_counter()
+    for lat, lng in queries:
+        fn(lat, lng)
+    return (time.perf_counter() - start) / len(queries) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--facilities", type=int, nargs="+", default=[10000, 100000, 500000])
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--radius", type=float, default=10000, help="radius query size in metres")
+    args = parser.parse_args()
+
+    print(f"{'facilities':>10} {'build ms':>9} {'radius us':>10} {'knn5 us':>8} {'brute us':>9} {'speedup':>8}")
+    for n in args.facilities:
+        columns = synthetic_columns(n)
+        start = time.perf_counter()
+        index = FacilityIndex(columns)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        rng = np.random.default_rng(1)
+        queries = list(zip(rng.uniform(25, 49, args.queries), rng.uniform(-124, -67, args.queries)))
+        chord = chord_for_meters(args.radius)
+        points = unit_vectors(index.latitudes, index.longitudes)
+
+        def tree_radius(lat, lng):
+            return index.tree.query_radius(unit_vectors(lat, lng)[0], chord)
+
+        def tree_knn(lat, lng):
+            return index.tree.query_nearest(unit_vectors(lat, lng)[0], 5)
+
+        def brute_radius(lat, lng):
+            diff = points - unit_vectors(lat, lng)[0]
+            return np.flatnonzero(np.einsum("ij,ij->i", diff, diff) <= chord * chord)
+
+        radius_us = per_query_us(tree_radius, queries)
+        knn_us = per_query_us(tree_knn, queries)
+        brute_us = per_query_us(brute_radius, queries[:200])
+        print(f"{n:>10} {build_ms:>9.1f} {radius_us:>10.1f} {knn_us:>8.1f} {brute_us:>9.1f} {brute_us / radius_us:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
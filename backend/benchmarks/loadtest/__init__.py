@@ -0,0 +1,11 @@
+"""
+Offline load test for the backend.
+
+- fakes: local stand-ins for Google Places/Routes/Directions/Geocoding,
+  Gemini and Supabase, with configurable latency and error rates
+- app_server: runs main.app under uvicorn with an event-loop lag probe
+- workload: user sessions replaying the mobile app's calls
+- report: per-endpoint RPS, latency percentiles and loop lag
+
+Run everything with `python -m benchmarks.loadtest --help` from the backend folder.
+"""
@@ -0,0 +1,211 @@
+# backend/benchmarks/loadtest/__main__.py
+"""
+Offline load test: starts the upstream stand-ins and the backend, drives
+simulated app users against it and prints per-endpoint RPS, p50/p95/p99
+latency and event-loop lag.
+
+The backend runs in its own process (app_server) with the stand-ins' URL in
+UPSTREAM_URL_*, GEMINI_API_ENDPOINT and SUPABASE_URL, so no request leaves
+the machine and no API key is needed. Local quotas are lifted unless
+--keep-quotas is given, the SQLite place store and facility index go to a
+temporary folder, and --env KEY=VALUE sets anything else (cache TTLs,
+GEMINI_MAX_CONCURRENCY, HTTP_MAX_CONNECTIONS, ...).
+
+Users are closed-loop by default (--users run sessions back to back); with
+--rate sessions start as a Poisson process instead, which keeps offering
+load when the server slows down.
+
+Usage (from the backend folder):
+    python -m benchmarks.loadtest [--users 50 | --rate 5] [--duration 60] [--warmup 10]
+        [--profile profile.json] [--latency-scale 1.0] [--time-scale 0.1]
+        [--mix patient=0.95,account=0.05] [--env KEY=VALUE ...] [--json results.json]
+    python -m benchmarks.loadtest --target http://host:8000 ...   # an already running backend
+"""
+import os
+import sys
+import json
+import time
+import random
+import socket
+import asyncio
+import argparse
+import tempfile
+import subprocess
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+from benchmarks.loadtest.fakes import upstream_env, DEFAULT_PROFILE
+from benchmarks.loadtest.workload import Session, Sample, WorkloadConfig, SCENARIOS
+from benchmarks.loadtest.app_server import LAG_PATH
+from benchmarks.loadtest.report import summarize, render
+from app.services.quota import DEFAULT_BUDGETS
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name not in SCENARIOS:
+            raise argparse.ArgumentTypeError(f"unknown scenario '{name}', expected one of {SCENARIOS}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def start(module: str, port: int, extra_args: List[str], env: Dict[str, str]) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, "-m", module, "--port", str(port), *extra_args],
+        cwd=BACKEND_DIR, env={**os.environ, **env},
+    )
+
+
+async def wait_ready(url: str, process: Optional[subprocess.Popen], timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            if process is not None and process.poll() is not None:
+                raise RuntimeError(f"{url} exited with code {process.returncode} before it was ready")
+            try:
+                await client.get(url, timeout=1.0)
+                return
+            except httpx.HTTPError:
+                await asyncio.sleep(0.2)
+    raise RuntimeError(f"{url} not ready after {timeout:.0f} s")
+
+
+async def drive(target: str, args, config: WorkloadConfig) -> Tuple[List[Sample], float, float]:
+    """Run the workload; returns (samples after warm-up, measurement start, elapsed)."""
+    samples: List[Sample] = []
+    rng = random.Random(args.seed)
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    started = time.time()
+    measure_from = started + args.warmup
+    stop_at = measure_from + args.duration
+
+    async with httpx.AsyncClient(base_url=target, limits=limits, timeout=args.timeout) as client:
+        async def user():
+            session = Session(client, config, random.Random(rng.random()), samples, asyncio.sleep)
+            while time.time() < stop_at:
+                await session.run_one()
+
+        async def one_session():
+            await Session(client, config, random.Random(rng.random()), samples, asyncio.sleep).run_one()
+
+        if args.rate:
+            tasks = set()
+            while time.time() < stop_at:
+                task = asyncio.ensure_future(one_session())
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+                await asyncio.sleep(rng.expovariate(args.rate))
+            # Let sessions in flight finish, but not for ever
+            if tasks:
+                await asyncio.wait(tasks, timeout=args.timeout)
+                for task in tasks:
+                    task.cancel()
+        else:
+            users = []
+            for _ in range(args.users):
+                users.append(asyncio.ensure_future(user()))
+                # Spread the starts over the warm-up so sessions do not march in step
+                await asyncio.sleep(args.warmup / args.users if args.warmup else 0)
+            _, pending = await asyncio.wait(users, timeout=max(0.0, stop_at - time.time()) + args.timeout)
+            for task in pending:
+                task.cancel()
+
+    end = min(time.time(), stop_at)
+    return [s for s in samples if measure_from <= s.start <= stop_at], measure_from, end - measure_from
+
+
+async def fetch_json(url: str, **params) -> Optional[dict]:
+    try:
+        async with httpx.AsyncClient() as client:
+            response = await client.get(url, params=params, timeout=30.0)
+            return response.json() if response.status_code == 200 else None
+    except httpx.HTTPError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=50, help="closed-loop virtual users")
+    parser.add_argument("--rate", type=float, default=None, help="open loop: sessions started per second")
+    parser.add_argument("--duration", type=float, default=60.0, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=10.0, help="unmeasured seconds before")
+    parser.add_argument("--time-scale", type=float, default=0.1, help="multiply user think times by this")
+    parser.add_argument("--map-probability", type=float, default=0.6, help="share of users who open the map")
+    parser.add_argument("--issue-variety", type=float, default=0.5, help="share of forms with unique wording")
+    parser.add_argument("--mix", type=parse_mix, default=None, help="scenario weights, e.g. patient=0.95,account=0.05")
+    parser.add_argument("--profile", help=f"JSON overriding the stand-ins' latency/errors per endpoint {sorted(DEFAULT_PROFILE)}")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="multiply every stand-in latency by this")
+    parser.add_argument("--keep-quotas", action="store_true", help="keep the local Google API budgets")
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE", help="extra backend environment")
+    parser.add_argument("--target", help="load an already running backend instead of starting one")
+    parser.add_argument("--timeout", type=float, default=60.0, help="client timeout per request")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    config = WorkloadConfig(time_scale=args.time_scale, map_probability=args.map_probability,
+                            issue_variety=args.issue_variety, mix=args.mix)
+    processes = []
+    fakes_url = None
+    with tempfile.TemporaryDirectory(prefix="loadtest-") as workdir:
+        try:
+            target = args.target
+            if not target:
+                fakes_port, app_port = free_port(), free_port()
+                fakes_url = f"http://127.0.0.1:{fakes_port}"
+                fake_args = ["--latency-scale", str(args.latency_scale), "--seed", str(args.seed)]
+                if args.profile:
+                    fake_args += ["--profile", os.path.abspath(args.profile)]
+                processes.append(start("benchmarks.loadtest.fakes", fakes_port, fake_args, {}))
+
+                env = {
+                    **upstream_env(fakes_url),
+                    "LOG_LEVEL": "WARNING",
+                    "NEARBY_SOURCE": "google",
+                    "PLACE_STORE_PATH": os.path.join(workdir, "place_details.sqlite3"),
+                    "FACILITY_INDEX_PATH": os.path.join(workdir, "facilities"),
+                }
+                if not args.keep_quotas:
+                    env.update({f"QUOTA_{api.upper()}_PER_MINUTE": "1000000" for api in DEFAULT_BUDGETS})
+                for item in args.env:
+                    key, _, value = item.partition("=")
+                    env[key] = value
+                processes.append(start("benchmarks.loadtest.app_server", app_port, [], env))
+                target = f"http://127.0.0.1:{app_port}"
+                asyncio.run(wait_ready(f"{fakes_url}/__fake/stats", processes[0]))
+            asyncio.run(wait_ready(f"{target}/stats/http", processes[-1] if processes else None))
+
+            print(f"Load testing {target} for {args.duration:.0f} s after {args.warmup:.0f} s warm-up "
+                  + (f"at {args.rate} sessions/s" if args.rate else f"with {args.users} users"), flush=True)
+            samples, measure_from, elapsed = asyncio.run(drive(target, args, config))
+            lag = asyncio.run(fetch_json(f"{target}{LAG_PATH}", since=measure_from))
+            upstream = asyncio.run(fetch_json(f"{fakes_url}/__fake/stats")) if fakes_url else None
+        finally:
+            for process in reversed(processes):
+                process.terminate()
+            for process in processes:
+                try:
+                    process.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+
+    summary = summarize(samples, elapsed, lag, upstream)
+    print(render(summary))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# backend/benchmarks/loadtest/app_server.py
+"""
+Runs the backend (main.app) under uvicorn for a load test, with an
+event-loop lag probe on the serving loop.
+
+The probe sleeps `interval` seconds at a time and records, with a
+wall-clock timestamp, how late each wake-up was. The samples are served at
+GET /__loadtest/lag?since=<unix time> so the load generator can line them up
+with its own request timings. Everything else comes from the environment,
+exactly as in production; `python -m benchmarks.loadtest` sets it up.
+
+Usage (from the backend folder):
+    python -m benchmarks.loadtest.app_server [--port 8000] [--lag-interval 0.01]
+"""
+import time
+import bisect
+import asyncio
+import argparse
+from collections import deque
+
+LAG_PATH = "/__loadtest/lag"
+
+
+class LoopLagProbe:
+    """Samples scheduling delay of the running event loop."""
+
+    def __init__(self, interval: float = 0.01, max_samples: int = 1_000_000):
+        self.interval = interval
+        self.times: deque = deque(maxlen=max_samples)
+        self.lags: deque = deque(maxlen=max_samples)
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.lags.append(max(0.0, loop.time() - expected))
+            self.times.append(time.time())
+
+    def samples(self, since: float = 0.0) -> dict:
+        """Samples taken after the unix time `since`."""
+        times = list(self.times)
+        start = bisect.bisect_left(times, since)
+        return {"interval": self.interval, "times": times[start:], "lags": list(self.lags)[start:]}
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--lag-interval", type=float, default=0.01, help="probe period in seconds")
+    args = parser.parse_args()
+
+    import main as backend
+
+    probe = LoopLagProbe(args.lag_interval)
+    backend.app.add_api_route(LAG_PATH, probe.samples, methods=["GET"], include_in_schema=False)
+
+    config = uvicorn.Config(backend.app, host=args.host, port=args.port, log_level="warning",
+                            access_log=False, lifespan="on")
+    # Same loop implementation uvicorn would pick (uvloop when installed)
+    config.setup_event_loop()
+    server = uvicorn.Server(config)
+
+    async def serve():
+        task = asyncio.ensure_future(probe.run())
+        try:
+            await server.serve()
+        finally:
+            task.cancel()
+
+    asyncio.run(serve())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,524 @@
+# backend/benchmarks/loadtest/fakes.py
+"""
+Local stand-ins for every API the backend calls.
+
+One FastAPI app answers for all of them, each under the path the real API
+uses, so the backend only needs its base URLs pointed here (see
+`upstream_env`):
+
+- Places (New) `places:searchNearby` and place details
+- Routes `computeRoutes` and `computeRouteMatrix`
+- legacy Directions and Geocoding (maps.googleapis.com)
+- Gemini `generateContent` / `streamGenerateContent` (REST transport)
+- Supabase PostgREST (`/rest/v1/<table>`)
+
+Responses are synthetic but shaped like the real ones: hospitals scattered
+around the search centre with stable ids, routes with realistic step counts
+and polylines, X-Goog-FieldMask honoured. Each endpoint gets a latency drawn
+from a log-normal fitted to a median and p99, an error mix and an optional
+stall rate (requests that hang for `stall_s`, to exercise client timeouts);
+see DEFAULT_PROFILE. A JSON file with the same shape overrides it per
+endpoint.
+
+Usage (from the backend folder), normally started by `python -m benchmarks.loadtest`:
+    python -m benchmarks.loadtest.fakes [--port 9100] [--profile profile.json] [--latency-scale 1.0]
+"""
+import json
+import math
+import random
+import asyncio
+import argparse
+import hashlib
+from typing import Dict, List, Optional
+
+import numpy as np
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from app.services.route_geometry import encode_polyline, haversine_distances_m
+from app.services.country_resolver import get_country_resolver
+
+# Latency in milliseconds and error rates per stand-in endpoint, close to what
+# the real APIs show from a US region. Endpoint names match http_client's.
+DEFAULT_PROFILE = {
+    "places_nearby": {"median_ms": 180, "p99_ms": 900, "errors": {"503": 0.002}},
+    "places_details": {"median_ms": 120, "p99_ms": 600, "errors": {"503": 0.002}},
+    "routes": {"median_ms": 250, "p99_ms": 1200, "errors": {"503": 0.002}},
+    "route_matrix": {"median_ms": 300, "p99_ms": 1500, "errors": {"503": 0.002}},
+    "directions": {"median_ms": 220, "p99_ms": 1000, "errors": {"503": 0.002}},
+    "geocode": {"median_ms": 90, "p99_ms": 400},
+    # Time to the whole answer; streamed answers send the first chunk after
+    # `first_chunk_ratio` of it and the rest every `chunk_interval_ms`
+    "gemini": {"median_ms": 2500, "p99_ms": 9000, "errors": {"429": 0.01, "503": 0.005},
+               "first_chunk_ratio": 0.25, "chunk_interval_ms": 80},
+    "supabase": {"median_ms": 40, "p99_ms": 200},
+}
+
+ERROR_STATUS = {400: "INVALID_ARGUMENT", 403: "PERMISSION_DENIED", 404: "NOT_FOUND",
+                429: "RESOURCE_EXHAUSTED", 500: "INTERNAL", 503: "UNAVAILABLE"}
+
+# Average driving speed and detour factor for synthetic routes
+DRIVE_SPEED_MS = 13.0
+ROAD_FACTOR = 1.3
+
+ADVICE = """\
+**1. Medical Assessment:**
+The symptoms described are most consistent with a mild, self-limiting condition. Confidence is moderate
+because the description is short; a clinician should confirm it.
+
+**2. Severity Level:**
+Mild. Most people recover within a few days; seek care if symptoms worsen or last longer than a week.
+
+**3. Recommended Healthcare Provider:**
+Schedule an appointment with a primary care doctor within 3-5 days, or visit urgent care if it gets worse.
+
+**4. Immediate Relief Measures:**
+* Rest and drink plenty of fluids
+* Take 500-1000mg acetaminophen every 6 hours as needed, no more than 3000mg a day
+* Apply a cool compress for 15 minutes every hour
+
+**5. Warning Signs:**
+* High fever above 103F (39.4C)
+* Confusion, stiff neck or difficulty breathing
+* Symptoms that keep getting worse after 48 hours
+""" * 2
+
+
+class EndpointProfile:
+    """Latency, error and stall behaviour of one stand-in endpoint."""
+
+    def __init__(self, median_ms: float = 100, p99_ms: Optional[float] = None,
+                 errors: Optional[Dict[str, float]] = None, stall_rate: float = 0.0,
+                 stall_s: float = 60.0, **extra):
+        p99_ms = max(p99_ms or median_ms, median_ms)
+        self.mu = math.log(max(median_ms, 0.001) / 1000)
+        # 2.326 is the 99th percentile of the standard normal
+        self.sigma = (math.log(p99_ms) - math.log(max(median_ms, 0.001))) / 2.326
+        self.errors = [(int(status), float(rate)) for status, rate in (errors or {}).items()]
+        self.stall_rate = stall_rate
+        self.stall_s = stall_s
+        self.extra = extra
+
+    def delay(self, rng: random.Random, scale: float = 1.0) -> float:
+        """Seconds to wait before answering."""
+        if self.stall_rate and rng.random() < self.stall_rate:
+            return self.stall_s
+        return rng.lognormvariate(self.mu, self.sigma) * scale
+
+    def error(self, rng: random.Random) -> Optional[int]:
+        """HTTP status of an injected failure, or None."""
+        draw = rng.random()
+        for status, rate in self.errors:
+            if draw < rate:
+                return status
+            draw -= rate
+        return None
+
+
+def load_profile(path: Optional[str] = None) -> Dict[str, EndpointProfile]:
+    """DEFAULT_PROFILE, with the endpoints present in the JSON file at `path` replaced."""
+    settings = {name: dict(values) for name, values in DEFAULT_PROFILE.items()}
+    if path:
+        with open(path) as f:
+            for name, values in json.load(f).items():
+                if name not in settings:
+                    raise ValueError(f"Unknown endpoint '{name}' in {path}; expected one of {sorted(settings)}")
+                settings[name].update(values)
+    return {name: EndpointProfile(**values) for name, values in settings.items()}
+
+
+def project(value, mask: Optional[str]):
+    """Apply a Google field mask ("routes.legs.steps.distanceMeters,...") to a response."""
+    if not mask or mask.strip() == "*":
+        return value
+    tree: dict = {}
+    for path in mask.split(","):
+        node = tree
+        for part in path.strip().split("."):
+            node = node.setdefault(part, {})
+
+    def apply(item, node):
+        if not node:
+            return item
+        if isinstance(item, list):
+            return [apply(element, node) for element in item]
+        if isinstance(item, dict):
+            return {key: apply(item[key], child) for key, child in node.items() if key in item}
+        return item
+
+    return apply(value, tree)
+
+
+def _seed(*values) -> int:
+    return int.from_bytes(hashlib.blake2b(repr(values).encode(), digest_size=8).digest(), "big")
+
+
+def place_id_for(latitude: float, longitude: float) -> str:
+    """Place ids carry their location, so details need no shared state."""
+    return f"fake_{latitude:.6f}_{longitude:.6f}"
+
+
+def place_location(place_id: str):
+    _, latitude, longitude = place_id.split("_")
+    return float(latitude), float(longitude)
+
+
+def place_record(place_id: str) -> dict:
+    """Places (New) resource for a synthetic hospital."""
+    latitude, longitude = place_location(place_id)
+    rng = random.Random(_seed(place_id))
+    number = rng.randint(100, 9999)
+    phone = f"({rng.randint(201, 989)}) 555-{rng.randint(1000, 9999)}"
+    return {
+        "id": place_id,
+        "displayName": {"text": f"{rng.choice(['St. Mary', 'Regional', 'Mercy', 'County', 'Memorial'])} "
+                                f"{rng.choice(['Medical Center', 'Hospital', 'Health'])} {number % 97}",
+                        "languageCode": "en"},
+        "formattedAddress": f"{number} {rng.choice(['Main', 'Oak', 'Hospital', 'Central'])} St",
+        "location": {"latitude": latitude, "longitude": longitude},
+        "rating": round(rng.uniform(2.5, 4.9), 1),
+        "nationalPhoneNumber": phone,
+        "internationalPhoneNumber": "+1 " + phone.replace("(", "").replace(")", ""),
+        "types": ["hospital", "health", "point_of_interest", "establishment"],
+    }
+
+
+def nearby_places(latitude: float, longitude: float, radius: float, count: int) -> List[dict]:
+    """Hospitals around a centre; the same ~1 km cell always yields the same ones."""
+    rng = random.Random(_seed(round(latitude, 2), round(longitude, 2), round(radius, -3)))
+    places = []
+    for _ in range(count):
+        distance = radius * math.sqrt(rng.random())
+        bearing = rng.uniform(0, 2 * math.pi)
+        lat = latitude + distance * math.cos(bearing) / 111_320
+        lng = longitude + distance * math.sin(bearing) / (111_320 * max(math.cos(math.radians(latitude)), 0.01))
+        places.append(place_record(place_id_for(lat, lng)))
+    return places
+
+
+def route_path(origin, destination, seed: int):
+    """
+    Road-like polyline between two points, split into steps. Returns
+    (steps as (n, 2) arrays, distance in metres).
+    """
+    rng = np.random.default_rng(seed)
+    straight = float(haversine_distances_m(origin[0], origin[1], [destination[0]], [destination[1]])[0])
+    distance = max(straight * ROAD_FACTOR, 50.0)
+    # A vertex every ~60 m, like Google's detailed polylines, and a step every ~1.5 km
+    vertices = int(min(max(distance / 60, 8), 20000))
+    step_count = int(min(max(distance / 1500, 3), 60))
+    t = np.linspace(0.0, 1.0, vertices)
+    wiggle = np.sin(t * math.pi) * rng.normal(0, 0.05, 1)[0]
+    lat = origin[0] + (destination[0] - origin[0]) * t + wiggle * (destination[1] - origin[1]) * 0.2
+    lng = origin[1] + (destination[1] - origin[1]) * t - wiggle * (destination[0] - origin[0]) * 0.2
+    lat += rng.normal(0, 0.00005, vertices).cumsum() * (t * (1 - t))
+    coords = np.column_stack((lat, lng))
+    bounds = np.linspace(0, vertices - 1, step_count + 1).astype(int)
+    return [coords[bounds[i]:bounds[i + 1] + 1] for i in range(step_count)], distance
+
+
+MANEUVERS = [("TURN_LEFT", "Turn left onto {}"), ("TURN_RIGHT", "Turn right onto {}"),
+             ("STRAIGHT", "Continue onto {}"), ("RAMP_RIGHT", "Take the ramp onto {}"),
+             ("MERGE", "Merge onto {}")]
+STREETS = ["Main St", "Central Ave", "US-491 N", "I-40 W", "Hospital Dr", "Oak St", "Route 66"]
+
+
+def _step_texts(index: int, rng: random.Random):
+    maneuver, text = MANEUVERS[index % len(MANEUVERS)] if index else ("DEPART", "Head north on {}")
+    return maneuver, text.format(rng.choice(STREETS))
+
+
+def _latlng(point) -> dict:
+    return {"latitude": float(point[0]), "longitude": float(point[1])}
+
+
+def compute_routes_response(origin, destination) -> dict:
+    """Routes API computeRoutes answer with one route and one leg."""
+    seed = _seed(round(origin[0], 4), round(origin[1], 4), round(destination[0], 4), round(destination[1], 4))
+    parts, distance = route_path(origin, destination, seed)
+    rng = random.Random(seed)
+    total = len(parts)
+    steps = []
+    for i, part in enumerate(parts):
+        maneuver, text = _step_texts(i, rng)
+        step_distance = int(distance / total)
+        steps.append({
+            "distanceMeters": step_distance,
+            "staticDuration": f"{int(step_distance / DRIVE_SPEED_MS)}s",
+            "polyline": {"encodedPolyline": encode_polyline(part)},
+            "startLocation": {"latLng": _latlng(part[0])},
+            "endLocation": {"latLng": _latlng(part[-1])},
+            "navigationInstruction": {"maneuver": maneuver, "instructions": text},
+        })
+    duration = int(distance / DRIVE_SPEED_MS * rng.uniform(1.0, 1.4))
+    full = np.concatenate([part[:-1] for part in parts] + [parts[-1][-1:]])
+    return {"routes": [{
+        "legs": [{"steps": steps, "distanceMeters": int(distance), "duration": f"{duration}s",
+                  "staticDuration": f"{int(distance / DRIVE_SPEED_MS)}s"}],
+        "distanceMeters": int(distance),
+        "duration": f"{duration}s",
+        "staticDuration": f"{int(distance / DRIVE_SPEED_MS)}s",
+        "polyline": {"encodedPolyline": encode_polyline(full)},
+    }]}
+
+
+def _text_distance(meters: float) -> str:
+    miles = meters * 0.000621371
+    return f"{miles:.1f} mi" if miles >= 0.1 else f"{meters * 3.28084:.0f} ft"
+
+
+def _text_duration(seconds: float) -> str:
+    minutes = max(1, int(seconds // 60))
+    return f"{minutes // 60} hours {minutes % 60} mins" if minutes >= 60 else f"{minutes} mins"
+
+
+def directions_response(origin, destination, alternatives: bool) -> dict:
+    """Legacy Directions API answer; alternatives add two more, slightly longer routes."""
+    routes = []
+    for variant in range(3 if alternatives else 1):
+        seed = _seed(round(origin[0], 4), round(origin[1], 4), round(destination[0], 4),
+                     round(destination[1], 4), variant)
+        parts, distance = route_path(origin, destination, seed)
+        distance *= 1 + 0.08 * variant
+        rng = random.Random(seed)
+        steps = []
+        for i, part in enumerate(parts):
+            _, text = _step_texts(i, rng)
+            step_distance = distance / len(parts)
+            text = text.replace("onto ", "onto <b>") + "</b>" if "onto" in text else text
+            if i == len(parts) - 1:
+                text += '<div style="font-size:0.9em">Destination will be on the right</div>'
+            steps.append({
+                "html_instructions": text,
+                "distance": {"text": _text_distance(step_distance), "value": int(step_distance)},
+                "duration": {"text": _text_duration(step_distance / DRIVE_SPEED_MS),
+                             "value": int(step_distance / DRIVE_SPEED_MS)},
+                "polyline": {"points": encode_polyline(part)},
+                "start_location": {"lat": float(part[0][0]), "lng": float(part[0][1])},
+                "end_location": {"lat": float(part[-1][0]), "lng": float(part[-1][1])},
+                "travel_mode": "DRIVING",
+            })
+        static = distance / DRIVE_SPEED_MS
+        traffic = static * rng.uniform(1.0, 1.4)
+        routes.append({
+            "summary": rng.choice(STREETS),
+            "legs": [{
+                "steps": steps,
+                "distance": {"text": _text_distance(distance), "value": int(distance)},
+                "duration": {"text": _text_duration(static), "value": int(static)},
+                "duration_in_traffic": {"text": _text_duration(traffic), "value": int(traffic)},
+                "start_location": {"lat": origin[0], "lng": origin[1]},
+                "end_location": {"lat": destination[0], "lng": destination[1]},
+                "start_address": "Origin", "end_address": "Destination",
+            }],
+        })
+    return {"geocoded_waypoints": [], "routes": routes, "status": "OK"}
+
+
+def _parse_point(text: str):
+    latitude, longitude = (float(part) for part in text.split(","))
+    return latitude, longitude
+
+
+def _waypoint(entry: dict):
+    lat_lng = (entry.get("waypoint", entry).get("location") or {}).get("latLng") or {}
+    return lat_lng.get("latitude", 0.0), lat_lng.get("longitude", 0.0)
+
+
+class FakeUpstreams:
+    """The stand-in app plus per-endpoint request counters."""
+
+    def __init__(self, profile: Optional[Dict[str, EndpointProfile]] = None,
+                 latency_scale: float = 1.0, seed: Optional[int] = None):
+        self.profile = profile or load_profile()
+        self.latency_scale = latency_scale
+        self.rng = random.Random(seed)
+        self.counts = {name: {"requests": 0, "errors": 0} for name in self.profile}
+        self.users: Dict[str, dict] = {}
+        self.app = self._build()
+
+    async def _behave(self, endpoint: str) -> Optional[JSONResponse]:
+        """Sleep for the endpoint's latency; return an error response to send instead, if any."""
+        profile = self.profile[endpoint]
+        self.counts[endpoint]["requests"] += 1
+        await asyncio.sleep(profile.delay(self.rng, self.latency_scale))
+        status = profile.error(self.rng)
+        if status is None:
+            return None
+        self.counts[endpoint]["errors"] += 1
+        if endpoint == "supabase":
+            return JSONResponse(status_code=status, content={"code": str(status), "message": "injected failure"})
+        return JSONResponse(status_code=status, content={"error": {
+            "code": status, "message": "Injected failure from the load-test stand-in",
+            "status": ERROR_STATUS.get(status, "UNKNOWN"),
+        }})
+
+    def _build(self) -> FastAPI:
+        app = FastAPI(title="Upstream stand-ins", openapi_url=None)
+
+        @app.post("/v1/places:searchNearby")
+        async def search_nearby(request: Request):
+            body = await request.json()
+            if (failure := await self._behave("places_nearby")) is not None:
+                return failure
+            circle = body["locationRestriction"]["circle"]
+            places = nearby_places(circle["center"]["latitude"], circle["center"]["longitude"],
+                                   float(circle["radius"]), int(body.get("maxResultCount", 20)))
+            return project({"places": places}, request.headers.get("x-goog-fieldmask"))
+
+        @app.get("/v1/places/{place_id}")
+        async def place_details(place_id: str, request: Request):
+            if (failure := await self._behave("places_details")) is not None:
+                return failure
+            try:
+                record = place_record(place_id)
+            except ValueError:
+                return JSONResponse(status_code=404, content={"error": {
+                    "code": 404, "message": f"Place '{place_id}' not found", "status": "NOT_FOUND"}})
+            return project(record, request.headers.get("x-goog-fieldmask"))
+
+        @app.post("/directions/v2:computeRoutes")
+        async def compute_routes(request: Request):
+            body = await request.json()
+            if (failure := await self._behave("routes")) is not None:
+                return failure
+            response = compute_routes_response(_waypoint(body["origin"]), _waypoint(body["destination"]))
+            return project(response, request.headers.get("x-goog-fieldmask"))
+
+        @app.post("/distanceMatrix/v2:computeRouteMatrix")
+        async def compute_route_matrix(request: Request):
+            body = await request.json()
+            if (failure := await self._behave("route_matrix")) is not None:
+                return failure
+            elements = []
+            for o, origin in enumerate(body["origins"]):
+                origin = _waypoint(origin)
+                for d, destination in enumerate(body["destinations"]):
+                    destination = _waypoint(destination)
+                    meters = float(haversine_distances_m(
+                        origin[0], origin[1], [destination[0]], [destination[1]])[0]) * ROAD_FACTOR
+                    seconds = meters / DRIVE_SPEED_MS * self.rng.uniform(1.0, 1.4)
+                    elements.append({"originIndex": o, "destinationIndex": d, "status": {},
+                                     "condition": "ROUTE_EXISTS", "distanceMeters": int(meters),
+                                     "duration": f"{int(seconds)}s"})
+            return project(elements, request.headers.get("x-goog-fieldmask"))
+
+        @app.get("/maps/api/directions/json")
+        async def directions(origin: str, destination: str, alternatives: str = "false"):
+            if (failure := await self._behave("directions")) is not None:
+                return failure
+            return directions_response(_parse_point(origin), _parse_point(destination),
+                                       alternatives.lower() == "true")
+
+        @app.get("/maps/api/geocode/json")
+        async def geocode(latlng: str):
+            if (failure := await self._behave("geocode")) is not None:
+                return failure
+            code = get_country_resolver().lookup(*_parse_point(latlng)).code
+            if code is None:
+                return {"results": [], "status": "ZERO_RESULTS"}
+            return {"results": [{"address_components": [
+                {"long_name": code, "short_name": code, "types": ["country", "political"]}
+            ], "types": ["country", "political"]}], "status": "OK"}
+
+        @app.post("/v1beta/models/{model}:generateContent")
+        async def generate_content(model: str):
+            if (failure := await self._behave("gemini")) is not None:
+                return failure
+            return self._gemini_payload(ADVICE)
+
+        @app.post("/v1beta/models/{model}:streamGenerateContent")
+        async def stream_generate_content(model: str):
+            profile = self.profile["gemini"]
+            self.counts["gemini"]["requests"] += 1
+            status = profile.error(self.rng)
+            total = profile.delay(self.rng, self.latency_scale)
+            if status is not None:
+                self.counts["gemini"]["errors"] += 1
+                await asyncio.sleep(total)
+                return JSONResponse(status_code=status, content={"error": {
+                    "code": status, "message": "Injected failure", "status": ERROR_STATUS.get(status, "UNKNOWN")}})
+            await asyncio.sleep(total * profile.extra.get("first_chunk_ratio", 0.25))
+            interval = profile.extra.get("chunk_interval_ms", 80) / 1000 * self.latency_scale
+            chunks = [ADVICE[i:i + 200] for i in range(0, len(ADVICE), 200)]
+
+            async def events():
+                for i, chunk in enumerate(chunks):
+                    if i:
+                        await asyncio.sleep(interval)
+                    yield f"data: {json.dumps(self._gemini_payload(chunk))}\r\n\r\n"
+
+            return StreamingResponse(events(), media_type="text/event-stream")
+
+        @app.get("/rest/v1/{table}")
+        async def supabase_select(table: str, request: Request):
+            if (failure := await self._behave("supabase")) is not None:
+                return failure
+            phone = request.query_params.get("phone_number", "")
+            phone = phone[3:] if phone.startswith("eq.") else phone
+            user = self.users.get(phone) or {
+                "user_id": _seed(phone) % 100000, "phone_number": phone, "password": "loadtest",
+                "fist_name": "Load", "last_name": "Test",
+            }
+            return [user] if table == "userst" else []
+
+        @app.post("/rest/v1/{table}")
+        async def supabase_insert(table: str, request: Request):
+            body = await request.json()
+            if (failure := await self._behave("supabase")) is not None:
+                return failure
+            rows = body if isinstance(body, list) else [body]
+            for row in rows:
+                row.setdefault("user_id", _seed(json.dumps(row, sort_keys=True)) % 100000)
+                if table == "userst":
+                    self.users[row.get("phonen") or row.get("phone_number", "")] = row
+            return JSONResponse(status_code=201, content=rows)
+
+        @app.get("/__fake/stats")
+        async def stats():
+            return self.counts
+
+        return app
+
+    @staticmethod
+    def _gemini_payload(text: str) -> dict:
+        return {
+            "candidates": [{"content": {"parts": [{"text": text}], "role": "model"},
+                            "finishReason": "STOP", "index": 0}],
+            "usageMetadata": {"promptTokenCount": 120, "candidatesTokenCount": len(text) // 4,
+                              "totalTokenCount": 120 + len(text) // 4},
+        }
+
+
+def upstream_env(base_url: str) -> Dict[str, str]:
+    """Environment that points the backend at stand-ins served from `base_url`."""
+    return {
+        "UPSTREAM_URL_PLACES": base_url,
+        "UPSTREAM_URL_ROUTES": base_url,
+        "UPSTREAM_URL_MAPS": base_url,
+        "GEMINI_API_ENDPOINT": base_url,
+        "SUPABASE_URL": base_url,
+        "GOOGLEMAPS_API_KEY": "loadtest",
+        "GEMINI_API_KEY": "loadtest",
+        # supabase-py only accepts keys shaped like a JWT
+        "SUPABASE_KEY": "loadtest.loadtest.loadtest",
+    }
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--profile", help="JSON file overriding DEFAULT_PROFILE per endpoint")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="multiply every latency by this")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    fakes = FakeUpstreams(load_profile(args.profile), args.latency_scale, args.seed)
+    uvicorn.run(fakes.app, host=args.host, port=args.port, log_level="warning", access_log=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# backend/benchmarks/loadtest/report.py
+"""
+Per-endpoint results of a load test: throughput, latency percentiles and
+the event-loop lag each endpoint's requests ran into.
+
+Lag is attributed per request: the worst probe sample taken while the
+request was in flight on the server. An endpoint's "lag p99" is therefore
+the 99th percentile of the worst loop stall its requests sat through, and
+the overall line is the distribution of every probe sample.
+"""
+import bisect
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from benchmarks.loadtest.workload import Sample
+
+
+def _percentiles_ms(values) -> Dict[str, Optional[float]]:
+    if len(values) == 0:
+        return {"p50": None, "p95": None, "p99": None, "max": None}
+    p50, p95, p99 = np.percentile(values, [50, 95, 99]) * 1000
+    return {"p50": round(float(p50), 1), "p95": round(float(p95), 1),
+            "p99": round(float(p99), 1), "max": round(float(np.max(values)) * 1000, 1)}
+
+
+def summarize(samples: List[Sample], elapsed: float, lag: Optional[dict] = None,
+              upstream: Optional[dict] = None) -> dict:
+    """Aggregate request samples (and probe samples, when the server exposed them)."""
+    lag_times = lag["times"] if lag else []
+    lag_values = lag["lags"] if lag else []
+
+    by_name: Dict[str, List[Sample]] = {}
+    for sample in samples:
+        by_name.setdefault(sample.name, []).append(sample)
+
+    endpoints = {}
+    for name in sorted(by_name):
+        group = by_name[name]
+        latencies = np.array([s.latency for s in group])
+        entry = {
+            "requests": len(group),
+            "errors": sum(1 for s in group if not s.ok),
+            "rps": round(len(group) / elapsed, 2),
+            "latency_ms": _percentiles_ms(latencies),
+        }
+        statuses: Dict[str, int] = {}
+        for s in group:
+            statuses[str(s.status)] = statuses.get(str(s.status), 0) + 1
+        entry["statuses"] = statuses
+        if lag_times:
+            worst = []
+            for s in group:
+                lo = bisect.bisect_left(lag_times, s.start)
+                hi = bisect.bisect_right(lag_times, s.end)
+                worst.append(max(lag_values[lo:hi], default=0.0))
+            entry["loop_lag_ms"] = _percentiles_ms(np.array(worst))
+        endpoints[name] = entry
+
+    result = {
+        "elapsed_s": round(elapsed, 1),
+        "requests": len(samples),
+        "rps": round(len(samples) / elapsed, 2) if elapsed else 0.0,
+        "endpoints": endpoints,
+    }
+    if lag_values:
+        result["loop_lag_ms"] = _percentiles_ms(np.array(lag_values))
+    if upstream:
+        result["upstream"] = upstream
+    return result
+
+
+def _fmt(value) -> str:
+    return "-" if value is None else f"{value:.1f}"
+
+
+def render(summary: dict) -> str:
+    """Plain-text table of a summary."""
+    header = (f"{'endpoint':<30} {'reqs':>7} {'err':>5} {'rps':>7} {'p50 ms':>8} {'p95 ms':>8} "
+              f"{'p99 ms':>8} {'max ms':>8} {'lag p99':>8} {'lag max':>8}")
+    lines = [header, "-" * len(header)]
+    for name, entry in summary["endpoints"].items():
+        latency = entry["latency_ms"]
+        lag = entry.get("loop_lag_ms", {})
+        lines.append(
+            f"{name:<30} {entry['requests']:>7} {entry['errors']:>5} {entry['rps']:>7.2f} "
+            f"{_fmt(latency['p50']):>8} {_fmt(latency['p95']):>8} {_fmt(latency['p99']):>8} "
+            f"{_fmt(latency['max']):>8} {_fmt(lag.get('p99')):>8} {_fmt(lag.get('max')):>8}"
+        )
+    lines.append(f"\n{summary['requests']} requests in {summary['elapsed_s']} s, {summary['rps']:.2f} req/s")
+    if "loop_lag_ms" in summary:
+        lag = summary["loop_lag_ms"]
+        lines.append(f"event loop lag: p50 {_fmt(lag['p50'])} ms, p95 {_fmt(lag['p95'])} ms, "
+                     f"p99 {_fmt(lag['p99'])} ms, max {_fmt(lag['max'])} ms")
+    if summary.get("upstream"):
+        calls = ", ".join(f"{name} {counts['requests']}" + (f" ({counts['errors']} failed)" if counts["errors"] else "")
+                          for name, counts in summary["upstream"].items() if counts["requests"])
+        lines.append(f"upstream calls: {calls or 'none'}")
+    return "\n".join(lines)
@@ -0,0 +1,195 @@
+# backend/benchmarks/loadtest/workload.py
+"""
+User sessions that replay the mobile app's calls against the backend.
+
+A patient session follows the app screen by screen:
+
+1. MedicalForm.js posts the form to POST /medicalpost;
+2. resultsScreen.js asks GET /api/places/nearest-care (radius 10 km,
+   hospitals, rank=eta) for the hospital, its details and the steps, with
+   the emergency answer's `priority_token` as `X-Priority-Token`;
+3. if the user opens the map, MapComponent.js calls
+   GET /directions?format=polyline once and again on every location update
+   (watchPositionAsync fires every 5 s) while driving towards the hospital.
+
+An account session logs in, or signs up first, through POST /login and
+POST /users (the Supabase-backed routes). Think times are real-world
+seconds multiplied by `time_scale`, so a test can compress a session.
+"""
+import math
+import time
+import random
+from typing import Callable, Dict, List, Optional
+
+import httpx
+
+# Where users are: cities near borders exercise the Geocoding fallback
+METROS = [
+    ("Albuquerque, NM", 35.0844, -106.6504),
+    ("Gallup, NM", 35.5281, -108.7426),
+    ("El Paso, TX", 31.7619, -106.4850),
+    ("Phoenix, AZ", 33.4484, -112.0740),
+    ("Denver, CO", 39.7392, -104.9903),
+    ("Detroit, MI", 42.3314, -83.0458),
+    ("San Diego, CA", 32.7157, -117.1611),
+    ("Chicago, IL", 41.8781, -87.6298),
+    ("Houston, TX", 29.7604, -95.3698),
+    ("Seattle, WA", 47.6062, -122.3321),
+]
+
+ISSUES = [
+    "headache and mild fever since yesterday",
+    "sore throat and cough for three days",
+    "twisted my ankle and it is swollen",
+    "stomach pain and nausea after eating",
+    "itchy rash on my arm",
+    "back pain after lifting a box",
+    "chest pain spreading to my left arm and shortness of breath",
+    "my father collapsed and is not breathing",
+    "severe bleeding from a deep cut on my leg",
+]
+
+LANGUAGES = ["English", "English", "English", "Spanish", "Vietnamese"]
+
+# Seconds between location updates in MapComponent.js (timeInterval)
+LOCATION_INTERVAL = 5.0
+DRIVE_SPEED_MS = 13.0
+
+
+class Sample:
+    """One request as seen by the client."""
+
+    __slots__ = ("name", "start", "end", "status")
+
+    def __init__(self, name: str, start: float, end: float, status: int):
+        self.name = name
+        self.start = start
+        self.end = end
+        self.status = status
+
+    @property
+    def latency(self) -> float:
+        return self.end - self.start
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status < 400
+
+
+class WorkloadConfig:
+    """Knobs of the simulated users."""
+
+    def __init__(self, time_scale: float = 0.1, map_probability: float = 0.6,
+                 max_location_updates: int = 12, issue_variety: float = 0.5,
+                 mix: Optional[Dict[str, float]] = None):
+        self.time_scale = time_scale
+        self.map_probability = map_probability
+        self.max_location_updates = max_location_updates
+        # Share of forms whose wording is unique, so the advice cache cannot answer them
+        self.issue_variety = issue_variety
+        self.mix = mix or {"patient": 0.95, "account": 0.05}
+
+
+class Session:
+    """One simulated user; every request is appended to `samples`."""
+
+    def __init__(self, client: httpx.AsyncClient, config: WorkloadConfig, rng: random.Random,
+                 samples: List[Sample], sleep: Callable):
+        self.client = client
+        self.config = config
+        self.rng = rng
+        self.samples = samples
+        self.sleep = sleep
+
+    async def call(self, name: str, method: str, url: str, **kwargs) -> Optional[httpx.Response]:
+        start = time.time()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+            status = response.status_code
+        except httpx.HTTPError:
+            response, status = None, 0
+        self.samples.append(Sample(name, start, time.time(), status))
+        return response
+
+    async def think(self, low: float, high: float):
+        await self.sleep(self.rng.uniform(low, high) * self.config.time_scale)
+
+    def _origin(self):
+        city, latitude, longitude = self.rng.choice(METROS)
+        # Within ~8 km of the centre
+        latitude += self.rng.uniform(-0.07, 0.07)
+        longitude += self.rng.uniform(-0.07, 0.07) / max(math.cos(math.radians(latitude)), 0.1)
+        return city, latitude, longitude
+
+    async def patient(self):
+        city, latitude, longitude = self._origin()
+        issue = self.rng.choice(ISSUES)
+        if self.rng.random() < self.config.issue_variety:
+            issue += f", started about {self.rng.randint(1, 72)} hours ago"
+
+        # MedicalForm.js
+        await self.think(20, 60)
+        response = await self.call("POST /medicalpost", "POST", "/medicalpost", json={
+            "location": city, "language": self.rng.choice(LANGUAGES), "medical_issue": issue,
+            "latitude": latitude, "longitude": longitude,
+        })
+        token = None
+        if response is not None and response.status_code == 200:
+            token = response.json().get("priority_token")
+        headers = {"X-Priority-Token": token} if token else {}
+
+        # resultsScreen.js
+        response = await self.call(
+            "GET /api/places/nearest-care", "GET", "/api/places/nearest-care", headers=headers,
+            params={"latitude": latitude, "longitude": longitude, "radius": 10000,
+                    "place_type": "hospital", "rank": "eta"},
+        )
+        if response is None or response.status_code != 200:
+            return
+        details = response.json().get("details") or {}
+        location = (details.get("geometry") or {}).get("location") or {}
+        if location.get("lat") is None or self.rng.random() >= self.config.map_probability:
+            return
+
+        # MapComponent.js: directions on open, then on every location update
+        await self.think(5, 30)
+        destination = (location["lat"], location["lng"])
+        position = (latitude, longitude)
+        for _ in range(self.rng.randint(1, self.config.max_location_updates)):
+            await self.call(
+                "GET /directions", "GET", "/directions", headers=headers,
+                params={"origin": f"{position[0]},{position[1]}",
+                        "destination": f"{destination[0]},{destination[1]}", "format": "polyline"},
+            )
+            await self.sleep(LOCATION_INTERVAL * self.config.time_scale)
+            position = _towards(position, destination, DRIVE_SPEED_MS * LOCATION_INTERVAL)
+
+    async def account(self):
+        phone = f"505{self.rng.randint(1000000, 9999999)}"
+        await self.think(10, 30)
+        if self.rng.random() < 0.3:
+            await self.call("POST /users", "POST", "/users", json={
+                "phone_number": phone, "password": "loadtest", "full_name": "Load Test"})
+            await self.think(2, 5)
+        await self.call("POST /login", "POST", "/login", json={"phone_number": phone, "password": "loadtest"})
+
+    async def run_one(self):
+        """Run one session, picked according to the configured mix."""
+        names = list(self.config.mix)
+        name = self.rng.choices(names, weights=[self.config.mix[n] for n in names])[0]
+        await getattr(self, name)()
+
+
+SCENARIOS = ("patient", "account")
+
+
+def _towards(position, destination, meters: float):
+    """Move `meters` from `position` straight towards `destination`, stopping there."""
+    d_lat = (destination[0] - position[0]) * 111_320
+    d_lng = (destination[1] - position[1]) * 111_320 * math.cos(math.radians(position[0]))
+    remaining = math.hypot(d_lat, d_lng)
+    if remaining <= meters:
+        return destination
+    fraction = meters / remaining
+    return (position[0] + (destination[0] - position[0]) * fraction,
+            position[1] + (destination[1] - position[1]) * fraction)
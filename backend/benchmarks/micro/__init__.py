@@ -0,0 +1,7 @@
+"""
+Microbenchmarks of the CPU-bound request paths (polyline decoding,
+instruction HTML stripping, step formatting, place projection, prompt
+construction) with a stored baseline and a regression gate.
+
+Run with `python -m benchmarks.micro --help` from the backend folder.
+"""
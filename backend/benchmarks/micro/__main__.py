@@ -0,0 +1,170 @@
+# backend/benchmarks/micro/__main__.py
+"""
+Microbenchmarks for the CPU-bound request paths, with a regression gate.
+
+Each case in benchmarks/micro/cases.py is timed with timeit: the loop
+count is calibrated to run for at least --min-time seconds, repeated
+--repeat times, and the best per-call time is kept (the least disturbed
+by other processes).
+
+    run      time the cases and print them
+    save     time the cases and store them as the baseline
+    compare  time the cases and compare them with the baseline; exits with
+             status 1 when a case is slower than baseline * (1 + threshold).
+             Cases over the threshold are timed a second time before they
+             count as regressions.
+
+Baselines are only comparable on the machine and Python build that made
+them; compare warns when the stored machine description differs.
+
+Usage (from the backend folder):
+    python -m benchmarks.micro run [--filter polyline] [--json results.json]
+    python -m benchmarks.micro save [--baseline benchmarks/micro/baseline.json]
+    python -m benchmarks.micro compare [--threshold 0.25] [--baseline ...]
+"""
+import os
+import sys
+import gc
+import json
+import timeit
+import argparse
+import platform
+import statistics
+from typing import Dict, Optional
+
+import numpy as np
+
+from benchmarks.micro.cases import build_cases
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+DEFAULT_THRESHOLD = 0.25
+
+
+def machine() -> dict:
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def measure(fn, repeat: int = 7, min_time: float = 0.2) -> dict:
+    """Best and median seconds per call of `fn`, in microseconds."""
+    timer = timeit.Timer(fn)
+    number, elapsed = timer.autorange()
+    if elapsed < min_time:
+        number = max(1, int(number * min_time / max(elapsed, 1e-9)))
+    per_call = [t / number * 1e6 for t in timer.repeat(repeat, number)]
+    return {"best_us": round(min(per_call), 3), "median_us": round(statistics.median(per_call), 3),
+            "loops": number}
+
+
+def run(pattern: Optional[str], repeat: int, min_time: float) -> Dict[str, dict]:
+    results = {}
+    for name, fn in build_cases().items():
+        if pattern and pattern not in name:
+            continue
+        fn()  # warm caches and lazy imports
+        gc.collect()
+        results[name] = measure(fn, repeat, min_time)
+    return results
+
+
+def print_results(results: Dict[str, dict]):
+    print(f"{'case':<40} {'best us':>12} {'median us':>12} {'loops':>8}")
+    for name, result in results.items():
+        print(f"{name:<40} {result['best_us']:>12.2f} {result['median_us']:>12.2f} {result['loops']:>8}")
+
+
+def compare(results: Dict[str, dict], baseline: dict, threshold: float) -> Dict[str, str]:
+    """Status per case: ok, regressed, improved, new or missing."""
+    statuses = {}
+    stored = baseline.get("results", {})
+    for name in sorted(set(results) | set(stored)):
+        if name not in stored:
+            statuses[name] = "new"
+        elif name not in results:
+            statuses[name] = "missing"
+        else:
+            ratio = results[name]["best_us"] / stored[name]["best_us"]
+            statuses[name] = ("regressed" if ratio > 1 + threshold
+                              else "improved" if ratio < 1 - threshold else "ok")
+    return statuses
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=("run", "save", "compare"))
+    parser.add_argument("--filter", help="only cases whose name contains this")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown as a fraction of the baseline (default 0.25)")
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds per repeat")
+    parser.add_argument("--json", help="also write this run's results to this file")
+    args = parser.parse_args()
+
+    results = run(args.filter, args.repeat, args.min_time)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"machine": machine(), "results": results}, f, indent=2)
+
+    if args.command == "run":
+        print_results(results)
+        return
+
+    if args.command == "save":
+        baseline = {"machine": machine(), "results": results}
+        if args.filter and os.path.exists(args.baseline):
+            # Refresh only the selected cases
+            with open(args.baseline) as f:
+                stored = json.load(f)
+            baseline["results"] = {**stored.get("results", {}), **results}
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2)
+            f.write("\n")
+        print_results(results)
+        print(f"\nBaseline written to {args.baseline}")
+        return
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline.get("machine") != machine():
+        print("warning: the baseline was recorded on a different machine or Python build:\n"
+              f"  baseline: {baseline.get('machine')}\n  current:  {machine()}\n", file=sys.stderr)
+    if args.filter:
+        baseline["results"] = {name: r for name, r in baseline.get("results", {}).items() if args.filter in name}
+
+    statuses = compare(results, baseline, args.threshold)
+    # A single slow run is often noise; time those cases again and keep the better one
+    suspects = [name for name, status in statuses.items() if status == "regressed"]
+    if suspects:
+        cases = build_cases()
+        for name in suspects:
+            again = measure(cases[name], args.repeat, args.min_time)
+            if again["best_us"] < results[name]["best_us"]:
+                results[name] = again
+        statuses = compare(results, baseline, args.threshold)
+
+    stored = baseline.get("results", {})
+    print(f"{'case':<40} {'baseline us':>12} {'current us':>12} {'change':>8}  status")
+    for name, status in statuses.items():
+        before = stored.get(name, {}).get("best_us")
+        after = results.get(name, {}).get("best_us")
+        change = f"{(after / before - 1) * 100:+.1f}%" if before and after else "-"
+        print(f"{name:<40} {before if before is not None else '-':>12} "
+              f"{after if after is not None else '-':>12} {change:>8}  {status}")
+
+    regressed = [name for name, status in statuses.items() if status == "regressed"]
+    if regressed:
+        print(f"\n{len(regressed)} case(s) slower than the baseline by more than "
+              f"{args.threshold:.0%}: {', '.join(regressed)}", file=sys.stderr)
+        sys.exit(1)
+    print(f"\nNo regressions beyond {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
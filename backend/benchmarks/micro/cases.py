@@ -0,0 +1,68 @@
+# backend/benchmarks/micro/cases.py
+"""
+Microbenchmark cases for the CPU-bound request paths, with their fixtures.
+
+Fixtures are deterministic: a ~500 km drive (Albuquerque, NM to Pueblo, CO)
+shaped like the Routes and legacy Directions API answers, and a 20-result
+Places (New) nearby search, all built with the load-test stand-ins'
+generators. Each case is a zero-argument callable doing what one request
+does, so its time is the per-request cost.
+"""
+import os
+from typing import Callable, Dict
+
+# google_routes refuses to import without a key; no request is made
+os.environ.setdefault("GOOGLEMAPS_API_KEY", "benchmark")
+
+from app.services import route_geometry
+from app.services.advice_prompt import build_patient_content
+from app.core.google_routes import format_route_step, project_place, strip_instructions_html
+from benchmarks.loadtest.fakes import compute_routes_response, directions_response, nearby_places
+
+ORIGIN = (35.0844, -106.6504)
+DESTINATION = (38.2544, -104.6091)
+
+
+def route_500km() -> dict:
+    """Routes API computeRoutes answer for the 500 km fixture."""
+    return compute_routes_response(ORIGIN, DESTINATION)
+
+
+def directions_500km() -> dict:
+    """Legacy Directions API answer for the 500 km fixture, best route first."""
+    return directions_response(ORIGIN, DESTINATION, alternatives=True)
+
+
+def places_20() -> list:
+    """Places (New) searchNearby results: 20 hospitals within 10 km."""
+    return nearby_places(ORIGIN[0], ORIGIN[1], 10000, 20)
+
+
+def build_cases() -> Dict[str, Callable[[], object]]:
+    """Case name -> callable. Names are stable; baselines are keyed by them."""
+    route = route_500km()["routes"][0]
+    routes_steps = route["legs"][0]["steps"]
+    full_polyline = route["polyline"]["encodedPolyline"]
+    legacy_steps = directions_500km()["routes"][0]["legs"][0]["steps"]
+    step_polylines = [step["polyline"]["points"] for step in legacy_steps]
+    instructions = [step["html_instructions"] for step in legacy_steps]
+    places = places_20()
+
+    return {
+        # /api/places/routes and navigation: one overview polyline
+        "decode_polyline.route_500km": lambda: route_geometry.decode_polyline(full_polyline),
+        # /directions: every step polyline in one batch
+        "decode_polylines.steps_500km": lambda: route_geometry.decode_polylines(step_polylines),
+        # /directions: instruction text of every step
+        "strip_instructions_html.steps_500km": lambda: [strip_instructions_html(text) for text in instructions],
+        # /api/places/directions and nearest-care: Routes API steps to display text
+        "format_route_step.steps_500km": lambda: [format_route_step(step) for step in routes_steps],
+        # /api/places/nearby: search results to the cached dicts
+        "project_place.places_20": lambda: [project_place(place) for place in places],
+        # /medicalpost: per-request prompt content
+        "build_patient_content": lambda: build_patient_content(
+            "1901 Red Rock Dr, Gallup, NM 87301",
+            "chest pain spreading to my left arm and shortness of breath for 20 minutes",
+            "English",
+        ),
+    }
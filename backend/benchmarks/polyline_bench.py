@@ -0,0 +1,119 @@
+# backend/benchmarks/polyline_bench.py
+"""
+Polyline decoding and simplification microbenchmark.
+
+Compares the pure-Python per-vertex decoder that /directions used before
+(copied below as `legacy_decode_polyline`) with the batched NumPy decoder
+in app.services.route_geometry on synthetic road-like routes split into
+steps, then reports how many vertices survive simplification at a few
+phone zoom levels.
+
+Usage (from the backend folder):
+    python benchmarks/polyline_bench.py [--points 1000 10000 50000] [--steps 40]
+"""
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services import route_geometry
+
+
+def legacy_decode_polyline(polyline_str):
+    """The decoder previously defined in main.py, kept as the baseline."""
+    index = 0
+    lat = 0
+    lng = 0
+    coordinates = []
+    while index < len(polyline_str):
+        shift = 0
+        result = 0
+        while True:
+            byte = ord(polyline_str[index]) - 63
+            index += 1
+            result |= (byte & 0x1f) << shift
+            shift += 5
+            if byte < 0x20:
+                break
+        dlat = ~(result >> 1) if result & 1 else result >> 1
+        lat += dlat
+        shift = 0
+        result = 0
+        while True:
+            byte = ord(polyline_str[index]) - 63
+            index += 1
+            result |= (byte & 0x1f) << shift
+            shift += 5
+            if byte < 0x20:
+                break
+        dlng = ~(result >> 1) if result & 1 else result >> 1
+        lng += dlng
+        coordinates.append({"latitude": lat / 1e5, "longitude": lng / 1e5})
+    return coordinates
+
+
+def synthetic_route(points: int, seed: int = 0) -> np.ndarray:
+    """Road-like route: ~10 m vertices along a slowly turning heading."""
+    rng = np.random.default_rng(seed)
+    heading = np.cumsum(rng.normal(0, 0.05, points))
+    step_m = rng.uniform(5, 15, points)
+    dlat = step_m * np.cos(heading) / 111_320
+    dlng = step_m * np.sin(heading) / (111_320 * np.cos(np.radians(19.4)))
+    return np.column_stack((19.4 + np.cumsum(dlat), -99.1 + np.cumsum(dlng)))
+
+
+def best_of(fn, repeat: int = 5) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--points", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--steps", type=int, default=40, help="steps the route is split into")
+    args = parser.parse_args()
+
+    print(f"{'points':>8} {'legacy ms':>10} {'numpy ms':>9} {'speedup':>8} {'encode ms':>10}")
+    for n in args.points:
+        coords = synthetic_route(n)
+        bounds = np.linspace(0, n, args.steps + 1).astype(int)
+        # Consecutive steps share their boundary vertex, as Google's do
+        encoded = [route_geometry.encode_polyline(coords[a:b + 1]) for a, b in zip(bounds[:-1], bounds[1:])]
+
+        def legacy():
+            route = []
+            for e in encoded:
+                route.extend(legacy_decode_polyline(e))
+            return route
+
+        def vectorized():
+            return route_geometry.join_polylines(route_geometry.decode_polylines(encoded))
+
+        assert len(vectorized()) == n
+        legacy_ms = best_of(legacy)
+        numpy_ms = best_of(vectorized)
+        encode_ms = best_of(lambda: route_geometry.encode_polyline(coords))
+        print(f"{n:>8} {legacy_ms:>10.2f} {numpy_ms:>9.2f} {legacy_ms / numpy_ms:>7.1f}x {encode_ms:>10.2f}")
+
+    coords = route_geometry.join_polylines(route_geometry.decode_polylines(encoded))
+    print(f"\nsimplification of the {len(coords)}-point route")
+    print(f"{'zoom':>5} {'tol m':>7} {'dp pts':>7} {'dp ms':>7} {'vw pts':>7} {'vw ms':>7}")
+    for zoom in (10, 13, 15, 17):
+        tol = route_geometry.zoom_tolerance_m(zoom, 19.4)
+        dp = route_geometry.simplify(coords, zoom=zoom, method="dp")
+        vw = route_geometry.simplify(coords, zoom=zoom, method="vw")
+        dp_ms = best_of(lambda: route_geometry.simplify(coords, zoom=zoom, method="dp"), 3)
+        vw_ms = best_of(lambda: route_geometry.simplify(coords, zoom=zoom, method="vw"), 3)
+        print(f"{zoom:>5} {tol:>7.1f} {len(dp):>7} {dp_ms:>7.1f} {len(vw):>7} {vw_ms:>7.1f}")
+
+
+if __name__ == "__main__":
+    main()
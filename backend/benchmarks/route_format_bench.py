@@ -0,0 +1,55 @@
+# backend/benchmarks/route_format_bench.py
+"""
+Payload size of each /directions route wire format.
+
+Builds synthetic routes, serializes the route the way the endpoint does
+for every format (JSON exactly as FastAPI's JSONResponse renders it, or the
+binary frame) and reports raw and gzip sizes relative to the default
+verbose objects format, plus the time to build each payload.
+
+Usage (from the backend folder):
+    python benchmarks/route_format_bench.py [--points 200 2000 20000]
+"""
+import os
+import sys
+import gzip
+import json
+import time
+import argparse
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services import route_geometry
+from polyline_bench import synthetic_route
+
+
+def render(coords, fmt: str) -> bytes:
+    if fmt == "binary":
+        return route_geometry.pack_route(coords, {"distance": "", "duration": "", "steps": []})
+    body = {"route": route_geometry.format_route(coords, fmt), "distance": "", "duration": "", "steps": []}
+    return json.dumps(body, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--points", type=int, nargs="+", default=[200, 2000, 20000])
+    args = parser.parse_args()
+
+    for n in args.points:
+        coords = route_geometry.decode_polyline(route_geometry.encode_polyline(synthetic_route(n)))
+        print(f"\n{n} points")
+        print(f"{'format':>9} {'bytes':>9} {'ratio':>6} {'gzip':>8} {'ratio':>6} {'build ms':>9}")
+        baseline = baseline_gz = None
+        for fmt in route_geometry.ROUTE_FORMATS:
+            start = time.perf_counter()
+            payload = render(coords, fmt)
+            build_ms = (time.perf_counter() - start) * 1000
+            compressed = len(gzip.compress(payload))
+            if baseline is None:
+                baseline, baseline_gz = len(payload), compressed
+            print(f"{fmt:>9} {len(payload):>9} {len(payload) / baseline:>6.2f} "
+                  f"{compressed:>8} {compressed / baseline_gz:>6.2f} {build_ms:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+# backend/benchmarks/triage_bench.py
+"""
+Latency and recall of the local emergency triage.
+
+Runs every phrase in triage_phrases.json through TriageEngine.assess,
+reports precision and recall against the labels, lists the misses and
+measures per-call latency.
+
+Usage (from the backend folder):
+    python benchmarks/triage_bench.py [--repeat 2000]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.triage import TriageEngine
+
+PHRASES_PATH = Path(__file__).resolve().parent / "triage_phrases.json"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=2000, help="timed passes over the phrase set")
+    args = parser.parse_args()
+
+    with open(PHRASES_PATH, "r", encoding="utf-8") as f:
+        phrases = json.load(f)["phrases"]
+
+    start = time.perf_counter()
+    engine = TriageEngine()
+    build_ms = (time.perf_counter() - start) * 1000
+
+    tp = fp = fn = tn = 0
+    misses = []
+    for item in phrases:
+        flagged = engine.assess(item["text"]).emergency
+        if item["emergency"] and flagged:
+            tp += 1
+        elif item["emergency"]:
+            fn += 1
+            misses.append(("missed", item["text"]))
+        elif flagged:
+            fp += 1
+            misses.append(("false alarm", item["text"]))
+        else:
+            tn += 1
+
+    timings = []
+    for _ in range(args.repeat):
+        for item in phrases:
+            t0 = time.perf_counter()
+            engine.assess(item["text"])
+            timings.append(time.perf_counter() - t0)
+    timings.sort()
+
+    def us(p):
+        return timings[min(len(timings) - 1, int(p * len(timings)))] * 1e6
+
+    print(f"automaton build: {build_ms:.1f} ms")
+    print(f"phrases: {len(phrases)} ({tp + fn} emergency, {tn + fp} non-emergency)")
+    print(f"recall: {tp / (tp + fn):.3f}  precision: {tp / (tp + fp) if tp + fp else 0:.3f}")
+    print(f"latency per assess: p50 {us(0.50):.1f} us  p99 {us(0.99):.1f} us  max {timings[-1] * 1e6:.1f} us")
+    for kind, text in misses:
+        print(f"  {kind}: {text}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,63 @@
 from app.core import google_routes
-from fastapi import FastAPI, HTTPException, Query
+from app.core import navigation_routes
+from app.core import facility_routes
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from dotenv import load_dotenv
 from pydantic import BaseModel
-import requests
 import hashlib
+import logging
 import os
 import random
 import string
-from typing import List, Dict, Any
+import time
+from typing import List, Dict, Any, Optional
+from contextlib import asynccontextmanager
 from app.core.CreateUser_router import router as user_router
 from app.core.LoginUser_router import router as login_router
+from app.services.http_client import upstream, upstream_url
+from app.services.country_resolver import get_country_resolver
+from app.services.places_cache import nearby_cache
+from app.services.place_store import get_place_store
+from app.services.advice_queue import advice_limiter, AdviceQueueFull
+from app.services.advice_cache import advice_cache
+from app.services.advice_jobs import advice_jobs
+from app.services.triage import triage_engine, emergency_instructions
+from app.services import route_geometry
+from app.services.directions_cache import directions_cache
+from app.services.navigation import navigation_sessions
+from app.services.resilience import resilience
+from app.services.quota import quota, PriorityMiddleware, issue_emergency_token
+from app.services.facility_index import get_facility_registry
+from app.services import metrics
+from app.core.logging_config import configure_logging, log_payload, CorrelationIdMiddleware
+from app.services import timing
+from app.services.advice_stream import advice_events, encode_event, EMERGENCY_MARKER, MEDIA_TYPES, STREAM_HEADERS
 
 load_dotenv()
-app = FastAPI()
+configure_logging()
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Shared pooled HTTP clients for the Google APIs
+    await upstream.startup()
+    # Load the offline country boundaries before the first nearby search
+    get_country_resolver()
+    # Local facility index for offline nearby search; an unreadable export leaves it empty
+    try:
+        await get_facility_registry().reload_async()
+    except Exception as e:
+        logger.warning(f"Facility index not loaded: {e}")
+    yield
+    await upstream.shutdown()
+
+
+app = FastAPI(lifespan=lifespan)
+# Endpoints defined below report validate / handler / serialize in Server-Timing
+app.router.route_class = timing.TimedRoute
 app.include_router(user_router)
 app.include_router(login_router)
 
@@ -24,93 +68,205 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Requests carrying the X-Priority-Token handed out after an emergency triage
+# get the reserved Google API budget
+app.add_middleware(PriorityMiddleware)
+app.add_middleware(timing.ServerTimingMiddleware)
+app.add_middleware(metrics.MetricsMiddleware)
+# Added last so it is outermost and every log line in the request carries its id
+app.add_middleware(CorrelationIdMiddleware)
+
+
+def _service_metrics():
+    """Cache, breaker and quota state for /metrics, read from the services' own stats."""
+    caches = {
+        "nearby_places": nearby_cache.stats(),
+        "place_details": get_place_store().stats(),
+        "medical_advice": advice_cache.stats(),
+        "directions": directions_cache.stats(),
+    }
+    yield ("cache_hit_ratio", "gauge", "Share of lookups served from the cache since startup", [
+        ({"cache": name}, stats.get("hit_ratio", stats.get("geometry_hit_ratio"))) for name, stats in caches.items()
+    ])
+    yield ("cache_entries", "gauge", "Entries currently held by each cache", [
+        ({"cache": name}, stats.get("entries", stats.get("places"))) for name, stats in caches.items()
+    ])
+    breakers = resilience.stats()
+    yield ("circuit_breaker_open", "gauge", "1 while a dependency's breaker rejects calls", [
+        ({"dependency": name}, int(stats["state"] == "open")) for name, stats in breakers.items()
+    ])
+    yield ("quota_remaining_ratio", "gauge", "Share of the local Google API budget left", [
+        ({"api": api}, stats["remaining_ratio"]) for api, stats in quota.stats().items()
+    ])
+
+
+metrics.registry.add_collector(_service_metrics)
+
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Route and upstream latency histograms, error counters and cache ratios for Prometheus."""
+    return Response(content=metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
+
+
+@app.get("/stats/http")
+async def http_pool_stats():
+    """Connection pool usage for the shared upstream HTTP clients."""
+    return upstream.stats()
+
+
+@app.get("/stats/cache")
+async def cache_stats():
+    """Hit ratios and sizes of the in-process response caches."""
+    return {
+        "nearby_places": nearby_cache.stats(),
+        "place_details": get_place_store().stats(),
+        "medical_advice": advice_cache.stats(),
+        "directions": directions_cache.stats(),
+    }
+
+
+@app.get("/stats/breakers")
+async def breaker_stats():
+    """Circuit breaker state, rolling error ratio and adaptive timeout per dependency."""
+    return resilience.stats()
+
+
+@app.get("/stats/quota")
+async def quota_stats():
+    """Remaining local Google API budget and grants, queued and degraded calls per lane."""
+    return quota.stats()
+
+
+@app.get("/stats/facilities")
+async def facility_stats():
+    """Size, facility types and last reload of the local facility index."""
+    return get_facility_registry().stats()
+
+
+@app.get("/stats/navigation")
+async def navigation_stats():
+    """Active navigation sessions and how many GPS fixes needed a new route."""
+    return navigation_sessions.stats()
+
+
+@app.get("/stats/advice")
+async def advice_queue_stats():
+    """Queue depth, concurrency and wait times for Gemini advice requests."""
+    return {
+        **advice_limiter.stats(),
+        "triage": triage_engine.stats(),
+        "background": advice_jobs.stats(),
+    }
 
 
 class MedicalFormRequest(BaseModel):
     location: str
     language: str
     medical_issue: str
+    # Optional device coordinates, used to pick the local emergency number
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+
+
+def _form_country(form: MedicalFormRequest) -> Optional[str]:
+    if form.latitude is None or form.longitude is None:
+        return None
+    return get_country_resolver().lookup(form.latitude, form.longitude).code
+
 
 @app.post("/medicalpost")
 async def medical_post(form: MedicalFormRequest):
-    print("=== MEDICAL POST API CALLED ===")
-    print(f"Received form data:")
-    print(f"   - Location: '{form.location}'")
-    print(f"   - Language: '{form.language}'")
-    print(f"   - Medical Issue: '{form.medical_issue}'")
+    # Only sizes at INFO; the form itself is patient data
+    logger.info("Medical advice request: language=%s, location_chars=%d, issue_chars=%d",
+                form.language, len(form.location or ""), len(form.medical_issue or ""))
+    log_payload(logger, "Medical advice form", form)
     
     try:
         # Validate input data
         if not form.location or not form.location.strip():
-            print("ERROR: Location is empty")
+            logger.info("Rejected medical advice request: location is empty")
             raise HTTPException(status_code=400, detail="Location is required")
         
         if not form.medical_issue or not form.medical_issue.strip():
-            print("ERROR: Medical issue is empty")
+            logger.info("Rejected medical advice request: medical issue is empty")
             raise HTTPException(status_code=400, detail="Medical issue is required")
             
         if not form.language or not form.language.strip():
-            print("ERROR: Language is empty")
+            logger.info("Rejected medical advice request: language is empty")
             raise HTTPException(status_code=400, detail="Language is required")
 
-        print("SUCCESS: Input validation passed")
-
         # Import and use Gemini API
         try:
-            print("INFO: Importing Gemini service...")
-            from app.services.gemini import get_medical_advice
-            print("SUCCESS: Gemini service imported successfully")
+            from app.services.gemini import get_medical_advice_async, is_fallback_advice, fallback_advice, gemini_breaker
         except ImportError as ie:
-            print(f"IMPORT ERROR: Failed to import Gemini service: {ie}")
+            logger.error(f"Failed to import Gemini service: {ie}")
             raise HTTPException(status_code=500, detail=f"Gemini service not available: {str(ie)}")
         
+        async def generate_advice() -> str:
+            with timing.stage("cache"):
+                advice, cache_state = advice_cache.get(form.location, form.medical_issue, form.language)
+            logger.debug("Advice cache %s", cache_state)
+            if advice is not None:
+                return advice
+            if gemini_breaker.is_open():
+                # Gemini is failing; answer now instead of queueing for a call that will be rejected
+                return fallback_advice(form.medical_issue)
+            # Non-blocking call, limited so a burst of submissions cannot starve the maps routes
+            advice = await advice_limiter.run(
+                lambda: get_medical_advice_async(
+                    address=form.location,
+                    health_problems=form.medical_issue,
+                    language=form.language
+                )
+            )
+            if advice and not is_fallback_advice(advice):
+                advice_cache.put(form.location, form.medical_issue, form.language, advice)
+            return advice
+
+        # Local triage: emergencies get instructions now, the detailed advice follows
+        with timing.stage("triage"):
+            triage = triage_engine.assess(form.medical_issue, _form_country(form))
+        if triage.emergency:
+            # Conditions only; the matched phrases are the patient's own words
+            logger.warning("Emergency triage: %s", ", ".join(triage.conditions))
+            advice_id = advice_jobs.submit(generate_advice)
+            return {
+                "message": emergency_instructions(triage, form.language),
+                "emergency": True,
+                "conditions": triage.conditions,
+                "emergency_number": triage.emergency_number,
+                "advice_id": advice_id,
+                "advice_url": f"/medicalpost/advice/{advice_id}",
+                # Sent back as X-Priority-Token on the hospital and directions requests
+                "priority_token": issue_emergency_token(),
+            }
+
         # Call Gemini API with form data
-        print("INFO: Calling Gemini API...")
-        print(f"   - Address: {form.location}")
-        print(f"   - Health problems: {form.medical_issue}")
-        print(f"   - Language: {form.language}")
-        
         try:
-            gemini_response = get_medical_advice(
-                address=form.location,
-                health_problems=form.medical_issue,
-                language=form.language
-            )
-            print("SUCCESS: Gemini API call completed")
-            print(f"Response type: {type(gemini_response)}")
-            print(f"Response length: {len(gemini_response) if gemini_response else 0} characters")
+            gemini_response = await generate_advice()
+            logger.debug("Gemini advice: %d characters", len(gemini_response) if gemini_response else 0)
             
             if not gemini_response:
-                print("WARNING: Gemini returned empty response")
+                logger.warning("Gemini returned an empty response")
                 raise Exception("Gemini API returned empty response")
                 
-            print(f"First 200 chars: {gemini_response[:200]}...")
+            log_payload(logger, "Gemini advice", {"message": gemini_response[:200]})
             
         except Exception as gemini_error:
-            print(f"GEMINI API ERROR: {str(gemini_error)}")
-            print(f"Error type: {type(gemini_error)}")
-            import traceback
-            print("Full traceback:")
-            traceback.print_exc()
+            logger.error(f"Gemini API error: {type(gemini_error).__name__}", exc_info=True)
             raise Exception(f"Gemini API failed: {str(gemini_error)}")
 
         # Prepare response
         response_data = {"message": gemini_response}
-        print("SUCCESS: Response prepared successfully")
-        print(f"Final response structure: {list(response_data.keys())}")
         
         return response_data
 
     except HTTPException as http_ex:
-        print(f"HTTP EXCEPTION: {http_ex.detail}")
         raise http_ex
         
     except Exception as e:
-        print(f"GENERAL EXCEPTION: {str(e)}")
-        print(f"Exception type: {type(e)}")
-        import traceback
-        print("Full exception traceback:")
-        traceback.print_exc()
+        logger.error(f"Medical advice failed, returning the fallback: {type(e).__name__}", exc_info=True)
         
         # Fallback response if Gemini fails
         fallback_response = f"""
@@ -127,18 +283,211 @@ async def medical_post(form: MedicalFormRequest):
         calling 911 or visiting your nearest Emergency Room.
         """
         
-        print("INFO: Returning fallback response")
         return {"message": fallback_response}
 
+@app.post("/medicalpost/stream")
+async def medical_post_stream(form: MedicalFormRequest, format: str = Query("sse", pattern="^(sse|ndjson)$")):
+    """
+    Streaming variant of /medicalpost: forwards Gemini's text as it is
+    generated, as Server-Sent Events (default) or NDJSON. An `emergency`
+    event precedes the text when the emergency header is present.
+    """
+    if not form.location or not form.location.strip():
+        raise HTTPException(status_code=400, detail="Location is required")
+    if not form.medical_issue or not form.medical_issue.strip():
+        raise HTTPException(status_code=400, detail="Medical issue is required")
+    if not form.language or not form.language.strip():
+        raise HTTPException(status_code=400, detail="Language is required")
+
+    try:
+        from app.services.gemini import stream_medical_advice, fallback_advice, is_fallback_advice, gemini_breaker
+    except ImportError as ie:
+        logger.error(f"Failed to import Gemini service: {ie}")
+        raise HTTPException(status_code=500, detail=f"Gemini service not available: {str(ie)}")
+
+    async def events():
+        # Sent straight away so the client gets its first byte while we wait for a slot
+        yield encode_event("start", {}, format)
+        triage = triage_engine.assess(form.medical_issue, _form_country(form))
+        if triage.emergency:
+            yield encode_event("emergency", {
+                "message": EMERGENCY_MARKER,
+                "conditions": triage.conditions,
+                "emergency_number": triage.emergency_number,
+                "instructions": emergency_instructions(triage, form.language),
+                "priority_token": issue_emergency_token(),
+            }, format)
+        cached, _ = advice_cache.get(form.location, form.medical_issue, form.language)
+        if cached is not None:
+            async for event, data in advice_events(_single(cached), emergency_sent=triage.emergency):
+                yield encode_event(event, data, format)
+            yield encode_event("done", {"cached": True}, format)
+            return
+        if gemini_breaker.is_open():
+            yield encode_event("chunk", {"text": fallback_advice(form.medical_issue)}, format)
+            yield encode_event("done", {}, format)
+            return
+        try:
+            async with advice_limiter.slot():
+                chunks = stream_medical_advice(
+                    address=form.location,
+                    health_problems=form.medical_issue,
+                    language=form.language
+                )
+                generated = []
+                async for event, data in advice_events(chunks, emergency_sent=triage.emergency):
+                    if event == "chunk":
+                        generated.append(data["text"])
+                    yield encode_event(event, data, format)
+            text = "".join(generated)
+            if text and not is_fallback_advice(text):
+                advice_cache.put(form.location, form.medical_issue, form.language, text)
+        except AdviceQueueFull as e:
+            logger.warning(f"Advice queue full, streaming the fallback: {str(e)}")
+            yield encode_event("chunk", {"text": fallback_advice(form.medical_issue)}, format)
+        yield encode_event("done", {}, format)
+
+    return StreamingResponse(events(), media_type=MEDIA_TYPES[format], headers=STREAM_HEADERS)
+
+
+async def _single(text: str):
+    yield text
+
+
+@app.get("/medicalpost/advice/{advice_id}")
+async def medical_advice_result(advice_id: str):
+    """Detailed advice generated in the background after an emergency triage response."""
+    job = advice_jobs.get(advice_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired advice id")
+    return {"status": job.status, "message": job.message}
+
+def _directions_response(coordinates, distance: str, duration: str, steps: list, fmt: str,
+                         cache_state: Optional[str] = None):
+    """Directions payload with the route geometry in the negotiated wire format."""
+    headers = {"Vary": "Accept"}
+    if cache_state:
+        headers["X-Cache"] = cache_state.upper()
+    # The body is rendered here rather than by FastAPI, so time it as its own stage
+    with timing.stage("encode"):
+        if fmt == "binary":
+            metadata = {"distance": distance, "duration": duration, "steps": steps}
+            return Response(
+                content=route_geometry.pack_route(coordinates, metadata),
+                media_type=route_geometry.ROUTE_BINARY_MEDIA_TYPE,
+                headers=headers,
+            )
+        body = {
+            "route": route_geometry.format_route(coordinates, fmt),
+            "distance": distance,
+            "duration": duration,
+            "steps": steps
+        }
+        if fmt != "objects":
+            body["route_format"] = fmt
+        return JSONResponse(content=body, headers=headers)
+
+
+# Overall budget for a Directions API call, hedged attempts included
+DIRECTIONS_DEADLINE = float(os.getenv("DIRECTIONS_DEADLINE", "8"))
+DIRECTIONS_HEDGING = os.getenv("DIRECTIONS_HEDGING", "true").lower() in ("1", "true", "yes")
+
+
+async def _fetch_directions(origin: str, destination: str, origin_point, dest_point, api_key: str, cache_key):
+    """Full Directions API request for /directions, stored in the directions cache. Returns the entry."""
+    url = upstream_url("maps", "/maps/api/directions/json")
+    params = {
+        "origin": origin,
+        "destination": destination,
+        "mode": "driving",
+        "alternatives": "true",
+        "traffic_model": "best_guess",
+        "departure_time": "now",
+        "key": api_key
+    }
+    
+    response = await upstream.request(
+        "maps", "GET", url, endpoint="directions", params=params,
+        hedge=DIRECTIONS_HEDGING, deadline=DIRECTIONS_DEADLINE
+    )
+    data = response.json()
+    
+    if data["status"] != "OK":
+        raise HTTPException(status_code=400, detail=f"Directions API error: {data['status']}")
+    
+    # Extract the best route
+    route = data["routes"][0]
+    legs = route["legs"][0]
+    
+    # Decode every step polyline in one batch
+    encoded = [step.get("polyline", {}).get("points", "") for step in legs["steps"]]
+    with timing.stage("decode_polyline"):
+        decoded = route_geometry.decode_polylines(encoded)
+    
+    # Convert steps to coordinate array
+    parts = []
+    steps = []
+    format_start = time.perf_counter()
+    
+    for step, polyline_points in zip(legs["steps"], decoded):
+        # Add start point, then the polyline for a smooth route
+        start_location = step["start_location"]
+        parts.append([[start_location["lat"], start_location["lng"]]])
+        parts.append(polyline_points)
+        
+        # Add turn-by-turn instruction
+        steps.append({
+            "instruction": google_routes.strip_instructions_html(step["html_instructions"]),
+            "distance": step["distance"]["text"],
+            "duration": step["duration"]["text"],
+            "location": {
+                "latitude": start_location["lat"],
+                "longitude": start_location["lng"]
+            }
+        })
+    
+    timing.record("format_steps", time.perf_counter() - format_start)
+    
+    # Add final destination
+    end_location = legs["end_location"]
+    parts.append([[end_location["lat"], end_location["lng"]]])
+    
+    # Repeated vertices at step boundaries are dropped; simplification happens per request
+    with timing.stage("geometry"):
+        coordinates = route_geometry.join_polylines(parts)
+    
+    # With departure_time=now the traffic-aware time is in duration_in_traffic
+    duration_s = legs.get("duration_in_traffic", legs["duration"])["value"]
+    return directions_cache.put(
+        cache_key,
+        {"coordinates": coordinates, "distance": legs["distance"]["text"], "steps": steps},
+        origin_point,
+        dest_point,
+        duration_s,
+        google_routes.format_duration_text(duration_s),
+    )
+
+
 @app.get("/directions")
 async def get_directions(
+    request: Request,
     origin: str = Query(..., description="Origin coordinates as 'lat,lng'"),
-    destination: str = Query(..., description="Destination coordinates as 'lat,lng'")
+    destination: str = Query(..., description="Destination coordinates as 'lat,lng'"),
+    destination_place_id: Optional[str] = Query(None, description="Place id of the destination; improves cache sharing"),
+    zoom: Optional[float] = Query(None, ge=0, le=22, description="Map zoom level; drops vertices invisible at this zoom"),
+    simplify: str = Query("dp", pattern="^(dp|vw)$", description="Simplification: Douglas-Peucker (dp) or Visvalingam (vw)"),
+    format: Optional[str] = Query(None, pattern="^(objects|polyline|arrays|binary)$",
+                                  description="Route encoding; defaults to objects, or binary when Accept asks for it")
 ):
     """
     Get real-time directions between two points using Google Directions API.
     Returns optimized route coordinates for real-time navigation.
     """
+    fmt = format
+    if fmt is None:
+        accept = request.headers.get("accept", "")
+        fmt = "binary" if route_geometry.ROUTE_BINARY_MEDIA_TYPE in accept else "objects"
+
     try:
         # Parse coordinates
         origin_coords = origin.split(',')
@@ -151,139 +500,54 @@ async def get_directions(
         GOOGLE_API_KEY = os.getenv("GOOGLEMAPS_API_KEY")
         if not GOOGLE_API_KEY:
             # Fallback: return straight line
-            return {
-                "route": [
-                    {"latitude": float(origin_coords[0]), "longitude": float(origin_coords[1])},
-                    {"latitude": float(dest_coords[0]), "longitude": float(dest_coords[1])}
-                ],
-                "distance": "Unknown",
-                "duration": "Unknown",
-                "steps": []
-            }
-        
-        # Call Google Directions API
-        url = "https://maps.googleapis.com/maps/api/directions/json"
-        params = {
-            "origin": origin,
-            "destination": destination,
-            "mode": "driving",
-            "alternatives": "true",
-            "traffic_model": "best_guess",
-            "departure_time": "now",
-            "key": GOOGLE_API_KEY
-        }
-        
-        response = requests.get(url, params=params)
-        data = response.json()
-        
-        if data["status"] != "OK":
-            raise HTTPException(status_code=400, detail=f"Directions API error: {data['status']}")
+            straight_line = [
+                [float(origin_coords[0]), float(origin_coords[1])],
+                [float(dest_coords[0]), float(dest_coords[1])]
+            ]
+            return _directions_response(straight_line, "Unknown", "Unknown", [], fmt)
         
-        # Extract the best route
-        route = data["routes"][0]
-        legs = route["legs"][0]
+        origin_point = (float(origin_coords[0]), float(origin_coords[1]))
+        dest_point = (float(dest_coords[0]), float(dest_coords[1]))
         
-        # Convert steps to coordinate array
-        route_coordinates = []
-        steps = []
+        # Nearby origins share one cached route; a stale ETA only costs a duration-only request
+        cache_key = directions_cache.key("directions", *origin_point, *dest_point, destination_place_id)
+        with timing.stage("cache"):
+            entry, cache_state = directions_cache.get(cache_key)
+        if cache_state == "eta_stale":
+            try:
+                duration_s = await google_routes.fetch_traffic_duration(*entry.origin, *entry.destination)
+                directions_cache.update_eta(cache_key, duration_s, google_routes.format_duration_text(duration_s))
+                cache_state = "eta_refreshed"
+            except Exception as e:
+                logger.warning(f"Directions ETA refresh failed, serving the previous duration: {str(e)}")
+                directions_cache.eta_refresh_failed()
+        if entry is None:
+            entry = await _fetch_directions(origin, destination, origin_point, dest_point, GOOGLE_API_KEY, cache_key)
         
-        for step in legs["steps"]:
-            # Add start point
-            start_location = step["start_location"]
-            route_coordinates.append({
-                "latitude": start_location["lat"],
-                "longitude": start_location["lng"]
-            })
-            
-            # Decode polyline for smooth route
-            if "polyline" in step and "points" in step["polyline"]:
-                polyline_points = decode_polyline(step["polyline"]["points"])
-                route_coordinates.extend(polyline_points)
-            
-            # Add turn-by-turn instruction
-            steps.append({
-                "instruction": step["html_instructions"].replace("<b>", "").replace("</b>", "").replace("<div>", " ").replace("</div>", ""),
-                "distance": step["distance"]["text"],
-                "duration": step["duration"]["text"],
-                "location": {
-                    "latitude": start_location["lat"],
-                    "longitude": start_location["lng"]
-                }
-            })
-        
-        # Add final destination
-        end_location = legs["end_location"]
-        route_coordinates.append({
-            "latitude": end_location["lat"],
-            "longitude": end_location["lng"]
-        })
+        route = entry.route
+        # The cached route may start from a neighbour's origin in the same cell
+        with timing.stage("geometry"):
+            coordinates = route_geometry.join_polylines([[origin_point], route["coordinates"]])
+            coordinates = route_geometry.simplify(coordinates, zoom=zoom, method=simplify)
         
-        return {
-            "route": route_coordinates,
-            "distance": legs["distance"]["text"],
-            "duration": legs["duration"]["text"],
-            "steps": steps
-        }
+        return _directions_response(coordinates, route["distance"], entry.duration_text, route["steps"], fmt,
+                                    cache_state)
         
     except Exception as e:
-        print(f"Directions API error: {str(e)}")
+        logger.error(f"Directions API error: {str(e)}")
         # Fallback to straight line
         try:
             origin_coords = origin.split(',')
             dest_coords = destination.split(',')
-            return {
-                "route": [
-                    {"latitude": float(origin_coords[0]), "longitude": float(origin_coords[1])},
-                    {"latitude": float(dest_coords[0]), "longitude": float(dest_coords[1])}
-                ],
-                "distance": "Unknown",
-                "duration": "Unknown",
-                "steps": [{"instruction": "Navigate to destination", "distance": "Unknown", "duration": "Unknown"}]
-            }
+            straight_line = [
+                [float(origin_coords[0]), float(origin_coords[1])],
+                [float(dest_coords[0]), float(dest_coords[1])]
+            ]
+            steps = [{"instruction": "Navigate to destination", "distance": "Unknown", "duration": "Unknown"}]
+            return _directions_response(straight_line, "Unknown", "Unknown", steps, fmt)
         except:
             raise HTTPException(status_code=500, detail="Unable to process directions request")
 
-def decode_polyline(polyline_str):
-    """Decode Google's polyline format to latitude/longitude coordinates."""
-    index = 0
-    lat = 0
-    lng = 0
-    coordinates = []
-    
-    while index < len(polyline_str):
-        # Decode latitude
-        shift = 0
-        result = 0
-        while True:
-            byte = ord(polyline_str[index]) - 63
-            index += 1
-            result |= (byte & 0x1f) << shift
-            shift += 5
-            if byte < 0x20:
-                break
-        
-        dlat = ~(result >> 1) if result & 1 else result >> 1
-        lat += dlat
-        
-        # Decode longitude
-        shift = 0
-        result = 0
-        while True:
-            byte = ord(polyline_str[index]) - 63
-            index += 1
-            result |= (byte & 0x1f) << shift
-            shift += 5
-            if byte < 0x20:
-                break
-        
-        dlng = ~(result >> 1) if result & 1 else result >> 1
-        lng += dlng
-        
-        coordinates.append({
-            "latitude": lat / 1e5,
-            "longitude": lng / 1e5
-        })
-    
-    return coordinates
-
 app.include_router(google_routes.router)
+app.include_router(navigation_routes.router)
+app.include_router(facility_routes.router)
@@ -0,0 +1,72 @@
+import sys
+import os
+import time
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.advice_cache import AdviceCache, normalize_symptoms, coarse_region
+
+EMERGENCY_ADVICE = "**⚠️ EMERGENCY MEDICAL ATTENTION REQUIRED ⚠️**\nCall 911"
+
+
+class TestNormalization:
+    """Tests for the symptom and region normalization"""
+
+    def test_order_and_stopwords_do_not_matter(self):
+        assert normalize_symptoms("headache and fever") == normalize_symptoms("Fever, headache")
+        assert normalize_symptoms("dolor de cabeza y fiebre") == normalize_symptoms("Fiebre y dolor de cabeza")
+        assert normalize_symptoms("fiébre") == normalize_symptoms("fiebre")
+
+    def test_opposite_polarity_gets_different_keys(self):
+        cache = AdviceCache()
+        keys = {
+            cache.key("Austin, TX", text, "Spanish")
+            for text in ("dolor de cabeza con fiebre", "dolor de cabeza sin fiebre", "dolor de cabeza")
+        }
+        assert len(keys) == 3
+        assert normalize_symptoms("headache with fever") != normalize_symptoms("headache without fever")
+        assert normalize_symptoms("fever, not headache") != normalize_symptoms("headache, not fever")
+        assert normalize_symptoms("I have no fever") == ("no_fever",)
+
+    def test_coarse_region(self):
+        assert coarse_region("123 Main St, Austin, TX 78701") == "austin,tx"
+        assert coarse_region("Austin, TX") == "austin,tx"
+
+
+class TestAdviceCache:
+    """Tests for the medical advice cache"""
+
+    def test_near_duplicate_is_a_hit(self):
+        cache = AdviceCache()
+        cache.put("Austin, TX", "headache and fever", "English", "Rest and fluids")
+
+        assert cache.get("500 Congress Ave, Austin, TX 78701", "Fever, headache", "english") == ("Rest and fluids", "hit")
+        assert cache.get("Austin, TX", "headache and fever", "Spanish") == (None, "miss")
+        assert cache.get("Miami, FL", "headache and fever", "English") == (None, "miss")
+
+    def test_lru_bound(self):
+        cache = AdviceCache(max_entries=2)
+        cache.put("Austin, TX", "cough", "English", "a")
+        cache.put("Austin, TX", "rash", "English", "b")
+        cache.get("Austin, TX", "cough", "English")
+        cache.put("Austin, TX", "sore throat", "English", "c")
+
+        assert cache.get("Austin, TX", "rash", "English") == (None, "miss")
+        assert cache.get("Austin, TX", "cough", "English") == ("a", "hit")
+        assert cache.stats()["evictions"] == 1
+
+    def test_emergency_advice_expires_quickly(self):
+        cache = AdviceCache(ttl=3600, emergency_ttl=0.01)
+        cache.put("Austin, TX", "chest pain", "English", EMERGENCY_ADVICE)
+        time.sleep(0.02)
+
+        assert cache.get("Austin, TX", "chest pain", "English") == (None, "miss")
+
+    def test_similarity_tier(self):
+        cache = AdviceCache(similarity_threshold=0.8)
+        cache.put("Austin, TX", "sore throat and cough", "English", "Warm tea")
+        cache.put("Austin, TX", "crushing chest pain", "English", EMERGENCY_ADVICE)
+
+        assert cache.get("Austin, TX", "cough with sore throats", "English") == ("Warm tea", "similar")
+        assert cache.get("Austin, TX", "crushing chest pains", "English") == (None, "miss")
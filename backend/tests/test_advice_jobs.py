@@ -0,0 +1,59 @@
+import sys
+import os
+import asyncio
+import pytest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.advice_jobs import AdviceJobs
+
+
+class TestAdviceJobs:
+    """Tests for the background advice registry"""
+
+    @pytest.mark.asyncio
+    async def test_job_completes(self):
+        jobs = AdviceJobs()
+        release = asyncio.Event()
+
+        async def generate():
+            await release.wait()
+            return "detailed advice"
+
+        advice_id = jobs.submit(generate)
+        assert jobs.get(advice_id).status == "pending"
+
+        release.set()
+        await asyncio.sleep(0.01)
+        job = jobs.get(advice_id)
+        assert job.status == "done"
+        assert job.message == "detailed advice"
+
+    @pytest.mark.asyncio
+    async def test_failed_and_unknown_jobs(self):
+        jobs = AdviceJobs()
+
+        async def generate():
+            raise RuntimeError("queue full")
+
+        advice_id = jobs.submit(generate)
+        await asyncio.sleep(0.01)
+
+        assert jobs.get(advice_id).status == "failed"
+        assert jobs.get("missing") is None
+
+    @pytest.mark.asyncio
+    async def test_oldest_jobs_are_dropped(self):
+        jobs = AdviceJobs(max_jobs=2)
+
+        async def generate():
+            return "advice"
+
+        first = jobs.submit(generate)
+        jobs.submit(generate)
+        jobs.submit(generate)
+        await asyncio.sleep(0.01)
+
+        assert jobs.get(first) is None
+        assert jobs.stats()["jobs"] == 2
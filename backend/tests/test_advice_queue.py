@@ -0,0 +1,74 @@
+import sys
+import os
+import asyncio
+import pytest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.advice_queue import AdviceLimiter, AdviceQueueFull
+
+
+class TestAdviceLimiter:
+    """Tests for the bounded Gemini advice queue"""
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded(self):
+        limiter = AdviceLimiter(max_concurrency=2, max_queue=10, queue_timeout=5)
+        running = []
+        peak = []
+
+        async def generate():
+            running.append(1)
+            peak.append(len(running))
+            await asyncio.sleep(0.01)
+            running.pop()
+            return "advice"
+
+        results = await asyncio.gather(*[limiter.run(generate) for _ in range(6)])
+
+        assert results == ["advice"] * 6
+        assert max(peak) == 2
+        stats = limiter.stats()
+        assert stats["completed"] == 6
+        assert stats["queue_depth"] == 0
+        assert stats["wait_ms"]["max"] is not None
+
+    @pytest.mark.asyncio
+    async def test_requests_beyond_queue_are_rejected(self):
+        limiter = AdviceLimiter(max_concurrency=1, max_queue=1, queue_timeout=5)
+        release = asyncio.Event()
+
+        async def slow():
+            await release.wait()
+            return "done"
+
+        first = asyncio.ensure_future(limiter.run(slow))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(limiter.run(slow))
+        await asyncio.sleep(0)
+
+        with pytest.raises(AdviceQueueFull):
+            await limiter.run(slow)
+
+        release.set()
+        assert await first == "done"
+        assert await second == "done"
+        assert limiter.stats()["rejected"] == 1
+
+    @pytest.mark.asyncio
+    async def test_queue_wait_times_out(self):
+        limiter = AdviceLimiter(max_concurrency=1, max_queue=5, queue_timeout=0.01)
+        release = asyncio.Event()
+
+        async def slow():
+            await release.wait()
+
+        holder = asyncio.ensure_future(limiter.run(slow))
+        await asyncio.sleep(0)
+        with pytest.raises(AdviceQueueFull):
+            await limiter.run(slow)
+
+        release.set()
+        await holder
+        assert limiter.stats()["timed_out"] == 1
@@ -0,0 +1,57 @@
+import sys
+import os
+import json
+import pytest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.advice_stream import advice_events, encode_event, EMERGENCY_MARKER, PROBE_CHARS
+
+
+async def _chunks(*texts):
+    for text in texts:
+        yield text
+
+
+async def _collect(chunks):
+    return [event async for event in advice_events(chunks)]
+
+
+class TestAdviceEvents:
+    """Tests for the streamed medical advice framing"""
+
+    @pytest.mark.asyncio
+    async def test_emergency_event_comes_first(self):
+        events = await _collect(_chunks("**⚠️ EMERGENCY MEDICAL ", "ATTENTION REQUIRED ⚠️**\n", "Call 911 now"))
+
+        assert events[0] == ("emergency", {"message": EMERGENCY_MARKER})
+        text = "".join(data["text"] for event, data in events if event == "chunk")
+        assert text == "**⚠️ EMERGENCY MEDICAL ATTENTION REQUIRED ⚠️**\nCall 911 now"
+        assert [event for event, _ in events].count("emergency") == 1
+
+    @pytest.mark.asyncio
+    async def test_non_emergency_text_is_passed_through(self):
+        first = "x" * PROBE_CHARS
+        events = await _collect(_chunks(first, "**1. Medical Assessment:**"))
+
+        assert events == [("chunk", {"text": first}), ("chunk", {"text": "**1. Medical Assessment:**"})]
+
+    @pytest.mark.asyncio
+    async def test_short_stream_is_flushed_at_the_end(self):
+        events = await _collect(_chunks("Rest ", "and drink water."))
+
+        assert events == [("chunk", {"text": "Rest and drink water."})]
+
+    @pytest.mark.asyncio
+    async def test_late_emergency_header_split_across_chunks(self):
+        preamble = "y" * PROBE_CHARS
+        events = await _collect(_chunks(preamble, "EMERGENCY MEDICAL ATT", "ENTION REQUIRED"))
+
+        assert [event for event, _ in events] == ["chunk", "chunk", "emergency", "chunk"]
+
+    def test_encodings(self):
+        assert encode_event("chunk", {"text": "hola"}) == 'event: chunk\ndata: {"text": "hola"}\n\n'
+        line = encode_event("chunk", {"text": "hola"}, "ndjson")
+        assert line.endswith("\n")
+        assert json.loads(line) == {"type": "chunk", "text": "hola"}
@@ -0,0 +1,60 @@
+import sys
+import os
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.country_resolver import CountryResolver, RTree, get_country_resolver
+
+
+class TestCountryResolver:
+    """Tests for the offline reverse-country lookup"""
+
+    def test_interior_points_are_confident(self):
+        resolver = get_country_resolver()
+        for (lat, lng), code in [
+            ((30.27, -97.74), "US"),    # Austin
+            ((19.43, -99.13), "MX"),    # Mexico City
+            ((48.85, 2.35), "FR"),      # Paris
+            ((-26.20, 28.04), "ZA"),    # Johannesburg
+        ]:
+            match = resolver.lookup(lat, lng)
+            assert match.code == code
+            assert match.confident
+
+    def test_border_towns_are_not_confident(self):
+        resolver = get_country_resolver()
+        for lat, lng in [
+            (31.77, -106.49),   # El Paso / Ciudad Juarez
+            (32.51, -117.04),   # Tijuana / San Diego
+            (31.34, -110.94),   # Nogales
+        ]:
+            match = resolver.lookup(lat, lng)
+            assert not match.confident
+            assert match.border_distance_km is not None
+            assert match.border_distance_km < resolver.border_threshold_km
+
+    def test_enclave_is_not_resolved_as_surrounding_country(self):
+        # Maseru, Lesotho sits inside a hole of the South Africa outline
+        assert get_country_resolver().lookup(-29.31, 27.48).code == "LS"
+
+    def test_open_ocean_is_unknown(self):
+        match = get_country_resolver().lookup(30.0, -40.0)
+        assert match.code is None
+        assert not match.confident
+
+    def test_threshold_is_configurable(self):
+        resolver = CountryResolver(border_threshold_km=1.0)
+        match = resolver.lookup(31.77, -106.49)
+        assert match.code == "US"
+        assert match.confident
+
+
+class TestRTree:
+    """Tests for the packed R-tree used by the resolver"""
+
+    def test_query_returns_intersecting_items(self):
+        entries = [((i, i, i + 0.5, i + 0.5), i) for i in range(100)]
+        tree = RTree(entries)
+        assert sorted(tree.query((10.2, 10.2, 12.1, 12.1))) == [10, 11, 12]
+        assert tree.query((-5, -5, -4, -4)) == []
@@ -0,0 +1,81 @@
+import sys
+import os
+import time
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.directions_cache import DirectionsCache
+
+ORIGIN = (19.4326, -99.1332)
+HOSPITAL = (19.4200, -99.1500)
+
+
+class TestDirectionsCacheKey:
+    """Tests for snapping trips onto shared cache keys"""
+
+    def test_nearby_origins_share_a_key(self):
+        cache = DirectionsCache()
+        a = cache.key("directions", *ORIGIN, *HOSPITAL)
+        b = cache.key("directions", ORIGIN[0] + 0.0002, ORIGIN[1] + 0.0002, *HOSPITAL)
+        far = cache.key("directions", ORIGIN[0] + 0.01, ORIGIN[1], *HOSPITAL)
+
+        assert a == b
+        assert a != far
+        assert a != cache.key("steps", *ORIGIN, *HOSPITAL)
+
+    def test_place_id_identifies_the_destination(self):
+        cache = DirectionsCache()
+        a = cache.key("directions", *ORIGIN, *HOSPITAL, "ChIJhospital")
+        b = cache.key("directions", *ORIGIN, HOSPITAL[0] + 0.001, HOSPITAL[1], "ChIJhospital")
+
+        assert a == b
+        assert a[2] == "place:ChIJhospital"
+
+
+class TestDirectionsCacheLifetimes:
+    """Tests for the separate geometry and ETA lifetimes"""
+
+    def test_eta_expires_before_geometry(self):
+        cache = DirectionsCache(geometry_ttl=60, eta_ttl=0.05)
+        key = cache.key("directions", *ORIGIN, *HOSPITAL)
+
+        assert cache.get(key) == (None, "miss")
+        cache.put(key, {"steps": []}, ORIGIN, HOSPITAL, 600, "10 min")
+        assert cache.get(key)[1] == "hit"
+
+        time.sleep(0.06)
+        entry, state = cache.get(key)
+        assert state == "eta_stale"
+        assert entry.route == {"steps": []}
+        assert entry.origin == ORIGIN
+
+        cache.update_eta(key, 720, "12 min")
+        entry, state = cache.get(key)
+        assert state == "hit"
+        assert entry.duration_text == "12 min"
+
+    def test_entries_without_duration_only_expire_with_geometry(self):
+        cache = DirectionsCache(geometry_ttl=0.05, eta_ttl=0.01)
+        key = cache.key("steps", *ORIGIN, *HOSPITAL)
+        cache.put(key, [{"instruction": "Head north"}], ORIGIN, HOSPITAL)
+
+        time.sleep(0.02)
+        assert cache.get(key)[1] == "hit"
+        time.sleep(0.04)
+        assert cache.get(key) == (None, "miss")
+        assert cache.stats()["entries"] == 0
+
+    def test_stats_and_eviction(self):
+        cache = DirectionsCache(max_entries=1, eta_ttl=0)
+        first = cache.key("directions", *ORIGIN, *HOSPITAL)
+        second = cache.key("directions", *HOSPITAL, *ORIGIN)
+        cache.put(first, {}, ORIGIN, HOSPITAL, 60, "1 min")
+        cache.get(first)
+        cache.eta_refresh_failed()
+        cache.put(second, {}, HOSPITAL, ORIGIN, 60, "1 min")
+
+        stats = cache.stats()
+        assert stats["evictions"] == 1
+        assert stats["eta_refresh_failures"] == 1
+        assert stats["geometry_hit_ratio"] == 1.0
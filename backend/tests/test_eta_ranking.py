@@ -0,0 +1,98 @@
+import sys
+import os
+import json
+import pytest
+import httpx
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault("GOOGLEMAPS_API_KEY", "test-key")
+
+from app.core import google_routes
+from app.services.http_client import UpstreamClients
+
+ORIGIN = (35.50, -108.70)
+PLACES = [
+    # Google's order: the first result is neither the closest nor the fastest
+    {"place_id": "far", "name": "Far", "latitude": 35.70, "longitude": -108.70},
+    {"place_id": "near", "name": "Near", "latitude": 35.51, "longitude": -108.70},
+    {"place_id": "fast", "name": "Fast", "latitude": 35.55, "longitude": -108.70},
+    {"place_id": "nowhere", "name": "No location", "latitude": None, "longitude": None},
+]
+
+
+@pytest.fixture
+def matrix(monkeypatch):
+    """Route matrix upstream answering with the durations in `matrix.durations`."""
+    clients = UpstreamClients()
+    calls = []
+
+    def handler(request):
+        body = json.loads(request.content)
+        calls.append(body)
+        elements = []
+        for index, destination in enumerate(body["destinations"]):
+            lat = destination["waypoint"]["location"]["latLng"]["latitude"]
+            duration = handler.durations.get(lat)
+            if duration is None:
+                elements.append({"originIndex": 0, "destinationIndex": index, "condition": "ROUTE_NOT_FOUND"})
+            else:
+                elements.append({"originIndex": 0, "destinationIndex": index, "condition": "ROUTE_EXISTS",
+                                 "duration": f"{duration}s", "distanceMeters": duration * 20})
+        # Elements arrive in no particular order
+        return httpx.Response(200, json=list(reversed(elements)))
+
+    handler.durations = {35.70: 1500, 35.51: 1200, 35.55: 600}
+    handler.calls = calls
+    clients._clients["routes"] = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    clients._stats["routes"] = {"requests": 0, "errors": 0, "in_flight": 0, "total_time": 0.0}
+    monkeypatch.setattr(google_routes, "upstream", clients)
+    return handler
+
+
+class TestEtaRanking:
+    """Tests for ordering nearby results by drive time"""
+
+    def test_sort_by_distance(self):
+        ordered = google_routes.sort_by_distance(PLACES, *ORIGIN)
+        assert [p["place_id"] for p in ordered] == ["near", "fast", "far", "nowhere"]
+        assert "distance_m" not in PLACES[0]
+
+    @pytest.mark.asyncio
+    async def test_one_matrix_call_orders_by_duration(self, matrix):
+        ranked, rank = await google_routes.rank_by_eta(PLACES, *ORIGIN)
+
+        assert rank == "eta"
+        assert [p["place_id"] for p in ranked] == ["fast", "near", "far", "nowhere"]
+        assert ranked[0]["duration_s"] == 600
+        assert ranked[0]["duration"] == "10 min"
+        assert ranked[0]["route_distance_m"] == 12000
+        assert len(matrix.calls) == 1
+        assert len(matrix.calls[0]["destinations"]) == 3
+
+    @pytest.mark.asyncio
+    async def test_only_the_closest_candidates_are_routed(self, matrix):
+        ranked, _ = await google_routes.rank_by_eta(PLACES, *ORIGIN, candidates=2)
+
+        assert [p["place_id"] for p in ranked] == ["fast", "near", "far", "nowhere"]
+        assert "duration_s" not in ranked[2]
+        assert len(matrix.calls[0]["destinations"]) == 2
+
+    @pytest.mark.asyncio
+    async def test_unroutable_places_follow_routed_ones(self, matrix):
+        matrix.durations = {35.70: 1500, 35.55: 600}
+        ranked, _ = await google_routes.rank_by_eta(PLACES, *ORIGIN)
+        assert [p["place_id"] for p in ranked] == ["fast", "far", "near", "nowhere"]
+
+    @pytest.mark.asyncio
+    async def test_matrix_failure_falls_back_to_distance(self, monkeypatch):
+        clients = UpstreamClients()
+        clients._clients["routes"] = httpx.AsyncClient(transport=httpx.MockTransport(
+            lambda request: httpx.Response(200, json={"error": {"code": 429, "message": "Quota exceeded"}})
+        ))
+        clients._stats["routes"] = {"requests": 0, "errors": 0, "in_flight": 0, "total_time": 0.0}
+        monkeypatch.setattr(google_routes, "upstream", clients)
+
+        ranked, rank = await google_routes.rank_by_eta(PLACES, *ORIGIN)
+        assert rank == "distance"
+        assert [p["place_id"] for p in ranked] == ["near", "fast", "far", "nowhere"]
@@ -0,0 +1,116 @@
+import sys
+import os
+import json
+import numpy as np
+import pytest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.facility_index import (
+    KDTree, FacilityRegistry, normalize_type, unit_vectors, LOCAL_PREFIX,
+)
+from app.services.places_cache import haversine_m
+
+CSV_HEADER = "facility_id,name,address,phone,facility_type,lat,lon\n"
+
+
+def _write_csv(path, rows):
+    path.write_text(CSV_HEADER + "".join(",".join(str(v) for v in row) + "\n" for row in rows))
+
+
+class TestKDTree:
+    """Tests for radius and nearest-neighbour queries against brute force"""
+
+    def test_queries_match_brute_force(self):
+        rng = np.random.default_rng(7)
+        points = unit_vectors(rng.uniform(-60, 60, 3000), rng.uniform(-180, 180, 3000))
+        tree = KDTree(points, leaf_size=8)
+        mask = rng.random(3000) < 0.5
+
+        for target in unit_vectors(rng.uniform(-60, 60, 20), rng.uniform(-180, 180, 20)):
+            distances = np.linalg.norm(points - target, axis=1)
+
+            index, found = tree.query_radius(target, 0.05)
+            assert sorted(index.tolist()) == np.flatnonzero(distances <= 0.05).tolist()
+            assert np.allclose(found, distances[index])
+
+            index, found = tree.query_nearest(target, 5, mask=mask)
+            expected = np.flatnonzero(mask)[np.argsort(distances[mask])[:5]]
+            assert index.tolist() == expected.tolist()
+            assert list(found) == sorted(found)
+
+    def test_empty_tree(self):
+        tree = KDTree(np.empty((0, 3)))
+        assert len(tree.query_radius([1, 0, 0], 1)[0]) == 0
+        assert len(tree.query_nearest([1, 0, 0], 3)[0]) == 0
+
+
+class TestFacilityRegistry:
+    """Tests for loading exports and answering nearby searches"""
+
+    def test_loads_csv_and_geojson(self, tmp_path):
+        _write_csv(tmp_path / "hifld.csv", [
+            (1, "General Hospital", "1 Main St", "555-0100", "GENERAL ACUTE CARE HOSPITAL", 35.0, -106.0),
+            (2, "Pueblo Clinic", "", "", "IHS Health Center", 35.01, -106.0),
+            (3, "Broken Row", "", "", "hospital", "", ""),
+        ])
+        (tmp_path / "urgent.geojson").write_text(json.dumps({"type": "FeatureCollection", "features": [{
+            "type": "Feature", "id": "u1",
+            "geometry": {"type": "Point", "coordinates": [-106.02, 35.0]},
+            "properties": {"name": "QuickCare", "type": "Urgent Care", "place_id": "ChIJquick"},
+        }]}))
+
+        registry = FacilityRegistry(str(tmp_path))
+        assert registry.reload()["facilities"] == 3
+        index = registry.index
+
+        hospitals = index.nearby(35.0, -106.0, 5000, "hospital")
+        # IHS facilities count as hospitals for the existing hospital search
+        assert [p["name"] for p in hospitals] == ["General Hospital", "Pueblo Clinic"]
+        assert hospitals[1]["facility_type"] == "tribal_health"
+        assert hospitals[1]["place_id"] == LOCAL_PREFIX + "2"
+        assert hospitals[1]["distance_m"] == pytest.approx(haversine_m(35.0, -106.0, 35.01, -106.0), rel=1e-3)
+
+        urgent = index.nearest(35.0, -106.0, 1, "urgent_care")
+        assert urgent[0]["place_id"] == "ChIJquick"
+        assert index.covers("doctor") and not index.covers("pharmacy")
+
+        details = index.details(LOCAL_PREFIX + "1")
+        assert details["displayName"]["text"] == "General Hospital"
+        assert details["nationalPhoneNumber"] == "555-0100"
+        assert registry.stats()["by_type"]["urgent_care"] == 1
+
+    def test_reload_only_reparses_changed_files(self, tmp_path):
+        _write_csv(tmp_path / "a.csv", [(1, "A", "", "", "hospital", 10.0, 10.0)])
+        _write_csv(tmp_path / "b.csv", [(2, "B", "", "", "hospital", 10.1, 10.0)])
+        registry = FacilityRegistry(str(tmp_path))
+        assert registry.reload()["reparsed"] == 2
+        before = registry.index
+
+        _write_csv(tmp_path / "b.csv", [(2, "B2", "", "", "hospital", 10.1, 10.0),
+                                        (3, "C", "", "", "clinic", 10.2, 10.0)])
+        result = registry.reload()
+        assert result == {**result, "facilities": 3, "reparsed": 1}
+        # The old snapshot is untouched for queries already holding it
+        assert len(before) == 2
+        assert registry.index.details(LOCAL_PREFIX + "2")["displayName"]["text"] == "B2"
+
+        (tmp_path / "a.csv").unlink()
+        assert registry.reload()["facilities"] == 2
+
+    def test_missing_path_gives_empty_index(self, tmp_path):
+        registry = FacilityRegistry(str(tmp_path / "nowhere"))
+        assert registry.reload()["facilities"] == 0
+        assert registry.index.nearby(0, 0, 1000, "hospital") == []
+
+
+class TestNormalizeType:
+    """Tests for mapping dataset categories to facility types"""
+
+    def test_categories(self):
+        assert normalize_type("Indian Health Service") == "tribal_health"
+        assert normalize_type("URGENT CARE CENTER") == "urgent_care"
+        assert normalize_type("Critical Access Hospital") == "hospital"
+        assert normalize_type("Federally Qualified Health Center") == "clinic"
+        assert normalize_type(None) == "other"
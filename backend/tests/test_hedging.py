@@ -0,0 +1,126 @@
+import sys
+import os
+import asyncio
+import pytest
+import httpx
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.hedging import Hedger, LatencyTracker
+from app.services.http_client import UpstreamClients
+
+
+def _attempts(*delays):
+    """An attempt function whose n-th call sleeps delays[n] and returns n."""
+    calls = []
+
+    async def attempt(timeout):
+        index = len(calls)
+        calls.append(timeout)
+        await asyncio.sleep(delays[index])
+        return index
+
+    return attempt, calls
+
+
+class TestLatencyTracker:
+    """Tests for the sliding latency window"""
+
+    def test_percentile_needs_minimum_samples(self):
+        tracker = LatencyTracker(window=100, min_samples=10)
+        for i in range(9):
+            tracker.record(i / 100)
+        assert tracker.percentile(95) is None
+
+        tracker.record(0.09)
+        assert tracker.percentile(50) == 0.04
+        assert tracker.percentile(95) == 0.09
+
+    def test_window_drops_old_samples(self):
+        tracker = LatencyTracker(window=5, min_samples=1)
+        for seconds in (10, 10, 1, 1, 1, 1, 1):
+            tracker.record(seconds)
+        assert len(tracker) == 5
+        assert tracker.percentile(100) == 1
+
+
+class TestHedger:
+    """Tests for deadlines and hedged attempts"""
+
+    @pytest.mark.asyncio
+    async def test_fast_primary_is_not_hedged(self):
+        hedger = Hedger()
+        attempt, calls = _attempts(0.0)
+
+        assert await hedger.run("directions", attempt, deadline=1.0, hedge_after=0.1) == 0
+        assert len(calls) == 1
+        assert hedger.stats()["directions"]["hedged"] == 0
+
+    @pytest.mark.asyncio
+    async def test_hedge_wins_when_primary_is_slow(self):
+        hedger = Hedger()
+        attempt, calls = _attempts(0.5, 0.0)
+
+        assert await hedger.run("directions", attempt, deadline=1.0, hedge_after=0.02) == 1
+        assert len(calls) == 2
+        # The hedge only gets what is left of the deadline
+        assert calls[1] < calls[0]
+        stats = hedger.stats()["directions"]
+        assert stats["hedge_wins"] == 1
+        assert stats["hedge_win_ratio"] == 1.0
+
+    @pytest.mark.asyncio
+    async def test_deadline_bounds_every_attempt(self):
+        hedger = Hedger()
+        attempt, _ = _attempts(1.0, 1.0)
+
+        with pytest.raises(httpx.TimeoutException):
+            await hedger.run("directions", attempt, deadline=0.05, hedge_after=0.01)
+        assert hedger.stats()["directions"]["deadline_exceeded"] == 1
+
+    @pytest.mark.asyncio
+    async def test_failure_waits_for_the_other_attempt(self):
+        hedger = Hedger()
+        calls = []
+
+        async def attempt(timeout):
+            calls.append(timeout)
+            if len(calls) == 1:
+                await asyncio.sleep(0.03)
+                raise httpx.ConnectError("reset")
+            await asyncio.sleep(0.05)
+            return "ok"
+
+        assert await hedger.run("directions", attempt, deadline=1.0, hedge_after=0.01) == "ok"
+
+
+class TestUpstreamHedging:
+    """Tests for hedged requests through the pooled clients"""
+
+    @pytest.mark.asyncio
+    async def test_latency_is_tracked_and_used_for_hedging(self):
+        clients = UpstreamClients()
+        sent = []
+
+        async def handler(request):
+            sent.append(request)
+            await asyncio.sleep(0.2 if len(sent) == 21 else 0.0)
+            return httpx.Response(200, json={"status": "OK"})
+
+        clients._clients["maps"] = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        clients._stats["maps"] = {"requests": 0, "errors": 0, "in_flight": 0, "total_time": 0.0}
+        url = "https://maps.googleapis.com/maps/api/directions/json"
+
+        assert clients.hedge_delay("directions") is None
+        for _ in range(20):
+            await clients.request("maps", "GET", url, endpoint="directions", hedge=True, deadline=1.0)
+        assert clients.hedge_delay("directions") is not None
+
+        response = await clients.request("maps", "GET", url, endpoint="directions", hedge=True, deadline=1.0)
+        assert response.status_code == 200
+        assert len(sent) == 22
+        stats = clients.stats()
+        assert stats["hedging"]["directions"]["hedge_wins"] == 1
+        assert stats["latency"]["directions"]["samples"] >= 20
+        await clients.shutdown()
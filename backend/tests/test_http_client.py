@@ -0,0 +1,87 @@
+import sys
+import os
+import asyncio
+import pytest
+import httpx
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.http_client import UpstreamClients, UPSTREAM_HOSTS
+
+
+class TestUpstreamClients:
+    """Tests for the shared pooled upstream HTTP clients"""
+
+    @pytest.mark.asyncio
+    async def test_one_client_per_host_is_reused(self):
+        clients = UpstreamClients()
+        await clients.startup()
+        try:
+            assert set(clients.stats()["hosts"]) == set(UPSTREAM_HOSTS)
+            assert clients.client("places") is clients.client("places")
+            assert clients.client("places") is not clients.client("routes")
+        finally:
+            await clients.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_client_is_created_lazily_without_lifespan(self):
+        clients = UpstreamClients()
+        client = clients.client("maps")
+        assert isinstance(client, httpx.AsyncClient)
+        assert not client.is_closed
+        await clients.shutdown()
+        assert client.is_closed
+
+    def test_timeouts_and_limits_from_environment(self, monkeypatch):
+        monkeypatch.setenv("HTTP_TIMEOUT_GEOCODE", "2.5")
+        monkeypatch.setenv("HTTP_MAX_CONNECTIONS", "7")
+        clients = UpstreamClients()
+        assert clients.timeout("geocode") == 2.5
+        assert clients.timeout("places_nearby") == 30.0
+        assert clients.limits.max_connections == 7
+
+    def test_http2_needs_optional_dependency(self, monkeypatch):
+        monkeypatch.setenv("HTTP2_ENABLED", "false")
+        assert UpstreamClients().http2 is False
+
+    @pytest.mark.asyncio
+    async def test_request_records_stats(self):
+        clients = UpstreamClients()
+        transport = httpx.MockTransport(lambda request: httpx.Response(200, json={"ok": True}))
+        clients._clients["places"] = httpx.AsyncClient(transport=transport)
+        clients._stats["places"] = {"requests": 0, "errors": 0, "in_flight": 0, "total_time": 0.0}
+
+        response = await clients.request("places", "GET", "https://places.googleapis.com/v1/places/abc", endpoint="places_details")
+
+        assert response.json() == {"ok": True}
+        stats = clients.stats()["hosts"]["places"]
+        assert stats["requests"] == 1
+        assert stats["in_flight"] == 0
+        await clients.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_identical_concurrent_requests_are_coalesced(self):
+        clients = UpstreamClients()
+        sent = []
+
+        async def handler(request):
+            sent.append(request)
+            await asyncio.sleep(0.01)
+            return httpx.Response(200, json={"places": []})
+
+        clients._clients["places"] = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        clients._stats["places"] = {"requests": 0, "errors": 0, "in_flight": 0, "total_time": 0.0}
+        url = "https://places.googleapis.com/v1/places:searchNearby"
+
+        responses = await asyncio.gather(*[
+            clients.request("places", "POST", url, endpoint="places_nearby",
+                            json={"radius": 10000, "includedTypes": ["hospital"]},
+                            headers={"X-Goog-FieldMask": "places.id"})
+            for _ in range(5)
+        ])
+
+        assert len(sent) == 1
+        assert all(r.status_code == 200 for r in responses)
+        assert clients.stats()["coalescing"]["places_nearby"]["coalesced"] == 4
+        await clients.shutdown()
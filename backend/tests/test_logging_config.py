@@ -0,0 +1,135 @@
+import sys
+import os
+import json
+import queue
+import logging
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.core.logging_config import (
+    RequestQueueHandler, JsonFormatter, CorrelationIdMiddleware, request_id, redact, scrub, log_payload,
+    coarse_location, coarsen_query, AccessLogFilter,
+)
+
+
+def _handler(size=100):
+    handler = RequestQueueHandler(queue.Queue(size))
+    logger = logging.getLogger(f"test_logging_config.{id(handler)}")
+    logger.handlers = [handler]
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    return handler, logger
+
+
+class TestRedaction:
+    """Tests for keeping PHI and credentials out of the logs"""
+
+    def test_sensitive_fields_are_replaced_by_length(self):
+        payload = {"medical_issue": "chest pain", "language": "en",
+                   "rows": [{"password": "hunter2", "user_id": 7, "phone_number": None}]}
+        assert redact(payload) == {
+            "medical_issue": "[redacted 10 chars]", "language": "en",
+            "rows": [{"password": "[redacted 7 chars]", "user_id": 7, "phone_number": None}],
+        }
+
+    def test_free_text_is_scrubbed(self):
+        text = scrub("call +1 (505) 722-1000 or mail jo@example.org, url ?origin=1&key=AIzaSyABC-123")
+        assert "722" not in text and "example.org" not in text and "AIza" not in text
+        assert "[phone]" in text and "[email]" in text and "key=[redacted]" in text
+
+    def test_ordinary_numbers_survive(self):
+        text = "took 1792317180.406227 s for place ChIJ1234567890abc, 20 results"
+        assert scrub(text) == text
+
+    def test_coordinates_are_coarsened_to_a_geohash_cell(self):
+        cell = coarse_location(31.77061, -106.49702)
+        assert cell == coarse_location(31.7718, -106.4952) and len(cell) == 5
+        assert "31.77" not in cell
+        assert coarse_location(None, -106.5) == "?"
+
+    def test_access_log_query_coordinates_are_coarsened(self):
+        cell = coarse_location(31.7706, -106.497)
+        assert coarsen_query("/api/places/nearby?latitude=31.7706&longitude=-106.497&radius=5000") == \
+            f"/api/places/nearby?cell={cell}&radius=5000"
+        assert coarsen_query("/directions?origin=31.7706,-106.497&destination=31.7717,-106.4988&format=polyline") == \
+            f"/directions?origin={cell}&destination={cell}&format=polyline"
+        assert coarsen_query("/api/places/details?place_id=abc") == "/api/places/details?place_id=abc"
+
+        record = logging.LogRecord("uvicorn.access", logging.INFO, __file__, 1, '%s - "%s %s HTTP/%s" %d',
+                                   ("127.0.0.1:5000", "GET", "/api/places/nearest-care?latitude=31.7706&longitude=-106.497",
+                                    "1.1", 200), None)
+        assert AccessLogFilter().filter(record)
+        assert "31.77" not in record.getMessage() and cell in record.getMessage()
+
+
+class TestQueueHandler:
+    """Tests for the non-blocking handler"""
+
+    def test_records_carry_request_id_and_formatted_message(self):
+        handler, logger = _handler()
+        token = request_id.set("abc123")
+        try:
+            logger.info("sent %d messages to %s", 2, "555-123-4567 ext")
+        finally:
+            request_id.reset(token)
+
+        record = handler.queue.get_nowait()
+        assert record.request_id == "abc123"
+        assert record.getMessage() == "sent 2 messages to [phone] ext"
+        entry = json.loads(JsonFormatter().format(record))
+        assert entry["request_id"] == "abc123"
+        assert entry["level"] == "INFO"
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        handler, logger = _handler(size=2)
+        for i in range(5):
+            logger.warning("message %d", i)
+        assert handler.queue.qsize() == 2
+        assert handler.dropped == 3
+
+    def test_exceptions_are_rendered_before_queueing(self):
+        handler, logger = _handler()
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            logger.error("failed", exc_info=True)
+        entry = json.loads(JsonFormatter().format(handler.queue.get_nowait()))
+        assert "ValueError: boom" in entry["exc"]
+
+    def test_payloads_are_sampled_and_redacted(self):
+        handler, logger = _handler()
+        log_payload(logger, "form", {"medical_issue": "fever"}, sample_rate=0)
+        assert handler.queue.empty()
+
+        log_payload(logger, "form", {"medical_issue": "fever"}, sample_rate=1)
+        record = handler.queue.get_nowait()
+        assert record.payload == {"medical_issue": "[redacted 5 chars]"}
+
+        logger.setLevel(logging.INFO)
+        log_payload(logger, "form", {"medical_issue": "fever"}, sample_rate=1)
+        assert handler.queue.empty()
+
+
+class TestCorrelationIdMiddleware:
+    """Tests for per-request correlation ids"""
+
+    def test_request_id_is_propagated_or_generated(self):
+        app = FastAPI()
+        app.add_middleware(CorrelationIdMiddleware)
+
+        @app.get("/rid")
+        async def rid():
+            return {"request_id": request_id.get()}
+
+        client = TestClient(app)
+        response = client.get("/rid", headers={"X-Request-ID": "probe-42"})
+        assert response.json() == {"request_id": "probe-42"}
+        assert response.headers["x-request-id"] == "probe-42"
+
+        generated = client.get("/rid", headers={"X-Request-ID": "bad id\twith spaces"})
+        assert generated.json()["request_id"] == generated.headers["x-request-id"]
+        assert generated.headers["x-request-id"] != "bad id\twith spaces"
+        assert request_id.get() == "-"
@@ -0,0 +1,106 @@
+import sys
+import os
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services import metrics
+from app.services.metrics import Registry, MetricsMiddleware
+from app.services.resilience import CircuitBreaker, CircuitOpenError
+
+
+class TestRegistry:
+    """Tests for the Prometheus text exposition"""
+
+    def test_histogram_buckets_are_cumulative(self):
+        registry = Registry()
+        histogram = registry.histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value, "/a")
+
+        lines = registry.render().splitlines()
+        assert "# TYPE latency_seconds histogram" in lines
+        assert 'latency_seconds_bucket{route="/a",le="0.1"} 2' in lines
+        assert 'latency_seconds_bucket{route="/a",le="1"} 3' in lines
+        assert 'latency_seconds_bucket{route="/a",le="+Inf"} 4' in lines
+        assert 'latency_seconds_count{route="/a"} 4' in lines
+        assert 'latency_seconds_sum{route="/a"} 3.65' in lines
+
+    def test_counters_gauges_and_label_escaping(self):
+        registry = Registry()
+        counter = registry.counter("errors_total", "Errors", ("category",))
+        gauge = registry.gauge("in_flight", "In flight")
+        counter.inc('say "hi"\\')
+        counter.inc('say "hi"\\', amount=2)
+        gauge.inc()
+        gauge.inc()
+        gauge.dec()
+
+        text = registry.render()
+        assert 'errors_total{category="say \\"hi\\"\\\\"} 3' in text
+        assert "in_flight 1\n" in text
+
+    def test_collectors_run_at_scrape_time(self):
+        registry = Registry()
+        state = {"ratio": 0.25}
+        registry.add_collector(lambda: [("hit_ratio", "gauge", "Hit ratio", [({"cache": "x"}, state["ratio"]),
+                                                                              ({"cache": "y"}, None)])])
+        state["ratio"] = 0.5
+        text = registry.render()
+        assert 'hit_ratio{cache="x"} 0.5' in text
+        # Unknown values are left out rather than exported as 0
+        assert 'cache="y"' not in text
+
+    def test_duplicate_names_are_rejected(self):
+        registry = Registry()
+        registry.counter("a_total", "A")
+        with pytest.raises(ValueError):
+            registry.gauge("a_total", "A")
+
+
+class TestMetricsMiddleware:
+    """Tests for per-route request metrics"""
+
+    def test_requests_are_labelled_by_route_template(self):
+        app = FastAPI()
+        app.add_middleware(MetricsMiddleware)
+
+        @app.get("/items/{item_id}")
+        async def item(item_id: str):
+            return {"id": item_id}
+
+        client = TestClient(app)
+        before = metrics.http_duration.count("GET", "/items/{item_id}")
+        client.get("/items/1")
+        client.get("/items/2")
+        client.get("/missing")
+
+        assert metrics.http_duration.count("GET", "/items/{item_id}") == before + 2
+        assert metrics.http_requests.value("GET", "unmatched", "404") >= 1
+
+
+class TestUpstreamMetrics:
+    """Tests for dependency calls reported through the breaker guard"""
+
+    def test_guard_records_latency_and_error_categories(self):
+        breaker = CircuitBreaker("metrics_test", consecutive_failures=2)
+
+        with breaker.guard("lookup"):
+            pass
+        with breaker.guard("lookup") as call:
+            call.fail("http_5xx")
+        with pytest.raises(TimeoutError):
+            with breaker.guard("lookup"):
+                raise TimeoutError()
+        with pytest.raises(CircuitOpenError):
+            with breaker.guard("lookup"):
+                pass
+
+        assert metrics.upstream_duration.count("metrics_test", "lookup") == 3
+        assert metrics.upstream_errors.value("metrics_test", "lookup", "http_5xx") == 1
+        assert metrics.upstream_errors.value("metrics_test", "lookup", "timeout") == 1
+        assert metrics.upstream_errors.value("metrics_test", "lookup", "circuit_open") == 1
+        assert metrics.upstream_in_flight.value("metrics_test") == 0
@@ -0,0 +1,103 @@
+import sys
+import os
+import time
+import numpy as np
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.navigation import NavigationRoute, NavigationSession, NavigationSessions
+
+# Roughly 1 km in degrees of latitude
+KM = 1 / 111.2
+
+
+def _l_shaped_route():
+    """1 km east, then 1 km north, from (0, 0); 10 vertices per step."""
+    east = np.column_stack((np.zeros(11), np.linspace(0, KM, 11)))
+    north = np.column_stack((np.linspace(0, KM, 11), np.full(11, KM)))
+    steps = [
+        {"instruction": "Head east", "distance": "0.6 mi", "duration": "2 min", "duration_s": 120},
+        {"instruction": "Turn left", "distance": "0.6 mi", "duration": "2 min", "duration_s": 120},
+    ]
+    # Traffic makes the whole trip take 300 s instead of the static 240 s
+    return NavigationRoute([east, north], steps, duration_s=300)
+
+
+class TestNavigationRoute:
+    """Tests for map matching against a stored route"""
+
+    def test_geometry_and_steps(self):
+        route = _l_shaped_route()
+
+        assert len(route.coords) == 21
+        assert abs(route.length_m - 2000) < 10
+        assert abs(route.steps[1].start_offset_m - 1000) < 5
+
+    def test_match_projects_onto_nearest_segment(self):
+        route = _l_shaped_route()
+        match = route.match(0.0002, KM / 2, radius_m=50)
+
+        assert match is not None
+        assert abs(match.distance_m - 22) < 1
+        assert abs(match.offset_m - 500) < 5
+        assert route.match(0.01, KM / 2, radius_m=50) is None
+
+    def test_prefers_progress_over_backtracking(self):
+        # Out and back along the same street: the return leg overlaps the way out
+        out = np.column_stack((np.zeros(11), np.linspace(0, KM, 11)))
+        back = out[::-1]
+        route = NavigationRoute([out, back], [{"duration_s": 60}, {"duration_s": 60}], duration_s=120)
+
+        assert route.match(0, KM / 4, 50).offset_m < 1000
+        assert route.match(0, KM / 4, 50, last_offset_m=1500).offset_m > 1000
+
+    def test_huge_search_radius_is_bounded(self):
+        route = _l_shaped_route()
+        start = time.perf_counter()
+        assert route.match(5.0, 5.0, radius_m=200000) is None
+        assert route.match(0.0002, KM / 2, radius_m=1e12) is not None
+        assert time.perf_counter() - start < 0.1
+
+
+class TestNavigationSession:
+    """Tests for per-fix navigation state"""
+
+    def test_state_along_route(self):
+        session = NavigationSession(KM, KM, _l_shaped_route())
+        state = session.update(KM / 2, KM)
+
+        assert state["on_route"] and not state["off_route"]
+        assert state["current_step"]["instruction"] == "Turn left"
+        assert state["next_step"] is None
+        assert abs(state["remaining_distance_m"] - 500) < 10
+        # Half of the 120 s step, scaled by the 300/240 traffic ratio
+        assert abs(state["remaining_duration_s"] - 75) <= 1
+        assert not state["arrived"]
+        assert session.update(KM, KM)["arrived"]
+
+    def test_off_route_needs_consecutive_fixes(self):
+        session = NavigationSession(KM, KM, _l_shaped_route())
+
+        assert not session.update(0.005, 0)["off_route"]
+        assert session.update(0.005, 0)["off_route"]
+        assert not session.update(0, KM / 2)["off_route"]
+
+    def test_accuracy_widens_threshold(self):
+        session = NavigationSession(KM, KM, _l_shaped_route())
+        for _ in range(3):
+            state = session.update(0.0008, KM / 2, accuracy_m=120)
+        assert state["on_route"]
+
+
+class TestNavigationSessions:
+    """Tests for the session registry"""
+
+    def test_oldest_sessions_are_dropped(self):
+        sessions = NavigationSessions(max_sessions=2)
+        first = sessions.add(NavigationSession(KM, KM, _l_shaped_route()))
+        sessions.add(NavigationSession(KM, KM, _l_shaped_route()))
+        sessions.add(NavigationSession(KM, KM, _l_shaped_route()))
+
+        assert sessions.get(first.id) is None
+        assert sessions.stats()["active"] == 2
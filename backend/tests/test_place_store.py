@@ -0,0 +1,115 @@
+import sys
+import os
+import time
+import pytest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+os.environ.setdefault("GOOGLEMAPS_API_KEY", "test-key")
+
+from app.core import google_routes
+from app.services.http_client import UpstreamError
+from app.services.place_store import PlaceStore, FIELD_TTLS
+
+DETAILS = {
+    "displayName": {"text": "Las Palmas Medical Center"},
+    "formattedAddress": "1801 N Oregon St, El Paso, TX 79902",
+    "location": {"latitude": 31.7717, "longitude": -106.4988},
+    "nationalPhoneNumber": "(915) 521-1200",
+}
+
+
+class TestPlaceStore:
+    """Tests for the persistent place details store"""
+
+    def test_unknown_place_has_every_field_stale(self):
+        store = PlaceStore(":memory:")
+        assert store.stale_fields(store.load("abc")) == list(FIELD_TTLS)
+
+    def test_saved_fields_are_fresh_and_missing_ones_stored_as_null(self):
+        store = PlaceStore(":memory:")
+        store.save("abc", DETAILS, list(FIELD_TTLS), {})
+
+        stored = store.load("abc")
+        assert store.stale_fields(stored) == []
+        assert stored["displayName"].value == {"text": "Las Palmas Medical Center"}
+        assert stored["internationalPhoneNumber"].value is None
+
+    def test_only_expired_fields_are_stale(self):
+        store = PlaceStore(":memory:")
+        store.save("abc", DETAILS, list(FIELD_TTLS), {})
+        stored = store.load("abc")
+
+        later = time.time() + 8 * 86400  # phone numbers expire after 7 days
+        assert store.stale_fields(stored, now=later) == ["nationalPhoneNumber", "internationalPhoneNumber"]
+
+    def test_changed_at_only_moves_when_value_changes(self):
+        store = PlaceStore(":memory:")
+        store.save("abc", DETAILS, list(FIELD_TTLS), {})
+        first = store.load("abc")
+
+        written = store.save("abc", {"nationalPhoneNumber": "(915) 521-1200"}, ["nationalPhoneNumber"], first)
+        assert written["nationalPhoneNumber"].changed_at == first["nationalPhoneNumber"].changed_at
+
+        written = store.save("abc", {"nationalPhoneNumber": "(915) 000-0000"}, ["nationalPhoneNumber"], first)
+        assert written["nationalPhoneNumber"].changed_at > first["nationalPhoneNumber"].changed_at
+
+    def test_store_survives_reopen(self, tmp_path):
+        path = str(tmp_path / "places.sqlite3")
+        store = PlaceStore(path)
+        store.save("abc", DETAILS, list(FIELD_TTLS), {})
+        store.close()
+
+        reopened = PlaceStore(path)
+        assert reopened.load("abc")["formattedAddress"].value == DETAILS["formattedAddress"]
+        assert reopened.stats()["places"] == 1
+
+    def test_place_count_tracks_new_places_only(self):
+        store = PlaceStore(":memory:")
+        store.save("abc", DETAILS, list(FIELD_TTLS), {})
+        store.save("abc", DETAILS, ["nationalPhoneNumber"], store.load("abc"))
+        store.save("def", DETAILS, list(FIELD_TTLS), {})
+        assert store.stats()["places"] == 2
+
+    def test_least_recently_fetched_places_are_evicted_past_the_cap(self):
+        store = PlaceStore(":memory:", max_places=10)
+        for i in range(11):
+            store.save(f"place{i}", DETAILS, list(FIELD_TTLS), {})
+
+        stats = store.stats()
+        assert stats["places"] == 9 and stats["evictions"] == 2
+        assert store.load("place0") == {} and store.load("place1") == {}
+        assert store.load("place10") != {}
+
+
+class TestPlaceRecord:
+    """Tests for serving place details from the store"""
+
+    @pytest.fixture
+    def store(self, monkeypatch):
+        store = PlaceStore(":memory:", field_ttls={"displayName": 0, "formattedAddress": 0})
+        monkeypatch.setattr(google_routes, "get_place_store", lambda: store)
+        return store
+
+    @pytest.mark.asyncio
+    async def test_stored_fields_are_served_when_the_refresh_fails(self, store, monkeypatch):
+        store.save("abc", DETAILS, ["displayName", "formattedAddress"], {})
+
+        async def unavailable(place_id, fields):
+            raise UpstreamError(503, "places temporarily unavailable")
+        monkeypatch.setattr(google_routes, "request_place_fields", unavailable)
+
+        fields, _, state = await google_routes.get_place_record("abc")
+        assert state == "STALE"
+        assert fields["formattedAddress"] == DETAILS["formattedAddress"]
+        assert store.stats()["stale_served"] == 1
+
+    @pytest.mark.asyncio
+    async def test_refresh_failure_without_stored_fields_raises(self, store, monkeypatch):
+        async def unavailable(place_id, fields):
+            raise UpstreamError(503, "places temporarily unavailable")
+        monkeypatch.setattr(google_routes, "request_place_fields", unavailable)
+
+        with pytest.raises(UpstreamError):
+            await google_routes.get_place_record("abc")
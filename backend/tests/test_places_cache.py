@@ -0,0 +1,136 @@
+import sys
+import os
+import asyncio
+import pytest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.places_cache import (
+    NearbyPlacesCache, geohash_encode, geohash_neighbors, radius_bucket,
+)
+
+EL_PASO = (31.7706, -106.4970)
+
+PLACES = [
+    {"place_id": "a", "name": "Near", "latitude": 31.7710, "longitude": -106.4960},
+    {"place_id": "b", "name": "Far", "latitude": 31.8400, "longitude": -106.4970},  # ~7.7 km north
+]
+
+
+class TestGeohash:
+    """Tests for the geocell helpers"""
+
+    def test_known_geohash(self):
+        assert geohash_encode(57.64911, 10.40744, 11) == "u4pruydqqvj"
+
+    def test_neighbors_include_cell_itself(self):
+        cell = geohash_encode(*EL_PASO, 6)
+        neighbors = geohash_neighbors(cell)
+        assert cell in neighbors
+        assert len(set(neighbors)) == 9
+
+    def test_radius_buckets_round_up(self):
+        assert radius_bucket(10000) == 10000
+        assert radius_bucket(10001) == 20000
+        assert radius_bucket(600) == 1000
+
+
+class TestNearbyPlacesCache:
+    """Tests for the geocell nearby-places cache"""
+
+    def test_miss_then_fresh_hit_in_same_cell(self):
+        cache = NearbyPlacesCache()
+        assert cache.get(*EL_PASO, 10000, "hospital") == (None, "miss")
+
+        cache.put(*EL_PASO, 10000, "hospital", PLACES, complete=True)
+        places, state = cache.get(*EL_PASO, 10000, "Hospital")
+        assert state == "fresh"
+        assert [p["place_id"] for p in places] == ["a", "b"]
+
+    def test_same_cell_hit_must_be_covered(self):
+        cache = NearbyPlacesCache()
+        cache.put(*EL_PASO, 10000, "hospital", PLACES, complete=True)
+        # Same geohash cell and radius bucket, but the circle reaches past the cached one
+        moved = (EL_PASO[0] + 0.0005, EL_PASO[1])
+        assert geohash_encode(*moved, 6) == geohash_encode(*EL_PASO, 6)
+        assert cache.get(*moved, 10000, "hospital") == (None, "miss")
+        # A smaller circle inside the cached one is still a hit
+        _, state = cache.get(*moved, 9000, "hospital")
+        assert state == "fresh"
+
+    def test_results_are_filtered_to_requested_radius(self):
+        cache = NearbyPlacesCache()
+        cache.put(*EL_PASO, 10000, "hospital", PLACES, complete=True)
+        places, _ = cache.get(*EL_PASO, 5000, "hospital")
+        assert [p["place_id"] for p in places] == ["a"]
+
+    def test_stale_entry_is_served(self):
+        cache = NearbyPlacesCache(fresh_ttl=0, stale_ttl=60)
+        cache.put(*EL_PASO, 10000, "hospital", PLACES, complete=True)
+        places, state = cache.get(*EL_PASO, 10000, "hospital")
+        assert state == "stale"
+        assert places
+
+    def test_expired_entry_is_a_miss(self):
+        cache = NearbyPlacesCache(fresh_ttl=0, stale_ttl=0)
+        cache.put(*EL_PASO, 10000, "hospital", PLACES, complete=True)
+        assert cache.get(*EL_PASO, 10000, "hospital") == (None, "miss")
+
+    def test_covering_entry_from_neighbor_cell(self):
+        cache = NearbyPlacesCache()
+        cache.put(*EL_PASO, 20000, "hospital", PLACES, complete=True)
+        # ~1.5 km east is a different precision-6 cell, but inside the cached 20 km circle
+        places, state = cache.get(EL_PASO[0], EL_PASO[1] + 0.016, 2000, "hospital")
+        assert state == "covered"
+        assert [p["place_id"] for p in places] == ["a"]
+
+    def test_truncated_entry_is_not_reused_for_coverage(self):
+        cache = NearbyPlacesCache()
+        cache.put(*EL_PASO, 20000, "hospital", PLACES, complete=False)
+        assert cache.get(EL_PASO[0], EL_PASO[1] + 0.016, 2000, "hospital") == (None, "miss")
+
+    def test_truncated_entry_only_answers_its_own_search(self):
+        cache = NearbyPlacesCache()
+        cache.put(*EL_PASO, 10000, "hospital", PLACES, complete=False)
+        # Same cell and bucket, smaller circle: the 20 results may skip the closest places
+        assert cache.get(*EL_PASO, 6000, "hospital") == (None, "miss")
+        _, state = cache.get(*EL_PASO, 10000, "hospital")
+        assert state == "fresh"
+
+    def test_entry_keeps_the_searched_radius(self):
+        cache = NearbyPlacesCache()
+        cache.put(*EL_PASO, 5001, "hospital", PLACES, complete=True)
+        # 8000 m falls in the same 10 km bucket but reaches past the 5001 m search
+        assert cache.get(*EL_PASO, 8000, "hospital") == (None, "miss")
+        _, state = cache.get(*EL_PASO, 5001, "hospital")
+        assert state == "fresh"
+
+    def test_lru_eviction(self):
+        cache = NearbyPlacesCache(max_entries=2)
+        cache.put(10.0, 10.0, 1000, "hospital", [], complete=True)
+        cache.put(20.0, 20.0, 1000, "hospital", [], complete=True)
+        cache.get(10.0, 10.0, 1000, "hospital")
+        cache.put(30.0, 30.0, 1000, "hospital", [], complete=True)
+        assert cache.get(20.0, 20.0, 1000, "hospital")[1] == "miss"
+        assert cache.get(10.0, 10.0, 1000, "hospital")[1] == "fresh"
+        assert cache.stats()["evictions"] == 1
+
+    @pytest.mark.asyncio
+    async def test_background_refresh_runs_once(self):
+        cache = NearbyPlacesCache(fresh_ttl=0, stale_ttl=60)
+        cache.put(*EL_PASO, 10000, "hospital", [], complete=True)
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0)
+            return PLACES, True
+
+        cache.refresh_in_background(*EL_PASO, 10000, "hospital", fetch)
+        cache.refresh_in_background(*EL_PASO, 10000, "hospital", fetch)
+        await asyncio.sleep(0.01)
+
+        assert len(calls) == 1
+        places, _ = cache.get(*EL_PASO, 10000, "hospital")
+        assert [p["place_id"] for p in places] == ["a", "b"]
@@ -0,0 +1,115 @@
+import sys
+import os
+import asyncio
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.quota import (
+    QuotaGovernor, QuotaExceeded, PriorityMiddleware, priority, request_priority, issue_emergency_token,
+    EMERGENCY, NORMAL, LOW,
+)
+
+
+def _governor(per_minute=60, burst=10, max_wait=0.0):
+    governor = QuotaGovernor({"routes": per_minute}, max_wait=max_wait)
+    bucket = governor._buckets["routes"]
+    bucket.capacity = bucket.tokens = burst
+    return governor
+
+
+class TestQuotaGovernor:
+    """Tests for the per-API token buckets and priority lanes"""
+
+    @pytest.mark.asyncio
+    async def test_normal_lane_keeps_the_emergency_reserve(self):
+        governor = _governor(burst=10)
+        for _ in range(8):
+            await governor.acquire("routes", NORMAL)
+
+        with pytest.raises(QuotaExceeded):
+            await governor.acquire("routes", NORMAL)
+
+        # The reserved 20% is still there for emergencies
+        await governor.acquire("routes", EMERGENCY)
+        stats = governor.stats()["routes"]
+        assert stats["granted"] == {EMERGENCY: 1, NORMAL: 8, LOW: 0}
+        assert stats["degraded"] == 1
+
+    @pytest.mark.asyncio
+    async def test_emergency_can_overdraw(self):
+        governor = _governor(burst=2)
+        for _ in range(4):
+            await governor.acquire("routes", EMERGENCY)
+        assert governor.stats()["routes"]["remaining"] < 0
+        assert governor.stats()["routes"]["overdrawn"] >= 1
+
+    @pytest.mark.asyncio
+    async def test_low_lane_is_dropped_first(self):
+        governor = _governor(burst=10)
+        for _ in range(5):
+            await governor.acquire("routes", LOW)
+        with pytest.raises(QuotaExceeded):
+            await governor.acquire("routes", LOW)
+        await governor.acquire("routes", NORMAL)
+
+    @pytest.mark.asyncio
+    async def test_normal_lane_waits_for_refill(self):
+        # 1200/min refills a token every 50 ms
+        governor = _governor(per_minute=1200, burst=5, max_wait=0.5)
+        for _ in range(4):
+            await governor.acquire("routes", NORMAL)
+
+        await asyncio.wait_for(governor.acquire("routes", NORMAL), 1.0)
+        assert governor.stats()["routes"]["queued"] == 1
+
+    @pytest.mark.asyncio
+    async def test_lane_defaults_to_the_request_priority(self):
+        governor = _governor(burst=10)
+        for _ in range(8):
+            await governor.acquire("routes")
+        with priority(EMERGENCY):
+            await governor.acquire("routes")
+        assert governor.stats()["routes"]["granted"][EMERGENCY] == 1
+
+    @pytest.mark.asyncio
+    async def test_ungoverned_api_passes(self):
+        await _governor().acquire("unknown_api")
+
+
+class TestPriorityMiddleware:
+    """Tests for reading the lane from the request"""
+
+    def _client(self):
+        app = FastAPI()
+        app.add_middleware(PriorityMiddleware)
+
+        @app.get("/lane")
+        async def lane():
+            return {"lane": request_priority.get()}
+
+        return TestClient(app)
+
+    def test_header_and_query_set_the_lane(self):
+        client = self._client()
+        assert client.get("/lane").json() == {"lane": NORMAL}
+        assert client.get("/lane", headers={"X-Priority": "Low"}).json() == {"lane": LOW}
+        assert client.get("/lane?priority=low").json() == {"lane": LOW}
+        assert client.get("/lane?priority=urgent!").json() == {"lane": NORMAL}
+
+    def test_emergency_lane_needs_a_server_issued_token(self):
+        client = self._client()
+        assert client.get("/lane", headers={"X-Priority": "emergency"}).json() == {"lane": NORMAL}
+        assert client.get("/lane?priority=emergency").json() == {"lane": NORMAL}
+
+        token = issue_emergency_token()
+        assert client.get("/lane", headers={"X-Priority-Token": token}).json() == {"lane": EMERGENCY}
+
+        expires, _, signature = token.partition(".")
+        forged = f"{int(expires) + 3600}.{signature}"
+        assert client.get("/lane", headers={"X-Priority-Token": forged}).json() == {"lane": NORMAL}
+        expired = issue_emergency_token(ttl=-1)
+        assert client.get("/lane", headers={"X-Priority-Token": expired}).json() == {"lane": NORMAL}
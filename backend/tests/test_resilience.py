@@ -0,0 +1,126 @@
+import sys
+import os
+import time
+import asyncio
+import pytest
+import httpx
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services import http_client
+from app.services.http_client import UpstreamClients, UpstreamError
+from app.services.resilience import CircuitBreaker, CircuitOpenError, Resilience
+
+
+def _fail(breaker, times=1):
+    for _ in range(times):
+        with pytest.raises(RuntimeError):
+            with breaker.guard():
+                raise RuntimeError("upstream down")
+
+
+class TestCircuitBreaker:
+    """Tests for breaker state transitions"""
+
+    def test_opens_after_consecutive_failures_and_fails_fast(self):
+        breaker = CircuitBreaker("gemini", consecutive_failures=3, open_seconds=60)
+        _fail(breaker, 2)
+        assert breaker.state == "closed"
+
+        _fail(breaker)
+        assert breaker.is_open()
+        with pytest.raises(CircuitOpenError) as info:
+            breaker.before_call()
+        assert info.value.dependency == "gemini"
+        assert breaker.stats()["rejected"] == 1
+
+    def test_opens_on_failure_ratio(self):
+        breaker = CircuitBreaker("places", min_calls=4, failure_ratio=0.5, consecutive_failures=100)
+        for ok in (True, False, True, False):
+            breaker.before_call()
+            breaker.record(ok, 0.01)
+        assert breaker.state == "open"
+
+    def test_half_open_trial_closes_or_reopens(self):
+        breaker = CircuitBreaker("routes", consecutive_failures=1, open_seconds=0.02, half_open_calls=1)
+        _fail(breaker)
+        time.sleep(0.03)
+        assert breaker.state == "half_open"
+
+        _fail(breaker)
+        assert breaker.state == "open"
+
+        time.sleep(0.03)
+        with breaker.guard():
+            # Only one trial at a time
+            with pytest.raises(CircuitOpenError):
+                breaker.before_call()
+        assert breaker.state == "closed"
+
+    def test_cancelled_trial_frees_its_slot(self):
+        breaker = CircuitBreaker("directions", consecutive_failures=1, open_seconds=0.01)
+        _fail(breaker)
+        time.sleep(0.02)
+
+        with pytest.raises(asyncio.CancelledError):
+            with breaker.guard():
+                raise asyncio.CancelledError()
+        breaker.before_call()
+        assert breaker.state == "half_open"
+
+    def test_failure_flag_without_exception(self):
+        breaker = CircuitBreaker("places", consecutive_failures=1)
+        with breaker.guard() as call:
+            call.fail()
+        assert breaker.is_open()
+
+
+class TestAdaptiveTimeout:
+    """Tests for timeouts derived from observed latency"""
+
+    def test_configured_timeout_until_latency_is_known(self):
+        breaker = CircuitBreaker("geocoding")
+        assert breaker.timeout(10.0) == 10.0
+
+    def test_timeout_follows_percentile_within_bounds(self):
+        breaker = CircuitBreaker("geocoding")
+        for _ in range(50):
+            breaker.record(True, 0.5)
+        assert breaker.timeout(10.0) == 1.5
+        assert breaker.timeout(1.0) == 1.0
+
+        fast = CircuitBreaker("routes")
+        for _ in range(50):
+            fast.record(True, 0.01)
+        # Never below the floor
+        assert fast.timeout(10.0) == 1.0
+
+
+class TestUpstreamBreaker:
+    """Tests for breakers on the pooled upstream clients"""
+
+    @pytest.mark.asyncio
+    async def test_server_errors_open_the_breaker(self, monkeypatch):
+        monkeypatch.setattr(http_client, "resilience", Resilience())
+        clients = UpstreamClients()
+        sent = []
+
+        def handler(request):
+            sent.append(request)
+            return httpx.Response(503, json={"error": {"message": "backend error"}})
+
+        clients._clients["maps"] = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        clients._stats["maps"] = {"requests": 0, "errors": 0, "in_flight": 0, "total_time": 0.0}
+        url = "https://maps.googleapis.com/maps/api/geocode/json"
+
+        for _ in range(5):
+            response = await clients.request("maps", "GET", url, endpoint="geocode", coalesce=False)
+            assert response.status_code == 503
+
+        with pytest.raises(UpstreamError) as info:
+            await clients.request("maps", "GET", url, endpoint="geocode", coalesce=False)
+        assert info.value.status_code == 503
+        assert len(sent) == 5
+        assert http_client.resilience.stats()["geocoding"]["state"] == "open"
+        await clients.shutdown()
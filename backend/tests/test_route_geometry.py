@@ -0,0 +1,135 @@
+import sys
+import os
+import math
+import numpy as np
+import pytest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services import route_geometry
+
+# Example from Google's encoded polyline documentation
+GOOGLE_EXAMPLE = "_p~iF~ps|U_ulLnnqC_mqNvxq`@"
+GOOGLE_POINTS = [[38.5, -120.2], [40.7, -120.95], [43.252, -126.453]]
+
+
+def _reference_dp(points, tolerance):
+    """Recursive Douglas-Peucker on projected points, for comparison."""
+    keep = {0, len(points) - 1}
+
+    def recurse(first, last):
+        a, b = points[first], points[last]
+        ab = b - a
+        best, index = -1.0, None
+        for i in range(first + 1, last):
+            ap = points[i] - a
+            length2 = ab @ ab
+            t = 0.0 if length2 == 0 else min(1.0, max(0.0, (ap @ ab) / length2))
+            d = math.hypot(*(ap - t * ab))
+            if d > best:
+                best, index = d, i
+        if index is not None and best > tolerance:
+            keep.add(index)
+            recurse(first, index)
+            recurse(index, last)
+
+    recurse(0, len(points) - 1)
+    return sorted(keep)
+
+
+class TestPolylineCodec:
+    """Tests for the vectorized polyline decoder and encoder"""
+
+    def test_decode_google_example(self):
+        assert route_geometry.decode_polyline(GOOGLE_EXAMPLE).tolist() == GOOGLE_POINTS
+
+    def test_round_trip(self):
+        rng = np.random.default_rng(1)
+        coords = np.round(np.cumsum(rng.normal(0, 0.01, (500, 2)), axis=0) + [19.4, -99.1], 5)
+
+        encoded = route_geometry.encode_polyline(coords)
+        assert np.allclose(route_geometry.decode_polyline(encoded), coords, atol=1e-9)
+        assert route_geometry.encode_polyline(GOOGLE_POINTS) == GOOGLE_EXAMPLE
+
+    def test_batch_decode_matches_single(self):
+        parts = [GOOGLE_EXAMPLE, route_geometry.encode_polyline([[-33.86, 151.2], [-33.87, 151.21]]), ""]
+        decoded = route_geometry.decode_polylines(parts)
+
+        assert len(decoded) == 3
+        assert decoded[0].tolist() == GOOGLE_POINTS
+        assert np.allclose(decoded[1], [[-33.86, 151.2], [-33.87, 151.21]])
+        assert decoded[2].shape == (0, 2)
+
+    def test_join_removes_boundary_duplicates(self):
+        joined = route_geometry.join_polylines([[[1, 1], [1, 2]], [[1, 2], [1, 3]], [[1, 3]]])
+        assert joined.tolist() == [[1, 1], [1, 2], [1, 3]]
+
+
+class TestSimplification:
+    """Tests for zoom-aware route simplification"""
+
+    def test_douglas_peucker_matches_recursive_reference(self):
+        rng = np.random.default_rng(2)
+        heading = np.cumsum(rng.normal(0, 0.2, 400))
+        coords = np.column_stack((np.cumsum(np.cos(heading)), np.cumsum(np.sin(heading)))) * 1e-4 + [19.4, -99.1]
+        points = route_geometry._project(coords)
+
+        simplified = route_geometry.simplify_douglas_peucker(coords, 5.0)
+        expected = coords[_reference_dp(points, 5.0)]
+        assert np.array_equal(simplified, expected)
+
+    def test_straight_line_collapses_to_endpoints(self):
+        coords = np.column_stack((np.linspace(10, 10.1, 50), np.linspace(20, 20.1, 50)))
+
+        for method in route_geometry.SIMPLIFY_METHODS:
+            simplified = route_geometry.simplify(coords, zoom=15, method=method)
+            assert simplified.tolist() == [coords[0].tolist(), coords[-1].tolist()]
+
+    def test_higher_zoom_keeps_more_points(self):
+        rng = np.random.default_rng(3)
+        heading = np.cumsum(rng.normal(0, 0.1, 2000))
+        coords = np.column_stack((np.cumsum(np.cos(heading)), np.cumsum(np.sin(heading)))) * 1e-4
+
+        low = route_geometry.simplify(coords, zoom=12)
+        high = route_geometry.simplify(coords, zoom=17)
+        assert 2 <= len(low) < len(high) <= len(coords)
+        assert route_geometry.simplify(coords).shape == coords.shape
+
+
+class TestRouteFormats:
+    """Tests for the /directions route wire formats"""
+
+    def test_json_formats(self):
+        coords = np.array(GOOGLE_POINTS)
+
+        assert route_geometry.format_route(coords)[0] == {"latitude": 38.5, "longitude": -120.2}
+        assert route_geometry.format_route(coords, "polyline") == GOOGLE_EXAMPLE
+        arrays = route_geometry.format_route(coords, "arrays")
+        assert arrays == {"latitudes": [38.5, 40.7, 43.252], "longitudes": [-120.2, -120.95, -126.453]}
+
+    def test_binary_round_trip(self):
+        metadata = {"distance": "5 km", "duration": "9 min", "steps": [{"instruction": "Gire à direita"}]}
+        frame = route_geometry.pack_route(GOOGLE_POINTS, metadata)
+
+        coords, decoded = route_geometry.unpack_route(frame)
+        assert decoded == metadata
+        assert np.allclose(coords, GOOGLE_POINTS, atol=1e-5)
+        assert (len(frame) - 8 * len(GOOGLE_POINTS)) % 4 == 0
+
+    def test_binary_rejects_other_payloads(self):
+        with pytest.raises(ValueError):
+            route_geometry.unpack_route(b'{"route": []}')
+
+
+class TestDistances:
+    """Tests for the vectorized haversine distance"""
+
+    def test_matches_scalar_haversine(self):
+        from app.services.places_cache import haversine_m
+        lats = [19.42, -33.9, 64.1, 19.4326]
+        lngs = [-99.15, 151.2, -21.9, -99.1332]
+        distances = route_geometry.haversine_distances_m(19.4326, -99.1332, lats, lngs)
+        for d, lat, lng in zip(distances, lats, lngs):
+            assert d == pytest.approx(haversine_m(19.4326, -99.1332, lat, lng), rel=1e-6, abs=1e-6)
+        assert distances[-1] == 0
@@ -0,0 +1,85 @@
+import sys
+import os
+import asyncio
+import pytest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.singleflight import SingleFlight, request_key
+
+
+class TestSingleFlight:
+    """Tests for single-flight request coalescing"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_callers_share_one_call(self):
+        flight = SingleFlight()
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "result"
+
+        results = await asyncio.gather(*[flight.do("k", fetch) for _ in range(10)])
+
+        assert results == ["result"] * 10
+        assert len(calls) == 1
+        assert flight.stats()["default"] == {"executions": 1, "coalesced": 9, "coalesced_ratio": 0.9}
+        assert flight.in_flight() == 0
+
+    @pytest.mark.asyncio
+    async def test_errors_reach_every_waiter(self):
+        flight = SingleFlight()
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("upstream down")
+
+        results = await asyncio.gather(*[flight.do("k", fail) for _ in range(3)], return_exceptions=True)
+        assert all(isinstance(r, RuntimeError) for r in results)
+
+    @pytest.mark.asyncio
+    async def test_cancelled_leader_does_not_cancel_followers(self):
+        flight = SingleFlight()
+
+        async def fetch():
+            await asyncio.sleep(0.02)
+            return "ok"
+
+        leader = asyncio.ensure_future(flight.do("k", fetch))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flight.do("k", fetch))
+        await asyncio.sleep(0)
+        leader.cancel()
+
+        assert await follower == "ok"
+
+    @pytest.mark.asyncio
+    async def test_sequential_calls_are_not_coalesced(self):
+        flight = SingleFlight()
+
+        async def fetch():
+            return 1
+
+        await flight.do("k", fetch)
+        await flight.do("k", fetch)
+        assert flight.stats()["default"]["executions"] == 2
+
+
+class TestRequestKey:
+    """Tests for upstream request normalization"""
+
+    def test_key_ignores_order_and_credentials(self):
+        a = request_key("get", "https://maps.googleapis.com/maps/api/geocode/json",
+                        params={"latlng": "1,2", "key": "secret-a", "result_type": "country"})
+        b = request_key("GET", "https://maps.googleapis.com/maps/api/geocode/json",
+                        params={"result_type": "country", "latlng": "1,2", "key": "secret-b"})
+        assert a == b
+
+    def test_field_mask_changes_key(self):
+        url = "https://places.googleapis.com/v1/places/abc"
+        a = request_key("GET", url, headers={"X-Goog-FieldMask": "displayName"})
+        b = request_key("GET", url, headers={"X-Goog-FieldMask": "displayName,location"})
+        assert a != b
@@ -0,0 +1,81 @@
+import sys
+import os
+from fastapi import FastAPI, APIRouter
+from fastapi.testclient import TestClient
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services import timing
+from app.services.timing import RequestTiming, TimedRoute, ServerTimingMiddleware
+from app.services.resilience import CircuitBreaker
+
+
+def _stages(header):
+    """Server-Timing header -> {name: [params]}"""
+    stages = {}
+    for part in header.split(", "):
+        name, *params = part.split(";")
+        stages[name] = params
+    return stages
+
+
+def _app():
+    app = FastAPI()
+    app.router.route_class = TimedRoute
+    app.add_middleware(ServerTimingMiddleware)
+    breaker = CircuitBreaker("timing_test")
+
+    @app.get("/work")
+    async def work():
+        with timing.stage("cache"):
+            pass
+        for _ in range(3):
+            with breaker.guard("lookup"):
+                pass
+        return {"ok": True}
+
+    router = APIRouter(route_class=TimedRoute)
+
+    @router.get("/sync")
+    def sync_work():
+        return {"ok": True}
+
+    app.include_router(router)
+    return app
+
+
+class TestServerTiming:
+    """Tests for the per-request stage breakdown"""
+
+    def test_header_splits_request_into_stages(self):
+        response = TestClient(_app()).get("/work")
+        stages = _stages(response.headers["server-timing"])
+        assert list(stages) == ["validate", "cache", "lookup", "handler", "serialize", "total"]
+        assert stages["lookup"][1] == 'desc="3 calls"'
+        for params in stages.values():
+            assert params[0].startswith("dur=")
+
+    def test_included_sync_routes_are_timed(self):
+        response = TestClient(_app()).get("/sync")
+        stages = _stages(response.headers["server-timing"])
+        assert {"validate", "handler", "serialize", "total"} <= set(stages)
+
+    def test_unmatched_requests_still_report_total(self):
+        response = TestClient(_app()).get("/missing")
+        assert response.status_code == 404
+        assert list(_stages(response.headers["server-timing"])) == ["total"]
+
+    def test_stages_are_no_ops_outside_a_request(self):
+        with timing.stage("cache"):
+            pass
+        timing.record("cache", 1.0)
+        with CircuitBreaker("timing_test_idle").guard():
+            pass
+
+    def test_repeated_stages_are_summed(self):
+        request = RequestTiming()
+        request.add("directions", 0.010)
+        request.add("directions", 0.0025)
+        header = request.header(request.start + 0.02)
+        assert header == 'directions;dur=12.5;desc="2 calls", total;dur=20.0'
@@ -0,0 +1,66 @@
+import sys
+import os
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.triage import TriageEngine, emergency_instructions, emergency_number
+
+
+class TestTriageEngine:
+    """Tests for the local emergency triage"""
+
+    def setup_method(self):
+        self.engine = TriageEngine()
+
+    def test_flags_english_and_spanish_emergencies(self):
+        result = self.engine.assess("Crushing chest pain and I can't breathe")
+        assert result.emergency
+        assert result.conditions == ["cardiac", "breathing"]
+
+        result = self.engine.assess("Mi padre se desmayó y tiene dolor en el pecho")
+        assert result.emergency
+        assert set(result.conditions) == {"unconscious", "cardiac"}
+
+    def test_ignores_ordinary_and_negated_symptoms(self):
+        assert not self.engine.assess("headache and fever").emergency
+        assert not self.engine.assess("no chest pain, just a cough").emergency
+        assert not self.engine.assess("sin dificultad para respirar").emergency
+
+    def test_negation_reaches_a_few_words_within_the_clause(self):
+        assert not self.engine.assess("I do not have chest pain").emergency
+        assert not self.engine.assess("I don't have any chest pain").emergency
+        assert not self.engine.assess("no tengo ninguna dificultad para respirar").emergency
+        assert self.engine.assess("no fever but crushing chest pain").conditions == ["cardiac"]
+        assert self.engine.assess("no puede hablar y no puede respirar").conditions == ["stroke", "breathing"]
+
+    def test_negation_stops_at_punctuation(self):
+        for text in ("no fever, chest pain", "I have no fever. Chest pain since morning",
+                     "Denies fever. Crushing pain in chest", "sin fiebre, dolor de pecho",
+                     "No tengo fiebre. Dolor en el pecho desde la mañana", "Niega fiebre; dolor de pecho"):
+            assert self.engine.assess(text).conditions == ["cardiac"], text
+        assert not self.engine.assess("Niega dolor de pecho").emergency
+
+    def test_ambiguous_words_need_medical_context(self):
+        assert not self.engine.assess("It was a stroke of luck that I found the pharmacy open").emergency
+        assert not self.engine.assess("I had a stroke of genius").emergency
+        assert self.engine.assess("I think my mother is having a stroke").conditions == ["stroke"]
+
+    def test_matches_whole_words_and_prefixes(self):
+        assert not self.engine.assess("I have a strokes game tonight").emergency
+        assert self.engine.assess("he is having seizures").conditions == ["unconscious"]
+
+    def test_emergency_number_by_country(self):
+        assert self.engine.assess("chest pain", "GB").emergency_number == "999"
+        assert emergency_number("DE") == "112"
+        assert emergency_number(None) == "911"
+
+    def test_instructions_follow_language(self):
+        result = self.engine.assess("severe bleeding", "MX")
+        english = emergency_instructions(result, "English")
+        spanish = emergency_instructions(result, "Español")
+
+        assert english.startswith("**⚠️ EMERGENCY MEDICAL ATTENTION REQUIRED ⚠️**")
+        assert "Call emergency services (911)" in english
+        assert "Llame a emergencias (911)" in spanish
+        assert "**ADVERTENCIA:**" in spanish and "WARNING" not in spanish
@@ -5,11 +5,13 @@ import MapView, { Marker, Polyline } from 'react-native-maps';
 import * as Location from 'expo-location';
 import config from '../config';
 import Button from '../components/Button';
+import { decodePolyline } from '../utils/polyline';
 
 const MapComponent = ({ 
   destination: propDestination, 
   directions = [], 
   hospitalDetails = null, 
+  priorityToken = null,
   onBackPress,
   onHomePress 
 }) => {
@@ -145,14 +147,17 @@ const MapComponent = ({
     try {
       // Call your backend API for real directions
       const response = await fetch(
-        `${config.API_BASE_URL}/directions?origin=${origin.latitude},${origin.longitude}&destination=${destination.latitude},${destination.longitude}`
+        `${config.API_BASE_URL}/directions?origin=${origin.latitude},${origin.longitude}&destination=${destination.latitude},${destination.longitude}&format=polyline`,
+        { headers: priorityToken ? { 'X-Priority-Token': priorityToken } : {} }
       );
       
       if (response.ok) {
         const data = await response.json();
+        // The route comes back as an encoded polyline to keep the payload small
+        const routePoints = data.route_format === 'polyline' ? decodePolyline(data.route) : data.route;
         // Update route and navigation data
-        if (data.route && data.route.length > 0) {
-          setRoute(data.route);
+        if (routePoints && routePoints.length > 0) {
+          setRoute(routePoints);
           setNavigationSteps(data.steps || []);
           setRouteInfo({
             distance: data.distance || 'Unknown',
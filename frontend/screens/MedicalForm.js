@@ -138,6 +138,8 @@ export default function MedicalForm({ navigation }) {
           location: location,
           language: language,
           medical_issue: medicalIssue,
+          latitude: currentLocation?.latitude,
+          longitude: currentLocation?.longitude,
         }),
       });
 
@@ -151,7 +153,12 @@ export default function MedicalForm({ navigation }) {
           language,
           medical_issue: medicalIssue,
           how_are_you: howAreYou,
-          gemini_response: data.message // Pass the Gemini response
+          gemini_response: data.message, // Pass the Gemini response
+          emergency: data.emergency === true,
+          // Emergencies get instructions first; the detailed advice is fetched from here
+          advice_url: data.advice_url,
+          // Puts the hospital and directions requests in the backend's emergency lane
+          priority_token: data.priority_token
         });
       } else {
         Alert.alert('Error', 'Failed to get medical advice. Please try again.');
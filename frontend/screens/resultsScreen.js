@@ -15,6 +15,10 @@ import MapComponent from './MapComponent';
 import Button from '../components/Button';
 import { emergencyNumbers } from '../utils/emergencyNumbers';
 
+// Detailed advice after an emergency: poll every 2 s for up to 3 minutes
+const ADVICE_POLL_INTERVAL_MS = 2000;
+const ADVICE_POLL_MAX_ATTEMPTS = 90;
+
 const PlacesSearch = ({ route, navigation }) => {
   const [location, setLocation] = useState(null);
   const [errorMsg, setErrorMsg] = useState(null);
@@ -24,6 +28,8 @@ const PlacesSearch = ({ route, navigation }) => {
   const [loading, setLoading] = useState(false);
   const [screen, setScreen] = useState('info'); // 'info' or 'directions'
   const [phoneNumber, setPhoneNumber] = useState('');
+  const [detailedAdvice, setDetailedAdvice] = useState(null);
+  const [adviceStatus, setAdviceStatus] = useState(null); // 'pending', 'done' or 'failed'
 
     // Get country from device location
   const setCountryFromLocation = async (latitude, longitude) => {
@@ -45,7 +51,10 @@ const PlacesSearch = ({ route, navigation }) => {
     location: userLocation, 
     language, 
     medical_issue, 
-    gemini_response 
+    gemini_response,
+    emergency = false,
+    advice_url,
+    priority_token
   } = route?.params || {};
 
   // Function to render formatted Gemini response
@@ -106,7 +115,8 @@ const PlacesSearch = ({ route, navigation }) => {
                                 trimmedLine.toLowerCase().includes('difficulty breathing') ||
                                 trimmedLine.toLowerCase().includes('severe') ||
                                 trimmedLine.startsWith('**WARNING:**') ||
-                                trimmedLine.includes('WARNING:');
+                                trimmedLine.includes('WARNING:') ||
+                                trimmedLine.includes('ADVERTENCIA:');
         
         elements.push(
           <Text key={key++} style={isEmergencyText ? styles.warningText : styles.regularText}>
@@ -142,6 +152,56 @@ const PlacesSearch = ({ route, navigation }) => {
     }
   }, [location]);
 
+  // After an emergency triage the backend answers with instructions right away
+  // and keeps generating the detailed advice; poll for it until it is ready
+  useEffect(() => {
+    if (!advice_url) return;
+
+    let cancelled = false;
+    let timer = null;
+    let attempts = 0;
+    setAdviceStatus('pending');
+
+    const poll = async () => {
+      attempts += 1;
+      try {
+        const response = await fetch(`${config.API_BASE_URL}${advice_url}`);
+        if (cancelled) return;
+        if (response.status === 404) {
+          setAdviceStatus('failed');
+          return;
+        }
+        if (response.ok) {
+          const data = await response.json();
+          if (cancelled) return;
+          if (data.status === 'done' && data.message) {
+            setDetailedAdvice(data.message);
+            setAdviceStatus('done');
+            return;
+          }
+          if (data.status === 'failed') {
+            setAdviceStatus('failed');
+            return;
+          }
+        }
+      } catch (error) {
+        console.log('Could not fetch the detailed advice, retrying');
+      }
+      if (cancelled) return;
+      if (attempts >= ADVICE_POLL_MAX_ATTEMPTS) {
+        setAdviceStatus('failed');
+        return;
+      }
+      timer = setTimeout(poll, ADVICE_POLL_INTERVAL_MS);
+    };
+
+    poll();
+    return () => {
+      cancelled = true;
+      if (timer) clearTimeout(timer);
+    };
+  }, [advice_url]);
+
   const fetchNearbyHospitalAndDetails = async () => {
     if (!location) return;
 
@@ -149,40 +209,29 @@ const PlacesSearch = ({ route, navigation }) => {
     try {
       const { latitude, longitude } = location.coords;
       
-      const nearbyResponse = await fetch(
-        `${config.API_BASE_URL}/api/places/nearby?latitude=${latitude}&longitude=${longitude}&radius=10000&place_type=hospital`
+      // Nearby search, hospital details and directions in one round trip,
+      // picking the hospital with the shortest drive rather than Google's first result
+      const careResponse = await fetch(
+        `${config.API_BASE_URL}/api/places/nearest-care?latitude=${latitude}&longitude=${longitude}&radius=10000&place_type=hospital&rank=eta`,
+        // Emergencies use the reserved Google API budget on the backend
+        { headers: priority_token ? { 'X-Priority-Token': priority_token } : {} }
       );
-      if (!nearbyResponse.ok) throw new Error('Failed to fetch nearby hospitals');
+      if (!careResponse.ok) throw new Error('Failed to fetch nearby hospitals');
 
-      const nearbyData = await nearbyResponse.json();
-      const hospitals = nearbyData.places;
-      if (!hospitals || hospitals.length === 0) {
+      const careData = await careResponse.json();
+      if (!careData.hospital) {
         Alert.alert('No hospitals found.');
         return;
       }
 
-      const firstHospital = hospitals[0];
-      setNearbyHospital(firstHospital);
-
-      const detailsResponse = await fetch(
-        `${config.API_BASE_URL}/api/places/details?place_id=${firstHospital.place_id}`
-      );
-      if (!detailsResponse.ok) throw new Error('Failed to fetch hospital details');
-
-      const detailsData = await detailsResponse.json();
-      setHospitalDetails(detailsData.result);
+      setNearbyHospital(careData.hospital);
+      setHospitalDetails(careData.details);
 
-      const destinationLat = detailsData.result.geometry.location.lat;
-      const destinationLng = detailsData.result.geometry.location.lng;
+      const destinationLat = careData.details.geometry.location.lat;
+      const destinationLng = careData.details.geometry.location.lng;
       setCountryFromLocation(destinationLat, destinationLng);
 
-      const directionsResponse = await fetch(
-        `${config.API_BASE_URL}/api/places/directions?origin_latitude=${latitude}&origin_longitude=${longitude}&destination_latitude=${destinationLat}&destination_longitude=${destinationLng}`
-      );
-      if (!directionsResponse.ok) throw new Error('Failed to fetch directions');
-
-      const directionsData = await directionsResponse.json();
-      setDirections(directionsData.steps);
+      setDirections(careData.steps);
 
     } catch (error) {
       Alert.alert('Error', error.message);
@@ -200,6 +249,7 @@ const PlacesSearch = ({ route, navigation }) => {
         }}
         directions={directions}
         hospitalDetails={hospitalDetails}
+        priorityToken={priority_token}
         onBackPress={() => setScreen('info')}
         onHomePress={() => navigation.goBack()}
       />
@@ -238,6 +288,25 @@ const PlacesSearch = ({ route, navigation }) => {
               </Text>
             </View>
           )}
+
+          {adviceStatus === 'pending' && (
+            <View style={styles.loadingAdvice}>
+              <ActivityIndicator size="small" color="#666" />
+              <Text style={styles.loadingText}>
+                Preparing detailed advice... Follow the instructions above in the meantime.
+              </Text>
+            </View>
+          )}
+          {adviceStatus === 'done' && detailedAdvice && (
+            <View style={styles.adviceContainer}>
+              {renderFormattedResponse(detailedAdvice)}
+            </View>
+          )}
+          {adviceStatus === 'failed' && (
+            <Text style={styles.regularText}>
+              Detailed advice is not available right now. Follow the instructions above and contact emergency services.
+            </Text>
+          )}
         </View>
 
         {/* Error Display */}
@@ -263,6 +332,9 @@ const PlacesSearch = ({ route, navigation }) => {
               <Text style={styles.hospitalName}>{hospitalDetails.name}</Text>
               <Text style={styles.hospitalDetail}>Address: {hospitalDetails.formatted_address}</Text>
               <Text style={styles.hospitalDetail}>Phone: {hospitalDetails.formatted_phone_number || 'N/A'}</Text>
+              {nearbyHospital?.duration && (
+                <Text style={styles.hospitalDetail}>Drive time: {nearbyHospital.duration}</Text>
+              )}
             </View>
             
             {/* Navigation Button */}